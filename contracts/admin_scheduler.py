@@ -0,0 +1,265 @@
+"""
+TrackBuddy -- Deadline-Aware Admin Scheduler
+
+verifySession (user funds waiting), applyPenalty (real-time enforcement)
+and logDiscipline (end-of-day, deferrable) all go out from the same admin
+account and compete for the same round capacity. AdminScheduler queues
+admin operations by priority class and validity-window deadline, and each
+round packs the most urgent ones into atomic groups under a
+txns-per-round budget, so a nightly score dump cannot starve settlements.
+
+Ordering:
+  1. ops whose deadline is within `urgent_slack` rounds, earliest first
+  2. then by priority class (PRIORITIES), earliest deadline first
+Ops whose deadline has passed are dropped and counted as expired.
+
+Sending: a group the node rejects (HTTP 400, e.g. one op's assert fails)
+is split and each op retried alone, so one bad call does not sink the
+unrelated calls grouped with it; an op rejected on its own is counted as
+failed and kept in `failures`. Any other send error (node unreachable,
+5xx) re-queues that group and the rest of the round untouched.
+
+Usage:
+    scheduler = AdminScheduler(txns_per_round=64)
+    scheduler.enqueue("verifySession", account, success=True, deadline_round=r + 20)
+    scheduler.enqueue("logDiscipline", account, score=87)
+    txids = scheduler.send_round(algod_client, admin, admin_key, app_id)
+    print(scheduler.stats())
+"""
+
+import time
+import heapq
+import itertools
+from dataclasses import dataclass, field
+
+from algosdk.error import AlgodHTTPError
+from algosdk.transaction import assign_group_id
+
+from instrumentation import percentile
+from txn_templates import TEMPLATE_METHODS
+
+
+MAX_GROUP_SIZE = 16          # protocol limit on transactions per atomic group
+DEFAULT_TXNS_PER_ROUND = 64
+DEFAULT_DEADLINE_ROUNDS = 1000
+DEFAULT_URGENT_SLACK = 3
+
+# Lower runs first.
+PRIORITIES = {
+    "verifySession": 0,      # user funds waiting on the outcome
+    "settleBridge": 1,       # user-visible payout confirmation
+    "applyPenalty": 2,       # real-time enforcement
+    "applyPenaltyN": 2,
+    "logDiscipline": 3,      # end-of-day, deferrable
+}
+
+
+@dataclass
+class AdminOp:
+    """One queued admin call."""
+    method: str
+    account: str
+    args: dict
+    priority: int
+    deadline_round: int
+    enqueued_round: int
+    enqueued_at: float
+    seq: int = 0
+    lease: bytes = None
+
+
+@dataclass
+class _MethodStats:
+    enqueued: int = 0
+    dispatched: int = 0
+    expired: int = 0
+    failed: int = 0
+    requeued: int = 0
+    wait_rounds: list = field(default_factory=list)
+    wait_secs: list = field(default_factory=list)
+
+
+def _rejected(error: Exception) -> bool:
+    """True if the node evaluated and refused the txns (vs. never reached / failed)."""
+    return isinstance(error, AlgodHTTPError) and error.code == 400
+
+
+class AdminScheduler:
+    """Priority + earliest-deadline-first queue of admin operations."""
+
+    def __init__(self, txns_per_round: int = DEFAULT_TXNS_PER_ROUND, group_size: int = MAX_GROUP_SIZE,
+                 urgent_slack: int = DEFAULT_URGENT_SLACK, clock=time.monotonic):
+        if not 1 <= group_size <= MAX_GROUP_SIZE:
+            raise ValueError(f"group_size must be within 1-{MAX_GROUP_SIZE}")
+        if txns_per_round < 1:
+            raise ValueError("txns_per_round must be positive")
+        self.txns_per_round = txns_per_round
+        self.group_size = group_size
+        self.urgent_slack = urgent_slack
+        self.clock = clock
+        self.current_round = 0
+        self._seq = itertools.count()
+        # One (deadline, seq, op) heap per priority class.
+        self._queues = {p: [] for p in sorted(set(PRIORITIES.values()))}
+        self._stats = {m: _MethodStats() for m in PRIORITIES}
+        self.failures = []       # (AdminOp, error message) for ops the node rejected
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    # -- enqueue --
+
+    def enqueue(self, method: str, account: str, deadline_round: int = None,
+                lease: bytes = None, **args) -> AdminOp:
+        """Queue one admin call; `args` are the builder's extra arguments."""
+        if method not in PRIORITIES or method not in TEMPLATE_METHODS:
+            raise ValueError(f"Unschedulable admin method: {method}")
+        if deadline_round is None:
+            deadline_round = self.current_round + DEFAULT_DEADLINE_ROUNDS
+        op = AdminOp(method, account, args, PRIORITIES[method], deadline_round,
+                     self.current_round, self.clock(), next(self._seq), lease)
+        heapq.heappush(self._queues[op.priority], (op.deadline_round, op.seq, op))
+        self._stats[method].enqueued += 1
+        return op
+
+    # -- planning --
+
+    def _drop_expired(self, rnd: int):
+        for queue in self._queues.values():
+            while queue and queue[0][0] < rnd:
+                _, _, op = heapq.heappop(queue)
+                self._stats[op.method].expired += 1
+
+    def _pop_next(self, rnd: int):
+        """Most urgent op: near-deadline first, then by priority class."""
+        urgent = None
+        for queue in self._queues.values():
+            if queue and queue[0][0] - rnd <= self.urgent_slack:
+                if urgent is None or queue[0][:2] < urgent[0][:2]:
+                    urgent = queue
+        if urgent is not None:
+            return heapq.heappop(urgent)[2]
+        for queue in self._queues.values():
+            if queue:
+                return heapq.heappop(queue)[2]
+        return None
+
+    def _take(self, rnd: int) -> list:
+        """Pop this round's groups without recording them as dispatched."""
+        self.current_round = rnd
+        self._drop_expired(rnd)
+        ops = []
+        while len(ops) < self.txns_per_round:
+            op = self._pop_next(rnd)
+            if op is None:
+                break
+            ops.append(op)
+        return [ops[i:i + self.group_size] for i in range(0, len(ops), self.group_size)]
+
+    def _dispatched(self, ops: list, rnd: int, now: float):
+        for op in ops:
+            stats = self._stats[op.method]
+            stats.dispatched += 1
+            stats.wait_rounds.append(rnd - op.enqueued_round)
+            stats.wait_secs.append(now - op.enqueued_at)
+
+    def _requeue(self, ops: list):
+        for op in ops:
+            heapq.heappush(self._queues[op.priority], (op.deadline_round, op.seq, op))
+            self._stats[op.method].requeued += 1
+
+    def plan_round(self, rnd: int) -> list:
+        """
+        Pop this round's work: a list of groups (lists of AdminOp), at
+        most `txns_per_round` ops in total and `group_size` per group.
+        The ops count as dispatched; the caller owns sending them.
+        """
+        groups = self._take(rnd)
+        now = self.clock()
+        for ops in groups:
+            self._dispatched(ops, rnd, now)
+        return groups
+
+    # -- building / sending --
+
+    @staticmethod
+    def build_group(ops: list, admin: str, sp, app_id: int) -> list:
+        """Grouped transactions for `ops`; each expires at its op's deadline."""
+        txns = []
+        for op in ops:
+            builder, _ = TEMPLATE_METHODS[op.method]
+            txn = builder(admin, sp, app_id, account=op.account, **op.args)
+            txn.last_valid_round = min(txn.last_valid_round, op.deadline_round)
+            if op.lease is not None:
+                txn.lease = op.lease
+            txns.append(txn)
+        return assign_group_id(txns) if len(txns) > 1 else txns
+
+    def _send(self, ops: list, algod_client, admin: str, admin_key: str, sp, app_id: int, archive) -> str:
+        signed = [txn.sign(admin_key) for txn in self.build_group(ops, admin, sp, app_id)]
+        if archive is not None:
+            archive.append_group(signed)
+        return algod_client.send_transactions(signed)
+
+    def send_round(self, algod_client, admin: str, admin_key: str, app_id: int, archive=None) -> list:
+        """
+        Plan the next round against algod's suggested params and submit it
+        (archiving if given). Returns the txids sent; see the module
+        docstring for how rejected and unsent ops are handled.
+        """
+        sp = algod_client.suggested_params()
+        attempts = self._take(sp.first)
+        now = self.clock()
+        txids = []
+        while attempts:
+            ops = attempts.pop(0)
+            try:
+                txids.append(self._send(ops, algod_client, admin, admin_key, sp, app_id, archive))
+            except (AlgodHTTPError, OSError) as e:
+                if not _rejected(e):
+                    self._requeue([op for group in [ops] + attempts for op in group])
+                    break
+                if len(ops) > 1:
+                    # One op's failure rejects the whole atomic group: retry each alone.
+                    attempts[:0] = [[op] for op in ops]
+                else:
+                    self._failed(ops[0], e)
+                continue
+            self._dispatched(ops, sp.first, now)
+        return txids
+
+    def _failed(self, op: AdminOp, error: Exception):
+        self._stats[op.method].failed += 1
+        self.failures.append((op, str(error)))
+
+    # -- metrics --
+
+    def depth(self) -> dict:
+        """Queued ops per method."""
+        counts = {}
+        for queue in self._queues.values():
+            for _, _, op in queue:
+                counts[op.method] = counts.get(op.method, 0) + 1
+        return counts
+
+    def stats(self) -> dict:
+        """Per-method counters and wait-time percentiles (rounds and seconds)."""
+        depth = self.depth()
+        report = {}
+        for method, s in self._stats.items():
+            if not (s.enqueued or depth.get(method)):
+                continue
+            rounds, secs = sorted(s.wait_rounds), sorted(s.wait_secs)
+            report[method] = {
+                "depth": depth.get(method, 0),
+                "enqueued": s.enqueued,
+                "dispatched": s.dispatched,
+                "expired": s.expired,
+                "failed": s.failed,
+                "requeued": s.requeued,
+                "wait_rounds_p50": percentile(rounds, 50),
+                "wait_rounds_p99": percentile(rounds, 99),
+                "wait_secs_p50": percentile(secs, 50),
+                "wait_secs_p99": percentile(secs, 99),
+            }
+        return report
@@ -0,0 +1,430 @@
+"""
+TrackBuddy -- Bulk Backfill Loader
+
+Rebuilding the database from chain through dbSync.ts costs several
+Prisma round trips per event. This pipeline folds the decoded event
+stream in memory with the same rules as dbSync's handlers and writes
+the final rows as PostgreSQL COPY files plus a load.sql that applies
+them in one transaction:
+
+    commitments          on_chain_tx_id / status / end_time   (UPDATE from staging)
+    violations           one row per penalty                  (INSERT, skip known tx ids)
+    discipline_scores    per (user, day)                      (INSERT ... ON CONFLICT)
+    bridge_transactions  intents + settlements                (INSERT new, settle PENDING)
+
+Users and commitments are created by the API, not on chain, so the fold
+starts from a snapshot of them (snapshot.sql exports the CSVs). All
+non-cancelled commitments are reset to ACTIVE / unlinked and replayed,
+which is what a clean dbSync run over the same history would produce.
+
+Differences from the live handlers, all deliberate:
+  - timestamps (end_time, discipline day) come from the round time,
+    not the sync wall clock
+  - a commitment only matches events confirmed after it was created
+  - applyPenaltyN becomes `count` violations (dbSync predates it)
+  - row ids are uuid5 of the tx id, so reloading is idempotent
+
+Usage:
+    python backfill_loader.py snapshot --dsn $DATABASE_URL --out snap/
+    python block_ingestor.py --app-id 1234 --from-round 0 > events.jsonl
+    python backfill_loader.py build --snapshot snap/ --events events.jsonl --out backfill/
+    python backfill_loader.py load backfill/ --dsn $DATABASE_URL
+"""
+
+import os
+import sys
+import csv
+import uuid
+import argparse
+import subprocess
+from datetime import datetime, timezone
+from dataclasses import dataclass, field
+
+from events import ContractEvent, read_event_lines
+
+
+ID_NAMESPACE = uuid.UUID("6f1c5a52-4b1e-4e4a-9d55-7472616b6275")
+MICROALGOS = 1_000_000
+PENALTY_RATE = 0.1                  # handleApplyPenalty: stakeAmount * 0.1
+
+# table -> COPY column order
+COLUMNS = {
+    "commitments": ("id", "on_chain_tx_id", "status", "end_time"),
+    "violations": ("id", "user_id", "commitment_id", "type", "penalty_applied", "penalty_amount",
+                   "call_triggered", "on_chain_tx_id", "occurred_at", "created_at"),
+    "discipline_scores": ("id", "user_id", "date", "overall_score", "focus_score", "consistency_score",
+                          "current_streak", "longest_streak", "on_chain_tx_id", "created_at"),
+    "bridge_transactions": ("id", "user_id", "algo_amount", "algo_tx_id", "exchange_rate", "inr_amount",
+                            "status", "on_chain_intent_tx_id", "on_chain_settle_tx_id",
+                            "created_at", "updated_at", "settled_at"),
+}
+
+
+# ── Rows ──
+
+@dataclass
+class CommitmentRow:
+    id: str
+    user_id: str
+    stake_amount: float
+    created_at: datetime
+    status: str = "ACTIVE"
+    on_chain_tx_id: str = None
+    end_time: datetime = None
+    original: tuple = (None, "ACTIVE", None)    # (on_chain_tx_id, status, end_time) in the snapshot
+
+
+@dataclass
+class BridgeRow:
+    id: str
+    user_id: str
+    algo_amount: float
+    algo_tx_id: str
+    created_at: datetime
+    status: str = "PENDING"
+    on_chain_settle_tx_id: str = None
+    settled_at: datetime = None
+
+
+@dataclass
+class BackfillStats:
+    events: int = 0
+    unmatched: dict = field(default_factory=dict)
+
+    def miss(self, method: str):
+        self.unmatched[method] = self.unmatched.get(method, 0) + 1
+
+
+def _round_time(event: ContractEvent) -> datetime:
+    return datetime.fromtimestamp(event.round_time, timezone.utc).replace(tzinfo=None)
+
+
+def _row_id(*parts) -> str:
+    return str(uuid.uuid5(ID_NAMESPACE, ":".join(str(p) for p in parts)))
+
+
+# ── Fold ──
+
+class BackfillFold:
+    """Applies dbSync's handler rules to an in-memory copy of the affected tables."""
+
+    def __init__(self, users: dict, commitments: list):
+        self.users = users                          # wallet_address -> user id
+        self.commitments = {}                       # user id -> [CommitmentRow] by created_at
+        for row in sorted(commitments, key=lambda c: c.created_at):
+            self.commitments.setdefault(row.user_id, []).append(row)
+        self.violations = []
+        self.scores = {}                            # (user id, date) -> row dict
+        self.bridges = {}                           # user id -> [BridgeRow] in creation order
+        self.stats = BackfillStats()
+        self._handlers = {
+            "createCommitment": self._create_commitment,
+            "verifySession": self._verify_session,
+            "applyPenalty": self._apply_penalty,
+            "applyPenaltyN": self._apply_penalty,
+            "logDiscipline": self._log_discipline,
+            "bridgeIntent": self._bridge_intent,
+            "settleBridge": self._settle_bridge,
+        }
+
+    def apply(self, event: ContractEvent):
+        handler = self._handlers.get(event.method)
+        if handler is None:
+            return
+        self.stats.events += 1
+        if not handler(event):
+            self.stats.miss(event.method)
+
+    def apply_all(self, events):
+        for event in events:
+            self.apply(event)
+        return self
+
+    # -- lookups (findFirst ... orderBy createdAt desc) --
+
+    def _latest_commitment(self, wallet: str, at: datetime, unlinked: bool = False):
+        user_id = self.users.get(wallet)
+        for row in reversed(self.commitments.get(user_id, ())):
+            if row.created_at <= at and row.status == "ACTIVE" and not (unlinked and row.on_chain_tx_id):
+                return row
+        return None
+
+    # -- handlers --
+
+    def _create_commitment(self, event: ContractEvent) -> bool:
+        row = self._latest_commitment(event.sender, _round_time(event), unlinked=True)
+        if row is not None:
+            row.on_chain_tx_id = event.tx_id
+        return row is not None
+
+    def _verify_session(self, event: ContractEvent) -> bool:
+        at = _round_time(event)
+        row = self._latest_commitment(event.arg_account(0), at)
+        if row is not None:
+            row.status = "COMPLETED" if event.arg_uint(1) == 1 else "FAILED"
+            row.end_time = at
+        return row is not None
+
+    def _apply_penalty(self, event: ContractEvent) -> bool:
+        at = _round_time(event)
+        row = self._latest_commitment(event.arg_account(0), at)
+        if row is None:
+            return False
+        count = event.arg_uint(1) if event.method == "applyPenaltyN" else 1
+        for i in range(count):
+            self.violations.append({
+                "id": _row_id("violation", event.tx_id, i),
+                "user_id": row.user_id,
+                "commitment_id": row.id,
+                "type": "MISSED_SESSION",
+                "penalty_applied": False,
+                "penalty_amount": row.stake_amount * PENALTY_RATE,
+                "call_triggered": False,
+                "on_chain_tx_id": event.tx_id,
+                "occurred_at": at,
+                "created_at": at,
+            })
+        return True
+
+    def _log_discipline(self, event: ContractEvent) -> bool:
+        user_id = self.users.get(event.arg_account(0))
+        if user_id is None:
+            return False
+        at = _round_time(event)
+        key = (user_id, at.date())
+        row = self.scores.get(key)
+        if row is None:
+            row = self.scores[key] = {
+                "id": _row_id("score", user_id, key[1]),
+                "user_id": user_id,
+                "date": key[1],
+                "focus_score": 0.0,
+                "consistency_score": 0.0,
+                "current_streak": 0,
+                "longest_streak": 0,
+                "created_at": at,
+            }
+        row["overall_score"] = float(event.arg_uint(1))
+        row["on_chain_tx_id"] = event.tx_id
+        return True
+
+    def _bridge_intent(self, event: ContractEvent) -> bool:
+        user_id = self.users.get(event.sender)
+        if user_id is None:
+            return False
+        self.bridges.setdefault(user_id, []).append(BridgeRow(
+            id=_row_id("bridge", event.tx_id),
+            user_id=user_id,
+            algo_amount=(event.payment_amount or 0) / MICROALGOS,
+            algo_tx_id=event.tx_id,
+            created_at=_round_time(event),
+        ))
+        return True
+
+    def _settle_bridge(self, event: ContractEvent) -> bool:
+        user_id = self.users.get(event.arg_account(0))
+        for row in reversed(self.bridges.get(user_id, ())):
+            if row.status == "PENDING":
+                row.status = "SETTLED"
+                row.on_chain_settle_tx_id = event.tx_id
+                row.settled_at = _round_time(event)
+                return True
+        return False
+
+    # -- output --
+
+    def rows(self) -> dict:
+        """table -> list of row dicts, in COLUMNS order."""
+        commitments = [
+            {"id": c.id, "on_chain_tx_id": c.on_chain_tx_id, "status": c.status, "end_time": c.end_time}
+            for rows in self.commitments.values() for c in rows
+            if (c.on_chain_tx_id, c.status, c.end_time) != c.original
+        ]
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        bridges = [
+            {
+                "id": b.id, "user_id": b.user_id, "algo_amount": b.algo_amount, "algo_tx_id": b.algo_tx_id,
+                "exchange_rate": 0.0, "inr_amount": 0.0, "status": b.status,
+                "on_chain_intent_tx_id": b.algo_tx_id, "on_chain_settle_tx_id": b.on_chain_settle_tx_id,
+                "created_at": b.created_at, "updated_at": b.settled_at or now, "settled_at": b.settled_at,
+            }
+            for rows in self.bridges.values() for b in rows
+        ]
+        return {
+            "commitments": commitments,
+            "violations": self.violations,
+            "discipline_scores": list(self.scores.values()),
+            "bridge_transactions": bridges,
+        }
+
+
+# ── Input ──
+
+def _parse_time(value: str):
+    """Snapshot timestamp -> naive UTC (Prisma's timestamp(3) columns carry no zone)."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def load_snapshot(directory: str) -> tuple:
+    """(users, commitments) from snapshot.sql's users.csv / commitments.csv."""
+    with open(os.path.join(directory, "users.csv"), newline="") as f:
+        users = {row["wallet_address"]: row["id"] for row in csv.DictReader(f) if row["wallet_address"]}
+    commitments = []
+    with open(os.path.join(directory, "commitments.csv"), newline="") as f:
+        for row in csv.DictReader(f):
+            if row["status"] == "CANCELLED":
+                continue
+            original = (row["on_chain_tx_id"] or None, row["status"], _parse_time(row["end_time"]))
+            commitments.append(CommitmentRow(
+                id=row["id"], user_id=row["user_id"], stake_amount=float(row["stake_amount"]),
+                created_at=_parse_time(row["created_at"]), original=original,
+            ))
+    return users, commitments
+
+
+# ── COPY Output ──
+
+_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def copy_value(value) -> str:
+    """One field in PostgreSQL COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ", timespec="milliseconds")
+    if isinstance(value, float):
+        return repr(value)
+    return str(value).translate(_ESCAPES)
+
+
+def write_copy(path: str, columns: tuple, rows) -> int:
+    count = 0
+    with open(path, "w") as f:
+        for row in rows:
+            f.write("\t".join(copy_value(row.get(c)) for c in columns) + "\n")
+            count += 1
+    return count
+
+
+_STAGE = """CREATE TEMP TABLE stage_{table} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP;
+\\copy stage_{table} ({columns}) FROM '{table}.copy'
+"""
+
+LOAD_SQL = """-- Generated by backfill_loader.py; run from this directory:
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f load.sql
+BEGIN;
+
+CREATE TEMP TABLE stage_commitments (id text, on_chain_tx_id text, status text, end_time timestamp(3)) ON COMMIT DROP;
+\\copy stage_commitments ({commitments}) FROM 'commitments.copy'
+UPDATE commitments c
+   SET on_chain_tx_id = s.on_chain_tx_id, status = s.status::"CommitmentStatus",
+       end_time = s.end_time, updated_at = now()
+  FROM stage_commitments s
+ WHERE c.id = s.id;
+
+{stage_violations}INSERT INTO violations ({violations})
+SELECT {violations} FROM stage_violations s
+ WHERE NOT EXISTS (SELECT 1 FROM violations v WHERE v.on_chain_tx_id = s.on_chain_tx_id);
+
+{stage_discipline_scores}INSERT INTO discipline_scores ({discipline_scores})
+SELECT {discipline_scores} FROM stage_discipline_scores
+    ON CONFLICT (user_id, date) DO UPDATE
+   SET overall_score = EXCLUDED.overall_score, on_chain_tx_id = EXCLUDED.on_chain_tx_id;
+
+{stage_bridge_transactions}INSERT INTO bridge_transactions ({bridge_transactions})
+SELECT {bridge_transactions} FROM stage_bridge_transactions s
+ WHERE NOT EXISTS (SELECT 1 FROM bridge_transactions b WHERE b.on_chain_intent_tx_id = s.on_chain_intent_tx_id);
+UPDATE bridge_transactions b
+   SET status = 'SETTLED', on_chain_settle_tx_id = s.on_chain_settle_tx_id,
+       settled_at = s.settled_at, updated_at = now()
+  FROM stage_bridge_transactions s
+ WHERE b.on_chain_intent_tx_id = s.on_chain_intent_tx_id
+   AND s.status = 'SETTLED' AND b.status = 'PENDING';
+
+COMMIT;
+"""
+
+SNAPSHOT_SQL = """-- Generated by backfill_loader.py; exports the API-owned rows the fold starts from.
+\\copy (SELECT id, wallet_address FROM users WHERE wallet_address IS NOT NULL) TO 'users.csv' CSV HEADER
+\\copy (SELECT id, user_id, status, stake_amount, on_chain_tx_id, end_time, created_at FROM commitments) TO 'commitments.csv' CSV HEADER
+"""
+
+
+def render_load_sql() -> str:
+    params = {table: ", ".join(columns) for table, columns in COLUMNS.items()}
+    for table in ("violations", "discipline_scores", "bridge_transactions"):
+        params[f"stage_{table}"] = _STAGE.format(table=table, columns=params[table])
+    return LOAD_SQL.format(**params)
+
+
+def write_backfill(fold: BackfillFold, out_dir: str) -> dict:
+    """Write <table>.copy files and load.sql; returns row counts per table."""
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {
+        table: write_copy(os.path.join(out_dir, f"{table}.copy"), COLUMNS[table], rows)
+        for table, rows in fold.rows().items()
+    }
+    with open(os.path.join(out_dir, "load.sql"), "w") as f:
+        f.write(render_load_sql())
+    return counts
+
+
+def run_psql(dsn: str, script: str, cwd: str):
+    """Run a psql script (relative \\copy paths resolve against `cwd`)."""
+    subprocess.run(["psql", dsn, "-v", "ON_ERROR_STOP=1", "-q", "-f", script], cwd=cwd, check=True)
+
+
+# ── CLI ──
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk backfill of chain events into the backend database")
+    sub = parser.add_subparsers(dest="command", required=True)
+    snap = sub.add_parser("snapshot", help="export users / commitments CSVs")
+    snap.add_argument("--dsn", default=os.getenv("DATABASE_URL"))
+    snap.add_argument("--out", default="snapshot")
+    build = sub.add_parser("build", help="fold events into COPY files")
+    build.add_argument("--snapshot", required=True)
+    build.add_argument("--events", required=True, help="block_ingestor JSON-lines output")
+    build.add_argument("--out", default="backfill")
+    load = sub.add_parser("load", help="apply COPY files with psql")
+    load.add_argument("directory")
+    load.add_argument("--dsn", default=os.getenv("DATABASE_URL"))
+    args = parser.parse_args(argv)
+
+    if args.command in ("snapshot", "load") and not args.dsn:
+        print("❌ --dsn (or DATABASE_URL) is required")
+        sys.exit(1)
+
+    if args.command == "snapshot":
+        os.makedirs(args.out, exist_ok=True)
+        with open(os.path.join(args.out, "snapshot.sql"), "w") as f:
+            f.write(SNAPSHOT_SQL)
+        run_psql(args.dsn, "snapshot.sql", args.out)
+        print(f"Snapshot written to {args.out}/")
+    elif args.command == "build":
+        users, commitments = load_snapshot(args.snapshot)
+        fold = BackfillFold(users, commitments).apply_all(read_event_lines(args.events))
+        counts = write_backfill(fold, args.out)
+        print(f"Folded {fold.stats.events} events into {args.out}/")
+        for table, count in counts.items():
+            print(f"  {table:<20} {count:>9} rows")
+        for method, count in sorted(fold.stats.unmatched.items()):
+            print(f"  unmatched {method:<15} {count:>6}")
+    else:
+        if not os.path.exists(os.path.join(args.directory, "load.sql")):
+            print(f"❌ No load.sql in {args.directory}")
+            sys.exit(1)
+        run_psql(args.dsn, "load.sql", args.directory)
+        print(f"Loaded {args.directory}/")
+
+
+if __name__ == "__main__":
+    main()
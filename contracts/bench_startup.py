@@ -0,0 +1,76 @@
+"""
+TrackBuddy -- CLI Startup Benchmark
+
+Runs `cli.py <command>` in fresh interpreters and reports the median
+wall time, the bare-interpreter baseline, and whether heavy modules
+(algosdk, dotenv) were imported. Exits non-zero when the median exceeds
+the budget, so it can gate CI. `compile` runs write into a temporary
+directory, never the tracked artifacts/ or contract_codec.py.
+
+Usage:
+    python bench_startup.py                    # compile, 20 runs, 100 ms budget
+    python bench_startup.py --help-only --runs 50
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("algosdk", "dotenv", "msgpack", "numpy")
+
+_PROBE = (
+    "import sys, runpy; sys.argv = ['cli.py'] + sys.argv[1:]; "
+    "runpy.run_path('cli.py', run_name='__main__'); "
+    "sys.stderr.write(' '.join(m for m in {heavy!r} if m in sys.modules))"
+)
+
+
+def _time(cmd: list, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def heavy_imports(command: list) -> list:
+    """Heavy modules loaded by running `command` through the CLI."""
+    probe = _PROBE.format(heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", probe] + command, cwd=HERE,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    return result.stderr.split()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure trackbuddy-contracts startup time")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    parser.add_argument("--help-only", action="store_true", help="time `--help` instead of `compile`")
+    args = parser.parse_args(argv)
+
+    label = "--help" if args.help_only else "compile"
+    baseline = statistics.median(_time([sys.executable, "-c", "pass"], args.runs)) * 1000
+    with tempfile.TemporaryDirectory(prefix="trackbuddy-bench-") as out_dir:
+        command = [label] if args.help_only else [label, "--artifacts", out_dir]
+        median = statistics.median(_time([sys.executable, "cli.py"] + command, args.runs)) * 1000
+        heavy = heavy_imports(command)
+
+    print(f"Startup: cli.py {label} ({args.runs} runs)")
+    print("---")
+    print(f"  Interpreter: {baseline:.1f}ms")
+    print(f"  Command:     {median:.1f}ms  (+{median - baseline:.1f}ms)")
+    print(f"  Heavy deps:  {', '.join(heavy) or 'none'}")
+    if median > args.budget_ms:
+        print(f"❌ Over budget ({args.budget_ms:.0f}ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
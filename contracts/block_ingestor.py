@@ -0,0 +1,245 @@
+"""
+TrackBuddy -- Algod Block-Following Ingestor
+
+Follows new rounds directly from algod instead of polling the indexer
+every 5s (web3/listener.ts). For each round it waits on
+/v2/status/wait-for-block-after, fetches the raw msgpack block and
+decodes calls to our app, plus payments to the app address and any
+other watched address, into ContractEvents, typically within a round
+of confirmation. Receivers are matched against an address set built
+once at startup.
+
+The indexer is only used to backfill gaps algod can no longer serve,
+e.g. when resuming from a cursor older than the node's retained blocks.
+
+Usage:
+    python block_ingestor.py --app-id 1234
+    python block_ingestor.py --app-id 1234 --from-round 41000000
+    python block_ingestor.py --app-id 1234 --watch TREASURYADDR...
+"""
+
+import os
+import sys
+import time
+import argparse
+from dataclasses import dataclass, field
+
+import msgpack
+from algosdk import encoding, logic
+from algosdk.error import AlgodHTTPError
+
+import instrumentation
+from events import decode_block, decode_indexer_payment, decode_indexer_txn, event_to_json
+from instrumentation import percentile
+
+
+DEFAULT_CURSOR_PATH = ".block_cursor"
+INDEXER_PAGE_LIMIT = 1000
+
+
+@dataclass
+class IngestStats:
+    """Counters and per-round latency (seconds from block timestamp)."""
+    rounds: int = 0
+    events: int = 0
+    backfilled_events: int = 0
+    backfills: int = 0
+    latencies: list = field(default_factory=list)
+
+    def latency_percentiles(self) -> dict:
+        ordered = sorted(self.latencies)
+        return {q: percentile(ordered, q) for q in (50, 90, 99)}
+
+
+class BlockIngestor:
+    """
+    Streams ContractEvents for one app from algod blocks.
+
+    `on_event` is called for every decoded event, in chain order.
+    Payments to the app address and to `watch_addresses` are reported.
+    """
+
+    def __init__(self, algod_client, app_id: int, indexer_client=None, on_event=None,
+                 cursor_path: str = DEFAULT_CURSOR_PATH, clock=time.time, watch_addresses=()):
+        self.algod = algod_client
+        self.indexer = indexer_client
+        self.app_id = app_id
+        self.app_address_str = logic.get_application_address(app_id)
+        self.app_address = encoding.decode_address(self.app_address_str)
+        self.watch_addresses = [self.app_address_str] + \
+            [a for a in dict.fromkeys(watch_addresses) if a != self.app_address_str]
+        self.watch = frozenset(encoding.decode_address(a) for a in self.watch_addresses)
+        self.on_event = on_event or (lambda event: None)
+        self.cursor_path = cursor_path
+        self.clock = clock
+        self.stats = IngestStats()
+
+    # -- cursor --
+
+    def load_cursor(self) -> int:
+        """Last processed round, or 0 when starting fresh."""
+        if not self.cursor_path or not os.path.exists(self.cursor_path):
+            return 0
+        with open(self.cursor_path) as f:
+            return int(f.read().strip() or 0)
+
+    def save_cursor(self, rnd: int):
+        if not self.cursor_path:
+            return
+        tmp = f"{self.cursor_path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(rnd))
+        os.replace(tmp, self.cursor_path)
+
+    # -- algod path --
+
+    def fetch_block(self, rnd: int):
+        """Raw msgpack block for a round, or None if algod cannot serve it."""
+        try:
+            raw = self.algod.block_info(rnd, response_format="msgpack")
+        except AlgodHTTPError:
+            return None
+        return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+
+    def process_block(self, block: dict) -> list:
+        """Decode and emit events from one block."""
+        events = decode_block(block, self.app_id, self.app_address, self.watch)
+        header = block.get("block", block)
+        self.stats.rounds += 1
+        self.stats.latencies.append(max(0.0, self.clock() - header.get("ts", 0)))
+        for event in events:
+            self.on_event(event)
+        self.stats.events += len(events)
+        return events
+
+    # -- indexer backfill --
+
+    def _search(self, **kwargs):
+        token = None
+        while True:
+            page = self.indexer.search_transactions(limit=INDEXER_PAGE_LIMIT, next_page=token, **kwargs)
+            yield from page.get("transactions", [])
+            token = page.get("next-token")
+            if not token or not page.get("transactions"):
+                return
+
+    def backfill(self, min_round: int, max_round: int) -> int:
+        """
+        Emit events for [min_round, max_round] from the indexer.
+
+        Returns the last round the indexer could cover (which may be
+        below max_round if the indexer itself lags).
+        """
+        if self.indexer is None:
+            raise RuntimeError(f"algod cannot serve round {min_round} and no indexer is configured")
+        max_round = min(max_round, self.indexer.health().get("round", max_round))
+        if max_round < min_round:
+            return min_round - 1
+
+        calls = list(self._search(application_id=self.app_id, min_round=min_round, max_round=max_round))
+        call_groups = {txn["group"] for txn in calls if txn.get("group")}
+
+        group_payments = {}
+        events = []
+        for address in self.watch_addresses:
+            for txn in self._search(address=address, address_role="receiver",
+                                    txn_type="pay", min_round=min_round, max_round=max_round):
+                pay = txn.get("payment-transaction", {})
+                if txn.get("group") in call_groups and pay.get("receiver") == self.app_address_str:
+                    group_payments[txn["group"]] = group_payments.get(txn["group"], 0) + pay.get("amount", 0)
+                else:
+                    events.append(decode_indexer_payment(txn))
+
+        for txn in calls:
+            event = decode_indexer_txn(txn, group_payments)
+            if event is not None:
+                events.append(event)
+        events.sort(key=lambda e: e.order_key)
+
+        for event in events:
+            self.on_event(event)
+        self.stats.events += len(events)
+        self.stats.backfilled_events += len(events)
+        self.stats.backfills += 1
+        return max_round
+
+    # -- follow loop --
+
+    def follow(self, start_round: int = None, max_rounds: int = None, should_stop=None) -> int:
+        """
+        Process rounds as they are confirmed.
+
+        Starts after the saved cursor (or at `start_round`, or at the
+        next round if neither is set). Returns the last processed round.
+        """
+        last = self.algod.status()["last-round"]
+        cursor = self.load_cursor()
+        if start_round:
+            rnd = start_round
+        elif cursor:
+            rnd = cursor + 1
+        else:
+            rnd = last + 1
+        processed = 0
+
+        while max_rounds is None or processed < max_rounds:
+            if should_stop and should_stop():
+                break
+            if rnd > last:
+                last = self.algod.status_after_block(rnd - 1)["last-round"]
+                continue
+
+            block = self.fetch_block(rnd)
+            if block is None:
+                covered = self.backfill(rnd, last)
+                if covered < rnd:
+                    instrumentation.record_retry("ingest.block", "unavailable")
+                    time.sleep(1)
+                    continue
+                processed += covered - rnd + 1
+                rnd = covered + 1
+                self.save_cursor(covered)
+                continue
+
+            self.process_block(block)
+            self.save_cursor(rnd)
+            processed += 1
+            rnd += 1
+        return rnd - 1
+
+
+# ── CLI ──
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Follow algod blocks for discipline contract events")
+    parser.add_argument("--app-id", type=int, default=int(os.getenv("ALGO_APP_ID", "0") or 0))
+    parser.add_argument("--from-round", type=int, help="start here instead of the saved cursor")
+    parser.add_argument("--cursor", default=DEFAULT_CURSOR_PATH)
+    parser.add_argument("--watch", action="append", default=[], metavar="ADDRESS",
+                        help="also report payments to this address (repeatable)")
+    args = parser.parse_args(argv)
+
+    if not args.app_id:
+        print("❌ --app-id (or ALGO_APP_ID) is required")
+        sys.exit(1)
+
+    from config import get_algod_client, get_indexer_client
+
+    ingestor = BlockIngestor(
+        get_algod_client(),
+        args.app_id,
+        indexer_client=get_indexer_client(),
+        on_event=lambda event: print(event_to_json(event), flush=True),
+        cursor_path=args.cursor,
+        watch_addresses=args.watch,
+    )
+    try:
+        ingestor.follow(start_round=args.from_round)
+    except KeyboardInterrupt:
+        pct = ingestor.stats.latency_percentiles()
+        print(f"\nIngested {ingestor.stats.events} events over {ingestor.stats.rounds} rounds "
+              f"(latency p50={pct[50]:.2f}s p99={pct[99]:.2f}s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
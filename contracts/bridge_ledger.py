@@ -0,0 +1,266 @@
+"""
+TrackBuddy -- Bridge Intent Ledger
+
+bridgeIntent keeps nothing in contract state (the UPI hash and amount
+live only in the transaction) and settleBridge only records a ref hash,
+so finding unsettled intents means rescanning history. BridgeLedger
+ingests both events into in-memory indexes instead:
+
+  - by account    : pending intents per user (settlement matching)
+  - by upi_hash   : every intent paying out to a UPI id
+  - by age        : chain-ordered list, bisected for "older than T"
+  - running totals: locked amount overall and per account, O(1)
+
+settleBridge(account, ref) settles the account's most recent pending
+intent, the same rule the backend applies in dbSync.ts.
+
+Every applied event is appended to a JSON-lines journal, so the ledger
+persists incrementally and reloads by replaying it; compact() rewrites
+the journal down to the pending set. Events arrive in round order, so
+duplicates are caught with a round watermark: anything below
+last_round was already applied, and only the tx_ids of last_round
+itself are kept as tombstones. Re-ingesting overlapping history after a
+reload (cursor resume, indexer backfill) therefore cannot revive
+settled intents, and neither memory nor the compacted journal grows
+with total history.
+
+Usage:
+    ledger = BridgeLedger("bridge.journal")
+    BlockIngestor(algod, app_id, on_event=ledger.apply).follow()
+    ledger.unsettled_older_than(3600)      # intents waiting more than an hour
+    ledger.total_locked
+
+    python bridge_ledger.py bridge.journal --older-than 3600
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import argparse
+from dataclasses import dataclass
+
+
+@dataclass
+class BridgeIntent:
+    """One bridgeIntent call and, once settled, its settlement."""
+    tx_id: str
+    account: str
+    upi_hash: str          # hex
+    amount: int            # microAlgos paid to the app
+    confirmed_round: int
+    round_time: int
+    settle_tx_id: str = None
+    ref_hash: str = None   # hex
+    settled_round: int = None
+
+    @property
+    def settled(self) -> bool:
+        return self.settle_tx_id is not None
+
+
+class BridgeLedger:
+    """Indexed view of bridge intents and their settlement state."""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.intents = {}           # tx_id -> BridgeIntent
+        self.total_locked = 0
+        self.pending_count = 0
+        self.orphan_settlements = 0
+        self.last_round = 0
+        self._pending = {}          # account -> [tx_id, ...] in chain order
+        self._locked = {}           # account -> pending amount
+        self._by_upi = {}           # upi_hash -> [tx_id, ...]
+        self._age_times = []        # round_time of _age_ids[i]; append-only, chain order
+        self._age_ids = []
+        self._age_head = 0          # entries before this index are all settled
+        self._seen = set()          # tx_ids applied at last_round
+        self._journal = None
+        if path and os.path.exists(path):
+            self._replay(path)
+        if path:
+            self._journal = open(path, "a")
+
+    # -- ingestion --
+
+    def apply(self, event):
+        """Apply a bridgeIntent / settleBridge ContractEvent; others are ignored."""
+        if event.method == "bridgeIntent":
+            record = {
+                "t": "intent",
+                "tx_id": event.tx_id,
+                "account": event.sender,
+                "upi_hash": event.args[0].hex(),
+                # bridgeIntent's args carry only the hash; the amount is the grouped payment's
+                "amount": event.payment_amount or 0,
+                "round": event.confirmed_round,
+                "time": event.round_time,
+            }
+        elif event.method == "settleBridge":
+            record = {
+                "t": "settle",
+                "tx_id": event.tx_id,
+                "account": event.arg_account(0),
+                "ref_hash": event.args[1].hex() if len(event.args) > 1 else None,
+                "round": event.confirmed_round,
+            }
+        else:
+            return
+        if self._apply_record(record) and self._journal is not None:
+            self._journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._journal.flush()
+
+    def _advance(self, rnd: int, tx_ids) -> bool:
+        """Move the watermark to `rnd`; False if these tx_ids were already applied."""
+        if rnd < self.last_round:
+            return False
+        if rnd > self.last_round:
+            self.last_round, self._seen = rnd, set()
+        elif self._seen.issuperset(tx_ids):
+            return False
+        self._seen.update(tx_ids)
+        return True
+
+    def _apply_record(self, record: dict) -> bool:
+        if record["t"] == "seen":
+            return self._advance(record["round"], record["tx_ids"])
+        if not self._advance(record["round"], (record["tx_id"],)):
+            return False
+        if record["t"] == "intent":
+            self._add_intent(BridgeIntent(
+                record["tx_id"], record["account"], record["upi_hash"], record["amount"],
+                record["round"], record["time"],
+            ))
+        else:
+            self._settle(record["account"], record["tx_id"], record.get("ref_hash"), record["round"])
+        return True
+
+    def _add_intent(self, intent: BridgeIntent):
+        self.intents[intent.tx_id] = intent
+        self._by_upi.setdefault(intent.upi_hash, []).append(intent.tx_id)
+        self._pending.setdefault(intent.account, []).append(intent.tx_id)
+        self._locked[intent.account] = self._locked.get(intent.account, 0) + intent.amount
+        self.total_locked += intent.amount
+        self.pending_count += 1
+        self._age_times.append(intent.round_time)
+        self._age_ids.append(intent.tx_id)
+
+    def _settle(self, account: str, tx_id: str, ref_hash: str, rnd: int):
+        stack = self._pending.get(account)
+        if not stack:
+            self.orphan_settlements += 1
+            return
+        intent = self.intents[stack.pop()]
+        if not stack:
+            del self._pending[account]
+        intent.settle_tx_id, intent.ref_hash, intent.settled_round = tx_id, ref_hash, rnd
+        self._locked[account] -= intent.amount
+        if not self._locked[account]:
+            del self._locked[account]
+        self.total_locked -= intent.amount
+        self.pending_count -= 1
+        while self._age_head < len(self._age_ids) and self.intents[self._age_ids[self._age_head]].settled:
+            self._age_head += 1
+
+    # -- queries --
+
+    def locked_for(self, account: str) -> int:
+        return self._locked.get(account, 0)
+
+    def pending_for(self, account: str) -> list:
+        """Unsettled intents of `account`, oldest first."""
+        return [self.intents[t] for t in self._pending.get(account, [])]
+
+    def by_upi(self, upi_hash) -> list:
+        """All intents (settled or not) for a UPI hash (bytes or hex)."""
+        key = upi_hash.hex() if isinstance(upi_hash, bytes) else upi_hash
+        return [self.intents[t] for t in self._by_upi.get(key, [])]
+
+    def unsettled_older_than(self, age_secs: float, now: float = None) -> list:
+        """Pending intents whose round time is more than `age_secs` ago, oldest first."""
+        cutoff = (time.time() if now is None else now) - age_secs
+        end = bisect.bisect_left(self._age_times, cutoff, lo=self._age_head)
+        return [
+            self.intents[t] for t in self._age_ids[self._age_head:end]
+            if not self.intents[t].settled
+        ]
+
+    def oldest_pending(self):
+        return self.intents[self._age_ids[self._age_head]] if self._age_head < len(self._age_ids) else None
+
+    # -- persistence --
+
+    def _replay(self, path: str):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    self._apply_record(json.loads(line))
+
+    def compact(self):
+        """
+        Rewrite the journal with only pending intents (in chain order),
+        then the watermark: last_round and the tx_ids applied at it.
+        """
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            for tx_id in self._age_ids[self._age_head:]:
+                intent = self.intents[tx_id]
+                if intent.settled:
+                    continue
+                f.write(json.dumps({
+                    "t": "intent", "tx_id": intent.tx_id, "account": intent.account,
+                    "upi_hash": intent.upi_hash, "amount": intent.amount,
+                    "round": intent.confirmed_round, "time": intent.round_time,
+                }, separators=(",", ":")) + "\n")
+            f.write(json.dumps({
+                "t": "seen", "round": self.last_round, "tx_ids": sorted(self._seen),
+            }, separators=(",", ":")) + "\n")
+        if self._journal is not None:
+            self._journal.close()
+        os.replace(tmp, self.path)
+        self._journal = open(self.path, "a")
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def summary(self) -> dict:
+        oldest = self.oldest_pending()
+        return {
+            "intents": len(self.intents),
+            "pending": self.pending_count,
+            "total_locked": self.total_locked,
+            "orphan_settlements": self.orphan_settlements,
+            "oldest_pending_round": oldest.confirmed_round if oldest else None,
+            "last_round": self.last_round,
+        }
+
+
+# ── CLI ──
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report unsettled bridge intents from a ledger journal")
+    parser.add_argument("journal")
+    parser.add_argument("--older-than", type=float, default=0, help="only intents older than N seconds")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.journal):
+        print(f"❌ Journal not found: {args.journal}")
+        sys.exit(1)
+
+    ledger = BridgeLedger(args.journal)
+    summary = ledger.summary()
+    print(f"Pending: {summary['pending']} / {summary['intents']} intents, "
+          f"{summary['total_locked'] / 1_000_000:.6f} ALGO locked")
+    for intent in ledger.unsettled_older_than(args.older_than):
+        print(f"  {intent.tx_id}  {intent.account}  {intent.amount / 1_000_000:.6f} ALGO  round {intent.confirmed_round}")
+    ledger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+TrackBuddy -- Contracts Command Line
+
+Single entry point for the contract tooling:
+
+    compile   write artifacts/ and contract_codec.py   (discipline_contract)
+    deploy    create the app on the configured network  (deploy)
+    verify    check the deployed app's schema / state   (verify_deploy)
+    snapshot  query materialized state as of a round    (state_materializer)
+    scan      follow blocks for contract events         (block_ingestor)
+
+Each command's module is imported only when that command runs, and
+backend/.env is loaded only for commands that talk to the network, so
+`compile` never imports algosdk or python-dotenv. bench_startup.py
+measures the startup cost.
+
+Usage:
+    ./trackbuddy-contracts compile
+    ./trackbuddy-contracts compile --methods createCommitment,verifySession,applyPenalty --artifacts builds/core
+    ./trackbuddy-contracts scan --app-id 1234 --from-round 41000000
+    python cli.py snapshot state/ --round 41000123 --account <ADDRESS>
+"""
+
+import sys
+import importlib
+
+
+# name -> (module, function, needs .env, accepts argv, help)
+COMMANDS = {
+    "compile": ("discipline_contract", "main", False, True, "compile TEAL, metadata and codec"),
+    "deploy": ("deploy", "deploy", True, False, "deploy the contract to the configured network"),
+    "verify": ("verify_deploy", "verify", True, False, "verify the deployed contract"),
+    "snapshot": ("state_materializer", "main", False, True, "query materialized state as of a round"),
+    "scan": ("block_ingestor", "main", True, True, "follow algod blocks for contract events"),
+}
+
+
+def usage() -> str:
+    lines = ["usage: trackbuddy-contracts <command> [args...]", "", "commands:"]
+    lines += [f"  {name:<10} {spec[-1]}" for name, spec in COMMANDS.items()]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"❌ Unknown command: {command}")
+        print(usage())
+        sys.exit(2)
+
+    module_name, function, needs_env, accepts_argv, _ = COMMANDS[command]
+    if needs_env:
+        import config
+        config.load_env()
+    if rest and not accepts_argv:
+        print(f"❌ {command} takes no arguments")
+        sys.exit(2)
+    entry = getattr(importlib.import_module(module_name), function)
+    return entry(rest) if accepts_argv else entry()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+TrackBuddy -- Contract Codec Generator
+
+Renders contract_codec.py from contract metadata (artifacts/contract.json).
+compile_contract() calls write_codec() so the codec always matches the
+compiled contract.
+
+The generated module resolves everything the metadata knows ahead of
+time -- method selectors, state keys (raw and base64), struct layouts
+and per-method arg decoders -- so bulk decoding of indexer records is a
+dict lookup per key instead of a base64 decode and a string compare.
+
+Usage:
+    python codec_gen.py                    # regenerate from artifacts/contract.json
+"""
+
+import os
+import re
+import json
+import base64
+
+
+CODEC_FILENAME = "contract_codec.py"
+
+# Byte-slice state values occupy a length byte plus BYTES_WIDTH bytes in
+# packed records: every bytes key in the schema holds an address or a
+# SHA-256 digest, or b"" before it is first set.
+BYTES_WIDTH = 32
+
+_ARG_PATTERN = re.compile(r"^(\w+) \((\w+)\)$")
+
+
+def snake_case(name: str) -> str:
+    """createCommitment -> create_commitment"""
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def parse_args(specs: list) -> list:
+    """["account (address)", ...] -> [("account", "address"), ...]"""
+    parsed = []
+    for spec in specs:
+        match = _ARG_PATTERN.match(spec)
+        if not match:
+            raise ValueError(f"Unrecognized arg spec: {spec!r}")
+        parsed.append((match.group(1), match.group(2)))
+    return parsed
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode()
+
+
+# ── Rendering ──
+
+_HEADER = '''"""
+TrackBuddy -- Contract Codec (generated)
+
+Typed encoders / decoders for {name} v{version}.
+Generated by codec_gen.py from artifacts/contract.json -- do not edit;
+rerun `python discipline_contract.py` after changing the contract.
+
+  - encode_<method>(...)       : app args for a method call
+  - decode_app_args(args)      : (method, <Method>Args) from raw args
+  - decode_app_args_b64(args)  : same, from indexer base64 args
+  - decode_local_state(kvs)    : LocalState from an indexer/algod key-value list
+  - pack_local / unpack_local  : fixed-width LocalState records (LOCAL_RECORD)
+
+Bytes fields are packed as a length byte and BYTES_WIDTH bytes, so
+unpacking returns exactly the value packed; pack_* raises ValueError
+for a value wider than BYTES_WIDTH.
+"""
+
+import base64
+import struct
+from collections import namedtuple
+
+from algosdk import encoding
+
+
+BYTES_WIDTH = {width}
+
+_U64 = struct.Struct(">Q")
+_b64decode = base64.b64decode
+_decode_address = encoding.decode_address
+_encode_address = encoding.encode_address
+
+
+def _btoi(raw: bytes) -> int:
+    return int.from_bytes(raw, "big")
+
+
+def _width(value: bytes) -> int:
+    """Length of a bytes field value, which must fit in BYTES_WIDTH."""
+    if len(value) > BYTES_WIDTH:
+        raise ValueError(f"{{len(value)}}-byte value does not fit a {{BYTES_WIDTH}}-byte record field")
+    return len(value)
+'''
+
+
+def _render_state(lines: list, scope: str, keys: dict):
+    title = scope.capitalize()
+    upper = scope.upper()
+    names = list(keys)
+    is_bytes = [keys[k]["type"] == "bytes" for k in names]
+    fmt = "".join(f"B{BYTES_WIDTH}s" if b else "Q" for b in is_bytes)
+    record_fields = []
+    packed, unpacked = [], []
+    for k, b in zip(names, is_bytes):
+        if b:
+            record_fields += [f"len({k})", k]
+            packed += [f"_width(state.{k})", f"state.{k}"]
+            unpacked.append(f"fields[{len(record_fields) - 1}][:fields[{len(record_fields) - 2}]]")
+        else:
+            record_fields.append(k)
+            packed.append(f"state.{k}")
+            unpacked.append(f"fields[{len(record_fields) - 1}]")
+    fields = ", ".join(f'"{k}"' for k in names)
+    defaults = ", ".join('b""' if keys[k]["type"] == "bytes" else "0" for k in names)
+
+    lines += [
+        "",
+        f"# ── {title} State ──",
+        "",
+        f"{title}State = namedtuple(\"{title}State\", [{fields}], defaults=[{defaults}])",
+        "",
+        f"{upper}_KEYS = {{",
+    ]
+    lines += [f"    {k!r}: {k.encode()!r}," for k in names]
+    lines += [
+        "}",
+        "",
+        "# key -> (slot, is_bytes), for raw and base64-encoded keys",
+        f"_{upper}_SLOTS = {{",
+    ]
+    lines += [f"    {k.encode()!r}: ({i}, {keys[k]['type'] == 'bytes'})," for i, k in enumerate(names)]
+    lines += ["}", f"_{upper}_SLOTS_B64 = {{"]
+    lines += [f"    {_b64(k.encode())!r}: ({i}, {keys[k]['type'] == 'bytes'})," for i, k in enumerate(names)]
+    lines += [
+        "}",
+        "",
+        f"# {', '.join(record_fields)}",
+        f"{upper}_RECORD = struct.Struct({'>' + fmt!r})",
+        "",
+        "",
+        f"def decode_{scope}_state(key_values: list) -> {title}State:",
+        f"    \"\"\"{title}State from a [{{\"key\": b64, \"value\": {{...}}}}] list; unknown keys are skipped.\"\"\"",
+        f"    values = list({title}State._field_defaults.values())",
+        "    for item in key_values:",
+        f"        slot = _{upper}_SLOTS_B64.get(item[\"key\"])",
+        "        if slot is None:",
+        "            continue",
+        "        value = item[\"value\"]",
+        "        values[slot[0]] = _b64decode(value.get(\"bytes\", \"\")) if slot[1] else value.get(\"uint\", 0)",
+        f"    return {title}State._make(values)",
+        "",
+        "",
+        f"def decode_{scope}_state_raw(state: dict) -> {title}State:",
+        f"    \"\"\"{title}State from a {{key bytes: int | bytes}} mapping (e.g. msgpack state deltas).\"\"\"",
+        f"    values = list({title}State._field_defaults.values())",
+        "    for key, value in state.items():",
+        f"        slot = _{upper}_SLOTS.get(key)",
+        "        if slot is not None:",
+        "            values[slot[0]] = value",
+        f"    return {title}State._make(values)",
+        "",
+        "",
+        f"def decode_{scope}_states(records) -> list:",
+        f"    \"\"\"Bulk decode_{scope}_state over an iterable of key-value lists.\"\"\"",
+        f"    return [decode_{scope}_state(kvs) for kvs in records]",
+        "",
+        "",
+        f"def pack_{scope}(state: {title}State) -> bytes:",
+        f"    return {upper}_RECORD.pack({', '.join(packed)})",
+        "",
+        "",
+        f"def pack_{scope}_into(buffer, offset: int, state: {title}State):",
+        f"    {upper}_RECORD.pack_into(buffer, offset, {', '.join(packed)})",
+        "",
+        "",
+        f"def _{scope}_from_record(fields: tuple) -> {title}State:",
+        f"    return {title}State({', '.join(unpacked)})",
+        "",
+        "",
+        f"def unpack_{scope}(buffer, offset: int = 0) -> {title}State:",
+        f"    return _{scope}_from_record({upper}_RECORD.unpack_from(buffer, offset))",
+        "",
+        "",
+        f"def iter_unpack_{scope}(buffer):",
+        f"    \"\"\"Yield {title}State for each packed record in `buffer`.\"\"\"",
+        f"    for fields in {upper}_RECORD.iter_unpack(buffer):",
+        f"        yield _{scope}_from_record(fields)",
+    ]
+
+
+_ENCODERS = {
+    "address": "_decode_address({})",
+    "uint64": "_U64.pack({})",
+    "bytes": "{}",
+}
+_DECODERS = {
+    "address": "_encode_address(args[{}])",
+    "uint64": "_btoi(args[{}])",
+    "bytes": "args[{}]",
+}
+_HINTS = {"address": "str", "uint64": "int", "bytes": "bytes"}
+
+
+def _render_methods(lines: list, methods: dict):
+    lines += ["", "", "# ── Method Args ──", ""]
+    for method, spec in methods.items():
+        args = parse_args(spec["args"])
+        cls = method[0].upper() + method[1:] + "Args"
+        fields = ", ".join(f'"{a}"' for a, _ in args)
+        lines.append(f"{cls} = namedtuple(\"{cls}\", [{fields}])")
+
+    for method, spec in methods.items():
+        args = parse_args(spec["args"])
+        fn = snake_case(method)
+        cls = method[0].upper() + method[1:] + "Args"
+        params = ", ".join(f"{a}: {_HINTS[t]}" for a, t in args)
+        encoded = ", ".join([repr(method.encode())] + [_ENCODERS[t].format(a) for a, t in args])
+        decoded = ", ".join(_DECODERS[t].format(i + 1) for i, (_, t) in enumerate(args))
+        lines += [
+            "",
+            "",
+            f"def encode_{fn}({params}) -> list:",
+            f"    return [{encoded}]",
+            "",
+            "",
+            f"def _decode_{fn}(args: list) -> {cls}:",
+            f"    return {cls}({decoded})",
+        ]
+
+    lines += ["", "", "METHOD_SELECTORS = {"]
+    lines += [f"    {m!r}: {m.encode()!r}," for m in methods]
+    lines += ["}", "", "_ARG_DECODERS = {"]
+    lines += [f"    {m.encode()!r}: ({m!r}, _decode_{snake_case(m)})," for m in methods]
+    lines += ["}", "_ARG_DECODERS_B64 = {"]
+    lines += [f"    {_b64(m.encode())!r}: ({m!r}, _decode_{snake_case(m)})," for m in methods]
+    lines += [
+        "}",
+        "",
+        "",
+        "def decode_app_args(args: list):",
+        "    \"\"\"(method, <Method>Args) for raw app args, or (None, None) if not a known method.\"\"\"",
+        "    entry = _ARG_DECODERS.get(args[0]) if args else None",
+        "    if entry is None:",
+        "        return None, None",
+        "    return entry[0], entry[1](args)",
+        "",
+        "",
+        "def decode_app_args_b64(args: list):",
+        "    \"\"\"decode_app_args for indexer `application-args` (selector matched without decoding).\"\"\"",
+        "    entry = _ARG_DECODERS_B64.get(args[0]) if args else None",
+        "    if entry is None:",
+        "        return None, None",
+        "    return entry[0], entry[1]([None] + [_b64decode(a) for a in args[1:]])",
+        "",
+        "",
+        "def decode_indexer_txns(txns) -> list:",
+        "    \"\"\"[(txid, method, args)] for indexer app-call records of known methods.\"\"\"",
+        "    decoded = []",
+        "    for txn in txns:",
+        "        app_txn = txn.get(\"application-transaction\")",
+        "        if not app_txn:",
+        "            continue",
+        "        method, args = decode_app_args_b64(app_txn.get(\"application-args\") or [])",
+        "        if method is not None:",
+        "            decoded.append((txn.get(\"id\"), method, args))",
+        "    return decoded",
+    ]
+
+
+def render_codec(metadata: dict) -> str:
+    """Source of contract_codec.py for the given contract metadata."""
+    schema = metadata["state_schema"]
+    lines = [_HEADER.format(name=metadata["name"], version=metadata["version"], width=BYTES_WIDTH).rstrip("\n")]
+    lines.append("")
+    _render_state(lines, "global", schema["global"]["keys"])
+    lines.append("")
+    _render_state(lines, "local", schema["local"]["keys"])
+    _render_methods(lines, metadata["methods"])
+    return "\n".join(lines) + "\n"
+
+
+def write_codec(metadata: dict, path: str = None) -> str:
+    """Render and write the codec module; returns its path."""
+    path = path or os.path.join(os.path.dirname(os.path.abspath(__file__)), CODEC_FILENAME)
+    with open(path, "w") as f:
+        f.write(render_codec(metadata))
+    return path
+
+
+if __name__ == "__main__":
+    artifacts = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts", "contract.json")
+    with open(artifacts) as f:
+        print(f"Wrote {write_codec(json.load(f))}")
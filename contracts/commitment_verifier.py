@@ -0,0 +1,255 @@
+"""
+TrackBuddy -- Commitment Hash Verifier
+
+createCommitment stores sha256(JSON.stringify({title, category,
+duration, timestamp})) in the user's commitment_hash local state
+(backend/src/services/commitment.ts). The backend keeps title, category
+and duration but not the timestamp: it is Date.now() taken just before
+the transactions are built, while the row's start_time is set after.
+Verifying a commitment therefore means searching the milliseconds in
+[start_time - window, start_time] for a payload whose hash matches the
+chain.
+
+That search is CPU-bound, so batches of records are hashed in a
+process pool while the next batch's local state is fetched on a thread
+pool. The JSON prefix up to `"timestamp":` is hashed once per record
+and copied per candidate. Request bodies may carry duration as a string,
+so the quoted form is tried once the numeric one is exhausted.
+
+Each commitment record resolves to one outcome:
+    match           hash found; offset_ms = start_time - timestamp
+    mismatch        no timestamp in the window reproduces the hash
+    not_opted_in    the wallet has no local state for the app
+    no_hash         local state holds no commitment hash
+    fetch_error     account_application_info failed
+
+Only the latest commitment per wallet is on chain, so the export query
+selects one row per wallet.
+
+Usage:
+    psql $DATABASE_URL -c "\\copy ($EXPORT_SQL) TO 'commitments.csv' CSV HEADER"
+    python commitment_verifier.py commitments.csv --out mismatches.jsonl --workers 8
+"""
+
+import os
+import sys
+import csv
+import json
+import hashlib
+import argparse
+from collections import deque
+from datetime import datetime, timezone
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+
+DEFAULT_WINDOW_MS = 10_000
+DEFAULT_BATCH_SIZE = 512
+DEFAULT_FETCH_CONCURRENCY = 32
+OUTCOMES = ("match", "mismatch", "not_opted_in", "no_hash", "fetch_error")
+
+EXPORT_SQL = (
+    "SELECT DISTINCT ON (u.wallet_address) c.id, u.wallet_address, c.title, c.category, "
+    "c.duration, c.start_time FROM commitments c JOIN users u ON u.id = c.user_id "
+    "WHERE c.on_chain_tx_id IS NOT NULL AND u.wallet_address IS NOT NULL "
+    "ORDER BY u.wallet_address, c.created_at DESC"
+)
+
+
+@dataclass(frozen=True)
+class CommitmentRecord:
+    id: str
+    wallet_address: str
+    title: str
+    category: str
+    duration: int
+    start_ms: int
+
+
+@dataclass
+class VerifyReport:
+    counts: dict = field(default_factory=lambda: dict.fromkeys(OUTCOMES, 0))
+    max_offset_ms: int = 0
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def add(self, outcome: str, offset_ms: int = None):
+        self.counts[outcome] += 1
+        if offset_ms is not None:
+            self.max_offset_ms = max(self.max_offset_ms, offset_ms)
+
+
+# ── Hashing ──
+
+def _js_string(value: str) -> str:
+    # JSON.stringify: no ASCII escaping, lowercase \u00xx for control characters.
+    return json.dumps(value, ensure_ascii=False)
+
+
+def payload_prefix(title: str, category: str, duration, quoted_duration: bool = False) -> bytes:
+    """JSON.stringify output up to (not including) the timestamp value."""
+    duration = _js_string(str(duration)) if quoted_duration else str(int(duration))
+    return (f'{{"title":{_js_string(title)},"category":{_js_string(category)},'
+            f'"duration":{duration},"timestamp":').encode()
+
+
+def commitment_hash(title: str, category: str, duration, timestamp_ms: int) -> bytes:
+    """The hash commitment.ts computes for these fields."""
+    return hashlib.sha256(payload_prefix(title, category, duration) + b"%d}" % timestamp_ms).digest()
+
+
+def find_timestamp(record: CommitmentRecord, expected: bytes, window_ms: int = DEFAULT_WINDOW_MS):
+    """Offset (ms before start_time) whose payload hashes to `expected`, or None."""
+    for quoted in (False, True):
+        prefix = hashlib.sha256(payload_prefix(record.title, record.category, record.duration, quoted))
+        for offset in range(window_ms + 1):
+            h = prefix.copy()
+            h.update(b"%d}" % (record.start_ms - offset))
+            if h.digest() == expected:
+                return offset
+    return None
+
+
+def _check_batch(items: list, window_ms: int) -> list:
+    """Pool worker: [(record, expected hash)] -> [(record, offset or None)]."""
+    return [(record, find_timestamp(record, expected, window_ms)) for record, expected in items]
+
+
+# ── Input ──
+
+def _start_ms(value: str) -> int:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)          # Prisma stores UTC without a zone
+    return round(parsed.timestamp() * 1000)
+
+
+def read_records(path: str):
+    """Stream CommitmentRecords from an EXPORT_SQL CSV."""
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            yield CommitmentRecord(
+                id=row["id"], wallet_address=row["wallet_address"], title=row["title"],
+                category=row["category"], duration=int(row["duration"]),
+                start_ms=_start_ms(row["start_time"]),
+            )
+
+
+def _batches(records, size: int):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ── Pipeline ──
+
+def verify(records, fetch, workers: int = None, fetch_concurrency: int = DEFAULT_FETCH_CONCURRENCY,
+           batch_size: int = DEFAULT_BATCH_SIZE, window_ms: int = DEFAULT_WINDOW_MS,
+           on_result=None) -> VerifyReport:
+    """
+    Verify every record against fetch(address) -> LocalState or None
+    (state_cache.algod_fetcher). on_result(record, outcome, offset_ms)
+    is called for each record as it resolves. workers=0 hashes inline.
+    """
+    report = VerifyReport()
+
+    def resolve(record, outcome, offset=None):
+        report.add(outcome, offset)
+        if on_result is not None:
+            on_result(record, outcome, offset)
+
+    def lookup(record):
+        try:
+            return record, fetch(record.wallet_address), None
+        except Exception as e:
+            return record, None, e
+
+    def settle(results):
+        for record, offset in results:
+            resolve(record, "mismatch" if offset is None else "match", offset)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = ProcessPoolExecutor(workers) if workers else None
+    max_inflight = 2 * workers
+    pending = deque()
+    try:
+        with ThreadPoolExecutor(fetch_concurrency) as io:
+            for batch in _batches(records, batch_size):
+                items = []
+                for record, state, error in io.map(lookup, batch):
+                    if error is not None:
+                        resolve(record, "fetch_error")
+                    elif state is None:
+                        resolve(record, "not_opted_in")
+                    elif not any(state.commitment_hash):
+                        resolve(record, "no_hash")
+                    else:
+                        items.append((record, state.commitment_hash))
+                if pool is None:
+                    settle(_check_batch(items, window_ms))
+                    continue
+                pending.append(pool.submit(_check_batch, items, window_ms))
+                while len(pending) > max_inflight:
+                    settle(pending.popleft().result())
+            while pending:
+                settle(pending.popleft().result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return report
+
+
+# ── CLI ──
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify on-chain commitment hashes against the database")
+    parser.add_argument("records", help="CSV exported with EXPORT_SQL")
+    parser.add_argument("--app-id", type=int, default=int(os.getenv("ALGO_APP_ID", "0") or 0))
+    parser.add_argument("--out", help="write non-matching records as JSON lines (default stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="hashing processes (default: CPU count)")
+    parser.add_argument("--fetch-concurrency", type=int, default=DEFAULT_FETCH_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--window-ms", type=int, default=DEFAULT_WINDOW_MS)
+    args = parser.parse_args(argv)
+
+    if not args.app_id:
+        print("❌ --app-id (or ALGO_APP_ID) is required")
+        sys.exit(1)
+
+    from config import get_algod_client
+    from state_cache import algod_fetcher
+
+    out = open(args.out, "w") if args.out else sys.stdout
+
+    def report_mismatch(record, outcome, offset):
+        if outcome != "match":
+            out.write(json.dumps({"id": record.id, "wallet_address": record.wallet_address,
+                                  "outcome": outcome}) + "\n")
+
+    try:
+        report = verify(
+            read_records(args.records), algod_fetcher(get_algod_client(), args.app_id),
+            workers=args.workers, fetch_concurrency=args.fetch_concurrency,
+            batch_size=args.batch_size, window_ms=args.window_ms, on_result=report_mismatch,
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Verified {report.total} commitments (max offset {report.max_offset_ms} ms)", file=sys.stderr)
+    for outcome in OUTCOMES:
+        print(f"  {outcome:<13} {report.counts[outcome]:>9}", file=sys.stderr)
+    if report.counts["mismatch"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,38 +3,96 @@ TrackBuddy — Algorand Connection Configuration
 
 Reads environment variables for Algorand testnet connectivity.
 Used by deploy scripts and test harness.
+
+Settings are resolved on first access (module __getattr__), so importing
+this module neither reads backend/.env nor imports algosdk; commands
+that never touch the network start without paying for either.
 """
 
 import os
-from dotenv import load_dotenv
-from algosdk.v2client import algod, indexer
 
-# Load env from backend .env file
-load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', 'backend', '.env'))
+ENV_PATH = os.path.join(os.path.dirname(__file__), '..', 'backend', '.env')
 
 # ── Algorand Network Configuration ──
 
-ALGO_ALGOD_URL = os.getenv('ALGO_ALGOD_URL', 'https://testnet-api.algonode.cloud')
-ALGO_INDEXER_URL = os.getenv('ALGO_INDEXER_URL', 'https://testnet-idx.algonode.cloud')
-ALGO_ALGOD_TOKEN = os.getenv('ALGO_ALGOD_TOKEN', '')
-ALGO_MNEMONIC = os.getenv('ALGO_MNEMONIC', '')
-ALGO_NETWORK = os.getenv('ALGO_NETWORK', 'testnet')
+_DEFAULTS = {
+    'ALGO_ALGOD_URL': 'https://testnet-api.algonode.cloud',
+    'ALGO_INDEXER_URL': 'https://testnet-idx.algonode.cloud',
+    'ALGO_ALGOD_TOKEN': '',
+    'ALGO_MNEMONIC': '',
+    'ALGO_NETWORK': 'testnet',
+    'ALGO_INDEXER_CACHE': '',
+    'ALGO_INDEXER_CACHE_MB': '256',
+    'ALGO_COALESCE_READS': '1',
+}
+_CASTS = {'ALGO_INDEXER_CACHE_MB': int, 'ALGO_COALESCE_READS': int}
+_env_loaded = False
+
+
+def load_env():
+    """Load env from the backend .env file (once)."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv(dotenv_path=ENV_PATH)
+        _env_loaded = True
+
+
+def _setting(name: str):
+    load_env()
+    return _CASTS.get(name, str)(os.getenv(name, _DEFAULTS[name]))
+
 
+def __getattr__(name: str):
+    if name in _DEFAULTS:
+        value = _setting(name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def get_algod_client() -> algod.AlgodClient:
+
+def _instrumented(client, service: str):
+    """
+    Attach metrics / tracing when enabled via TRACKBUDDY_* (see
+    instrumentation.py), then merge concurrent identical reads unless
+    ALGO_COALESCE_READS=0 (see singleflight.py).
+    """
+    import instrumentation
+    instrumentation.configure_from_env()
+    client = instrumentation.instrument(client, service)
+    if _setting('ALGO_COALESCE_READS'):
+        from singleflight import coalesce
+        client = coalesce(client, service)
+    return client
+
+
+def get_algod_client() -> "algod.AlgodClient":
     """Create and return an Algod client for the configured network."""
-    return algod.AlgodClient(ALGO_ALGOD_TOKEN, ALGO_ALGOD_URL)
+    from algosdk.v2client import algod
+    return _instrumented(algod.AlgodClient(_setting('ALGO_ALGOD_TOKEN'), _setting('ALGO_ALGOD_URL')), 'algod')
+
+
+def get_indexer_client(cache_path: str = None) -> "indexer.IndexerClient":
+    """
+    Create and return an Indexer client for the configured network.
 
+    With `cache_path` (or ALGO_INDEXER_CACHE) set, finalized-round
+    responses are cached on disk (see indexer_cache.py).
+    """
+    cache_path = cache_path or _setting('ALGO_INDEXER_CACHE')
+    if not cache_path:
+        from algosdk.v2client import indexer
+        return _instrumented(indexer.IndexerClient('', _setting('ALGO_INDEXER_URL')), 'indexer')
 
-def get_indexer_client() -> indexer.IndexerClient:
-    """Create and return an Indexer client for the configured network."""
-    return indexer.IndexerClient('', ALGO_INDEXER_URL)
+    from indexer_cache import CachedIndexerClient, ResponseCache
+    cache = ResponseCache(cache_path, max_bytes=_setting('ALGO_INDEXER_CACHE_MB') * 1024 * 1024)
+    return _instrumented(CachedIndexerClient('', _setting('ALGO_INDEXER_URL'), cache), 'indexer')
 
 
 def get_network_info() -> dict:
     """Return current network configuration summary."""
     return {
-        'network': ALGO_NETWORK,
-        'algod_url': ALGO_ALGOD_URL,
-        'indexer_url': ALGO_INDEXER_URL,
+        'network': _setting('ALGO_NETWORK'),
+        'algod_url': _setting('ALGO_ALGOD_URL'),
+        'indexer_url': _setting('ALGO_INDEXER_URL'),
     }
@@ -0,0 +1,345 @@
+"""
+TrackBuddy -- Contract Codec (generated)
+
+Typed encoders / decoders for TrackBuddyDiscipline v1.0.0.
+Generated by codec_gen.py from artifacts/contract.json -- do not edit;
+rerun `python discipline_contract.py` after changing the contract.
+
+  - encode_<method>(...)       : app args for a method call
+  - decode_app_args(args)      : (method, <Method>Args) from raw args
+  - decode_app_args_b64(args)  : same, from indexer base64 args
+  - decode_local_state(kvs)    : LocalState from an indexer/algod key-value list
+  - pack_local / unpack_local  : fixed-width LocalState records (LOCAL_RECORD)
+
+Bytes fields are packed as a length byte and BYTES_WIDTH bytes, so
+unpacking returns exactly the value packed; pack_* raises ValueError
+for a value wider than BYTES_WIDTH.
+"""
+
+import base64
+import struct
+from collections import namedtuple
+
+from algosdk import encoding
+
+
+BYTES_WIDTH = 32
+
+_U64 = struct.Struct(">Q")
+_b64decode = base64.b64decode
+_decode_address = encoding.decode_address
+_encode_address = encoding.encode_address
+
+
+def _btoi(raw: bytes) -> int:
+    return int.from_bytes(raw, "big")
+
+
+def _width(value: bytes) -> int:
+    """Length of a bytes field value, which must fit in BYTES_WIDTH."""
+    if len(value) > BYTES_WIDTH:
+        raise ValueError(f"{len(value)}-byte value does not fit a {BYTES_WIDTH}-byte record field")
+    return len(value)
+
+
+# ── Global State ──
+
+GlobalState = namedtuple("GlobalState", ["admin", "total_commitments", "total_penalties", "total_bridge_intents", "score_root", "score_day"], defaults=[b"", 0, 0, 0, b"", 0])
+
+GLOBAL_KEYS = {
+    'admin': b'admin',
+    'total_commitments': b'total_commitments',
+    'total_penalties': b'total_penalties',
+    'total_bridge_intents': b'total_bridge_intents',
+    'score_root': b'score_root',
+    'score_day': b'score_day',
+}
+
+# key -> (slot, is_bytes), for raw and base64-encoded keys
+_GLOBAL_SLOTS = {
+    b'admin': (0, True),
+    b'total_commitments': (1, False),
+    b'total_penalties': (2, False),
+    b'total_bridge_intents': (3, False),
+    b'score_root': (4, True),
+    b'score_day': (5, False),
+}
+_GLOBAL_SLOTS_B64 = {
+    'YWRtaW4=': (0, True),
+    'dG90YWxfY29tbWl0bWVudHM=': (1, False),
+    'dG90YWxfcGVuYWx0aWVz': (2, False),
+    'dG90YWxfYnJpZGdlX2ludGVudHM=': (3, False),
+    'c2NvcmVfcm9vdA==': (4, True),
+    'c2NvcmVfZGF5': (5, False),
+}
+
+# len(admin), admin, total_commitments, total_penalties, total_bridge_intents, len(score_root), score_root, score_day
+GLOBAL_RECORD = struct.Struct('>B32sQQQB32sQ')
+
+
+def decode_global_state(key_values: list) -> GlobalState:
+    """GlobalState from a [{"key": b64, "value": {...}}] list; unknown keys are skipped."""
+    values = list(GlobalState._field_defaults.values())
+    for item in key_values:
+        slot = _GLOBAL_SLOTS_B64.get(item["key"])
+        if slot is None:
+            continue
+        value = item["value"]
+        values[slot[0]] = _b64decode(value.get("bytes", "")) if slot[1] else value.get("uint", 0)
+    return GlobalState._make(values)
+
+
+def decode_global_state_raw(state: dict) -> GlobalState:
+    """GlobalState from a {key bytes: int | bytes} mapping (e.g. msgpack state deltas)."""
+    values = list(GlobalState._field_defaults.values())
+    for key, value in state.items():
+        slot = _GLOBAL_SLOTS.get(key)
+        if slot is not None:
+            values[slot[0]] = value
+    return GlobalState._make(values)
+
+
+def decode_global_states(records) -> list:
+    """Bulk decode_global_state over an iterable of key-value lists."""
+    return [decode_global_state(kvs) for kvs in records]
+
+
+def pack_global(state: GlobalState) -> bytes:
+    return GLOBAL_RECORD.pack(_width(state.admin), state.admin, state.total_commitments, state.total_penalties, state.total_bridge_intents, _width(state.score_root), state.score_root, state.score_day)
+
+
+def pack_global_into(buffer, offset: int, state: GlobalState):
+    GLOBAL_RECORD.pack_into(buffer, offset, _width(state.admin), state.admin, state.total_commitments, state.total_penalties, state.total_bridge_intents, _width(state.score_root), state.score_root, state.score_day)
+
+
+def _global_from_record(fields: tuple) -> GlobalState:
+    return GlobalState(fields[1][:fields[0]], fields[2], fields[3], fields[4], fields[6][:fields[5]], fields[7])
+
+
+def unpack_global(buffer, offset: int = 0) -> GlobalState:
+    return _global_from_record(GLOBAL_RECORD.unpack_from(buffer, offset))
+
+
+def iter_unpack_global(buffer):
+    """Yield GlobalState for each packed record in `buffer`."""
+    for fields in GLOBAL_RECORD.iter_unpack(buffer):
+        yield _global_from_record(fields)
+
+
+# ── Local State ──
+
+LocalState = namedtuple("LocalState", ["stake_amount", "commitment_status", "violations", "discipline_score", "commitment_hash"], defaults=[0, 0, 0, 0, b""])
+
+LOCAL_KEYS = {
+    'stake_amount': b'stake_amount',
+    'commitment_status': b'commitment_status',
+    'violations': b'violations',
+    'discipline_score': b'discipline_score',
+    'commitment_hash': b'commitment_hash',
+}
+
+# key -> (slot, is_bytes), for raw and base64-encoded keys
+_LOCAL_SLOTS = {
+    b'stake_amount': (0, False),
+    b'commitment_status': (1, False),
+    b'violations': (2, False),
+    b'discipline_score': (3, False),
+    b'commitment_hash': (4, True),
+}
+_LOCAL_SLOTS_B64 = {
+    'c3Rha2VfYW1vdW50': (0, False),
+    'Y29tbWl0bWVudF9zdGF0dXM=': (1, False),
+    'dmlvbGF0aW9ucw==': (2, False),
+    'ZGlzY2lwbGluZV9zY29yZQ==': (3, False),
+    'Y29tbWl0bWVudF9oYXNo': (4, True),
+}
+
+# stake_amount, commitment_status, violations, discipline_score, len(commitment_hash), commitment_hash
+LOCAL_RECORD = struct.Struct('>QQQQB32s')
+
+
+def decode_local_state(key_values: list) -> LocalState:
+    """LocalState from a [{"key": b64, "value": {...}}] list; unknown keys are skipped."""
+    values = list(LocalState._field_defaults.values())
+    for item in key_values:
+        slot = _LOCAL_SLOTS_B64.get(item["key"])
+        if slot is None:
+            continue
+        value = item["value"]
+        values[slot[0]] = _b64decode(value.get("bytes", "")) if slot[1] else value.get("uint", 0)
+    return LocalState._make(values)
+
+
+def decode_local_state_raw(state: dict) -> LocalState:
+    """LocalState from a {key bytes: int | bytes} mapping (e.g. msgpack state deltas)."""
+    values = list(LocalState._field_defaults.values())
+    for key, value in state.items():
+        slot = _LOCAL_SLOTS.get(key)
+        if slot is not None:
+            values[slot[0]] = value
+    return LocalState._make(values)
+
+
+def decode_local_states(records) -> list:
+    """Bulk decode_local_state over an iterable of key-value lists."""
+    return [decode_local_state(kvs) for kvs in records]
+
+
+def pack_local(state: LocalState) -> bytes:
+    return LOCAL_RECORD.pack(state.stake_amount, state.commitment_status, state.violations, state.discipline_score, _width(state.commitment_hash), state.commitment_hash)
+
+
+def pack_local_into(buffer, offset: int, state: LocalState):
+    LOCAL_RECORD.pack_into(buffer, offset, state.stake_amount, state.commitment_status, state.violations, state.discipline_score, _width(state.commitment_hash), state.commitment_hash)
+
+
+def _local_from_record(fields: tuple) -> LocalState:
+    return LocalState(fields[0], fields[1], fields[2], fields[3], fields[5][:fields[4]])
+
+
+def unpack_local(buffer, offset: int = 0) -> LocalState:
+    return _local_from_record(LOCAL_RECORD.unpack_from(buffer, offset))
+
+
+def iter_unpack_local(buffer):
+    """Yield LocalState for each packed record in `buffer`."""
+    for fields in LOCAL_RECORD.iter_unpack(buffer):
+        yield _local_from_record(fields)
+
+
+# ── Method Args ──
+
+CreateCommitmentArgs = namedtuple("CreateCommitmentArgs", ["commitment_hash"])
+VerifySessionArgs = namedtuple("VerifySessionArgs", ["account", "success"])
+ApplyPenaltyArgs = namedtuple("ApplyPenaltyArgs", ["account"])
+ApplyPenaltyNArgs = namedtuple("ApplyPenaltyNArgs", ["account", "count"])
+LogDisciplineArgs = namedtuple("LogDisciplineArgs", ["account", "score"])
+BridgeIntentArgs = namedtuple("BridgeIntentArgs", ["upi_hash"])
+SettleBridgeArgs = namedtuple("SettleBridgeArgs", ["account", "ref_hash"])
+AnchorScoresArgs = namedtuple("AnchorScoresArgs", ["root", "day"])
+
+
+def encode_create_commitment(commitment_hash: bytes) -> list:
+    return [b'createCommitment', commitment_hash]
+
+
+def _decode_create_commitment(args: list) -> CreateCommitmentArgs:
+    return CreateCommitmentArgs(args[1])
+
+
+def encode_verify_session(account: str, success: int) -> list:
+    return [b'verifySession', _decode_address(account), _U64.pack(success)]
+
+
+def _decode_verify_session(args: list) -> VerifySessionArgs:
+    return VerifySessionArgs(_encode_address(args[1]), _btoi(args[2]))
+
+
+def encode_apply_penalty(account: str) -> list:
+    return [b'applyPenalty', _decode_address(account)]
+
+
+def _decode_apply_penalty(args: list) -> ApplyPenaltyArgs:
+    return ApplyPenaltyArgs(_encode_address(args[1]))
+
+
+def encode_apply_penalty_n(account: str, count: int) -> list:
+    return [b'applyPenaltyN', _decode_address(account), _U64.pack(count)]
+
+
+def _decode_apply_penalty_n(args: list) -> ApplyPenaltyNArgs:
+    return ApplyPenaltyNArgs(_encode_address(args[1]), _btoi(args[2]))
+
+
+def encode_log_discipline(account: str, score: int) -> list:
+    return [b'logDiscipline', _decode_address(account), _U64.pack(score)]
+
+
+def _decode_log_discipline(args: list) -> LogDisciplineArgs:
+    return LogDisciplineArgs(_encode_address(args[1]), _btoi(args[2]))
+
+
+def encode_bridge_intent(upi_hash: bytes) -> list:
+    return [b'bridgeIntent', upi_hash]
+
+
+def _decode_bridge_intent(args: list) -> BridgeIntentArgs:
+    return BridgeIntentArgs(args[1])
+
+
+def encode_settle_bridge(account: str, ref_hash: bytes) -> list:
+    return [b'settleBridge', _decode_address(account), ref_hash]
+
+
+def _decode_settle_bridge(args: list) -> SettleBridgeArgs:
+    return SettleBridgeArgs(_encode_address(args[1]), args[2])
+
+
+def encode_anchor_scores(root: bytes, day: int) -> list:
+    return [b'anchorScores', root, _U64.pack(day)]
+
+
+def _decode_anchor_scores(args: list) -> AnchorScoresArgs:
+    return AnchorScoresArgs(args[1], _btoi(args[2]))
+
+
+METHOD_SELECTORS = {
+    'createCommitment': b'createCommitment',
+    'verifySession': b'verifySession',
+    'applyPenalty': b'applyPenalty',
+    'applyPenaltyN': b'applyPenaltyN',
+    'logDiscipline': b'logDiscipline',
+    'bridgeIntent': b'bridgeIntent',
+    'settleBridge': b'settleBridge',
+    'anchorScores': b'anchorScores',
+}
+
+_ARG_DECODERS = {
+    b'createCommitment': ('createCommitment', _decode_create_commitment),
+    b'verifySession': ('verifySession', _decode_verify_session),
+    b'applyPenalty': ('applyPenalty', _decode_apply_penalty),
+    b'applyPenaltyN': ('applyPenaltyN', _decode_apply_penalty_n),
+    b'logDiscipline': ('logDiscipline', _decode_log_discipline),
+    b'bridgeIntent': ('bridgeIntent', _decode_bridge_intent),
+    b'settleBridge': ('settleBridge', _decode_settle_bridge),
+    b'anchorScores': ('anchorScores', _decode_anchor_scores),
+}
+_ARG_DECODERS_B64 = {
+    'Y3JlYXRlQ29tbWl0bWVudA==': ('createCommitment', _decode_create_commitment),
+    'dmVyaWZ5U2Vzc2lvbg==': ('verifySession', _decode_verify_session),
+    'YXBwbHlQZW5hbHR5': ('applyPenalty', _decode_apply_penalty),
+    'YXBwbHlQZW5hbHR5Tg==': ('applyPenaltyN', _decode_apply_penalty_n),
+    'bG9nRGlzY2lwbGluZQ==': ('logDiscipline', _decode_log_discipline),
+    'YnJpZGdlSW50ZW50': ('bridgeIntent', _decode_bridge_intent),
+    'c2V0dGxlQnJpZGdl': ('settleBridge', _decode_settle_bridge),
+    'YW5jaG9yU2NvcmVz': ('anchorScores', _decode_anchor_scores),
+}
+
+
+def decode_app_args(args: list):
+    """(method, <Method>Args) for raw app args, or (None, None) if not a known method."""
+    entry = _ARG_DECODERS.get(args[0]) if args else None
+    if entry is None:
+        return None, None
+    return entry[0], entry[1](args)
+
+
+def decode_app_args_b64(args: list):
+    """decode_app_args for indexer `application-args` (selector matched without decoding)."""
+    entry = _ARG_DECODERS_B64.get(args[0]) if args else None
+    if entry is None:
+        return None, None
+    return entry[0], entry[1]([None] + [_b64decode(a) for a in args[1:]])
+
+
+def decode_indexer_txns(txns) -> list:
+    """[(txid, method, args)] for indexer app-call records of known methods."""
+    decoded = []
+    for txn in txns:
+        app_txn = txn.get("application-transaction")
+        if not app_txn:
+            continue
+        method, args = decode_app_args_b64(app_txn.get("application-args") or [])
+        if method is not None:
+            decoded.append((txn.get("id"), method, args))
+    return decoded
@@ -0,0 +1,198 @@
+"""
+TrackBuddy -- Offline Contract Simulator
+
+Wraps the offline TEAL evaluator (teal_vm) with the discipline
+contract's call shapes, so tooling can create the app, opt users in
+and call every method without a node.
+
+Addresses are 32-byte public keys throughout; make_address() derives
+deterministic test addresses from a label.
+
+SCENARIOS holds one canonical (setup, call) pair per contract entry
+point and is shared by the profiler and the cost regression suite.
+"""
+
+import hashlib
+import functools
+
+import teal_vm
+from discipline_contract import APPROVAL_PROGRAM
+
+
+DEFAULT_STAKE = 1_000_000
+
+
+def make_address(label: str) -> bytes:
+    """Derive a deterministic 32-byte address from a label."""
+    return hashlib.sha256(f"trackbuddy:{label}".encode()).digest()
+
+
+@functools.lru_cache(maxsize=8)
+def load_program(source: str = APPROVAL_PROGRAM) -> teal_vm.Program:
+    """Assemble (and cache) an approval program."""
+    return teal_vm.assemble(source)
+
+
+def _uint(value: int) -> bytes:
+    return int(value).to_bytes(8, "big")
+
+
+class DisciplineSim:
+    """In-memory discipline contract driven through the TEAL evaluator."""
+
+    def __init__(self, admin: bytes = None, app_id: int = 1, tracer=None,
+                 source: str = APPROVAL_PROGRAM):
+        self.admin = admin or make_address("admin")
+        self.source = source
+        self.state = teal_vm.AppState(app_id=app_id)
+        self.evaluator = teal_vm.Evaluator(load_program(source), self.state, tracer)
+        self.created = self.execute([teal_vm.app_call(self.admin, 0)])
+
+    @property
+    def app_id(self) -> int:
+        return self.state.app_id
+
+    @property
+    def app_address(self) -> bytes:
+        return self.state.address
+
+    def execute(self, group: list) -> teal_vm.EvalResult:
+        """Evaluate a raw transaction group against the simulated app."""
+        return self.evaluator.execute_group(group)
+
+    def _admin_call(self, args: list, account: bytes, sender: bytes = None) -> teal_vm.EvalResult:
+        txn = teal_vm.app_call(sender or self.admin, self.app_id, args, accounts=[account])
+        return self.execute([txn])
+
+    # -- lifecycle --
+
+    def fund(self, amount: int):
+        """Credit the app escrow (e.g. its minimum balance) directly."""
+        address = self.app_address
+        self.state.balances[address] = self.state.balances.get(address, 0) + amount
+
+    def opt_in(self, user: bytes) -> teal_vm.EvalResult:
+        return self.execute([teal_vm.app_call(user, self.app_id, on_complete="OptIn")])
+
+    def close_out(self, user: bytes) -> teal_vm.EvalResult:
+        return self.execute([teal_vm.app_call(user, self.app_id, on_complete="CloseOut")])
+
+    # -- methods --
+
+    def create_commitment(self, user: bytes, commitment_hash: bytes, stake: int) -> teal_vm.EvalResult:
+        return self.execute([
+            teal_vm.payment(user, self.app_address, stake),
+            teal_vm.app_call(user, self.app_id, [b"createCommitment", commitment_hash]),
+        ])
+
+    def verify_session(self, account: bytes, success: bool, sender: bytes = None) -> teal_vm.EvalResult:
+        return self._admin_call([b"verifySession", account, _uint(1 if success else 0)], account, sender)
+
+    def apply_penalty(self, account: bytes, sender: bytes = None) -> teal_vm.EvalResult:
+        return self._admin_call([b"applyPenalty", account], account, sender)
+
+    def apply_penalty_n(self, account: bytes, count: int, sender: bytes = None) -> teal_vm.EvalResult:
+        return self._admin_call([b"applyPenaltyN", account, _uint(count)], account, sender)
+
+    def log_discipline(self, account: bytes, score: int, sender: bytes = None) -> teal_vm.EvalResult:
+        return self._admin_call([b"logDiscipline", account, _uint(score)], account, sender)
+
+    def bridge_intent(self, user: bytes, upi_hash: bytes, amount: int) -> teal_vm.EvalResult:
+        return self.execute([
+            teal_vm.payment(user, self.app_address, amount),
+            teal_vm.app_call(user, self.app_id, [b"bridgeIntent", upi_hash]),
+        ])
+
+    def settle_bridge(self, account: bytes, ref_hash: bytes, sender: bytes = None) -> teal_vm.EvalResult:
+        return self._admin_call([b"settleBridge", account, ref_hash], account, sender)
+
+    def anchor_scores(self, root: bytes, day: int, sender: bytes = None) -> teal_vm.EvalResult:
+        txn = teal_vm.app_call(sender or self.admin, self.app_id, [b"anchorScores", root, _uint(day)])
+        return self.execute([txn])
+
+    # -- state readers --
+
+    def local(self, account: bytes) -> dict:
+        """Decoded local state of an account (str keys)."""
+        return {k.decode(): v for k, v in self.state.locals.get(account, {}).items()}
+
+    def global_state(self) -> dict:
+        """Decoded global state (str keys)."""
+        return {k.decode(): v for k, v in self.state.globals.items()}
+
+
+# ── Canonical Scenarios ──
+
+def _committed(sim: DisciplineSim, user: bytes):
+    sim.opt_in(user)
+    sim.create_commitment(user, hashlib.sha256(b"code 4 hours").digest(), DEFAULT_STAKE)
+
+
+SCENARIOS = {
+    "create": (
+        None,
+        lambda sim, user: DisciplineSim(admin=sim.admin, tracer=sim.evaluator.tracer, source=sim.source).created,
+    ),
+    "optIn": (
+        None,
+        lambda sim, user: sim.opt_in(user),
+    ),
+    "createCommitment": (
+        lambda sim, user: sim.opt_in(user),
+        lambda sim, user: sim.create_commitment(user, hashlib.sha256(b"code 4 hours").digest(), DEFAULT_STAKE),
+    ),
+    "verifySession:success": (
+        _committed,
+        lambda sim, user: sim.verify_session(user, True),
+    ),
+    "verifySession:failure": (
+        _committed,
+        lambda sim, user: sim.verify_session(user, False),
+    ),
+    "applyPenalty": (
+        _committed,
+        lambda sim, user: sim.apply_penalty(user),
+    ),
+    "applyPenaltyN": (
+        _committed,
+        lambda sim, user: sim.apply_penalty_n(user, 5),
+    ),
+    "logDiscipline": (
+        lambda sim, user: sim.opt_in(user),
+        lambda sim, user: sim.log_discipline(user, 85),
+    ),
+    "bridgeIntent": (
+        lambda sim, user: sim.opt_in(user),
+        lambda sim, user: sim.bridge_intent(user, hashlib.sha256(b"user@upi").digest(), 500_000),
+    ),
+    "settleBridge": (
+        lambda sim, user: sim.opt_in(user),
+        lambda sim, user: sim.settle_bridge(user, hashlib.sha256(b"UPI_REF_123").digest()),
+    ),
+    "anchorScores": (
+        None,
+        lambda sim, user: sim.anchor_scores(hashlib.sha256(b"scores").digest(), 20260101),
+    ),
+    "closeOut": (
+        lambda sim, user: sim.opt_in(user),
+        lambda sim, user: sim.close_out(user),
+    ),
+}
+
+
+def run_scenario(name: str, tracer=None, user: bytes = None, source: str = APPROVAL_PROGRAM) -> tuple:
+    """
+    Run one canonical scenario on a fresh simulator.
+
+    Setup runs untraced; only the measured call is passed to `tracer`.
+    Returns (sim, result).
+    """
+    setup, call = SCENARIOS[name]
+    sim = DisciplineSim(source=source)
+    user = user or make_address("user")
+    if setup is not None:
+        setup(sim, user)
+    sim.evaluator.tracer = tracer
+    result = call(sim, user)
+    sim.evaluator.tracer = None
+    return sim, result
@@ -0,0 +1,170 @@
+"""
+TrackBuddy -- Cost Regression Gate
+
+Runs every canonical scenario (contract_sim.SCENARIOS) through the
+offline evaluator with an ExecutionTrace attached and records a golden
+file per scenario in artifacts/golden/:
+
+    cost, steps          total opcode cost / executed opcodes
+    by_label             cost per program label
+    inner_txns           inner transactions issued (type, amount, fee)
+    state                final global / local state and app balance
+
+check() compares a fresh run against the goldens. Cost growth beyond
+the tolerance fails with a per-label diff; any change in approval,
+inner transactions or final state fails regardless of tolerance, since
+those are behavior changes, not cost changes. Cost reductions pass and
+are reported so the goldens can be refreshed with `update`.
+
+Usage:
+    python cost_gate.py check                     # exit 1 on regression
+    python cost_gate.py check --tolerance 0.05    # allow 5% growth per scenario
+    python cost_gate.py update                    # rewrite goldens after an intended change
+"""
+
+import os
+import sys
+import json
+import argparse
+from collections import Counter
+
+from contract_sim import SCENARIOS, run_scenario, make_address
+from discipline_contract import APPROVAL_PROGRAM
+from teal_profile import ExecutionTrace
+
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts", "golden")
+DEFAULT_TOLERANCE = float(os.getenv("COST_GATE_TOLERANCE", "0"))
+
+
+def _jsonable(value):
+    return "0x" + value.hex() if isinstance(value, bytes) else value
+
+
+def golden_path(scenario: str, directory: str = GOLDEN_DIR) -> str:
+    return os.path.join(directory, scenario.replace(":", "__") + ".json")
+
+
+# ── Capture ──
+
+def capture(scenario: str, source: str = APPROVAL_PROGRAM) -> dict:
+    """Execution summary of one scenario, in golden-file form."""
+    trace = ExecutionTrace()
+    user = make_address("user")
+    sim, result = run_scenario(scenario, tracer=trace, user=user, source=source)
+    by_label = Counter()
+    for step in trace.steps:
+        by_label[step.label] += step.cost
+    return {
+        "scenario": scenario,
+        "approved": result.approved,
+        "cost": result.cost,
+        "steps": result.steps,
+        "by_label": dict(sorted(by_label.items())),
+        "inner_txns": [
+            {"type": txn.get("TypeEnum"), "amount": txn.get("Amount", 0), "fee": txn.get("Fee", 0)}
+            for txn in result.inner_txns
+        ],
+        "state": {
+            "global": {k: _jsonable(v) for k, v in sorted(sim.global_state().items())},
+            "local": {k: _jsonable(v) for k, v in sorted(sim.local(user).items())},
+            "app_balance": sim.state.balances.get(sim.app_address, 0),
+        },
+    }
+
+
+def capture_all(source: str = APPROVAL_PROGRAM) -> dict:
+    return {name: capture(name, source) for name in SCENARIOS}
+
+
+def write_goldens(records: dict, directory: str = GOLDEN_DIR):
+    os.makedirs(directory, exist_ok=True)
+    for name, record in records.items():
+        with open(golden_path(name, directory), "w") as f:
+            json.dump(record, f, indent=2)
+            f.write("\n")
+
+
+def load_golden(scenario: str, directory: str = GOLDEN_DIR) -> dict:
+    path = golden_path(scenario, directory)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+# ── Comparison ──
+
+def label_diff(golden: dict, current: dict) -> list:
+    """(label, golden cost, current cost) for every label whose cost changed."""
+    labels = sorted(set(golden["by_label"]) | set(current["by_label"]))
+    return [
+        (label, golden["by_label"].get(label, 0), current["by_label"].get(label, 0))
+        for label in labels
+        if golden["by_label"].get(label, 0) != current["by_label"].get(label, 0)
+    ]
+
+
+def compare(golden: dict, current: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """Failure messages for one scenario (empty when it passes)."""
+    name = current["scenario"]
+    if golden is None:
+        return [f"{name}: no golden file (run `python cost_gate.py update`)"]
+    failures = []
+    for field in ("approved", "inner_txns", "state"):
+        if golden[field] != current[field]:
+            failures.append(f"{name}: {field} changed\n    golden:  {golden[field]}\n    current: {current[field]}")
+    limit = golden["cost"] * (1 + tolerance)
+    if current["cost"] > limit:
+        growth = current["cost"] - golden["cost"]
+        lines = [f"{name}: cost {golden['cost']} -> {current['cost']} (+{growth}, "
+                 f"{100 * growth / golden['cost']:.1f}% > {100 * tolerance:g}% tolerance)"]
+        for label, before, after in label_diff(golden, current):
+            lines.append(f"    {label:<28} {before:>5} -> {after:>5}  ({after - before:+d})")
+        failures.append("\n".join(lines))
+    return failures
+
+
+def check(tolerance: float = DEFAULT_TOLERANCE, source: str = APPROVAL_PROGRAM,
+          directory: str = GOLDEN_DIR) -> tuple:
+    """(failures, improvements) across all scenarios."""
+    failures, improvements = [], []
+    for name in SCENARIOS:
+        golden = load_golden(name, directory)
+        current = capture(name, source)
+        failures.extend(compare(golden, current, tolerance))
+        if golden is not None and current["cost"] < golden["cost"]:
+            improvements.append(f"{name}: cost {golden['cost']} -> {current['cost']}")
+    return failures, improvements
+
+
+# ── CLI ──
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Golden-trace cost regression gate")
+    parser.add_argument("command", choices=["check", "update"])
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative cost growth per scenario (0.05 = 5%%)")
+    args = parser.parse_args(argv)
+
+    if args.command == "update":
+        records = capture_all()
+        write_goldens(records)
+        print(f"Wrote {len(records)} golden traces to {GOLDEN_DIR}/")
+        for name, record in records.items():
+            print(f"  {name:<24} cost {record['cost']:>4}  inner {len(record['inner_txns'])}")
+        return
+
+    failures, improvements = check(args.tolerance)
+    for line in improvements:
+        print(f"  improved  {line}")
+    if failures:
+        print(f"❌ {len(failures)} cost / behavior regression(s):")
+        for failure in failures:
+            print("  " + failure)
+        sys.exit(1)
+    print(f"Cost gate passed: {len(SCENARIOS)} scenarios within {100 * args.tolerance:g}% of golden")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+TrackBuddy -- Fee & Round-Capacity Cost Model
+
+Predicts what a day of operations costs at a given scale, in closed form
+so whole parameter grids evaluate as NumPy arrays in one pass. Each
+active user runs one session per day:
+
+    createCommitment -> applyPenalty x V -> logDiscipline -> verifySession
+                     -> (bridgeIntent -> settleBridge)?
+
+with V ~ Poisson(violation_rate) and success odds halved per violation
+(the loadgen workload model). Transaction counts per call come from
+contract.json: methods with `requires_payment` are a payment + app call
+group, `admin_only` methods are paid by the admin account. Steps whose
+method the contract does not define (a build with a subset of methods)
+cost nothing; batched strategies fall back to applyPenalty when
+applyPenaltyN is absent.
+
+Submission strategies:
+  per_call  one applyPenalty per violation, every call submitted alone
+  batched   violations coalesced into applyPenaltyN(count <= 32) calls
+  grouped   batched, and admin calls packed into atomic groups of 16
+
+Reported per grid point: transactions and fees (user / admin / inner),
+admin submissions, rounds needed under the admin per-round budget,
+share of chain capacity, and minimum balance requirements.
+
+Usage:
+    python cost_model.py --users 1000 10000 100000 --violation-rate 0.5 1.5 3
+    python cost_model.py --users 1e3 1e6 --steps 100 --bridge-rate 0 0.5 --steps 100
+
+    from cost_model import sweep, grid
+    result = sweep(**grid(users=[1e4, 1e5], violation_rate=np.linspace(0, 5, 1000)))
+"""
+
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+
+from admin_scheduler import DEFAULT_TXNS_PER_ROUND, MAX_GROUP_SIZE
+from penalty_coalescer import MAX_PENALTIES_PER_CALL
+from teal_vm import MIN_TXN_FEE
+
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts")
+
+STRATEGIES = ("per_call", "batched", "grouped")
+
+# ── Protocol Constants ──
+
+MIN_BALANCE = 100_000                # base account minimum balance
+APP_PAGE_MIN_BALANCE = 100_000       # per created app (one extra page)
+OPT_IN_MIN_BALANCE = 100_000         # per opted-in app
+UINT_MIN_BALANCE = 28_500            # per schema uint (25_000 + 3_500)
+BYTES_MIN_BALANCE = 50_000           # per schema byte slice (25_000 + 25_000)
+ROUND_SECS = 2.8                     # approximate block time
+ROUND_CAPACITY = 25_000              # approximate txns per block
+
+RESULT_FIELDS = (
+    "user_txns", "admin_txns", "inner_txns", "total_txns",
+    "user_fees", "admin_fees", "inner_fees", "total_fees",
+    "submissions", "admin_rounds", "chain_share",
+    "user_min_balance", "admin_min_balance", "escrow_min_balance",
+)
+
+
+def load_contract(path: str = None) -> dict:
+    """Contract metadata (methods and state schema) from contract.json."""
+    with open(path or os.path.join(ARTIFACTS_DIR, "contract.json")) as f:
+        return json.load(f)
+
+
+def _schema_min_balance(schema: dict) -> int:
+    return UINT_MIN_BALANCE * schema["num_uints"] + BYTES_MIN_BALANCE * schema["num_byte_slices"]
+
+
+def _txns_per_call(method: dict) -> int:
+    return 2 if method.get("requires_payment") else 1
+
+
+# ── Vectorized Model ──
+
+def expected_ceil_poisson(lam, batch: int, tail: float = 12.0) -> np.ndarray:
+    """E[ceil(V / batch)] for V ~ Poisson(lam), elementwise over `lam`."""
+    lam = np.asarray(lam, dtype=np.float64)
+    top = int(np.max(lam, initial=0.0) + tail * np.sqrt(np.max(lam, initial=0.0)) + 2 * tail)
+    k = np.arange(top + 1, dtype=np.float64).reshape((-1,) + (1,) * lam.ndim)
+    log_fact = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, top + 1))))).reshape(k.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_pmf = np.where(k == 0, 0.0, k * np.log(lam)) - lam - log_fact
+    return (np.exp(log_pmf) * np.ceil(k / batch)).sum(axis=0)
+
+
+def grid(**axes) -> dict:
+    """Cartesian product of parameter axes, flattened to equal-length arrays."""
+    names = list(axes)
+    mesh = np.meshgrid(*(np.asarray(axes[n], dtype=np.float64) for n in names), indexing="ij")
+    return {name: values.ravel() for name, values in zip(names, mesh)}
+
+
+def sweep(users=1000, violation_rate=1.5, success_rate=0.8, bridge_rate=0.2,
+          opt_in_rate=0.1, fee=MIN_TXN_FEE, anchors_per_day=1, strategy="grouped",
+          batch_size=MAX_PENALTIES_PER_CALL, group_size=MAX_GROUP_SIZE,
+          admin_txns_per_round=DEFAULT_TXNS_PER_ROUND, round_capacity=ROUND_CAPACITY,
+          contract: dict = None) -> dict:
+    """
+    Expected daily cost for every point of a parameter grid.
+
+    Numeric arguments broadcast against each other (scalars or arrays,
+    e.g. from grid()); every result field is an array of that shape.
+    Fees and balances are in microAlgos.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    contract = contract or load_contract()
+    methods = contract["methods"]
+    users, lam, success, bridge, opt_in, fee = np.broadcast_arrays(*(
+        np.asarray(v, dtype=np.float64)
+        for v in (users, violation_rate, success_rate, bridge_rate, opt_in_rate, fee)
+    ))
+
+    if strategy == "per_call" or "applyPenaltyN" not in methods:
+        penalty_calls, penalty_method = users * lam, "applyPenalty"
+    else:
+        penalty_calls = users * expected_ceil_poisson(lam, min(batch_size, MAX_PENALTIES_PER_CALL))
+        penalty_method = "applyPenaltyN"
+    # P(success) = success_rate * E[0.5 ** V] (Poisson generating function)
+    payouts = users * success * np.exp(-lam / 2)
+
+    calls = {
+        "createCommitment": users,
+        penalty_method: penalty_calls,
+        "logDiscipline": users,
+        "verifySession": users,
+        "bridgeIntent": users * bridge,
+        "settleBridge": users * bridge,
+        "anchorScores": np.full_like(users, anchors_per_day),
+    }
+    user_txns = users * opt_in
+    admin_txns = np.zeros_like(users)
+    for name, count in calls.items():
+        if name not in methods:
+            continue
+        txns = count * _txns_per_call(methods[name])
+        if methods[name].get("admin_only"):
+            admin_txns = admin_txns + txns
+        else:
+            user_txns = user_txns + txns
+    # verifySession's success path returns the stake in an inner payment
+    inner_txns = payouts if "verifySession" in methods else np.zeros_like(users)
+
+    submissions = np.ceil(admin_txns / group_size) if strategy == "grouped" else admin_txns
+    admin_rounds = np.ceil(admin_txns / admin_txns_per_round)
+    rounds_per_day = 86_400 / ROUND_SECS
+    total_txns = user_txns + admin_txns
+
+    local_schema = contract["state_schema"]["local"]
+    global_schema = contract["state_schema"]["global"]
+    user_mbr = MIN_BALANCE + OPT_IN_MIN_BALANCE + _schema_min_balance(local_schema)
+    admin_mbr = MIN_BALANCE + APP_PAGE_MIN_BALANCE + _schema_min_balance(global_schema)
+
+    return {
+        "user_txns": user_txns,
+        "admin_txns": admin_txns,
+        "inner_txns": inner_txns,
+        "total_txns": total_txns,
+        "user_fees": user_txns * fee,
+        "admin_fees": admin_txns * fee,
+        "inner_fees": inner_txns * fee,
+        "total_fees": (total_txns + inner_txns) * fee,
+        "submissions": submissions,
+        "admin_rounds": admin_rounds,
+        "chain_share": total_txns / (rounds_per_day * round_capacity),
+        "user_min_balance": users * user_mbr,
+        "admin_min_balance": np.full_like(users, admin_mbr),
+        "escrow_min_balance": np.full_like(users, MIN_BALANCE),
+    }
+
+
+def compare(**params) -> dict:
+    """sweep() under every strategy: {strategy: result}."""
+    contract = params.pop("contract", None) or load_contract()
+    return {s: sweep(strategy=s, contract=contract, **params) for s in STRATEGIES}
+
+
+# ── CLI ──
+
+def _axis(values: list, steps: int):
+    return np.linspace(values[0], values[-1], steps) if steps and len(values) == 2 else values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily fee / round-capacity model for TrackBuddy operations")
+    parser.add_argument("--users", type=float, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--violation-rate", type=float, nargs="+", default=[1.5])
+    parser.add_argument("--success-rate", type=float, nargs="+", default=[0.8])
+    parser.add_argument("--bridge-rate", type=float, nargs="+", default=[0.2])
+    parser.add_argument("--fee", type=float, nargs="+", default=[MIN_TXN_FEE], help="per-txn fee, microAlgos")
+    parser.add_argument("--steps", type=int, default=0, help="expand each 2-value axis into N linear steps")
+    args = parser.parse_args(argv)
+
+    axes = grid(
+        users=_axis(args.users, args.steps),
+        violation_rate=_axis(args.violation_rate, args.steps),
+        success_rate=_axis(args.success_rate, args.steps),
+        bridge_rate=_axis(args.bridge_rate, args.steps),
+        fee=_axis(args.fee, args.steps),
+    )
+    started = time.perf_counter()
+    results = compare(**axes)
+    elapsed = time.perf_counter() - started
+    points = len(axes["users"])
+    print(f"Cost model: {points} parameter combinations x {len(STRATEGIES)} strategies in {elapsed * 1000:.1f}ms")
+    print("---")
+
+    if points > 20:
+        for strategy, result in results.items():
+            worst = int(np.argmax(result["total_fees"]))
+            print(f"  {strategy:<9} fees/day {result['total_fees'].min() / 1e6:,.3f}"
+                  f" - {result['total_fees'].max() / 1e6:,.3f} ALGO"
+                  f"  (max at users={axes['users'][worst]:.0f}, violations={axes['violation_rate'][worst]:.2f})")
+        return results
+
+    print(f"  {'users':>9} {'viol':>5} {'strategy':<9} {'txns':>11} {'fees ALGO':>11}"
+          f" {'inner':>9} {'submits':>10} {'rounds':>7} {'chain%':>7}")
+    for i in range(points):
+        for strategy, r in results.items():
+            print(f"  {axes['users'][i]:>9.0f} {axes['violation_rate'][i]:>5.2f} {strategy:<9}"
+                  f" {r['total_txns'][i]:>11,.0f} {r['total_fees'][i] / 1e6:>11,.3f}"
+                  f" {r['inner_fees'][i] / 1e6:>9,.3f} {r['submissions'][i]:>10,.0f}"
+                  f" {r['admin_rounds'][i]:>7,.0f} {r['chain_share'][i] * 100:>6.3f}%")
+    first = results["grouped"]
+    print(f"  Min balance: {first['user_min_balance'][0] / axes['users'][0] / 1e6:.4f} ALGO per user,"
+          f" admin {first['admin_min_balance'][0] / 1e6:.4f} ALGO,"
+          f" app escrow {first['escrow_min_balance'][0] / 1e6:.4f} ALGO")
+    return results
+
+
+if __name__ == "__main__":
+    main()
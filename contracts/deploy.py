@@ -5,21 +5,27 @@ Deploys the Discipline smart contract to Algorand Testnet.
 Outputs the App ID for backend integration.
 
 Usage:
-    python deploy.py
+    python deploy.py                    # artifacts/
+    python deploy.py builds/core        # a subset build (see discipline_contract.py --artifacts)
 
 Requires ALGO_MNEMONIC in .env with a funded testnet account.
 Get testnet ALGO from: https://bank.testnet.algorand.network/
 """
 
+import os
 import sys
 import json
 from algosdk import mnemonic, account
-from algosdk.transaction import ApplicationCreateTxn, StateSchema, OnComplete, wait_for_confirmation
+from algosdk.transaction import ApplicationCreateTxn, StateSchema, OnComplete
+
+import instrumentation
 from config import get_algod_client, ALGO_MNEMONIC, get_network_info
 
+ARTIFACTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts")
+
 
-def deploy():
-    """Deploy the discipline contract to Algorand testnet."""
+def deploy(artifacts_dir: str = ARTIFACTS_DIR):
+    """Deploy the discipline contract compiled into artifacts_dir to Algorand testnet."""
 
     # ── Validate mnemonic ──
     if not ALGO_MNEMONIC:
@@ -34,10 +40,12 @@ def deploy():
 
     # ── Load compiled TEAL ──
     try:
-        with open("artifacts/approval.teal", "r") as f:
+        with open(os.path.join(artifacts_dir, "approval.teal"), "r") as f:
             approval_teal = f.read()
-        with open("artifacts/clear.teal", "r") as f:
+        with open(os.path.join(artifacts_dir, "clear.teal"), "r") as f:
             clear_teal = f.read()
+        with open(os.path.join(artifacts_dir, "contract.json"), "r") as f:
+            schema = json.load(f)["state_schema"]
     except FileNotFoundError:
         print("❌ Compiled TEAL not found. Run the contract compiler first:")
         print("   python discipline_contract.py")
@@ -49,16 +57,20 @@ def deploy():
     print(f"Network: {network_info['network']}")
 
     # Compile TEAL to binary
-    approval_result = algod_client.compile(approval_teal)
-    approval_binary = bytes.fromhex(approval_result['result'])
-    clear_result = algod_client.compile(clear_teal)
-    clear_binary = bytes.fromhex(clear_result['result'])
+    with instrumentation.span("deploy.compile"):
+        approval_result = algod_client.compile(approval_teal)
+        approval_binary = bytes.fromhex(approval_result['result'])
+        clear_result = algod_client.compile(clear_teal)
+        clear_binary = bytes.fromhex(clear_result['result'])
 
     # ── State schema ──
-    # Global: admin(bytes) + total_commitments(uint) + total_penalties(uint) + total_bridge_intents(uint)
-    global_schema = StateSchema(num_uints=3, num_byte_slices=1)
-    # Local: stake_amount(uint) + commitment_status(uint) + violations(uint) + discipline_score(uint) + commitment_hash(bytes)
-    local_schema = StateSchema(num_uints=4, num_byte_slices=1)
+    # From contract.json, which compile_contract() writes alongside the TEAL,
+    # so a build with a subset of methods deploys with only the keys it uses.
+    # Full build -- Global: 4 uints, 2 bytes; Local: 4 uints, 1 bytes
+    global_schema = StateSchema(num_uints=schema["global"]["num_uints"],
+                                num_byte_slices=schema["global"]["num_byte_slices"])
+    local_schema = StateSchema(num_uints=schema["local"]["num_uints"],
+                               num_byte_slices=schema["local"]["num_byte_slices"])
 
     # ── Build transaction ──
     params = algod_client.suggested_params()
@@ -74,12 +86,13 @@ def deploy():
 
     # ── Sign and send ──
     signed_txn = txn.sign(private_key)
-    tx_id = algod_client.send_transaction(signed_txn)
+    with instrumentation.span("deploy.send"):
+        tx_id = algod_client.send_transaction(signed_txn)
     print(f"Transaction sent: {tx_id}")
 
     # ── Wait for confirmation ──
     print(" Waiting for confirmation...")
-    result = wait_for_confirmation(algod_client, tx_id, 4)
+    result = instrumentation.wait_for_confirmation(algod_client, tx_id, 4, operation="deploy")
 
     app_id = result['application-index']
 
@@ -97,14 +110,14 @@ def deploy():
         'network': network_info['network'],
         'deployer': sender,
     }
-    with open("artifacts/deploy_info.json", "w") as f:
+    with open(os.path.join(artifacts_dir, "deploy_info.json"), "w") as f:
         json.dump(deploy_info, f, indent=2)
 
-    print(f"\n Deploy info saved to artifacts/deploy_info.json")
+    print(f"\n Deploy info saved to {os.path.join(artifacts_dir, 'deploy_info.json')}")
     print(f"   Update ALGO_APP_ID={app_id} in backend/.env")
 
     return app_id
 
 
 if __name__ == "__main__":
-    deploy()
+    deploy(*sys.argv[1:2])
@@ -4,15 +4,22 @@ TrackBuddy -- Discipline Smart Contract (Raw TEAL v8)
 Since Beaker/PyTeal are incompatible with Python 3.14,
 we write TEAL directly for maximum compatibility.
 
-This script generates the approval and clear programs
-for the TrackBuddy Discipline contract.
+The contract is described as data: on-completion ROUTES, the NoOp
+METHODS, SUBROUTINES and the state keys. build_approval() emits the
+approval program and build_metadata() the matching contract.json from
+the same description, so a deployment can include only the methods it
+uses -- a shorter NoOp routing chain, no unused method bodies, and a
+state schema and codec holding only the keys those methods touch.
+The default (every method) reproduces the full contract.
 
 State Schema:
-  Global (3 uints, 1 bytes):
+  Global (4 uints, 2 bytes):
     - admin (bytes): Backend admin address authorized for settlements
     - total_commitments (uint): Total commitments created
     - total_penalties (uint): Total penalties applied
     - total_bridge_intents (uint): Total bridge intents created
+    - score_root (bytes): Merkle root of the latest anchored score list
+    - score_day (uint): Day (YYYYMMDD) of the latest anchored root
 
   Local per user (4 uints, 1 bytes):
     - stake_amount (uint): Current staked microAlgos
@@ -22,187 +29,155 @@ State Schema:
     - commitment_hash (bytes): SHA256 of commitment metadata
 
 Methods:
-  - createCommitment(hash, duration)  : User stakes ALGO + registers commitment
+  - createCommitment(hash)            : User stakes ALGO + registers commitment
   - verifySession(account, success)   : Backend verifies session outcome
   - applyPenalty(account)             : Backend applies penalty on violation
+  - applyPenaltyN(account, count)     : Backend applies `count` penalties in one call
   - logDiscipline(account, score)     : Backend logs daily discipline score
-  - bridgeIntent(upi_hash, amount)    : User initiates crypto-to-UPI bridge
+  - bridgeIntent(upi_hash)            : User initiates crypto-to-UPI bridge
   - settleBridge(account, ref_hash)   : Backend settles bridge payout on-chain
+  - anchorScores(root, day)           : Backend anchors a day's score Merkle root
+
+  createCommitment and bridgeIntent carry only the hash in app args;
+  the stake / bridge amount is the grouped payment's Amount.
+
+Usage:
+    python discipline_contract.py                                   # every method
+    python discipline_contract.py --methods createCommitment,verifySession,applyPenalty --artifacts builds/core
 """
 
 import os
+import re
 import json
+import argparse
+import textwrap
+from dataclasses import dataclass
 
+from codec_gen import CODEC_FILENAME, snake_case, write_codec
 
-# =============================================
-# Approval Program (TEAL v8)
-# =============================================
 
-APPROVAL_PROGRAM = """#pragma version 8
-
-// =============================================
-// TrackBuddy Discipline Contract — Approval
-// =============================================
-
-// ---- Entry point routing ----
-
-// Application creation
-txn ApplicationID
-int 0
-==
-bnz handle_create
-
-// Opt-in
-txn OnCompletion
-int OptIn
-==
-bnz handle_optin
-
-// Close out
-txn OnCompletion
-int CloseOut
-==
-bnz handle_closeout
-
-// Update application (reject always)
-txn OnCompletion
-int UpdateApplication
-==
-bnz handle_reject
-
-// Delete application (admin only)
-txn OnCompletion
-int DeleteApplication
-==
-bnz handle_delete
-
-// NoOp — method dispatch
-txn OnCompletion
-int NoOp
-==
-bnz handle_noop
-
-// Default: reject
-b handle_reject
-
-
-// =============================================
-// CREATE — initialize contract
-// =============================================
-handle_create:
-  // Set admin to contract creator
-  byte "admin"
-  txn Sender
-  app_global_put
+# ── Contract IR ──
 
-  // Initialize global counters
-  byte "total_commitments"
-  int 0
-  app_global_put
+@dataclass(frozen=True)
+class StateKey:
+    """A global or local state key and its contract.json description."""
+    name: str
+    type: str            # "uint64" | "bytes"
+    descr: str
 
-  byte "total_penalties"
-  int 0
-  app_global_put
 
-  byte "total_bridge_intents"
-  int 0
-  app_global_put
+@dataclass(frozen=True)
+class Route:
+    """An entry-point check: `test` leaves a bool, true jumps to `target`."""
+    comment: str
+    test: tuple
+    target: str
 
-  int 1
-  return
 
+@dataclass(frozen=True)
+class Block:
+    """A labelled TEAL section: a banner comment, the label and its body."""
+    label: str
+    title: str
+    body: str
+    notes: tuple = ()
 
-// =============================================
-// OPT-IN — register new user
-// =============================================
-handle_optin:
-  // Initialize all local state keys for sender
-  txn Sender
-  byte "stake_amount"
-  int 0
-  app_local_put
 
-  txn Sender
-  byte "commitment_status"
-  int 0
-  app_local_put
+@dataclass(frozen=True)
+class Method:
+    """A NoOp method, dispatched on ApplicationArgs[0] == name."""
+    name: str
+    args: tuple
+    descr: str
+    body: str
+    admin_only: bool = False
+    requires_payment: bool = False
+    notes: tuple = ()
 
-  txn Sender
-  byte "violations"
-  int 0
-  app_local_put
+    @property
+    def label(self) -> str:
+        return f"method_{snake_case(self.name)}"
 
-  txn Sender
-  byte "discipline_score"
-  int 0
-  app_local_put
 
-  txn Sender
-  byte "commitment_hash"
-  byte ""
-  app_local_put
+@dataclass(frozen=True)
+class Subroutine:
+    """A callsub target, emitted only when a selected block calls it."""
+    label: str
+    body: str
+    notes: tuple = ()
 
-  int 1
-  return
 
+# ── State ──
 
-// =============================================
-// NOOP — method dispatch router
-// =============================================
-handle_noop:
-  // Must have at least 1 app arg (method name)
-  txn NumAppArgs
-  int 1
-  >=
-  assert
+CREATOR_KEY = "admin"
 
-  // Route: createCommitment
-  txna ApplicationArgs 0
-  byte "createCommitment"
-  ==
-  bnz method_create_commitment
+GLOBAL_KEYS = [
+    StateKey("admin", "bytes", "Backend admin address"),
+    StateKey("total_commitments", "uint64", "Commitment counter"),
+    StateKey("total_penalties", "uint64", "Penalty counter"),
+    StateKey("total_bridge_intents", "uint64", "Bridge intent counter"),
+    StateKey("score_root", "bytes", "Merkle root of latest anchored scores"),
+    StateKey("score_day", "uint64", "Day (YYYYMMDD) of latest anchored root"),
+]
 
-  // Route: verifySession
-  txna ApplicationArgs 0
-  byte "verifySession"
-  ==
-  bnz method_verify_session
+LOCAL_KEYS = [
+    StateKey("stake_amount", "uint64", "Staked microAlgos"),
+    StateKey("commitment_status", "uint64", "0=none, 1=active, 2=completed, 3=failed"),
+    StateKey("violations", "uint64", "Violation counter"),
+    StateKey("discipline_score", "uint64", "Score 0-100"),
+    StateKey("commitment_hash", "bytes", "SHA256 of commitment metadata"),
+]
 
-  // Route: applyPenalty
-  txna ApplicationArgs 0
-  byte "applyPenalty"
-  ==
-  bnz method_apply_penalty
 
-  // Route: logDiscipline
-  txna ApplicationArgs 0
-  byte "logDiscipline"
-  ==
-  bnz method_log_discipline
+# ── Routes and Handlers ──
 
-  // Route: bridgeIntent
-  txna ApplicationArgs 0
-  byte "bridgeIntent"
-  ==
-  bnz method_bridge_intent
+def _on_completion(name: str) -> tuple:
+    return ("txn OnCompletion", f"int {name}", "==")
 
-  // Route: settleBridge
-  txna ApplicationArgs 0
-  byte "settleBridge"
-  ==
-  bnz method_settle_bridge
-
-  // Unknown method
-  b handle_reject
 
+ROUTES = [
+    Route("Application creation", ("txn ApplicationID", "int 0", "=="), "handle_create"),
+    Route("Opt-in", _on_completion("OptIn"), "handle_optin"),
+    Route("Close out", _on_completion("CloseOut"), "handle_closeout"),
+    Route("Update application (reject always)", _on_completion("UpdateApplication"), "handle_reject"),
+    Route("Delete application (admin only)", _on_completion("DeleteApplication"), "handle_delete"),
+    Route("NoOp — method dispatch", _on_completion("NoOp"), "handle_noop"),
+]
 
-// =============================================
-// METHOD: createCommitment
-// Args: [0]="createCommitment", [1]=commitment_hash
-// Requires: atomic group with payment txn for stake
-// User stakes ALGO into contract escrow
-// =============================================
-method_create_commitment:
+# Emitted after the methods and subroutines; create, opt-in and the
+# NoOp router are generated from the selection.
+HANDLERS = [
+    Block("handle_closeout", "CLOSE OUT — allow user to leave", """\
+  // Only allow close out if no active commitment
+  txn Sender
+  byte "commitment_status"
+  app_local_get
+  int 1  // 1 = active
+  !=
+  return"""),
+    Block("handle_delete", "DELETE — admin only", """\
+  callsub is_admin
+  return"""),
+    Block("handle_reject", "REJECT", """\
+  int 0
+  return"""),
+]
+
+
+# ── Methods ──
+
+METHODS = [
+    Method(
+        name="createCommitment",
+        args=("commitment_hash (bytes)",),
+        descr="User stakes ALGO and registers a commitment",
+        requires_payment=True,
+        notes=(
+            'Args: [0]="createCommitment", [1]=commitment_hash',
+            "Requires: atomic group with payment txn for stake",
+            "User stakes ALGO into contract escrow",
+        ),
+        body="""\
   // --- Validate: must have 2 app args ---
   // arg[0] = "createCommitment", arg[1] = commitment_hash
   txn NumAppArgs
@@ -278,16 +253,20 @@ method_create_commitment:
 
   int 1
   return
-
-
-// =============================================
-// METHOD: verifySession
-// Args: [0]="verifySession", [1]=account, [2]=success(0/1)
-// Admin only -- backend verifies session outcome
-// success=1 -> return stake to user, mark completed
-// success=0 -> mark failed, stake stays in contract
-// =============================================
-method_verify_session:
+""",
+    ),
+    Method(
+        name="verifySession",
+        args=("account (address)", "success (uint64)"),
+        descr="Backend verifies session and releases/locks stake",
+        admin_only=True,
+        notes=(
+            'Args: [0]="verifySession", [1]=account, [2]=success(0/1)',
+            "Admin only -- backend verifies session outcome",
+            "success=1 -> return stake to user, mark completed",
+            "success=0 -> mark failed, stake stays in contract",
+        ),
+        body="""\
   // --- Admin only ---
   callsub is_admin
   assert
@@ -360,16 +339,20 @@ verify_success:
 
   int 1
   return
-
-
-// =============================================
-// METHOD: applyPenalty
-// Args: [0]="applyPenalty", [1]=account
-// Admin only -- deducts penalty from stake
-// Penalty = 10% of current stake (min 1000 microAlgo)
-// Increments violation counter
-// =============================================
-method_apply_penalty:
+""",
+    ),
+    Method(
+        name="applyPenalty",
+        args=("account (address)",),
+        descr="Backend applies penalty on detected violation",
+        admin_only=True,
+        notes=(
+            'Args: [0]="applyPenalty", [1]=account',
+            "Admin only -- deducts penalty from stake",
+            "Penalty = 10% of current stake (min 1000 microAlgo)",
+            "Increments violation counter",
+        ),
+        body="""\
   // --- Admin only ---
   callsub is_admin
   assert
@@ -438,15 +421,122 @@ method_apply_penalty:
 
   int 1
   return
+""",
+    ),
+    Method(
+        name="applyPenaltyN",
+        args=("account (address)", "count (uint64)"),
+        descr="Backend applies count penalties (1-32) in one call",
+        admin_only=True,
+        notes=(
+            'Args: [0]="applyPenaltyN", [1]=account, [2]=count (1-32)',
+            "Admin only -- applies `count` penalties in one call",
+            "Result matches `count` successive applyPenalty calls:",
+            "stake -= stake / 10 is repeated with the same integer",
+            "rounding (floor division does not compound in closed form)",
+            "Scratch: 0=count, 1=stake, 2=iteration",
+        ),
+        body="""\
+  // --- Admin only ---
+  callsub is_admin
+  assert
+
+  // --- Validate args ---
+  txn NumAppArgs
+  int 3
+  >=
+  assert
+
+  // --- User must have active commitment ---
+  txna ApplicationArgs 1
+  byte "commitment_status"
+  app_local_get
+  int 1
+  ==
+  assert
+
+  // --- Validate count: 1..32 (keeps the loop inside the budget) ---
+  txna ApplicationArgs 2
+  btoi
+  store 0
+
+  load 0
+  int 1
+  >=
+  assert
+
+  load 0
+  int 32
+  <=
+  assert
+
+  // --- Load current stake ---
+  txna ApplicationArgs 1
+  byte "stake_amount"
+  app_local_get
+  store 1
+
+  int 0
+  store 2
 
+penalty_n_loop:
+  // stake = stake - stake / 10
+  load 1
+  load 1
+  int 10
+  /
+  -
+  store 1
+
+  // iteration += 1; loop while iteration < count
+  load 2
+  int 1
+  +
+  dup
+  store 2
+  load 0
+  <
+  bnz penalty_n_loop
+
+  // --- Store reduced stake ---
+  txna ApplicationArgs 1
+  byte "stake_amount"
+  load 1
+  app_local_put
+
+  // --- Add count to violation counter ---
+  txna ApplicationArgs 1
+  byte "violations"
+  txna ApplicationArgs 1
+  byte "violations"
+  app_local_get
+  load 0
+  +
+  app_local_put
+
+  // --- Add count to global penalty counter ---
+  byte "total_penalties"
+  byte "total_penalties"
+  app_global_get
+  load 0
+  +
+  app_global_put
 
-// =============================================
-// METHOD: logDiscipline
-// Args: [0]="logDiscipline", [1]=account, [2]=score (0-100)
-// Admin only -- stores daily discipline score on-chain
-// Immutable productivity record per user
-// =============================================
-method_log_discipline:
+  int 1
+  return
+""",
+    ),
+    Method(
+        name="logDiscipline",
+        args=("account (address)", "score (uint64)"),
+        descr="Backend logs daily discipline score on-chain",
+        admin_only=True,
+        notes=(
+            'Args: [0]="logDiscipline", [1]=account, [2]=score (0-100)',
+            "Admin only -- stores daily discipline score on-chain",
+            "Immutable productivity record per user",
+        ),
+        body="""\
   // --- Admin only ---
   callsub is_admin
   assert
@@ -479,16 +569,20 @@ method_log_discipline:
 
   int 1
   return
-
-
-// =============================================
-// METHOD: bridgeIntent
-// Args: [0]="bridgeIntent", [1]=upi_hash
-// Requires: atomic group with payment txn
-// User locks ALGO in contract for UPI bridge payout
-// Stores hashed UPI reference for backend settlement
-// =============================================
-method_bridge_intent:
+""",
+    ),
+    Method(
+        name="bridgeIntent",
+        args=("upi_hash (bytes)",),
+        descr="User initiates crypto-to-UPI bridge payment",
+        requires_payment=True,
+        notes=(
+            'Args: [0]="bridgeIntent", [1]=upi_hash',
+            "Requires: atomic group with payment txn",
+            "User locks ALGO in contract for UPI bridge payout",
+            "Stores hashed UPI reference for backend settlement",
+        ),
+        body="""\
   // --- Validate args ---
   txn NumAppArgs
   int 2
@@ -539,16 +633,20 @@ method_bridge_intent:
 
   int 1
   return
-
-
-// =============================================
-// METHOD: settleBridge
-// Args: [0]="settleBridge", [1]=account, [2]=ref_hash
-// Admin only -- marks bridge payout as settled on-chain
-// Called after backend confirms UPI payout completed
-// ref_hash = hash of UPI transaction reference
-// =============================================
-method_settle_bridge:
+""",
+    ),
+    Method(
+        name="settleBridge",
+        args=("account (address)", "ref_hash (bytes)"),
+        descr="Backend confirms bridge payout completion on-chain",
+        admin_only=True,
+        notes=(
+            'Args: [0]="settleBridge", [1]=account, [2]=ref_hash',
+            "Admin only -- marks bridge payout as settled on-chain",
+            "Called after backend confirms UPI payout completed",
+            "ref_hash = hash of UPI transaction reference",
+        ),
+        body="""\
   // --- Admin only ---
   callsub is_admin
   assert
@@ -566,50 +664,223 @@ method_settle_bridge:
 
   int 1
   return
+""",
+    ),
+    Method(
+        name="anchorScores",
+        args=("root (bytes)", "day (uint64)"),
+        descr="Backend anchors the Merkle root of a day's discipline scores",
+        admin_only=True,
+        notes=(
+            'Args: [0]="anchorScores", [1]=root (32 bytes), [2]=day (uint64)',
+            "Admin only -- anchors the Merkle root of a day's",
+            "(account, score) list in a single call",
+            "Replaces per-user logDiscipline calls for bulk logging;",
+            "inclusion proofs are served off-chain (see merkle.py)",
+        ),
+        body="""\
+  // --- Admin only ---
+  callsub is_admin
+  assert
+
+  // --- Validate args ---
+  txn NumAppArgs
+  int 3
+  >=
+  assert
+
+  // --- Root must be a 32-byte hash ---
+  txna ApplicationArgs 1
+  len
+  int 32
+  ==
+  assert
 
+  // --- Day must advance (no rewriting past anchors) ---
+  txna ApplicationArgs 2
+  btoi
+  byte "score_day"
+  app_global_get
+  >
+  assert
 
-// =============================================
-// SUBROUTINE: is_admin
-// Checks if txn sender is the stored admin
-// Returns: 1 if admin, 0 otherwise
-// Used by verifySession, applyPenalty, logDiscipline, settleBridge
-// =============================================
-is_admin:
+  // --- Store latest root and day ---
+  byte "score_root"
+  txna ApplicationArgs 1
+  app_global_put
+
+  byte "score_day"
+  txna ApplicationArgs 2
+  btoi
+  app_global_put
+
+  // --- Log day || root so every anchor stays readable from history ---
+  txna ApplicationArgs 2
+  txna ApplicationArgs 1
+  concat
+  log
+
+  int 1
+  return
+""",
+    ),
+]
+
+SUBROUTINES = [
+    Subroutine("is_admin", """\
   byte "admin"
   app_global_get
   txn Sender
   ==
-  retsub
+  retsub""", notes=(
+        "Checks if txn sender is the stored admin",
+        "Returns: 1 if admin, 0 otherwise",
+    )),
+]
+
+METHOD_NAMES = [m.name for m in METHODS]
+
+
+# ── Emission ──
+
+_RULE = "// " + "=" * 45
+_KEY_REF = re.compile(r'byte "(\w+)"')
+
+
+def select_methods(methods=None) -> list:
+    """Method IR for the named methods (all by default), in routing order."""
+    if methods is None:
+        return list(METHODS)
+    wanted = set(methods)
+    unknown = sorted(wanted.difference(METHOD_NAMES))
+    if unknown:
+        raise ValueError(f"Unknown method(s): {', '.join(unknown)}")
+    return [m for m in METHODS if m.name in wanted]
+
+
+def _section(label: str, title: str, body: str, notes=()) -> str:
+    banner = [_RULE, f"// {title}"] + [f"// {note}" for note in notes] + [_RULE]
+    return "\n".join(banner + [f"{label}:", body.rstrip("\n")])
+
+
+def _subroutines(selected: list) -> list:
+    bodies = [m.body for m in selected] + [h.body for h in HANDLERS]
+    return [s for s in SUBROUTINES if any(f"callsub {s.label}\n" in b + "\n" for b in bodies)]
+
+
+def _used_keys(keys: list, selected: list) -> list:
+    """Keys a selected method, subroutine or handler reads or writes."""
+    bodies = [m.body for m in selected] + [h.body for h in HANDLERS]
+    bodies += [s.body for s in _subroutines(selected)]
+    referenced = {name for body in bodies for name in _KEY_REF.findall(body)}
+    return [k for k in keys if k.name in referenced]
+
+
+def _initial(key: StateKey) -> str:
+    if key.name == CREATOR_KEY:
+        return "txn Sender"
+    return 'byte ""' if key.type == "bytes" else "int 0"
+
+
+def _create(global_keys: list) -> str:
+    parts = []
+    for key in global_keys:
+        if key.name == CREATOR_KEY:
+            comment = ["  // Set admin to contract creator"]
+        else:
+            comment = ["  // Initialize global counters"] if len(parts) == 1 else []
+        parts.append("\n".join(comment + [f'  byte "{key.name}"', f"  {_initial(key)}", "  app_global_put"]))
+    return "\n\n".join(parts + ["  int 1\n  return"])
+
+
+def _optin(local_keys: list) -> str:
+    parts = ["  // Initialize all local state keys for sender"]
+    for key in local_keys:
+        parts.append("\n".join(["  txn Sender", f'  byte "{key.name}"', f"  {_initial(key)}", "  app_local_put"]))
+    return parts[0] + "\n" + "\n\n".join(parts[1:] + ["  int 1\n  return"])
+
+
+def _router(selected: list) -> str:
+    parts = ["  // Must have at least 1 app arg (method name)\n  txn NumAppArgs\n  int 1\n  >=\n  assert"]
+    for method in selected:
+        parts.append("\n".join([
+            f"  // Route: {method.name}",
+            "  txna ApplicationArgs 0",
+            f'  byte "{method.name}"',
+            "  ==",
+            f"  bnz {method.label}",
+        ]))
+    return "\n\n".join(parts + ["  // Unknown method\n  b handle_reject"])
+
+
+def _entry() -> str:
+    routes = ["\n".join([f"// {r.comment}", *r.test, f"bnz {r.target}"]) for r in ROUTES]
+    return "\n\n".join([
+        "#pragma version 8",
+        f"{_RULE}\n// TrackBuddy Discipline Contract — Approval\n{_RULE}",
+        "// ---- Entry point routing ----",
+        *routes,
+        "// Default: reject\nb handle_reject",
+    ])
+
+
+def build_approval(methods=None) -> str:
+    """Approval program TEAL for the selected methods (all by default)."""
+    selected = select_methods(methods)
+    sections = [
+        _entry(),
+        _section("handle_create", "CREATE — initialize contract", _create(_used_keys(GLOBAL_KEYS, selected))),
+        _section("handle_optin", "OPT-IN — register new user", _optin(_used_keys(LOCAL_KEYS, selected))),
+        _section("handle_noop", "NOOP — method dispatch router", _router(selected)),
+    ]
+    sections += [_section(m.label, f"METHOD: {m.name}", m.body, m.notes) for m in selected]
+    for sub in _subroutines(selected):
+        callers = [m.name for m in selected if f"callsub {sub.label}\n" in m.body + "\n"]
+        notes = list(sub.notes)
+        if callers:
+            notes += textwrap.wrap("Used by " + ", ".join(callers), width=70)
+        sections.append(_section(sub.label, f"SUBROUTINE: {sub.label}", sub.body, notes))
+    sections += [_section(h.label, h.title, h.body, h.notes) for h in HANDLERS]
+    return "\n\n\n".join(sections) + "\n"
+
+
+def _schema(keys: list) -> dict:
+    return {
+        "num_uints": sum(k.type == "uint64" for k in keys),
+        "num_byte_slices": sum(k.type == "bytes" for k in keys),
+        "keys": {k.name: {"type": k.type, "descr": k.descr} for k in keys},
+    }
 
 
-// =============================================
-// CLOSE OUT — allow user to leave
-// =============================================
-handle_closeout:
-  // Only allow close out if no active commitment
-  txn Sender
-  byte "commitment_status"
-  app_local_get
-  int 1  // 1 = active
-  !=
-  return
+def _method_metadata(method: Method) -> dict:
+    spec = {"args": list(method.args), "returns": "void", "descr": method.descr}
+    if method.requires_payment:
+        spec["requires_payment"] = True
+    spec["admin_only"] = method.admin_only
+    return spec
 
 
-// =============================================
-// DELETE — admin only
-// =============================================
-handle_delete:
-  callsub is_admin
-  return
+def build_metadata(methods=None) -> dict:
+    """contract.json metadata matching build_approval(methods)."""
+    selected = select_methods(methods)
+    return {
+        "name": "TrackBuddyDiscipline",
+        "description": "AI Accountability System -- Discipline enforcement on Algorand",
+        "version": "1.0.0",
+        "teal_version": 8,
+        "state_schema": {
+            "global": _schema(_used_keys(GLOBAL_KEYS, selected)),
+            "local": _schema(_used_keys(LOCAL_KEYS, selected)),
+        },
+        "methods": {m.name: _method_metadata(m) for m in selected},
+    }
 
 
-// =============================================
-// REJECT
-// =============================================
-handle_reject:
-  int 0
-  return
-"""
+# =============================================
+# Approval Program (TEAL v8) -- every method
+# =============================================
+
+APPROVAL_PROGRAM = build_approval()
 
 
 # =============================================
@@ -622,98 +893,63 @@ return
 """
 
 
-def compile_contract():
-    """Write TEAL files and contract metadata to artifacts/."""
-    artifacts_dir = os.path.join(os.path.dirname(__file__), "artifacts")
+def compile_contract(methods=None, artifacts_dir: str = None, codec_path: str = None):
+    """
+    Write TEAL files, contract metadata and the codec for the selected methods.
+
+    artifacts/ and contract_codec.py hold the full contract that the rest
+    of the tooling imports, so a subset build must name its own
+    `artifacts_dir`; its codec is written there unless `codec_path` is given.
+    """
+    if artifacts_dir is None:
+        if methods is not None and len(select_methods(methods)) < len(METHODS):
+            raise ValueError("a subset build needs its own artifacts directory (--artifacts DIR); "
+                             "artifacts/ holds the full contract")
+        artifacts_dir = os.path.join(os.path.dirname(__file__), "artifacts")
+    elif codec_path is None:
+        codec_path = os.path.join(artifacts_dir, CODEC_FILENAME)
     os.makedirs(artifacts_dir, exist_ok=True)
 
     # Write approval TEAL
     with open(os.path.join(artifacts_dir, "approval.teal"), "w") as f:
-        f.write(APPROVAL_PROGRAM.strip())
+        f.write(build_approval(methods).strip())
 
     # Write clear state TEAL
     with open(os.path.join(artifacts_dir, "clear.teal"), "w") as f:
         f.write(CLEAR_PROGRAM.strip())
 
     # Write ABI-like contract metadata
-    metadata = {
-        "name": "TrackBuddyDiscipline",
-        "description": "AI Accountability System -- Discipline enforcement on Algorand",
-        "version": "1.0.0",
-        "teal_version": 8,
-        "state_schema": {
-            "global": {
-                "num_uints": 3,
-                "num_byte_slices": 1,
-                "keys": {
-                    "admin": {"type": "bytes", "descr": "Backend admin address"},
-                    "total_commitments": {"type": "uint64", "descr": "Commitment counter"},
-                    "total_penalties": {"type": "uint64", "descr": "Penalty counter"},
-                    "total_bridge_intents": {"type": "uint64", "descr": "Bridge intent counter"},
-                }
-            },
-            "local": {
-                "num_uints": 4,
-                "num_byte_slices": 1,
-                "keys": {
-                    "stake_amount": {"type": "uint64", "descr": "Staked microAlgos"},
-                    "commitment_status": {"type": "uint64", "descr": "0=none, 1=active, 2=completed, 3=failed"},
-                    "violations": {"type": "uint64", "descr": "Violation counter"},
-                    "discipline_score": {"type": "uint64", "descr": "Score 0-100"},
-                    "commitment_hash": {"type": "bytes", "descr": "SHA256 of commitment metadata"},
-                }
-            }
-        },
-        "methods": {
-            "createCommitment": {
-                "args": ["commitment_hash (bytes)", "duration (uint64)"],
-                "returns": "void",
-                "descr": "User stakes ALGO and registers a commitment",
-                "requires_payment": True,
-                "admin_only": False,
-            },
-            "verifySession": {
-                "args": ["account (address)", "success (uint64)"],
-                "returns": "void",
-                "descr": "Backend verifies session and releases/locks stake",
-                "admin_only": True,
-            },
-            "applyPenalty": {
-                "args": ["account (address)"],
-                "returns": "void",
-                "descr": "Backend applies penalty on detected violation",
-                "admin_only": True,
-            },
-            "logDiscipline": {
-                "args": ["account (address)", "score (uint64)"],
-                "returns": "void",
-                "descr": "Backend logs daily discipline score on-chain",
-                "admin_only": True,
-            },
-            "bridgeIntent": {
-                "args": ["upi_hash (bytes)", "amount (uint64)"],
-                "returns": "void",
-                "descr": "User initiates crypto-to-UPI bridge payment",
-                "requires_payment": True,
-                "admin_only": False,
-            },
-            "settleBridge": {
-                "args": ["account (address)", "ref_hash (bytes)"],
-                "returns": "void",
-                "descr": "Backend confirms bridge payout completion on-chain",
-                "admin_only": True,
-            },
-        }
-    }
+    metadata = build_metadata(methods)
     with open(os.path.join(artifacts_dir, "contract.json"), "w") as f:
         json.dump(metadata, f, indent=2)
 
+    # Generate typed arg / state codec from the metadata
+    codec_path = write_codec(metadata, codec_path)
+
     print("Contract compiled successfully!")
+    print(f"   Methods: {', '.join(metadata['methods']) or '(none)'}")
     print(f"   Artifacts written to: {artifacts_dir}/")
     print(f"   - approval.teal")
     print(f"   - clear.teal")
     print(f"   - contract.json (ABI metadata)")
+    print(f"   Codec written to: {codec_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the TrackBuddy discipline contract")
+    parser.add_argument("--methods", help=f"comma-separated subset of: {', '.join(METHOD_NAMES)}")
+    parser.add_argument("--artifacts", help="output directory (default: artifacts/; required for a subset)")
+    parser.add_argument("--codec", help=f"codec output path (default: {CODEC_FILENAME} in the output directory, "
+                                        "or contracts/ for the default build)")
+    args = parser.parse_args(argv)
+
+    methods = [m.strip() for m in args.methods.split(",") if m.strip()] if args.methods is not None else None
+    try:
+        compile_contract(methods, args.artifacts, args.codec)
+    except ValueError as e:
+        print(f"❌ {e}")
+        raise SystemExit(2)
 
 
 if __name__ == "__main__":
-    compile_contract()
+    main()
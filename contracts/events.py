@@ -0,0 +1,297 @@
+"""
+TrackBuddy -- Decoded Contract Events
+
+Python counterpart of the backend's ContractEvent (web3/listener.ts).
+Decodes discipline contract calls from either source:
+
+  - raw algod blocks (msgpack SignedTxnInBlock entries)
+  - indexer transaction search results (JSON)
+
+Arguments are kept as raw bytes (method name excluded); arg_account()
+and arg_uint() decode them. Payments to the app address in the same
+group (createCommitment stakes, bridgeIntent amounts) are attached as
+payment_amount, inner payments (verifySession payouts) as payout_amount.
+Any other payment to a watched address (the app address plus whatever
+the caller adds, e.g. a bridge treasury) -- ungrouped top-ups, or
+grouped with no call to the app -- is its own "payment" event carrying
+receiver and payment_amount.
+
+event_to_json() / read_event_lines() are the JSON-lines form that
+block_ingestor prints and the offline tools read back.
+"""
+
+import json
+import base64
+import hashlib
+from dataclasses import dataclass, field
+
+import msgpack
+from algosdk import encoding, logic
+
+
+# ── Constants ──
+
+KNOWN_METHODS = [
+    "createCommitment",
+    "verifySession",
+    "applyPenalty",
+    "applyPenaltyN",
+    "logDiscipline",
+    "bridgeIntent",
+    "settleBridge",
+    "anchorScores",
+]
+
+# Non-NoOp calls are reported under these pseudo-method names.
+ON_COMPLETION_METHODS = {
+    1: "optIn",
+    2: "closeOut",
+    3: "clearState",
+    4: "update",
+    5: "delete",
+}
+
+# Watched payments not attached to an app call.
+PAYMENT_METHOD = "payment"
+
+INDEXER_ON_COMPLETION = {
+    "noop": 0,
+    "optin": 1,
+    "closeout": 2,
+    "clear": 3,
+    "update": 4,
+    "delete": 5,
+}
+
+
+@dataclass
+class ContractEvent:
+    """One discipline contract call, decoded."""
+    tx_id: str
+    method: str
+    sender: str
+    args: list
+    confirmed_round: int
+    round_time: int = 0
+    group_id: str = None
+    payment_amount: int = None
+    payout_amount: int = None
+    logs: list = field(default_factory=list)
+    intra_round_offset: int = 0
+    receiver: str = None
+
+    def arg_account(self, index: int = 0) -> str:
+        """Decode an account argument (32-byte key or address string)."""
+        raw = self.args[index]
+        if len(raw) == 32:
+            return encoding.encode_address(raw)
+        return raw.decode()
+
+    def arg_uint(self, index: int) -> int:
+        """Decode a big-endian uint64 argument."""
+        return int.from_bytes(self.args[index], "big")
+
+    @property
+    def order_key(self) -> tuple:
+        """Position of the event on chain (round, offset within round)."""
+        return self.confirmed_round, self.intra_round_offset
+
+
+def _method_name(on_completion: int, args: list):
+    if on_completion:
+        return ON_COMPLETION_METHODS.get(on_completion)
+    if not args:
+        return None
+    try:
+        method = args[0].decode()
+    except UnicodeDecodeError:
+        return None
+    return method if method in KNOWN_METHODS else None
+
+
+# ── Block Decoding ──
+
+def compute_txid(txn: dict) -> str:
+    """Transaction ID of a decoded (msgpack map) transaction."""
+    packed = msgpack.packb(encoding._sort_dict(txn), use_bin_type=True)
+    digest = hashlib.new("sha512_256", b"TX" + packed).digest()
+    return base64.b32encode(digest).decode().rstrip("=")
+
+
+def _group_id(group):
+    return base64.b64encode(group).decode() if group else None
+
+
+def decode_block(raw, app_id: int, app_address: bytes = None, watch: frozenset = None) -> list:
+    """
+    Decode contract events from an algod block.
+
+    `raw` is the msgpack body of GET /v2/blocks/{round}?format=msgpack
+    (or its already-unpacked dict). App calls to `app_id` produce
+    events, with payments to `app_address` in the same group attached.
+    `watch` is the prebuilt set of 32-byte receiver keys (default: just
+    `app_address`); other payments to them become PAYMENT_METHOD events.
+    Events are returned in block order.
+    """
+    if isinstance(raw, (bytes, bytearray)):
+        raw = msgpack.unpackb(raw, raw=False, strict_map_key=False)
+    block = raw.get("block", raw)
+    rnd = block.get("rnd", 0)
+    ts = block.get("ts", 0)
+    genesis_id = block.get("gen")
+    genesis_hash = block.get("gh")
+    app_address = app_address or encoding.decode_address(logic.get_application_address(app_id))
+    watch = watch or frozenset((app_address,))
+
+    def signed(stib):
+        txn = dict(stib["txn"])
+        if stib.get("hgi") and genesis_id:
+            txn["gen"] = genesis_id
+        if genesis_hash:
+            txn["gh"] = genesis_hash
+        return txn
+
+    calls, payments = [], []
+    for offset, stib in enumerate(block.get("txns", [])):
+        txn = stib.get("txn", {})
+        kind = txn.get("type")
+        if kind == "pay" and txn.get("rcv") in watch:
+            payments.append((offset, stib))
+        elif kind == "appl" and txn.get("apid") == app_id:
+            calls.append((offset, stib))
+
+    call_groups = {stib["txn"]["grp"] for _, stib in calls if "grp" in stib["txn"]}
+    group_payments = {}
+    events = []
+    for offset, stib in payments:
+        txn = stib["txn"]
+        group = txn.get("grp")
+        if group in call_groups and txn["rcv"] == app_address:
+            group_payments[group] = group_payments.get(group, 0) + txn.get("amt", 0)
+            continue
+        events.append(ContractEvent(
+            tx_id=compute_txid(signed(stib)),
+            method=PAYMENT_METHOD,
+            sender=encoding.encode_address(txn["snd"]),
+            args=[],
+            confirmed_round=rnd,
+            round_time=ts,
+            group_id=_group_id(group),
+            payment_amount=txn.get("amt", 0),
+            intra_round_offset=offset,
+            receiver=encoding.encode_address(txn["rcv"]),
+        ))
+
+    for offset, stib in calls:
+        txn = signed(stib)
+        args = list(txn.get("apaa", []))
+        method = _method_name(txn.get("apan", 0), args)
+        if method is None:
+            continue
+
+        apply_data = stib.get("dt", {})
+        payout = None
+        for inner in apply_data.get("itx", []):
+            inner_txn = inner.get("txn", {})
+            if inner_txn.get("type") == "pay":
+                payout = (payout or 0) + inner_txn.get("amt", 0)
+
+        group = txn.get("grp")
+        events.append(ContractEvent(
+            tx_id=compute_txid(txn),
+            method=method,
+            sender=encoding.encode_address(txn["snd"]),
+            args=args[1:] if txn.get("apan", 0) == 0 else args,
+            confirmed_round=rnd,
+            round_time=ts,
+            group_id=_group_id(group),
+            payment_amount=group_payments.get(group) if group else None,
+            payout_amount=payout,
+            logs=list(apply_data.get("lg", [])),
+            intra_round_offset=offset,
+        ))
+    events.sort(key=lambda e: e.order_key)
+    return events
+
+
+# ── Indexer Decoding ──
+
+def decode_indexer_txn(txn: dict, group_payments: dict = None):
+    """
+    Decode an indexer transaction record into a ContractEvent.
+
+    `group_payments` maps base64 group id -> amount paid to the app
+    address, for attaching stakes / bridge amounts. Returns None for
+    records that are not discipline contract calls.
+    """
+    app_txn = txn.get("application-transaction")
+    if not app_txn:
+        return None
+    args = [base64.b64decode(a) for a in app_txn.get("application-args", [])]
+    on_completion = INDEXER_ON_COMPLETION.get(app_txn.get("on-completion", "noop"), 0)
+    method = _method_name(on_completion, args)
+    if method is None:
+        return None
+
+    payout = None
+    for inner in txn.get("inner-txns", []):
+        pay = inner.get("payment-transaction")
+        if pay:
+            payout = (payout or 0) + pay.get("amount", 0)
+
+    group = txn.get("group")
+    return ContractEvent(
+        tx_id=txn["id"],
+        method=method,
+        sender=txn["sender"],
+        args=args[1:] if on_completion == 0 else args,
+        confirmed_round=txn.get("confirmed-round", 0),
+        round_time=txn.get("round-time", 0),
+        group_id=group,
+        payment_amount=(group_payments or {}).get(group) if group else None,
+        payout_amount=payout,
+        logs=[base64.b64decode(entry) for entry in txn.get("logs", [])],
+        intra_round_offset=txn.get("intra-round-offset", 0),
+    )
+
+
+def decode_indexer_payment(txn: dict) -> ContractEvent:
+    """A PAYMENT_METHOD event from an indexer payment record."""
+    pay = txn["payment-transaction"]
+    return ContractEvent(
+        tx_id=txn["id"],
+        method=PAYMENT_METHOD,
+        sender=txn["sender"],
+        args=[],
+        confirmed_round=txn.get("confirmed-round", 0),
+        round_time=txn.get("round-time", 0),
+        group_id=txn.get("group"),
+        payment_amount=pay.get("amount", 0),
+        intra_round_offset=txn.get("intra-round-offset", 0),
+        receiver=pay["receiver"],
+    )
+
+
+# ── JSON Lines ──
+
+def event_to_json(event: ContractEvent) -> str:
+    """One event as a JSON line, with args and logs hex-encoded."""
+    data = dict(event.__dict__)
+    data["args"] = [a.hex() for a in event.args]
+    data["logs"] = [entry.hex() for entry in event.logs]
+    return json.dumps(data)
+
+
+def event_from_json(line: str) -> ContractEvent:
+    data = json.loads(line)
+    data["args"] = [bytes.fromhex(a) for a in data.get("args", [])]
+    data["logs"] = [bytes.fromhex(entry) for entry in data.get("logs", [])]
+    return ContractEvent(**data)
+
+
+def read_event_lines(path: str):
+    """Stream ContractEvents from a JSON-lines file (block_ingestor output)."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield event_from_json(line)
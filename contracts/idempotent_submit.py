@@ -0,0 +1,289 @@
+"""
+TrackBuddy -- Idempotent Admin Submission
+
+applyPenalty is not idempotent on-chain, so a settlement script that
+retries after a timeout can apply the same violation twice. This layer
+makes admin submissions safe to retry:
+
+  - Every call carries a deterministic lease derived from
+    (method, account, logical event id). Algorand rejects a second
+    transaction from the same sender with the same lease until the
+    first one's last-valid round, so concurrent duplicates cannot land.
+  - A local SQLite dedup cache records each submission's txid, validity
+    window and signed bytes. A retry of a confirmed event is skipped; a
+    retry inside the window rebroadcasts the identical signed bytes (same
+    txid); only after the window has expired and an indexer that has
+    indexed past it has no record of the transaction is a fresh one built,
+    under the same lease. Until then an expired entry is reported as
+    unresolved rather than resent, since algod forgets confirmed
+    transactions and a resend could apply the action twice.
+
+Usage:
+    submitter = IdempotentSubmitter(algod_client, admin, admin_key, app_id)
+    result = submitter.submit("applyPenalty", account, event_id="viol-8812")
+    result.status   # submitted | pending | duplicate | resubmitted | unresolved
+"""
+
+import time
+import base64
+import hashlib
+import sqlite3
+import threading
+from dataclasses import dataclass
+
+from algosdk import encoding
+from algosdk.error import AlgodHTTPError, IndexerHTTPError
+
+import instrumentation
+from txn_templates import TEMPLATE_METHODS
+
+
+DEFAULT_CACHE_PATH = ".submissions.sqlite"
+DEFAULT_WINDOW = 10        # rounds; short windows let expired sends be retried sooner
+LEASE_DOMAIN = b"trackbuddy-lease:"
+
+STATUS_PENDING = "pending"
+STATUS_CONFIRMED = "confirmed"
+STATUS_FAILED = "failed"
+STATUS_EXPIRED = "expired"      # window closed and the indexer proves it never confirmed
+
+# Indexer's 404 text for an unknown txid (other errors prove nothing).
+INDEXER_NOT_FOUND = "no transaction found"
+
+# Node errors meaning "this exact send (or its lease) is already in flight".
+DUPLICATE_ERRORS = ("already in ledger", "transaction already in pool", "overlapping lease", "using an overlapping")
+
+
+def derive_lease(method: str, account: str, event_id) -> bytes:
+    """Deterministic 32-byte lease for one logical admin action."""
+    material = b"\0".join([method.encode(), encoding.decode_address(account), str(event_id).encode()])
+    return hashlib.sha256(LEASE_DOMAIN + material).digest()
+
+
+@dataclass
+class Submission:
+    """One row of the dedup cache."""
+    lease: bytes
+    txid: str
+    method: str
+    account: str
+    event_id: str
+    first_valid: int
+    last_valid: int
+    status: str
+    signed: bytes
+    confirmed_round: int = 0
+
+
+@dataclass
+class SubmitResult:
+    txid: str
+    status: str
+    last_valid: int
+    lease: bytes
+    confirmed_round: int = 0
+
+
+class SubmissionCache:
+    """SQLite-backed map of lease -> latest Submission."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS submissions ("
+            " lease BLOB PRIMARY KEY, txid TEXT NOT NULL, method TEXT NOT NULL, account TEXT NOT NULL,"
+            " event_id TEXT NOT NULL, first_valid INTEGER NOT NULL, last_valid INTEGER NOT NULL,"
+            " status TEXT NOT NULL, signed BLOB NOT NULL, confirmed_round INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS submissions_last_valid ON submissions(last_valid)")
+
+    def get(self, lease: bytes):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT lease, txid, method, account, event_id, first_valid, last_valid, status, signed,"
+                " confirmed_round FROM submissions WHERE lease = ?", (lease,)
+            ).fetchone()
+        return Submission(*row) if row else None
+
+    def put(self, sub: Submission):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO submissions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (sub.lease, sub.txid, sub.method, sub.account, sub.event_id, sub.first_valid,
+                 sub.last_valid, sub.status, sub.signed, sub.confirmed_round),
+            )
+
+    def mark(self, lease: bytes, status: str, confirmed_round: int = 0):
+        with self._lock:
+            self._db.execute(
+                "UPDATE submissions SET status = ?, confirmed_round = ? WHERE lease = ?",
+                (status, confirmed_round, lease),
+            )
+
+    def prune(self, before_round: int) -> int:
+        """
+        Shrink entries whose window closed before `before_round`; returns the count.
+
+        Failed and expired entries are deleted (their lease is free again).
+        Confirmed entries stay as tombstones without their signed bytes, so
+        a later retry is still a duplicate. Pending entries are kept until
+        reconcile() resolves them.
+        """
+        with self._lock:
+            deleted = self._db.execute(
+                "DELETE FROM submissions WHERE last_valid < ? AND status IN (?, ?)",
+                (before_round, STATUS_FAILED, STATUS_EXPIRED),
+            ).rowcount
+            shrunk = self._db.execute(
+                "UPDATE submissions SET signed = x'' WHERE last_valid < ? AND status = ? AND length(signed) > 0",
+                (before_round, STATUS_CONFIRMED),
+            ).rowcount
+        return deleted + shrunk
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class IdempotentSubmitter:
+    """
+    Submits leased admin calls, deduplicating retries of the same event.
+
+    Supported methods are those in txn_templates.TEMPLATE_METHODS; extra
+    builder arguments (score, count, success, ref_hash) go in **args.
+    Expired entries algod no longer remembers are resubmitted only once
+    an indexer client proves them absent; without one they stay
+    unresolved. With a TxnArchive, every
+    signed transaction is also archived before it is sent.
+    """
+
+    def __init__(self, algod_client, admin: str, admin_key: str, app_id: int,
+                 cache: SubmissionCache = None, window: int = DEFAULT_WINDOW, indexer_client=None,
+                 archive=None):
+        self.algod = algod_client
+        self.indexer = indexer_client
+        self.admin = admin
+        self.admin_key = admin_key
+        self.app_id = app_id
+        self.cache = cache if cache is not None else SubmissionCache()
+        self.window = window
+        self.archive = archive
+        self.counts = {"submitted": 0, "duplicate": 0, "pending": 0, "resubmitted": 0, "unresolved": 0}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lease_lock(self, lease: bytes) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(lease, threading.Lock())
+
+    def _result(self, sub: Submission, status: str) -> SubmitResult:
+        self.counts[status] += 1
+        if status != "submitted":
+            instrumentation.record_retry(f"submit.{sub.method}", status)
+        return SubmitResult(sub.txid, status, sub.last_valid, sub.lease, sub.confirmed_round)
+
+    # -- reconciliation --
+
+    def reconcile(self, sub: Submission) -> Submission:
+        """Refresh a pending entry's status from algod (or the indexer)."""
+        if sub.status != STATUS_PENDING:
+            return sub
+        try:
+            info = self.algod.pending_transaction_info(sub.txid)
+        except AlgodHTTPError:
+            info = self._indexer_lookup(sub)
+        if info.get("confirmed-round"):
+            sub.status, sub.confirmed_round = STATUS_CONFIRMED, info["confirmed-round"]
+            self.cache.mark(sub.lease, sub.status, sub.confirmed_round)
+        elif info.get("pool-error"):
+            sub.status = STATUS_FAILED
+            self.cache.mark(sub.lease, sub.status)
+        elif info.get("expired"):
+            sub.status = STATUS_EXPIRED
+            self.cache.mark(sub.lease, sub.status)
+        return sub
+
+    def _indexer_lookup(self, sub: Submission) -> dict:
+        """Indexer record of sub.txid, {"expired": True} if provably absent, else {}."""
+        if self.indexer is None:
+            return {}
+        try:
+            # Read the indexed round first: a miss is only proof of absence
+            # if the indexer had already passed last_valid before the lookup.
+            indexed = self.indexer.health().get("round", 0)
+        except IndexerHTTPError:
+            return {}
+        try:
+            return self.indexer.transaction(sub.txid).get("transaction", {})
+        except IndexerHTTPError as e:
+            if INDEXER_NOT_FOUND in str(e) and indexed > sub.last_valid:
+                return {"expired": True}
+            return {}
+
+    def _send(self, signed: bytes) -> bool:
+        """Broadcast signed bytes; False if the node already has them (or their lease)."""
+        try:
+            self.algod.send_raw_transaction(base64.b64encode(signed).decode())
+        except AlgodHTTPError as e:
+            if any(marker in str(e) for marker in DUPLICATE_ERRORS):
+                return False
+            raise
+        return True
+
+    # -- submit --
+
+    def submit(self, method: str, account: str, event_id, **args) -> SubmitResult:
+        """Submit `method` for `account` once per `event_id`, however often it is retried."""
+        if method not in TEMPLATE_METHODS:
+            raise ValueError(f"Unsupported admin method: {method}")
+        lease = derive_lease(method, account, event_id)
+
+        with self._lease_lock(lease):
+            sp = self.algod.suggested_params()
+            current = sp.first
+            previous = self.cache.get(lease)
+            if previous is not None:
+                previous = self.reconcile(previous)
+                if previous.status == STATUS_CONFIRMED:
+                    return self._result(previous, "duplicate")
+                if previous.status == STATUS_PENDING:
+                    if current <= previous.last_valid:
+                        self._send(previous.signed)
+                        return self._result(previous, "pending")
+                    # Expired, but it may have confirmed where algod no longer
+                    # remembers it: resending could apply the action twice.
+                    return self._result(previous, "unresolved")
+                # Expired and proven absent (or rejected): the lease is free again.
+
+            sp.last = sp.first + self.window
+            builder, _ = TEMPLATE_METHODS[method]
+            txn = builder(self.admin, sp, self.app_id, account=account, **args)
+            txn.lease = lease
+            stxn = txn.sign(self.admin_key)
+            sub = Submission(
+                lease=lease, txid=stxn.get_txid(), method=method, account=account,
+                event_id=str(event_id), first_valid=sp.first, last_valid=sp.last,
+                status=STATUS_PENDING, signed=base64.b64decode(encoding.msgpack_encode(stxn)),
+            )
+            # Write ahead: a crash after sending must still dedup the retry.
+            self.cache.put(sub)
+            if self.archive is not None:
+                self.archive.append(sub.signed)
+            self._send(sub.signed)
+            return self._result(sub, "resubmitted" if previous is not None else "submitted")
+
+    def wait(self, result: SubmitResult, poll_secs: float = 1.0) -> SubmitResult:
+        """Block until the submission confirms, fails or its window expires."""
+        sub = self.cache.get(result.lease)
+        while sub is not None:
+            sub = self.reconcile(sub)
+            if sub.status != STATUS_PENDING or self.algod.status()["last-round"] > sub.last_valid:
+                return SubmitResult(sub.txid, sub.status, sub.last_valid, sub.lease, sub.confirmed_round)
+            time.sleep(poll_secs)
+        return result
@@ -0,0 +1,191 @@
+"""
+TrackBuddy -- Finalized-Round Indexer Cache
+
+Algorand rounds are final once confirmed, so an indexer query whose
+round range ends at or below the indexer's current round always returns
+the same answer. CachedIndexerClient stores those responses in a local
+SQLite file and serves repeated backfills, audits and reports from disk.
+
+Only GET requests bounded by `max-round` (range searches), `round`
+(point-in-time lookups) or a block number at or below the finalized
+round are cached; everything else goes straight to the indexer. The
+file is bounded by `max_bytes` with least-recently-used eviction.
+
+Usage:
+    from config import get_indexer_client
+    client = get_indexer_client(cache_path=".indexer_cache.sqlite")
+    client.search_transactions(application_id=app_id, min_round=a, max_round=b)
+    print(client.cache.stats())
+"""
+
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from urllib import parse
+
+from algosdk.v2client import indexer
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+HEALTH_TTL_SECS = 5.0
+
+# Query parameters that pin a response to already-finalized rounds.
+ROUND_BOUND_PARAMS = ("max-round", "round")
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU map of request key -> JSON response, in SQLite.
+
+    Bodies are stored zlib-compressed; `max_bytes` bounds the sum of the
+    compressed sizes.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL, used INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_used ON responses(used)")
+        used, size = self._db.execute("SELECT MAX(used), SUM(size) FROM responses").fetchone()
+        self._tick = used or 0
+        self.size = size or 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key: str):
+        """Cached response for `key`, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT body FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._tick += 1
+            self._db.execute("UPDATE responses SET used = ? WHERE key = ?", (self._tick, key))
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, response):
+        """Store a response, evicting least-recently-used entries to fit."""
+        body = zlib.compress(json.dumps(response, separators=(",", ":")).encode(), 1)
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._tick += 1
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, body, size, used) VALUES (?, ?, ?, ?)",
+                (key, body, len(body), self._tick),
+            )
+            self.size += len(body) - (old[0] if old else 0)
+            self._evict()
+            self._db.execute("COMMIT")
+            self.stores += 1
+
+    def _evict(self):
+        while self.size > self.max_bytes:
+            victims = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY used LIMIT 64"
+            ).fetchall()
+            if not victims:
+                break
+            for key, size in victims:
+                if self.size <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.size -= size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self.size = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "bytes": self.size,
+        }
+
+
+class CachedIndexerClient(indexer.IndexerClient):
+    """
+    IndexerClient that answers finalized-round queries from a ResponseCache.
+
+    Requests that are not pinned to a finalized round (no round bound,
+    or a bound above the indexer's current round) are counted as
+    `bypassed` and always hit the network.
+    """
+
+    def __init__(self, indexer_token: str, indexer_address: str, cache: ResponseCache,
+                 headers=None, clock=time.monotonic):
+        super().__init__(indexer_token, indexer_address, headers)
+        self.cache = cache
+        self.clock = clock
+        self.bypassed = 0
+        self._finalized = 0
+        self._finalized_at = None
+
+    def finalized_round(self) -> int:
+        """Indexer's current round, refreshed at most every HEALTH_TTL_SECS."""
+        now = self.clock()
+        if self._finalized_at is None or now - self._finalized_at >= HEALTH_TTL_SECS:
+            health = super().indexer_request("GET", "/health")
+            self._finalized = health.get("round", 0)
+            self._finalized_at = now
+        return self._finalized
+
+    def _cache_key(self, method: str, requrl: str, params) -> str:
+        if method != "GET":
+            return None
+        params = params or {}
+        bound = [params[name] for name in ROUND_BOUND_PARAMS if params.get(name) is not None]
+        if requrl.startswith("/blocks/"):
+            bound.append(requrl.rsplit("/", 1)[1])
+        if not bound:
+            return None
+        if max(int(b) for b in bound) > self.finalized_round():
+            return None
+        query = parse.urlencode(sorted((k, v) for k, v in params.items() if v is not None))
+        return f"{self.indexer_address}{requrl}?{query}"
+
+    def indexer_request(self, method, requrl, params=None, data=None, headers=None, timeout=30):
+        key = self._cache_key(method, requrl, params)
+        if key is None:
+            self.bypassed += 1
+            return super().indexer_request(method, requrl, params, data, headers, timeout)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = super().indexer_request(method, requrl, params, data, headers, timeout)
+        self.cache.put(key, response)
+        return response
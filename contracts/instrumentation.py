@@ -0,0 +1,376 @@
+"""
+TrackBuddy -- Metrics & Tracing
+
+Instrumentation for the contract tooling's algod / indexer traffic:
+
+  trackbuddy_requests_total{service,method,endpoint,status}     counter
+  trackbuddy_request_seconds{service,endpoint}                   histogram
+  trackbuddy_request_bytes_total{service,endpoint,direction}     counter
+  trackbuddy_retries_total{operation,reason}                     counter
+  trackbuddy_confirmation_rounds{operation}                      histogram
+  trackbuddy_coalesced_requests_total{service,endpoint,role}     counter
+
+Endpoints are normalized (/accounts/{address}, /blocks/{id})
+so label cardinality stays bounded. Metrics are served in Prometheus
+text format from a local HTTP endpoint and/or written to a textfile on
+exit (for short-lived scripts such as deploy.py). Spans are optional
+and written as JSON lines with trace / parent ids.
+
+percentile() is the nearest-rank summary the loadgen, ingestor and
+scheduler reports share.
+
+Everything is off unless enabled: instrument() returns the client
+untouched, span() returns a shared no-op context and the record
+helpers return after one flag check.
+
+Environment (read by configure_from_env(), called from config.py):
+    TRACKBUDDY_METRICS_PORT   serve /metrics on this port
+    TRACKBUDDY_METRICS_FILE   write metrics here at exit
+    TRACKBUDDY_TRACE_FILE     append JSON-lines spans here
+
+Usage:
+    TRACKBUDDY_METRICS_PORT=9464 ./trackbuddy-contracts scan --app-id 1234
+    curl localhost:9464/metrics
+
+    import instrumentation
+    instrumentation.enable(port=9464, trace_path="spans.jsonl")
+    client = instrumentation.instrument(AlgodClient(token, url), "algod")
+    with instrumentation.span("deploy.send", txid=txid):
+        ...
+"""
+
+import os
+import re
+import json
+import math
+import time
+import atexit
+import bisect
+import random
+import threading
+import contextlib
+import contextvars
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROUND_BUCKETS = (1, 2, 3, 4, 5, 8, 10, 20, 50)
+
+_ENDPOINT_PATTERNS = [
+    (re.compile(r"/[A-Z2-7]{58}(?=/|$)"), "/{address}"),
+    (re.compile(r"/[A-Z2-7]{52}(?=/|$)"), "/{txid}"),
+    (re.compile(r"/\d+(?=/|$)"), "/{id}"),
+]
+
+_enabled = False
+_trace_file = None
+_trace_lock = threading.Lock()
+_server = None
+_current_span = contextvars.ContextVar("trackbuddy_span", default=None)
+
+
+def normalize_endpoint(path: str) -> str:
+    """Strip the query string and replace ids / addresses with placeholders."""
+    path = path.split("?", 1)[0]
+    for pattern, placeholder in _ENDPOINT_PATTERNS:
+        path = pattern.sub(placeholder, path)
+    return path
+
+
+# ── Metric Types ──
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{str(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Monotonic counter with a fixed label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.label_names = name, help, labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> list:
+        with self._lock:
+            return [f"{self.name}{_labels(self.label_names, k)} {v:g}" for k, v in sorted(self._values.items())]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help, self.label_names, self.buckets = name, help, labels, tuple(buckets)
+        self._series = {}       # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def render(self) -> list:
+        lines = []
+        names = self.label_names + ("le",)
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                running = 0
+                for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                    running += count
+                    lines.append(f"{self.name}_bucket{_labels(names, labels + (bound,))} {running}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {series[-1]:g}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {running}")
+        return lines
+
+
+REQUESTS = Counter("trackbuddy_requests_total", "Algod / indexer requests",
+                   ("service", "method", "endpoint", "status"))
+LATENCY = Histogram("trackbuddy_request_seconds", "Request latency in seconds", ("service", "endpoint"))
+BYTES = Counter("trackbuddy_request_bytes_total", "Request / response body bytes",
+                ("service", "endpoint", "direction"))
+RETRIES = Counter("trackbuddy_retries_total", "Retried operations", ("operation", "reason"))
+CONFIRMATION_ROUNDS = Histogram("trackbuddy_confirmation_rounds", "Rounds waited for confirmation",
+                                ("operation",), buckets=ROUND_BUCKETS)
+COALESCED = Counter("trackbuddy_coalesced_requests_total", "GET calls by singleflight role (leader | joined)",
+                    ("service", "endpoint", "role"))
+METRICS = (REQUESTS, LATENCY, BYTES, RETRIES, CONFIRMATION_ROUNDS, COALESCED)
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+# ── Recording ──
+
+def record_request(service: str, method: str, path: str, status, seconds: float,
+                   sent: int = 0, received: int = 0):
+    if not _enabled:
+        return
+    endpoint = normalize_endpoint(path)
+    REQUESTS.inc(service, method, endpoint, str(status))
+    LATENCY.observe(seconds, service, endpoint)
+    if sent:
+        BYTES.inc(service, endpoint, "sent", amount=sent)
+    if received:
+        BYTES.inc(service, endpoint, "received", amount=received)
+
+
+def record_retry(operation: str, reason: str = "retry"):
+    if _enabled:
+        RETRIES.inc(operation, reason)
+
+
+def record_confirmation(operation: str, rounds: int):
+    if _enabled:
+        CONFIRMATION_ROUNDS.observe(rounds, operation)
+
+
+def record_coalesced(service: str, path: str, role: str):
+    if _enabled:
+        COALESCED.inc(service, normalize_endpoint(path), role)
+
+
+def _body_size(response) -> int:
+    if isinstance(response, (bytes, bytearray)):
+        return len(response)
+    # JSON responses arrive parsed; re-serializing approximates the wire size.
+    return len(json.dumps(response, separators=(",", ":"))) if response else 0
+
+
+def instrument(client, service: str = None):
+    """
+    Wrap an AlgodClient / IndexerClient instance so every request is
+    recorded (and spanned). Returns the client unchanged when disabled.
+    """
+    if not _enabled:
+        return client
+    attr = "algod_request" if hasattr(client, "algod_request") else "indexer_request"
+    service = service or attr.split("_")[0]
+    inner = getattr(client, attr)
+
+    def request(method, requrl, params=None, data=None, headers=None, *args, **kwargs):
+        status = "ok"
+        start = time.perf_counter()
+        with span(f"{service} {method} {normalize_endpoint(requrl)}"):
+            try:
+                response = inner(method, requrl, params, data, headers, *args, **kwargs)
+            except Exception as exc:
+                status = getattr(exc, "code", None) or type(exc).__name__
+                record_request(service, method, requrl, status, time.perf_counter() - start,
+                               sent=len(data or b""))
+                raise
+        record_request(service, method, requrl, status, time.perf_counter() - start,
+                       sent=len(data or b""), received=_body_size(response))
+        return response
+
+    setattr(client, attr, request)
+    return client
+
+
+def wait_for_confirmation(algod_client, txid: str, wait_rounds: int = 4, operation: str = "confirm") -> dict:
+    """algosdk's wait_for_confirmation, recording rounds waited and a span."""
+    from algosdk.transaction import wait_for_confirmation as _wait
+
+    if not _enabled:
+        return _wait(algod_client, txid, wait_rounds)
+    start_round = algod_client.status()["last-round"]
+    with span(f"{operation}.wait", txid=txid):
+        result = _wait(algod_client, txid, wait_rounds)
+    record_confirmation(operation, max(0, result.get("confirmed-round", start_round) - start_round))
+    return result
+
+
+# ── Spans ──
+
+class _Span:
+    __slots__ = ("name", "attrs", "trace_id", "span_id", "parent_id", "start", "_token")
+
+    def __init__(self, name: str, attrs: dict):
+        parent = _current_span.get()
+        self.name, self.attrs = name, attrs
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = f"{random.getrandbits(64):016x}"
+
+    def __enter__(self):
+        self.start = time.time()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        record = {
+            "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "name": self.name, "start": self.start, "duration": time.time() - self.start,
+            "status": "error" if exc_type else "ok", **self.attrs,
+        }
+        with _trace_lock:
+            if _trace_file is not None:
+                _trace_file.write(json.dumps(record, default=str) + "\n")
+                _trace_file.flush()
+        return False
+
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+def span(name: str, **attrs):
+    """Context manager timing a unit of work as a span (no-op unless tracing)."""
+    if _trace_file is None:
+        return _NO_SPAN
+    return _Span(name, attrs)
+
+
+# ── Export ──
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread."""
+    global _server
+    if _server is None:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+def write_textfile(path: str):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(render())
+    os.replace(tmp, path)
+
+
+def enable(port: int = None, metrics_path: str = None, trace_path: str = None):
+    """Turn on recording, optionally with an HTTP endpoint, exit textfile and span log."""
+    global _enabled, _trace_file
+    _enabled = True
+    if port:
+        serve(port)
+    if metrics_path:
+        atexit.register(write_textfile, metrics_path)
+    if trace_path and _trace_file is None:
+        _trace_file = open(trace_path, "a")
+
+
+def disable():
+    """Stop recording and tracing (collected values are kept)."""
+    global _enabled, _trace_file, _server
+    _enabled = False
+    if _trace_file is not None:
+        _trace_file.close()
+        _trace_file = None
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """Clear all collected values."""
+    for metric in METRICS:
+        with metric._lock:
+            (metric._values if isinstance(metric, Counter) else metric._series).clear()
+
+
+def configure_from_env():
+    """Enable from TRACKBUDDY_METRICS_PORT / _METRICS_FILE / _TRACE_FILE if any is set."""
+    port = os.getenv("TRACKBUDDY_METRICS_PORT")
+    metrics_path = os.getenv("TRACKBUDDY_METRICS_FILE")
+    trace_path = os.getenv("TRACKBUDDY_TRACE_FILE")
+    if (port or metrics_path or trace_path) and not _enabled:
+        enable(int(port) if port else None, metrics_path, trace_path)
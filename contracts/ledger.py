@@ -0,0 +1,249 @@
+"""
+TrackBuddy -- Compact Ledger Model
+
+Array-backed model of the discipline contract's local state for
+million-account simulations. Accounts are keyed by integer index;
+each local key is a column:
+
+    stake_amount, commitment_status, violations, discipline_score  uint64[n]
+    commitment_hash                                                 uint8[n, 32] (+ length uint8[n])
+    opted_in                                                        bool[n]
+
+That is 66 bytes per account (~66 MB for a million users) versus
+several hundred bytes for a per-account dict. Bulk operations mirror
+the approval program's transitions and are vectorized with NumPy.
+
+Ledgers can be saved to a single file and reopened as memory-mapped
+columns, so multi-million-account state is shared with other
+processes or inspected without loading it into RAM.
+"""
+
+import os
+import numpy as np
+
+
+# ── Layout ──
+
+UINT_FIELDS = ("stake_amount", "commitment_status", "violations", "discipline_score")
+HASH_WIDTH = 32
+
+STATUS_NONE = 0
+STATUS_ACTIVE = 1
+STATUS_COMPLETED = 2
+STATUS_FAILED = 3
+
+MAGIC = b"TBLEDGR1"
+HEADER_SIZE = 64
+
+
+def _columns(capacity: int) -> list:
+    """(name, dtype, shape) for every column, in on-disk order."""
+    columns = [(name, np.uint64, (capacity,)) for name in UINT_FIELDS]
+    columns += [
+        ("commitment_hash", np.uint8, (capacity, HASH_WIDTH)),
+        ("hash_len", np.uint8, (capacity,)),
+        ("opted_in", np.bool_, (capacity,)),
+    ]
+    return columns
+
+
+def _layout(capacity: int) -> list:
+    """Columns with 8-byte aligned file offsets after the header."""
+    offset = HEADER_SIZE
+    layout = []
+    for name, dtype, shape in _columns(capacity):
+        layout.append((name, dtype, shape, offset))
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset += (nbytes + 7) // 8 * 8
+    return layout
+
+
+def _file_size(capacity: int) -> int:
+    name, dtype, shape, offset = _layout(capacity)[-1]
+    return offset + int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+
+# ── Ledger ──
+
+class CompactLedger:
+    """Columnar local-state ledger keyed by account index."""
+
+    def __init__(self, capacity: int, columns: dict = None, path: str = None):
+        self.capacity = capacity
+        self.path = path
+        if columns is None:
+            columns = {name: np.zeros(shape, dtype=dtype) for name, dtype, shape in _columns(capacity)}
+        for name, array in columns.items():
+            setattr(self, name, array)
+
+    @property
+    def columns(self) -> dict:
+        return {name: getattr(self, name) for name, _, _ in _columns(self.capacity)}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.columns.values())
+
+    # -- single account access --
+
+    def get(self, index: int) -> dict:
+        """Decoded local state of one account (same keys as on-chain)."""
+        state = {name: int(getattr(self, name)[index]) for name in UINT_FIELDS}
+        state["commitment_hash"] = bytes(self.commitment_hash[index, :self.hash_len[index]])
+        return state
+
+    def set(self, index: int, **fields):
+        """Overwrite individual local keys of one account."""
+        for name, value in fields.items():
+            if name == "commitment_hash":
+                self._write_hashes(np.array([index]), [value])
+            elif name in UINT_FIELDS:
+                getattr(self, name)[index] = value
+            else:
+                raise KeyError(f"Unknown local key: {name}")
+
+    def _write_hashes(self, indices: np.ndarray, hashes):
+        if isinstance(hashes, np.ndarray):
+            self.commitment_hash[indices] = hashes
+            self.hash_len[indices] = hashes.shape[1]
+            return
+        for index, value in zip(indices, hashes):
+            if len(value) > HASH_WIDTH:
+                raise ValueError(f"commitment_hash longer than {HASH_WIDTH} bytes")
+            self.commitment_hash[index] = 0
+            self.commitment_hash[index, :len(value)] = np.frombuffer(value, dtype=np.uint8)
+            self.hash_len[index] = len(value)
+
+    # -- bulk transitions (mirror the approval program) --
+
+    def opt_in(self, indices):
+        """Allocate (and zero) local state for accounts."""
+        indices = np.asarray(indices)
+        for name in UINT_FIELDS:
+            getattr(self, name)[indices] = 0
+        self.commitment_hash[indices] = 0
+        self.hash_len[indices] = 0
+        self.opted_in[indices] = True
+
+    def create_commitment(self, indices, stakes, hashes) -> np.ndarray:
+        """
+        Register commitments; accounts with an active commitment are skipped.
+
+        Returns the boolean mask of accounts that were updated.
+        """
+        indices = np.asarray(indices)
+        stakes = np.asarray(stakes, dtype=np.uint64)
+        ok = self.opted_in[indices] & (self.commitment_status[indices] != STATUS_ACTIVE) & (stakes > 0)
+        target = indices[ok]
+        self.stake_amount[target] = stakes[ok]
+        self.commitment_status[target] = STATUS_ACTIVE
+        if isinstance(hashes, np.ndarray):
+            self._write_hashes(target, hashes[ok])
+        else:
+            self._write_hashes(target, [h for h, keep in zip(hashes, ok) if keep])
+        return ok
+
+    def apply_penalty(self, indices) -> int:
+        """
+        Apply a 10% penalty (stake -= stake // 10) per occurrence.
+
+        Repeated indices are penalized repeatedly, compounding with the
+        same integer rounding as successive applyPenalty calls. Accounts
+        without an active commitment are skipped. Returns penalties applied.
+        """
+        unique, counts = np.unique(np.asarray(indices), return_counts=True)
+        active = self.commitment_status[unique] == STATUS_ACTIVE
+        unique, counts = unique[active], counts[active]
+        applied = int(counts.sum())
+        self.violations[unique] += counts.astype(np.uint64)
+        while unique.size:
+            stakes = self.stake_amount[unique]
+            self.stake_amount[unique] = stakes - stakes // 10
+            counts -= 1
+            keep = counts > 0
+            unique, counts = unique[keep], counts[keep]
+        return applied
+
+    def verify_session(self, indices, success) -> tuple:
+        """
+        Settle active commitments.
+
+        Returns (paid_out, forfeited) microAlgo totals.
+        """
+        indices = np.asarray(indices)
+        success = np.broadcast_to(np.asarray(success, dtype=bool), indices.shape)
+        active = self.commitment_status[indices] == STATUS_ACTIVE
+        won, lost = indices[active & success], indices[active & ~success]
+        paid_out = int(self.stake_amount[won].sum())
+        forfeited = int(self.stake_amount[lost].sum())
+        self.commitment_status[won] = STATUS_COMPLETED
+        self.commitment_status[lost] = STATUS_FAILED
+        self.stake_amount[won] = 0
+        self.stake_amount[lost] = 0
+        return paid_out, forfeited
+
+    def log_discipline(self, indices, scores):
+        """Store daily scores; the contract rejects anything above 100."""
+        scores = np.asarray(scores, dtype=np.uint64)
+        if scores.size and scores.max() > 100:
+            raise ValueError("discipline score must be within 0-100")
+        self.discipline_score[np.asarray(indices)] = scores
+
+    # -- aggregates --
+
+    def total_staked(self) -> int:
+        return int(self.stake_amount.sum())
+
+    def count_status(self, status: int) -> int:
+        return int(np.count_nonzero(self.commitment_status == status))
+
+    # -- persistence --
+
+    def save(self, path: str):
+        """Write the ledger to a single memory-mappable file."""
+        with open(path, "wb") as f:
+            f.write(_header(self.capacity))
+            for name, dtype, shape, offset in _layout(self.capacity):
+                f.seek(offset)
+                getattr(self, name).tofile(f)
+            f.truncate(_file_size(self.capacity))
+
+    @classmethod
+    def create(cls, path: str, capacity: int) -> "CompactLedger":
+        """Create an empty file-backed ledger (columns are memory maps)."""
+        with open(path, "wb") as f:
+            f.write(_header(capacity))
+            f.truncate(_file_size(capacity))
+        return cls.open(path, mode="r+")
+
+    @classmethod
+    def open(cls, path: str, mode: str = "r") -> "CompactLedger":
+        """
+        Open a saved ledger with every column memory-mapped (zero copy).
+
+        mode="r" is read-only, "r+" writes through to the file, "c" is
+        copy-on-write (changes stay in memory).
+        """
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if header[:8] != MAGIC:
+            raise ValueError(f"{path} is not a compact ledger file")
+        capacity = int.from_bytes(header[8:16], "little")
+        if os.path.getsize(path) < _file_size(capacity):
+            raise ValueError(f"{path} is truncated")
+
+        columns = {
+            name: np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=shape)
+            for name, dtype, shape, offset in _layout(capacity)
+        }
+        return cls(capacity, columns=columns, path=path)
+
+    def flush(self):
+        """Flush memory-mapped columns to disk."""
+        for array in self.columns.values():
+            if isinstance(array, np.memmap):
+                array.flush()
+
+
+def _header(capacity: int) -> bytes:
+    return (MAGIC + capacity.to_bytes(8, "little")).ljust(HEADER_SIZE, b"\0")
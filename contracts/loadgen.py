@@ -0,0 +1,392 @@
+"""
+TrackBuddy -- Synthetic Workload Generator & Throughput Harness
+
+Simulates a population of users moving through the commitment lifecycle:
+
+    opt-in -> createCommitment -> applyPenalty* -> logDiscipline
+           -> verifySession -> (bridgeIntent -> settleBridge)?
+
+Users arrive as a Poisson process, session lengths are exponential,
+violations per session are Poisson and stakes are log-normal. The
+generated operations are driven through the Python transaction builders
+at a fixed target rate against an algod endpoint (a local sandbox by
+default) and the run reports txns/sec, latency percentiles and fees.
+
+Usage:
+    python loadgen.py --users 10000 --rate 200 --app-id 1234
+    python loadgen.py --users 100000 --dry-run     # build + sign only
+"""
+
+import os
+import sys
+import math
+import time
+import heapq
+import random
+import hashlib
+import argparse
+import itertools
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from algosdk import account, mnemonic
+from algosdk.transaction import PaymentTxn, SuggestedParams, wait_for_confirmation
+from algosdk.v2client import algod
+
+import txn_builders
+from instrumentation import percentile
+
+
+# ── Defaults ──
+
+LOCAL_ALGOD_URL = "http://localhost:4001"
+LOCAL_ALGOD_TOKEN = "a" * 64
+
+LIFECYCLE_METHODS = [
+    "optIn",
+    "createCommitment",
+    "applyPenalty",
+    "logDiscipline",
+    "verifySession",
+    "bridgeIntent",
+    "settleBridge",
+]
+
+
+# ── Workload Model ──
+
+@dataclass
+class WorkloadConfig:
+    """Population and arrival parameters for a synthetic run."""
+    users: int = 1000
+    arrival_rate: float = 5.0           # users joining per simulated second
+    mean_session_secs: float = 3600.0   # exponential session length
+    violation_rate: float = 1.5         # mean violations per session (Poisson)
+    success_rate: float = 0.8           # success odds, halved per violation
+    bridge_rate: float = 0.2            # fraction of users that bridge out
+    mean_stake: int = 1_000_000         # microAlgos, log-normal median
+    settle_delay_secs: float = 600.0    # mean intent -> settlement delay
+    seed: int = 42
+
+
+@dataclass(order=True)
+class Op:
+    """One lifecycle step for one user at a simulated time."""
+    at: float
+    seq: int
+    method: str = field(compare=False)
+    user: int = field(compare=False)
+    value: int = field(compare=False, default=0)
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    """Sample a Poisson variate (Knuth's method, fine for small lambda)."""
+    limit = math.exp(-lam)
+    k, p = 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def _user_ops(rng: random.Random, cfg: WorkloadConfig, user: int, start: float, seq) -> list:
+    """Generate the full lifecycle of a single user starting at `start`."""
+    stake = max(1000, int(rng.lognormvariate(math.log(cfg.mean_stake), 0.5)))
+    duration = rng.expovariate(1.0 / cfg.mean_session_secs)
+    violations = _poisson(rng, cfg.violation_rate)
+    end = start + 1.0 + duration
+
+    ops = [
+        Op(start, next(seq), "optIn", user),
+        Op(start + 1.0, next(seq), "createCommitment", user, stake),
+    ]
+    for _ in range(violations):
+        ops.append(Op(start + 1.0 + rng.uniform(0, duration), next(seq), "applyPenalty", user))
+
+    score = max(0, min(100, 100 - 15 * violations - rng.randint(0, 20)))
+    success = rng.random() < cfg.success_rate * (0.5 ** violations)
+    ops.append(Op(end, next(seq), "logDiscipline", user, score))
+    ops.append(Op(end + 1.0, next(seq), "verifySession", user, int(success)))
+
+    if rng.random() < cfg.bridge_rate:
+        amount = max(1000, stake // 2)
+        intent_at = end + 2.0
+        ops.append(Op(intent_at, next(seq), "bridgeIntent", user, amount))
+        settle_at = intent_at + rng.expovariate(1.0 / cfg.settle_delay_secs)
+        ops.append(Op(settle_at, next(seq), "settleBridge", user))
+    return ops
+
+
+def generate_workload(cfg: WorkloadConfig):
+    """
+    Yield lifecycle operations for the whole population in time order.
+
+    Streams through a heap so memory stays proportional to the number
+    of users whose lifecycles overlap, not to the population size.
+    """
+    rng = random.Random(cfg.seed)
+    seq = itertools.count()
+    heap = []
+    now = 0.0
+    for user in range(cfg.users):
+        now += rng.expovariate(cfg.arrival_rate)
+        while heap and heap[0].at <= now:
+            yield heapq.heappop(heap)
+        for op in _user_ops(rng, cfg, user, now, seq):
+            heapq.heappush(heap, op)
+    while heap:
+        yield heapq.heappop(heap)
+
+
+# ── Reporting ──
+
+@dataclass
+class LoadReport:
+    """Aggregated results of a harness run."""
+    ops: int = 0
+    txns: int = 0
+    errors: int = 0
+    fees: int = 0
+    elapsed: float = 0.0
+    latencies: list = field(default_factory=list)
+    by_method: Counter = field(default_factory=Counter)
+    errors_by_method: Counter = field(default_factory=Counter)
+    fees_by_method: Counter = field(default_factory=Counter)
+
+    @property
+    def txns_per_sec(self) -> float:
+        return self.txns / self.elapsed if self.elapsed else 0.0
+
+    def latency_percentiles(self) -> dict:
+        ordered = sorted(self.latencies)
+        return {q: percentile(ordered, q) for q in (50, 90, 99, 99.9)}
+
+    def summary(self) -> str:
+        pct = self.latency_percentiles()
+        lines = [
+            f"  Operations:   {self.ops} ({self.errors} failed)",
+            f"  Transactions: {self.txns} in {self.elapsed:.2f}s",
+            f"  Throughput:   {self.txns_per_sec:.1f} txns/sec",
+            "  Latency:      " + "  ".join(f"p{q:g}={v * 1000:.2f}ms" for q, v in pct.items()),
+            f"  Fees:         {self.fees} microAlgos ({self.fees / 1_000_000:.6f} ALGO)",
+            "  By method:",
+        ]
+        for method in LIFECYCLE_METHODS + ["fund"]:
+            if self.by_method[method]:
+                lines.append(
+                    f"    {method:<17} {self.by_method[method]:>8} ops"
+                    f"  {self.errors_by_method[method]:>6} err"
+                    f"  {self.fees_by_method[method]:>12} fee"
+                )
+        return "\n".join(lines)
+
+
+# ── Harness ──
+
+def offline_params() -> SuggestedParams:
+    """Suggested params for dry runs that never touch the network."""
+    return SuggestedParams(
+        fee=1000,
+        first=1,
+        last=1000,
+        gh="SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=",
+        flat_fee=True,
+    )
+
+
+class LoadHarness:
+    """
+    Drives generated operations through the transaction builders.
+
+    With `client=None` transactions are built and signed but never sent,
+    which measures the client-side construction cost alone.
+    """
+
+    def __init__(self, client, app_id: int, admin_key: str, rate: float = 100.0,
+                 concurrency: int = 4, confirm: bool = False, fund_amount: int = 0,
+                 params_ttl: float = 30.0):
+        self.client = client
+        self.app_id = app_id
+        self.admin_key = admin_key
+        self.admin_addr = account.address_from_private_key(admin_key)
+        self.rate = rate
+        self.concurrency = concurrency
+        self.confirm = confirm
+        self.fund_amount = fund_amount
+        self.params_ttl = params_ttl
+        self._users = {}
+        self._params = None
+        self._params_at = 0.0
+        self._lock = threading.Lock()
+
+    # -- helpers --
+
+    def _user(self, index: int) -> tuple:
+        with self._lock:
+            if index not in self._users:
+                self._users[index] = account.generate_account()
+            return self._users[index]
+
+    def _suggested_params(self) -> SuggestedParams:
+        if self.client is None:
+            return offline_params()
+        with self._lock:
+            now = time.monotonic()
+            if self._params is None or now - self._params_at > self.params_ttl:
+                self._params = self.client.suggested_params()
+                self._params_at = now
+            return self._params
+
+    def build(self, op: Op) -> list:
+        """Return a list of (txn_group, signing_key) submissions for `op`."""
+        sp = self._suggested_params()
+        user_key, user_addr = self._user(op.user)
+        app_id, admin = self.app_id, self.admin_addr
+
+        if op.method == "optIn":
+            subs = []
+            if self.fund_amount:
+                fund = PaymentTxn(admin, sp, user_addr, self.fund_amount)
+                subs.append(("fund", [fund], self.admin_key))
+            subs.append(("optIn", [txn_builders.build_optin_txn(user_addr, sp, app_id)], user_key))
+            return subs
+        if op.method == "createCommitment":
+            digest = hashlib.sha256(f"user-{op.user}-{op.seq}".encode()).digest()
+            group = txn_builders.build_create_commitment_group(user_addr, sp, app_id, digest, op.value)
+            return [(op.method, group, user_key)]
+        if op.method == "bridgeIntent":
+            upi_hash = hashlib.sha256(f"user{op.user}@upi".encode()).digest()
+            group = txn_builders.build_bridge_intent_group(user_addr, sp, app_id, upi_hash, op.value)
+            return [(op.method, group, user_key)]
+        if op.method == "applyPenalty":
+            txn = txn_builders.build_apply_penalty_txn(admin, sp, app_id, user_addr)
+        elif op.method == "logDiscipline":
+            txn = txn_builders.build_log_discipline_txn(admin, sp, app_id, user_addr, op.value)
+        elif op.method == "verifySession":
+            txn = txn_builders.build_verify_session_txn(admin, sp, app_id, user_addr, bool(op.value))
+        elif op.method == "settleBridge":
+            ref_hash = hashlib.sha256(f"UPI_REF_{op.user}_{op.seq}".encode()).digest()
+            txn = txn_builders.build_settle_bridge_txn(admin, sp, app_id, user_addr, ref_hash)
+        else:
+            raise ValueError(f"Unknown lifecycle method: {op.method}")
+        return [(op.method, [txn], self.admin_key)]
+
+    def _execute(self, op: Op) -> list:
+        """Build, sign and submit one operation; return per-submission results."""
+        results = []
+        for method, group, key in self.build(op):
+            started = time.perf_counter()
+            fee = sum(txn.fee for txn in group)
+            try:
+                signed = [txn.sign(key) for txn in group]
+                if self.client is not None:
+                    txid = self.client.send_transactions(signed)
+                    if self.confirm:
+                        wait_for_confirmation(self.client, txid, 4)
+                results.append((method, len(group), fee, time.perf_counter() - started, None))
+            except Exception as e:
+                results.append((method, len(group), 0, time.perf_counter() - started, e))
+                break
+        return results
+
+    # -- run --
+
+    def run(self, ops) -> LoadReport:
+        """Submit `ops` at the configured rate and return the aggregated report."""
+        report = LoadReport()
+        interval = 1.0 / self.rate if self.rate else 0.0
+        started = time.perf_counter()
+
+        def record(results):
+            for method, size, fee, latency, error in results:
+                report.by_method[method] += 1
+                report.latencies.append(latency)
+                if error is None:
+                    report.txns += size
+                    report.fees += fee
+                    report.fees_by_method[method] += fee
+                else:
+                    report.errors += 1
+                    report.errors_by_method[method] += 1
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            pending = []
+            for i, op in enumerate(ops):
+                if interval:
+                    delay = started + i * interval - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                pending.append(pool.submit(self._execute, op))
+                report.ops += 1
+                # Keep the backlog bounded so huge populations stream.
+                if len(pending) >= self.concurrency * 64:
+                    record(pending.pop(0).result())
+            for future in pending:
+                record(future.result())
+
+        report.elapsed = time.perf_counter() - started
+        return report
+
+
+# ── CLI ──
+
+def main(argv=None) -> LoadReport:
+    parser = argparse.ArgumentParser(description="TrackBuddy lifecycle load generator")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--arrival-rate", type=float, default=5.0, help="simulated users/sec")
+    parser.add_argument("--violation-rate", type=float, default=1.5)
+    parser.add_argument("--bridge-rate", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rate", type=float, default=100.0, help="target submissions/sec (0 = unthrottled)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--app-id", type=int, default=0)
+    parser.add_argument("--algod-url", default=os.getenv("LOADGEN_ALGOD_URL", LOCAL_ALGOD_URL))
+    parser.add_argument("--algod-token", default=os.getenv("LOADGEN_ALGOD_TOKEN", LOCAL_ALGOD_TOKEN))
+    parser.add_argument("--fund", type=int, default=0, help="microAlgos to fund each new user with")
+    parser.add_argument("--confirm", action="store_true", help="wait for confirmation per submission")
+    parser.add_argument("--dry-run", action="store_true", help="build and sign only")
+    args = parser.parse_args(argv)
+
+    cfg = WorkloadConfig(
+        users=args.users,
+        arrival_rate=args.arrival_rate,
+        violation_rate=args.violation_rate,
+        bridge_rate=args.bridge_rate,
+        seed=args.seed,
+    )
+
+    if args.dry_run:
+        client = None
+        admin_key, _ = account.generate_account()
+        app_id = args.app_id or 1
+    else:
+        admin_mnemonic = os.getenv("LOADGEN_ADMIN_MNEMONIC") or os.getenv("ALGO_MNEMONIC", "")
+        if not admin_mnemonic or not args.app_id:
+            print("❌ --app-id and LOADGEN_ADMIN_MNEMONIC (or ALGO_MNEMONIC) are required")
+            print("   Use --dry-run to measure client-side construction only.")
+            sys.exit(1)
+        client = algod.AlgodClient(args.algod_token, args.algod_url)
+        admin_key = mnemonic.to_private_key(admin_mnemonic)
+        app_id = args.app_id
+
+    harness = LoadHarness(
+        client,
+        app_id,
+        admin_key,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        confirm=args.confirm,
+        fund_amount=args.fund,
+    )
+    target = "dry run" if client is None else args.algod_url
+    print(f"Load test: {cfg.users} users @ {args.rate:g} submissions/sec ({target})")
+    print("---")
+    report = harness.run(generate_workload(cfg))
+    print(report.summary())
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""
+TrackBuddy -- Daily Score Merkle Anchoring
+
+Builds a Merkle tree over a day's (account, score) list so the whole
+day can be anchored on-chain with a single anchorScores call instead
+of one logDiscipline call per user.
+
+    leaf = sha256(0x00 || address (32 bytes) || score (uint64 BE))
+    node = sha256(0x01 || left || right)
+
+An odd node at the end of a level is promoted unchanged. The 0x00/0x01
+prefixes keep leaves and inner nodes in separate domains. Each account
+appears at most once per day.
+
+Trees are built by streaming the score list to disk, one file per day:
+
+    header   64 bytes   magic, leaf count, day
+    records  n * 40     address || score, in input order
+    levels   32 bytes per node, leaves first, root last
+
+Global state only holds the latest anchor, but every anchorScores call
+logs day (uint64 BE) || root, so `verify --app-id` checks a proof
+against the root anchored for the proof's own day, looked up in the
+app's indexer history when it is not the latest. That search covers
+only the admin's calls from the start of that day, and stops at the
+first later anchor, so it does not scan the app's whole history.
+
+Usage:
+    python merkle.py build scores.csv --day 20260219 --out scores-20260219.merkle
+    python merkle.py prove scores-20260219.merkle <ADDRESS>
+    python merkle.py verify proof.json [--app-id APP_ID]
+"""
+
+import os
+import sys
+import csv
+import json
+import mmap
+import base64
+import hashlib
+import argparse
+import datetime
+import tempfile
+import shutil
+
+from algosdk import encoding
+
+from events import decode_indexer_txn
+
+
+# ── Constants ──
+
+MAGIC = b"TBMERKL1"
+HEADER_SIZE = 64
+RECORD_SIZE = 40
+HASH_SIZE = 32
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+CHUNK_NODES = 1 << 16          # nodes hashed per read while reducing a level
+ANCHOR_LOG_SIZE = 8 + HASH_SIZE
+INDEXER_PAGE_LIMIT = 1000
+
+
+# ── Hashing ──
+
+def leaf_hash(address: bytes, score: int) -> bytes:
+    """Hash of one (account, score) leaf."""
+    return hashlib.sha256(LEAF_PREFIX + address + score.to_bytes(8, "big")).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    """Hash of an inner node."""
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def level_sizes(leaf_count: int) -> list:
+    """Node counts per level, leaves first, root (1) last."""
+    sizes = [leaf_count]
+    while sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    return sizes
+
+
+def _level_offsets(leaf_count: int) -> list:
+    offset = HEADER_SIZE + leaf_count * RECORD_SIZE
+    offsets = []
+    for size in level_sizes(leaf_count):
+        offsets.append(offset)
+        offset += size * HASH_SIZE
+    return offsets
+
+
+def _address_bytes(address) -> bytes:
+    if isinstance(address, bytes):
+        if len(address) != 32:
+            raise ValueError("address must be 32 bytes")
+        return address
+    return encoding.decode_address(address)
+
+
+# ── Builder ──
+
+def build_tree(scores, path: str, day: int) -> bytes:
+    """
+    Stream (address, score) pairs into a tree file and return the root.
+
+    Leaves are spooled to a temporary file and each level is reduced in
+    chunks; only the set of addresses seen (to reject duplicates) grows
+    with the number of accounts.
+    """
+    with open(path, "w+b") as f, tempfile.TemporaryFile() as leaves:
+        f.write(bytes(HEADER_SIZE))
+        count = 0
+        seen = set()
+        for address, score in scores:
+            address = _address_bytes(address)
+            if address in seen:
+                raise ValueError(f"duplicate address at leaf {count}: {encoding.encode_address(address)}")
+            seen.add(address)
+            score = int(score)
+            if not 0 <= score <= 100:
+                raise ValueError(f"score out of range for leaf {count}: {score}")
+            f.write(address + score.to_bytes(8, "big"))
+            leaves.write(leaf_hash(address, score))
+            count += 1
+        if count == 0:
+            raise ValueError("cannot build a tree from an empty score list")
+
+        leaves.seek(0)
+        shutil.copyfileobj(leaves, f)
+        f.flush()
+
+        fd = f.fileno()
+        sizes = level_sizes(count)
+        offsets = _level_offsets(count)
+        for level in range(len(sizes) - 1):
+            src, dst = offsets[level], offsets[level + 1]
+            for start in range(0, sizes[level], CHUNK_NODES):
+                nodes = min(CHUNK_NODES, sizes[level] - start)
+                data = os.pread(fd, nodes * HASH_SIZE, src + start * HASH_SIZE)
+                parents = []
+                for i in range(0, nodes, 2):
+                    left = data[i * HASH_SIZE:(i + 1) * HASH_SIZE]
+                    if i + 1 < nodes:
+                        parents.append(node_hash(left, data[(i + 1) * HASH_SIZE:(i + 2) * HASH_SIZE]))
+                    else:
+                        parents.append(left)
+                os.pwrite(fd, b"".join(parents), dst + (start // 2) * HASH_SIZE)
+
+        header = MAGIC + count.to_bytes(8, "big") + int(day).to_bytes(8, "big")
+        os.pwrite(fd, header.ljust(HEADER_SIZE, b"\0"), 0)
+        return os.pread(fd, HASH_SIZE, offsets[-1])
+
+
+# ── Proofs ──
+
+class MerkleTree:
+    """Read-only, memory-mapped view of a tree file that serves proofs."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:8] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a score Merkle tree")
+        self.leaf_count = int.from_bytes(self._map[8:16], "big")
+        self.day = int.from_bytes(self._map[16:24], "big")
+        self._sizes = level_sizes(self.leaf_count)
+        self._offsets = _level_offsets(self.leaf_count)
+        self._index = None
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _node(self, level: int, index: int) -> bytes:
+        offset = self._offsets[level] + index * HASH_SIZE
+        return self._map[offset:offset + HASH_SIZE]
+
+    @property
+    def root(self) -> bytes:
+        return self._node(len(self._sizes) - 1, 0)
+
+    def record(self, index: int) -> tuple:
+        """(address, score) of leaf `index`."""
+        offset = HEADER_SIZE + index * RECORD_SIZE
+        raw = self._map[offset:offset + RECORD_SIZE]
+        return raw[:32], int.from_bytes(raw[32:], "big")
+
+    def index_of(self, address) -> int:
+        """
+        Leaf index of an account.
+
+        The address -> index map is built on first lookup by scanning
+        the records region once.
+        """
+        if self._index is None:
+            records = self._map[HEADER_SIZE:HEADER_SIZE + self.leaf_count * RECORD_SIZE]
+            self._index = {
+                records[i:i + 32]: n
+                for n, i in enumerate(range(0, len(records), RECORD_SIZE))
+            }
+        return self._index[_address_bytes(address)]
+
+    def proof(self, index: int) -> list:
+        """Sibling path for leaf `index` as [(side, hash)], side 'L' or 'R'."""
+        if not 0 <= index < self.leaf_count:
+            raise IndexError(f"leaf index {index} out of range")
+        path = []
+        for level, size in enumerate(self._sizes[:-1]):
+            sibling = index ^ 1
+            if sibling < size:
+                path.append(("L" if sibling < index else "R", self._node(level, sibling)))
+            index //= 2
+        return path
+
+    def proof_for(self, address) -> dict:
+        """Self-contained, JSON-serializable inclusion proof for an account."""
+        index = self.index_of(address)
+        addr, score = self.record(index)
+        return {
+            "day": self.day,
+            "index": index,
+            "address": encoding.encode_address(addr),
+            "score": score,
+            "root": self.root.hex(),
+            "proof": [[side, node.hex()] for side, node in self.proof(index)],
+        }
+
+
+def verify_proof(root: bytes, address, score: int, proof: list) -> bool:
+    """Check that (address, score) is included under `root`."""
+    node = leaf_hash(_address_bytes(address), int(score))
+    for side, sibling in proof:
+        sibling = bytes.fromhex(sibling) if isinstance(sibling, str) else sibling
+        node = node_hash(sibling, node) if side == "L" else node_hash(node, sibling)
+    return node == root
+
+
+def _global_state(algod_client, app_id: int) -> dict:
+    params = algod_client.application_info(app_id)["params"]
+    return {base64.b64decode(item["key"]): item["value"] for item in params.get("global-state", [])}
+
+
+def read_anchor(algod_client, app_id: int) -> tuple:
+    """Return the (root, day) currently anchored in the app's global state."""
+    state = _global_state(algod_client, app_id)
+    root = base64.b64decode(state.get(b"score_root", {}).get("bytes", ""))
+    day = state.get(b"score_day", {}).get("uint", 0)
+    return root, day
+
+
+def parse_anchor_log(entry: bytes):
+    """(day, root) from an anchorScores log entry, or None if it is not one."""
+    if len(entry) != ANCHOR_LOG_SIZE:
+        return None
+    return int.from_bytes(entry[:8], "big"), entry[8:]
+
+
+def _search_start(day: int) -> str:
+    """RFC 3339 lower bound for an anchor of `day`: one day early, so any timezone's day is covered."""
+    start = datetime.datetime.strptime(str(day), "%Y%m%d") - datetime.timedelta(days=1)
+    return start.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def find_anchor(indexer_client, app_id: int, day: int, admin: str = None):
+    """
+    Root the app anchored for `day`, from its logged anchorScores history;
+    None if never anchored.
+
+    Only calls sent by `admin` (anchorScores is admin-only) from the start
+    of `day` are searched, oldest first. Anchored days strictly increase,
+    so the search stops at the first anchor for a later day.
+    """
+    query = {"application_id": app_id, "start_time": _search_start(day), "limit": INDEXER_PAGE_LIMIT}
+    if admin:
+        query.update(address=admin, address_role="sender")
+    token = None
+    while True:
+        page = indexer_client.search_transactions(next_page=token, **query)
+        for txn in page.get("transactions", []):
+            event = decode_indexer_txn(txn)
+            if event is None or event.method != "anchorScores":
+                continue
+            for entry in event.logs:
+                anchor = parse_anchor_log(entry)
+                if anchor is None:
+                    continue
+                if anchor[0] == day:
+                    return anchor[1]
+                if anchor[0] > day:
+                    return None
+        token = page.get("next-token")
+        if not token or not page.get("transactions"):
+            return None
+
+
+def anchored_root(algod_client, indexer_client, app_id: int, day: int):
+    """
+    Root anchored for `day`, or None.
+
+    The latest anchor is read from global state; older days come from
+    the log history. Days only advance, so a day after the latest anchor
+    cannot have been anchored.
+    """
+    state = _global_state(algod_client, app_id)
+    latest = state.get(b"score_day", {}).get("uint", 0)
+    if day == latest:
+        return base64.b64decode(state.get(b"score_root", {}).get("bytes", ""))
+    if day > latest:
+        return None
+    admin = base64.b64decode(state.get(b"admin", {}).get("bytes", ""))
+    return find_anchor(indexer_client, app_id, day, encoding.encode_address(admin) if admin else None)
+
+
+# ── CLI ──
+
+def _read_csv(path: str):
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith("#") or row[0] == "address":
+                continue
+            yield row[0].strip(), int(row[1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily discipline score Merkle anchoring")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="build a tree from an address,score CSV")
+    build.add_argument("csv")
+    build.add_argument("--day", type=int, required=True, help="YYYYMMDD")
+    build.add_argument("--out", required=True)
+
+    prove = sub.add_parser("prove", help="print an inclusion proof for an account")
+    prove.add_argument("tree")
+    prove.add_argument("address")
+
+    verify = sub.add_parser("verify", help="verify a proof file (optionally against the on-chain root)")
+    verify.add_argument("proof")
+    verify.add_argument("--app-id", type=int, help="compare with the root anchored by this app")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        root = build_tree(_read_csv(args.csv), args.out, args.day)
+        with MerkleTree(args.out) as tree:
+            print(f"Built tree for day {args.day}: {tree.leaf_count} accounts")
+        print(f"   Root: {root.hex()}")
+        print(f"   Tree: {args.out}")
+        print("   Anchor with: anchorScores(root, day)")
+        return root
+
+    if args.command == "prove":
+        with MerkleTree(args.tree) as tree:
+            proof = tree.proof_for(args.address)
+        print(json.dumps(proof, indent=2))
+        return proof
+
+    with open(args.proof) as f:
+        proof = json.load(f)
+    root = bytes.fromhex(proof["root"])
+    if args.app_id:
+        from config import get_algod_client, get_indexer_client
+        anchor = anchored_root(get_algod_client(), get_indexer_client(), args.app_id, proof["day"])
+        if anchor is None:
+            print(f"❌ No anchor found for day {proof['day']}")
+            sys.exit(1)
+        if anchor != root:
+            print(f"❌ Proof root does not match the root anchored for day {proof['day']}")
+            sys.exit(1)
+    ok = verify_proof(root, proof["address"], proof["score"], proof["proof"])
+    print("Proof valid" if ok else "❌ Proof invalid")
+    if not ok:
+        sys.exit(1)
+    return ok
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+TrackBuddy -- Violation Coalescer
+
+Aggregates violation events per account over a time window and emits
+one applyPenaltyN(account, count) call per burst, instead of one
+applyPenalty admin transaction per violation.
+
+The on-chain result is identical to `count` successive applyPenalty
+calls; compound_penalty() is the reference for that arithmetic.
+
+Events may arrive out of timestamp order (several ingest sources, or
+replays with explicit `at`): a batch's window starts at its earliest
+violation and due batches are found through a heap keyed on that time,
+not by arrival order.
+
+Usage:
+    coalescer = PenaltyCoalescer(window_secs=30)
+    coalescer.add(account, event_id="viol-123")
+    ...
+    for txn in coalescer.build_txns(coalescer.due(), admin, sp, app_id):
+        submit(txn)
+"""
+
+import time
+import heapq
+import bisect
+import itertools
+from dataclasses import dataclass, field
+
+import txn_builders
+
+
+MAX_PENALTIES_PER_CALL = 32     # bound enforced by applyPenaltyN
+
+
+def compound_penalty(stake: int, count: int) -> int:
+    """Stake left after `count` successive 10% penalties (contract rounding)."""
+    for _ in range(count):
+        stake -= stake // 10
+    return stake
+
+
+@dataclass
+class PenaltyBatch:
+    """
+    Violations for one account to be applied in a single call.
+
+    event_ids and seen_at hold one entry per violation, in timestamp
+    order; an event added without an id is None in event_ids.
+    """
+    account: str
+    count: int = 0
+    first_seen: float = 0.0
+    event_ids: list = field(default_factory=list)
+    seen_at: list = field(default_factory=list)
+
+
+class PenaltyCoalescer:
+    """
+    Buffers violation events and releases per-account batches.
+
+    A batch becomes due `window_secs` after its first violation, so a
+    burst of violations inside the window costs one transaction.
+    Batches larger than the per-call bound are split.
+    """
+
+    def __init__(self, window_secs: float = 30.0, max_per_call: int = MAX_PENALTIES_PER_CALL,
+                 clock=time.monotonic):
+        if not 1 <= max_per_call <= MAX_PENALTIES_PER_CALL:
+            raise ValueError(f"max_per_call must be within 1-{MAX_PENALTIES_PER_CALL}")
+        self.window_secs = window_secs
+        self.max_per_call = max_per_call
+        self.clock = clock
+        self.events_in = 0
+        self.calls_out = 0
+        self._pending = {}
+        # (first_seen, seq, batch); entries for popped or re-keyed batches are skipped.
+        self._heap = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def pending_events(self) -> int:
+        return sum(batch.count for batch in self._pending.values())
+
+    @property
+    def reduction(self) -> float:
+        """Violation events per emitted call (1.0 = no coalescing)."""
+        return self.events_in / self.calls_out if self.calls_out else 0.0
+
+    def add(self, account: str, event_id=None, at: float = None):
+        """Record one violation for `account`."""
+        now = self.clock() if at is None else at
+        batch = self._pending.get(account)
+        if batch is None:
+            batch = self._pending[account] = PenaltyBatch(account=account, first_seen=now)
+            heapq.heappush(self._heap, (now, next(self._seq), batch))
+        elif now < batch.first_seen:
+            batch.first_seen = now
+            heapq.heappush(self._heap, (now, next(self._seq), batch))
+        batch.count += 1
+        index = bisect.bisect_right(batch.seen_at, now)     # == len() for in-order arrivals
+        batch.seen_at.insert(index, now)
+        batch.event_ids.insert(index, event_id)
+        self.events_in += 1
+
+    def _split(self, batch: PenaltyBatch) -> list:
+        if batch.count <= self.max_per_call:
+            return [batch]
+        parts = []
+        for start in range(0, batch.count, self.max_per_call):
+            end = min(start + self.max_per_call, batch.count)
+            parts.append(PenaltyBatch(batch.account, end - start, batch.seen_at[start],
+                                      batch.event_ids[start:end], batch.seen_at[start:end]))
+        return parts
+
+    def due(self, now: float = None) -> list:
+        """Pop and return batches whose window has closed, earliest first."""
+        now = self.clock() if now is None else now
+        ready = []
+        while self._heap and self._heap[0][0] + self.window_secs <= now:
+            first_seen, _, batch = heapq.heappop(self._heap)
+            if self._pending.get(batch.account) is not batch or batch.first_seen != first_seen:
+                continue
+            del self._pending[batch.account]
+            ready.extend(self._split(batch))
+        self.calls_out += len(ready)
+        return ready
+
+    def drain(self) -> list:
+        """Pop and return every pending batch (e.g. on shutdown), earliest first."""
+        ready = []
+        for batch in sorted(self._pending.values(), key=lambda b: b.first_seen):
+            ready.extend(self._split(batch))
+        self._pending.clear()
+        self._heap.clear()
+        self.calls_out += len(ready)
+        return ready
+
+    @staticmethod
+    def build_txns(batches: list, admin: str, sp, app_id: int) -> list:
+        """One applyPenaltyN transaction per batch."""
+        return [
+            txn_builders.build_apply_penalty_n_txn(admin, sp, app_id, batch.account, batch.count)
+            for batch in batches
+        ]
@@ -0,0 +1,232 @@
+"""
+TrackBuddy -- Vectorized Scoring Engine
+
+Port of calculateDisciplineScore (backend/src/services/scoring.ts) over
+NumPy columns, one element per user, so the nightly logDiscipline run
+and what-if recalculations score every user in one pass instead of one
+call per user.
+
+Parity with the TypeScript engine is exact, not approximate:
+  - Math.round rounds halves up (12.5 -> 13); np.round rounds to even,
+    so js_round() is used everywhere the TS code rounds
+  - float operations happen in the same order as in the TS expressions
+  - trend averages sum left to right, as Array.reduce does
+tests/fixtures/scoring_cases.json holds TS results for the same inputs
+(regenerate with `node tests/fixtures/scoring_cases.js`).
+
+overall_score is clamped to 0-100, the range logDiscipline accepts, and
+is what score_table() hands to the submitters (admin_scheduler,
+merkle.build_tree, ledger.log_discipline).
+
+Input CSV (one row per user; previous_scores oldest first, ';'-separated):
+    address,focus_minutes,distraction_minutes,sessions_completed,sessions_planned,violations,previous_streak,previous_scores
+
+Usage:
+    python scoring_engine.py inputs.csv --out scores.csv     # address,score (merkle.py build format)
+"""
+
+import sys
+import csv
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+
+
+# ── Weights (scoring.ts WEIGHTS) ──
+
+FOCUS_WEIGHT = 0.45
+CONSISTENCY_WEIGHT = 0.35
+VIOLATION_PENALTY = 5
+STREAK_THRESHOLD = 3
+STREAK_PER_DAY = 1
+STREAK_MAX = 10
+MINIMUM_PASSING_SCORE = 40
+HISTORY_DAYS = 7
+TREND_WINDOW = 3
+TREND_DELTA = 5
+
+TRENDS = ("stable", "improving", "declining")
+GRADES = ((97, "A+"), (93, "A"), (90, "A-"), (87, "B+"), (83, "B"), (80, "B-"),
+          (77, "C+"), (73, "C"), (70, "C-"), (60, "D"))
+
+INPUT_FIELDS = ("focus_minutes", "distraction_minutes", "sessions_completed", "sessions_planned",
+                "violations", "previous_streak")
+
+
+def js_round(x):
+    """Math.round: nearest integer, halves toward +infinity."""
+    x = np.asarray(x, dtype=np.float64)
+    floor = np.floor(x)
+    return floor + (x - floor >= 0.5)
+
+
+def history_matrix(previous_scores, days: int = HISTORY_DAYS) -> np.ndarray:
+    """Ragged per-user score lists (oldest first) -> (n, days) array, NaN-padded on the left."""
+    matrix = np.full((len(previous_scores), days), np.nan)
+    for i, scores in enumerate(previous_scores):
+        scores = list(scores)[-days:]
+        if scores:
+            matrix[i, days - len(scores):] = scores
+    return matrix
+
+
+# ── Scoring ──
+
+def calculate_scores(focus_minutes, distraction_minutes, sessions_completed, sessions_planned,
+                     violations, previous_streak, previous_scores) -> dict:
+    """
+    Score n users at once. Scalar inputs are length-n arrays;
+    previous_scores is an (n, k) array NaN-padded on the left (see
+    history_matrix). Returns a dict of length-n columns.
+    """
+    focus = np.asarray(focus_minutes, dtype=np.float64)
+    distraction = np.asarray(distraction_minutes, dtype=np.float64)
+    completed = np.asarray(sessions_completed, dtype=np.float64)
+    planned = np.asarray(sessions_planned, dtype=np.float64)
+    violations = np.asarray(violations, dtype=np.float64)
+    streak = np.asarray(previous_streak, dtype=np.int64)
+    history = np.asarray(previous_scores, dtype=np.float64).reshape(len(focus), -1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total = focus + distraction
+        focus_ratio = np.where(total > 0, focus / total, 0.0)
+        completion = np.where(planned > 0, completed / planned, 1.0)
+    focus_score = js_round(focus_ratio * 100)
+    consistency_score = js_round(completion * 100)
+
+    raw_score = js_round(
+        (focus_score * FOCUS_WEIGHT)
+        + (consistency_score * CONSISTENCY_WEIGHT)
+        + ((100 - np.minimum(focus_score, consistency_score)) * (1 - FOCUS_WEIGHT - CONSISTENCY_WEIGHT))
+    )
+    violation_penalty = violations * VIOLATION_PENALTY
+    streak_bonus = np.where(
+        streak >= STREAK_THRESHOLD,
+        np.minimum((streak - STREAK_THRESHOLD + 1) * STREAK_PER_DAY, STREAK_MAX),
+        0,
+    )
+    overall = np.clip(raw_score - violation_penalty + streak_bonus, 0, 100)
+
+    passing = overall >= MINIMUM_PASSING_SCORE
+    current_streak = np.where(passing, streak + 1, 0)
+    longest_streak = np.maximum(current_streak, streak)
+
+    return {
+        "overall_score": overall.astype(np.int64),
+        "focus_score": focus_score.astype(np.int64),
+        "consistency_score": consistency_score.astype(np.int64),
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "trend": trend(history, overall),
+        "grade": grade(overall),
+        "raw_score": raw_score.astype(np.int64),
+        "violation_penalty": violation_penalty,
+        "streak_bonus": streak_bonus,
+    }
+
+
+def trend(history: np.ndarray, today) -> np.ndarray:
+    """calculateTrend over [...history, today], as an array of TRENDS labels."""
+    scores = np.column_stack([history, today])
+    valid = ~np.isnan(scores)
+    count = valid.sum(axis=1)
+    values = np.where(valid, scores, 0.0)
+
+    # Column-by-column sums keep Array.reduce's left-to-right order; padding adds 0.0.
+    recent_sum = np.zeros(len(scores))
+    for col in range(scores.shape[1] - TREND_WINDOW, scores.shape[1]):
+        recent_sum = recent_sum + values[:, col]
+    earlier_sum = np.zeros(len(scores))
+    for col in range(scores.shape[1] - TREND_WINDOW):
+        earlier_sum = earlier_sum + values[:, col]
+
+    recent_avg = recent_sum / TREND_WINDOW
+    earlier_count = count - TREND_WINDOW
+    with np.errstate(divide="ignore", invalid="ignore"):
+        earlier_avg = np.where(earlier_count > 0, earlier_sum / earlier_count, recent_avg)
+    diff = recent_avg - earlier_avg
+
+    code = np.where(diff > TREND_DELTA, 1, np.where(diff < -TREND_DELTA, 2, 0))
+    code[count < TREND_WINDOW] = 0
+    return np.asarray(TRENDS, dtype=object)[code]
+
+
+def grade(scores) -> np.ndarray:
+    """scoreToGrade, vectorized."""
+    scores = np.asarray(scores)
+    return np.select([scores >= floor for floor, _ in GRADES], [label for _, label in GRADES], "F").astype(object)
+
+
+# ── Score Table ──
+
+@dataclass
+class ScoreTable:
+    """Addresses plus calculate_scores columns, row-aligned."""
+    addresses: list
+    columns: dict
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self.columns["overall_score"]
+
+    def pairs(self):
+        """(address, score) for merkle.build_tree and the CSV output."""
+        return zip(self.addresses, (int(s) for s in self.scores))
+
+    def enqueue(self, scheduler, deadline_round: int = None) -> int:
+        """Queue one logDiscipline per user on an AdminScheduler."""
+        for address, score in self.pairs():
+            scheduler.enqueue("logDiscipline", address, deadline_round=deadline_round, score=score)
+        return len(self)
+
+
+def score_table(addresses, inputs: dict, previous_scores) -> ScoreTable:
+    """Score every user; `inputs` maps INPUT_FIELDS to columns, previous_scores is ragged."""
+    columns = calculate_scores(**{name: inputs[name] for name in INPUT_FIELDS},
+                               previous_scores=history_matrix(previous_scores))
+    return ScoreTable(list(addresses), columns)
+
+
+def read_inputs(path: str) -> ScoreTable:
+    """Score every row of an input CSV."""
+    addresses, history = [], []
+    inputs = {name: [] for name in INPUT_FIELDS}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            addresses.append(row["address"])
+            for name in INPUT_FIELDS:
+                inputs[name].append(float(row[name] or 0))
+            history.append([float(s) for s in (row.get("previous_scores") or "").split(";") if s])
+    return score_table(addresses, inputs, history)
+
+
+# ── CLI ──
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vectorized discipline scoring")
+    parser.add_argument("inputs", help="per-user input CSV")
+    parser.add_argument("--out", help="write address,score CSV (default stdout)")
+    args = parser.parse_args(argv)
+
+    table = read_inputs(args.inputs)
+    out = open(args.out, "w", newline="") if args.out else sys.stdout
+    try:
+        writer = csv.writer(out)
+        writer.writerow(["address", "score"])
+        writer.writerows(table.pairs())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if len(table):
+        grades, counts = np.unique(table.columns["grade"].astype(str), return_counts=True)
+        print(f"Scored {len(table)} users: mean {table.scores.mean():.1f}, "
+              + ", ".join(f"{g} {c}" for g, c in zip(grades, counts)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
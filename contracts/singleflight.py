@@ -0,0 +1,129 @@
+"""
+TrackBuddy -- Singleflight Read Coalescing
+
+Settlement workers, verifiers and the backend's readUserState pattern
+call account_application_info per task, so concurrent tasks often ask
+algod for the same account at the same moment. coalesce() wraps a
+client so identical GET requests that overlap in time share one HTTP
+call: the first caller (the leader) sends it and every caller that
+arrives while it is in flight waits for and receives the same response.
+
+Requests are identical when service, path and query parameters match;
+the path carries the address and app id, and the query any explicit
+`round`. Only in-flight requests merge (nothing is cached), so a joiner
+receives a read that started at most one request latency before its
+own call, which is the same round in practice (rounds are ~2.8 s). Use
+state_cache.SharedStateCache when reads should be shared for a whole
+round across processes.
+
+Every caller, the leader included, gets its own deep copy of the
+response; the shared object is never handed out, so callers may mutate
+what they receive. Errors fan out the same way.
+
+Metrics (instrumentation.py, when enabled):
+    trackbuddy_coalesced_requests_total{service,endpoint,role}   role = leader | joined
+
+Usage:
+    client = coalesce(algod.AlgodClient(token, url), "algod")   # config.py does this by default
+    client.account_application_info(address, app_id)            # from many threads
+    client.singleflight.stats()     # {"calls", "executions", "coalesced", "hit_rate"}
+"""
+
+import copy
+import threading
+
+import instrumentation
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Singleflight:
+    """Merges concurrent do() calls with the same key into one execution."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """fn()'s result, running it only if no call with `key` is in flight. Returns (result, joined)."""
+        with self._lock:
+            call = self._calls.get(key)
+            joined = call is not None
+            if joined:
+                self.coalesced += 1
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+
+        if joined:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result), True
+
+        try:
+            call.result = fn()
+            # Copied before done is set: joiners deep-copy call.result concurrently.
+            result = copy.deepcopy(call.result)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict:
+        calls = self.executions + self.coalesced
+        return {
+            "calls": calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "hit_rate": self.coalesced / calls if calls else 0.0,
+        }
+
+
+def _request_key(service: str, requrl: str, params) -> tuple:
+    if isinstance(params, dict):
+        params = tuple(sorted((k, str(v)) for k, v in params.items()))
+    elif params is not None:
+        params = tuple(params)
+    return service, requrl, params
+
+
+def coalesce(client, service: str = None, group: Singleflight = None):
+    """
+    Wrap an AlgodClient / IndexerClient instance so overlapping identical
+    GETs share one request. The Singleflight is exposed as
+    client.singleflight. Other methods (sends, compiles) pass through.
+    """
+    attr = "algod_request" if hasattr(client, "algod_request") else "indexer_request"
+    service = service or attr.split("_")[0]
+    inner = getattr(client, attr)
+    group = group if group is not None else Singleflight()
+
+    def request(method, requrl, params=None, data=None, headers=None, *args, **kwargs):
+        if method != "GET":
+            return inner(method, requrl, params, data, headers, *args, **kwargs)
+        key = _request_key(service, requrl, params) + (tuple(args), tuple(sorted(kwargs.items())))
+        result, joined = group.do(key, lambda: inner(method, requrl, params, data, headers, *args, **kwargs))
+        instrumentation.record_coalesced(service, requrl, "joined" if joined else "leader")
+        return result
+
+    setattr(client, attr, request)
+    client.singleflight = group
+    return client
@@ -0,0 +1,254 @@
+"""
+TrackBuddy -- Shared-Memory Account State Cache
+
+Parallel settlement workers each read the same users' local state with
+account_application_info within the same round. SharedStateCache puts
+the decoded LocalState in a multiprocessing.shared_memory segment, as
+fixed-width contract_codec.LOCAL_RECORD records, so every worker on the
+host shares one fetch per account per round.
+
+Segment layout:
+    header  64 bytes   magic, capacity, current round, counters
+    slots   capacity x SLOT   address, round read, flag, LOCAL_RECORD
+
+Slots form an open-addressed table keyed by the 32-byte address. An
+entry is valid only for the newest round observed; seeing a later round
+invalidates every older entry at once, with no sweep, since entries are
+checked against the header round on read. While one worker fetches an
+address, its slot is marked FETCHING and other workers wait on it
+instead of issuing their own request.
+
+LOCAL_RECORD keeps each bytes value's length, so a hit returns exactly
+what the fetch did. A commitment_hash wider than the record's
+BYTES_WIDTH is never cached; every read of it goes to fetch().
+
+Writers serialize on an fcntl lock file next to the segment name, so
+unrelated processes (not only multiprocessing children) can attach.
+
+Usage:
+    cache = SharedStateCache.create("tb-state", capacity=1 << 16)    # owner
+    ...
+    cache = SharedStateCache.attach("tb-state")                      # each worker
+    fetch = algod_fetcher(algod_client, app_id)
+    state = cache.get(address, current_round, fetch)   # LocalState or None (not opted in)
+"""
+
+import os
+import time
+import fcntl
+import struct
+import tempfile
+import contextlib
+from multiprocessing import shared_memory
+
+from algosdk import encoding
+from algosdk.error import AlgodHTTPError
+
+from contract_codec import BYTES_WIDTH, LOCAL_RECORD, decode_local_state, pack_local_into, unpack_local
+
+
+MAGIC = b"TBSTATE1"
+HEADER = struct.Struct(">8sQQQQQQQ")     # magic, capacity, round, hits, misses, waits, stale, overflow
+SLOT = struct.Struct(">32sQB7x")         # address, round read, flag
+SLOT_SIZE = SLOT.size + LOCAL_RECORD.size
+DEFAULT_CAPACITY = 1 << 16
+MAX_PROBE = 32
+WAIT_TIMEOUT_SECS = 10.0
+
+FLAG_EMPTY = 0
+FLAG_PRESENT = 1
+FLAG_NOT_OPTED_IN = 2
+FLAG_FETCHING = 3
+FLAG_FAILED = 4                          # fetch raised or record too narrow; treated as stale
+
+_COUNTERS = ("hits", "misses", "waits", "stale", "overflow")
+
+
+def algod_fetcher(algod_client, app_id: int):
+    """fetch(address) -> LocalState, or None when the account is not opted in."""
+    def fetch(address: str):
+        try:
+            info = algod_client.account_application_info(address, app_id)
+        except AlgodHTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+        local = info.get("app-local-state")
+        return decode_local_state(local.get("key-value", [])) if local else None
+    return fetch
+
+
+class SharedStateCache:
+    """Round-tagged LocalState records in shared memory."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        self.buf = shm.buf
+        magic, self.capacity = HEADER.unpack_from(self.buf, 0)[:2]
+        if magic != MAGIC:
+            raise ValueError(f"{shm.name} is not a state cache segment")
+        self._lock_fd = os.open(self._lock_path(shm.name), os.O_RDWR | os.O_CREAT, 0o600)
+
+    @staticmethod
+    def _lock_path(name: str) -> str:
+        return os.path.join(tempfile.gettempdir(), f"{name.lstrip('/')}.lock")
+
+    @classmethod
+    def create(cls, name: str = None, capacity: int = DEFAULT_CAPACITY) -> "SharedStateCache":
+        size = HEADER.size + capacity * SLOT_SIZE
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        HEADER.pack_into(shm.buf, 0, MAGIC, capacity, 0, 0, 0, 0, 0, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedStateCache":
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    # -- header --
+
+    @contextlib.contextmanager
+    def _locked(self):
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _header(self) -> list:
+        return list(HEADER.unpack_from(self.buf, 0))
+
+    def _count(self, header: list, counter: str):
+        header[3 + _COUNTERS.index(counter)] += 1
+        HEADER.pack_into(self.buf, 0, *header)
+
+    @property
+    def current_round(self) -> int:
+        return HEADER.unpack_from(self.buf, 0)[2]
+
+    def observe_round(self, rnd: int) -> bool:
+        """Advance the valid round; entries read earlier become stale. True if it advanced."""
+        with self._locked():
+            header = self._header()
+            if rnd <= header[2]:
+                return False
+            header[2] = rnd
+            HEADER.pack_into(self.buf, 0, *header)
+            return True
+
+    # -- slots --
+
+    def _slot_offset(self, index: int) -> int:
+        return HEADER.size + index * SLOT_SIZE
+
+    def _find(self, key: bytes, current: int):
+        """(offset of key's slot or None, offset of first reusable slot or None)."""
+        start = int.from_bytes(key[:8], "big") % self.capacity
+        reusable = None
+        for probe in range(min(MAX_PROBE, self.capacity)):
+            offset = self._slot_offset((start + probe) % self.capacity)
+            address, rnd, flag = SLOT.unpack_from(self.buf, offset)
+            if flag == FLAG_EMPTY:
+                return None, reusable if reusable is not None else offset
+            if address == key:
+                return offset, None
+            if reusable is None and rnd < current and flag != FLAG_FETCHING:
+                reusable = offset
+        return None, reusable
+
+    def _read(self, offset: int):
+        _, _, flag = SLOT.unpack_from(self.buf, offset)
+        if flag == FLAG_NOT_OPTED_IN:
+            return None
+        return unpack_local(self.buf, offset + SLOT.size)
+
+    def _write(self, offset: int, key: bytes, rnd: int, state):
+        if state is None:
+            SLOT.pack_into(self.buf, offset, key, rnd, FLAG_NOT_OPTED_IN)
+        elif len(state.commitment_hash) > BYTES_WIDTH:
+            SLOT.pack_into(self.buf, offset, key, 0, FLAG_FAILED)
+        else:
+            pack_local_into(self.buf, offset + SLOT.size, state)
+            SLOT.pack_into(self.buf, offset, key, rnd, FLAG_PRESENT)
+
+    # -- lookup --
+
+    def get(self, address: str, rnd: int, fetch):
+        """
+        LocalState of `address` as read at round `rnd` (None if not opted
+        in), calling fetch(address) only if no worker has read it at
+        this round yet.
+        """
+        key = encoding.decode_address(address)
+        deadline = None
+        while True:
+            with self._locked():
+                header = self._header()
+                header[2] = current = max(header[2], rnd)
+                offset, reusable = self._find(key, current)
+                wait = False
+                if offset is not None:
+                    _, slot_round, flag = SLOT.unpack_from(self.buf, offset)
+                    fresh = slot_round >= current
+                    if fresh and flag in (FLAG_PRESENT, FLAG_NOT_OPTED_IN):
+                        self._count(header, "hits")
+                        return self._read(offset)
+                    wait = fresh and flag == FLAG_FETCHING and (deadline is None or time.monotonic() < deadline)
+                    if not wait:
+                        if flag != FLAG_FETCHING:
+                            header[3 + _COUNTERS.index("stale")] += 1
+                        reusable = offset
+                if wait:
+                    if deadline is None:
+                        deadline = time.monotonic() + WAIT_TIMEOUT_SECS
+                        self._count(header, "waits")
+                    else:
+                        HEADER.pack_into(self.buf, 0, *header)
+                else:
+                    self._count(header, "misses")
+                    if reusable is None:
+                        self._count(header, "overflow")
+                    else:
+                        SLOT.pack_into(self.buf, reusable, key, current, FLAG_FETCHING)
+                    break
+            time.sleep(0.001)
+
+        try:
+            state = fetch(address)
+        except Exception:
+            if reusable is not None:
+                # Release waiters; the slot stays in the probe chain as stale.
+                with self._locked():
+                    SLOT.pack_into(self.buf, reusable, key, 0, FLAG_FAILED)
+            raise
+        if reusable is not None:
+            with self._locked():
+                slot_key, slot_round, _ = SLOT.unpack_from(self.buf, reusable)
+                if slot_key == key and slot_round == current:
+                    self._write(reusable, key, current, state)
+        return state
+
+    # -- lifecycle --
+
+    def stats(self) -> dict:
+        header = HEADER.unpack_from(self.buf, 0)
+        stats = dict(zip(_COUNTERS, header[3:]))
+        lookups = stats["hits"] + stats["misses"]
+        stats["round"] = header[2]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        """Detach; the owner also removes the segment and lock file."""
+        self.buf = None
+        self.shm.close()
+        os.close(self._lock_fd)
+        if self.owner:
+            self.shm.unlink()
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._lock_path(self.shm.name))
@@ -0,0 +1,276 @@
+"""
+TrackBuddy -- Checkpointed State Materializer
+
+Replays decoded ContractEvents through the approval program itself (via
+the offline TEAL evaluator), so the materialized global / local state is
+exactly what the contract's transitions produce. Every `interval` rounds
+the state is written to a compact msgpack checkpoint, and events are
+appended to a per-checkpoint segment file.
+
+An as-of query loads the nearest checkpoint at or below the requested
+round and replays only that segment's events up to it, so "what was
+this user's stake / status / score at round R" costs at most one
+interval of replay instead of the full history.
+
+apply() is safe to call again for a round it has already seen: the
+ingestor saves its cursor only after a whole block, so a crash can
+redeliver the tip round. The tx_ids applied at the tip round are kept
+(and rebuilt from the segment on restart), and repeats are skipped.
+
+Layout of the checkpoint directory:
+    meta.json                   app id, admin, interval
+    checkpoint-<round>.msgpack  state after all events <= round
+    events-<round>.msgpack      events after that checkpoint (msgpack stream)
+
+Usage:
+    mat = StateMaterializer("state/", app_id=1234, admin=ADMIN_ADDRESS, interval=1000)
+    BlockIngestor(algod, 1234, on_event=mat.apply).follow()
+
+    python state_materializer.py state/ --round 41000123 --account <ADDRESS>
+"""
+
+import os
+import sys
+import json
+import bisect
+import argparse
+from dataclasses import asdict
+
+import msgpack
+from algosdk import encoding
+
+import teal_vm
+from contract_sim import DisciplineSim
+from events import PAYMENT_METHOD, ContractEvent
+
+
+DEFAULT_INTERVAL = 1000
+
+# Methods whose first argument is the target account (passed in Accounts).
+ACCOUNT_METHODS = {"verifySession", "applyPenalty", "applyPenaltyN", "logDiscipline", "settleBridge"}
+# Methods whose stake / amount arrives as a grouped payment to the app.
+PAYMENT_METHODS = {"createCommitment", "bridgeIntent"}
+
+
+def _addr(address: str) -> bytes:
+    return encoding.decode_address(address)
+
+
+def event_group(event: ContractEvent, app_id: int, app_address: bytes) -> list:
+    """The teal_vm transaction group equivalent to a confirmed event."""
+    sender = _addr(event.sender)
+    if event.method == PAYMENT_METHOD:
+        return [teal_vm.payment(sender, _addr(event.receiver), event.payment_amount or 0)]
+    if event.method in ("optIn", "closeOut"):
+        return [teal_vm.app_call(sender, app_id, on_complete="OptIn" if event.method == "optIn" else "CloseOut")]
+    args = [event.method.encode()] + list(event.args)
+    accounts = [event.args[0]] if event.method in ACCOUNT_METHODS and event.args else []
+    call = teal_vm.app_call(sender, app_id, args, accounts=accounts)
+    if event.method in PAYMENT_METHODS:
+        return [teal_vm.payment(sender, app_address, event.payment_amount or 0), call]
+    return [call]
+
+
+def _pack_state(state: teal_vm.AppState, rnd: int) -> bytes:
+    return msgpack.packb({
+        "round": rnd,
+        "timestamp": state.timestamp,
+        "creator": state.creator,
+        "globals": state.globals,
+        "locals": state.locals,
+        "balances": state.balances,
+    }, use_bin_type=True)
+
+
+def _unpack_state(blob: bytes, app_id: int) -> teal_vm.AppState:
+    data = msgpack.unpackb(blob, raw=False, strict_map_key=False)
+    return teal_vm.AppState(
+        app_id=app_id, creator=data["creator"], globals=data["globals"], locals=data["locals"],
+        balances=data["balances"], round=data["round"], timestamp=data["timestamp"],
+    )
+
+
+def _decode_state(state: teal_vm.AppState, account: bytes = None) -> dict:
+    items = state.globals if account is None else state.locals.get(account)
+    if items is None:
+        return None
+    return {k.decode(): v for k, v in items.items()}
+
+
+class StateMaterializer:
+    """Event-sourced contract state with periodic checkpoints and as-of queries."""
+
+    def __init__(self, directory: str, app_id: int = None, admin: str = None,
+                 interval: int = DEFAULT_INTERVAL, start_round: int = 0):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        else:
+            if app_id is None or admin is None:
+                raise ValueError("app_id and admin are required for a new materializer")
+            meta = {"app_id": app_id, "admin": admin, "interval": interval}
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+        self.app_id = meta["app_id"]
+        self.admin = meta["admin"]
+        self.interval = meta["interval"]
+        self.rejected = []
+        self.events_applied = 0
+        self.duplicates = 0
+        self._tip_round = 0
+        self._tip_ids = set()
+
+        self.checkpoints = sorted(
+            int(name[len("checkpoint-"):-len(".msgpack")])
+            for name in os.listdir(directory) if name.startswith("checkpoint-")
+        )
+        self._sim = DisciplineSim(admin=_addr(self.admin), app_id=self.app_id)
+        if not self.checkpoints:
+            self._sim.state.round = start_round
+            self._write_checkpoint(start_round)
+        self._restore_tip()
+
+    # -- files --
+
+    def _path(self, kind: str, rnd: int) -> str:
+        return os.path.join(self.directory, f"{kind}-{rnd:012d}.msgpack")
+
+    def _write_checkpoint(self, rnd: int):
+        tmp = self._path("checkpoint", rnd) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_pack_state(self._sim.state, rnd))
+        os.replace(tmp, self._path("checkpoint", rnd))
+        bisect.insort(self.checkpoints, rnd)
+        self._segment_round = rnd
+
+    def _load_checkpoint(self, rnd: int) -> teal_vm.AppState:
+        with open(self._path("checkpoint", rnd), "rb") as f:
+            return _unpack_state(f.read(), self.app_id)
+
+    def _segment_events(self, rnd: int):
+        path = self._path("events", rnd)
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            for data in msgpack.Unpacker(f, raw=False):
+                yield ContractEvent(**data)
+
+    def _restore_tip(self):
+        """Rebuild the live state from the newest checkpoint and its segment."""
+        latest = self.checkpoints[-1]
+        self._sim.state.__dict__.update(self._load_checkpoint(latest).__dict__)
+        self._segment_round = latest
+        for event in self._segment_events(latest):
+            self._execute(self._sim, event)
+        self._tip_round = self._sim.state.round
+        # A forced checkpoint at the tip leaves the tip round's events in the previous segment.
+        segments = self.checkpoints[-2:] if latest == self._tip_round else self.checkpoints[-1:]
+        self._tip_ids = {event.tx_id for rnd in segments for event in self._segment_events(rnd)
+                         if event.confirmed_round == self._tip_round}
+
+    # -- replay --
+
+    def _execute(self, sim: DisciplineSim, event: ContractEvent) -> teal_vm.EvalResult:
+        sim.state.round = event.confirmed_round
+        sim.state.timestamp = event.round_time
+        if event.method == "clearState":
+            sim.state.locals.pop(_addr(event.sender), None)
+            return teal_vm.EvalResult(approved=True)
+        result = sim.execute(event_group(event, self.app_id, sim.app_address))
+        if not result.approved:
+            self.rejected.append((event.tx_id, result.error))
+        return result
+
+    def apply(self, event: ContractEvent) -> bool:
+        """
+        Apply one confirmed event (chain order), checkpointing at interval
+        boundaries. Returns False for a redelivered event already applied.
+        """
+        if event.confirmed_round < self._sim.state.round:
+            raise ValueError(f"event {event.tx_id} at round {event.confirmed_round} is out of order")
+        if event.confirmed_round == self._tip_round and event.tx_id in self._tip_ids:
+            self.duplicates += 1
+            return False
+        if event.confirmed_round > self._tip_round:
+            self._tip_round = event.confirmed_round
+            self._tip_ids = set()
+        boundary = (event.confirmed_round - 1) // self.interval * self.interval
+        if boundary > self._segment_round:
+            self._write_checkpoint(boundary)
+        self._execute(self._sim, event)
+        with open(self._path("events", self._segment_round), "ab") as f:
+            f.write(msgpack.packb(asdict(event), use_bin_type=True))
+        self._tip_ids.add(event.tx_id)
+        self.events_applied += 1
+        return True
+
+    def checkpoint(self, rnd: int = None):
+        """Force a checkpoint of the live state (e.g. on shutdown)."""
+        rnd = self._sim.state.round if rnd is None else rnd
+        if rnd > self._segment_round:
+            self._write_checkpoint(rnd)
+
+    # -- queries --
+
+    def state_as_of(self, rnd: int) -> teal_vm.AppState:
+        """Application state after every event at or below `rnd`."""
+        index = bisect.bisect_right(self.checkpoints, rnd) - 1
+        if index < 0:
+            raise ValueError(f"round {rnd} precedes the first checkpoint ({self.checkpoints[0]})")
+        base = self.checkpoints[index]
+        sim = DisciplineSim.__new__(DisciplineSim)
+        sim.admin, sim.source = _addr(self.admin), self._sim.source
+        sim.state = self._load_checkpoint(base)
+        sim.evaluator = teal_vm.Evaluator(self._sim.evaluator.program, sim.state)
+        for event in self._segment_events(base):
+            if event.confirmed_round > rnd:
+                break
+            self._execute(sim, event)
+        return sim.state
+
+    def local_as_of(self, account: str, rnd: int) -> dict:
+        """Decoded local state of `account` at `rnd` (None if not opted in)."""
+        return _decode_state(self.state_as_of(rnd), _addr(account))
+
+    def global_as_of(self, rnd: int) -> dict:
+        return _decode_state(self.state_as_of(rnd))
+
+    @property
+    def state(self) -> teal_vm.AppState:
+        """Live (latest) state."""
+        return self._sim.state
+
+
+# ── CLI ──
+
+def _printable(state: dict) -> dict:
+    return {k: (v.hex() if isinstance(v, bytes) else v) for k, v in state.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query materialized discipline contract state as of a round")
+    parser.add_argument("directory")
+    parser.add_argument("--round", type=int, required=True)
+    parser.add_argument("--account", help="show this account's local state instead of global state")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(os.path.join(args.directory, "meta.json")):
+        print(f"❌ No materializer state in {args.directory}")
+        sys.exit(1)
+
+    mat = StateMaterializer(args.directory)
+    if args.account:
+        state = mat.local_as_of(args.account, args.round)
+        if state is None:
+            print(f"{args.account} was not opted in at round {args.round}")
+            return
+    else:
+        state = mat.global_as_of(args.round)
+    print(json.dumps(_printable(state), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+TrackBuddy -- Approval Program Tracer & Hot-Spot Profiler
+
+Execution tracing for offline runs of APPROVAL_PROGRAM:
+  - ExecutionTrace records every executed opcode with its pc, source
+    line, enclosing label, stack depth and cost
+  - Profiler aggregates per-label, per-line and per-opcode cost over
+    many runs and exports flamegraph-compatible folded stacks
+
+Folded stacks are rooted at "approval", followed by the labels of the
+active callsub sites and the current label, e.g.
+    approval;method_apply_penalty;is_admin 4000
+
+Usage:
+    python teal_profile.py applyPenalty verifySession:success --runs 1000
+    python teal_profile.py --folded profile.folded     # all scenarios
+    python teal_profile.py applyPenalty --trace        # single-run opcode trace
+    flamegraph.pl profile.folded > profile.svg
+"""
+
+import sys
+import argparse
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+from contract_sim import SCENARIOS, run_scenario, make_address
+from discipline_contract import APPROVAL_PROGRAM
+
+
+# ── Execution Trace ──
+
+@dataclass
+class TraceStep:
+    """One executed opcode."""
+    pc: int
+    line: int
+    op: str
+    args: tuple
+    label: str
+    stack_depth: int
+    cost: int
+    frames: tuple
+
+
+class ExecutionTrace:
+    """Tracer that records every executed opcode of a run."""
+
+    def __init__(self):
+        self.steps = []
+
+    def __call__(self, instr, stack_depth: int, frames: list):
+        self.steps.append(TraceStep(
+            pc=instr.pc,
+            line=instr.line,
+            op=instr.op,
+            args=instr.args,
+            label=instr.label,
+            stack_depth=stack_depth,
+            cost=instr.cost,
+            frames=tuple(frames),
+        ))
+
+    @property
+    def total_cost(self) -> int:
+        return sum(step.cost for step in self.steps)
+
+    def format(self) -> str:
+        """Render the trace as an aligned table."""
+        lines = [f"{'pc':>5} {'line':>5} {'depth':>5} {'cost':>4}  {'label':<26} op"]
+        for step in self.steps:
+            args = " ".join(repr(a) if isinstance(a, bytes) else str(a) for a in step.args)
+            indent = "  " * len(step.frames)
+            lines.append(
+                f"{step.pc:>5} {step.line:>5} {step.stack_depth:>5} {step.cost:>4}  "
+                f"{step.label:<26} {indent}{step.op} {args}".rstrip()
+            )
+        return "\n".join(lines)
+
+
+# ── Profiler ──
+
+class Profiler:
+    """
+    Tracer that aggregates opcode cost across many runs.
+
+    Call begin_run()/end_run() around each traced execution (or use
+    profile_scenario()) so per-run label distributions are kept.
+    """
+
+    def __init__(self, root: str = "approval"):
+        self.root = root
+        self.by_label = Counter()
+        self.by_line = Counter()
+        self.by_opcode = Counter()
+        self.folded = Counter()
+        self.label_runs = defaultdict(list)
+        self.run_costs = []
+        self._current = Counter()
+
+    def __call__(self, instr, stack_depth: int, frames: list):
+        cost = instr.cost
+        self._current[instr.label] += cost
+        self.by_line[instr.line] += cost
+        self.by_opcode[instr.op] += cost
+        self.folded[(self.root, *frames, instr.label)] += cost
+
+    @property
+    def runs(self) -> int:
+        return len(self.run_costs)
+
+    def begin_run(self):
+        self._current = Counter()
+
+    def end_run(self):
+        for label, cost in self._current.items():
+            self.by_label[label] += cost
+            self.label_runs[label].append(cost)
+        self.run_costs.append(sum(self._current.values()))
+        self._current = Counter()
+
+    def profile_scenario(self, name: str, user: bytes = None):
+        """Run one canonical scenario with this profiler attached."""
+        self.begin_run()
+        _, result = run_scenario(name, tracer=self, user=user)
+        self.end_run()
+        return result
+
+    # -- export --
+
+    def label_histogram(self) -> dict:
+        """label -> {total, runs, mean, min, max} of per-run cost."""
+        histogram = {}
+        for label, costs in self.label_runs.items():
+            histogram[label] = {
+                "total": sum(costs),
+                "runs": len(costs),
+                "mean": sum(costs) / len(costs),
+                "min": min(costs),
+                "max": max(costs),
+            }
+        return histogram
+
+    def folded_lines(self) -> list:
+        """Folded stack lines ("frame;frame;frame cost"), sorted."""
+        return sorted(f"{';'.join(stack)} {cost}" for stack, cost in self.folded.items())
+
+    def write_folded(self, path: str):
+        with open(path, "w") as f:
+            f.write("\n".join(self.folded_lines()) + "\n")
+
+    def report(self, source: str = APPROVAL_PROGRAM, top: int = 15) -> str:
+        """Human-readable hot-spot report."""
+        source_lines = source.splitlines()
+        total = sum(self.by_label.values()) or 1
+        runs = self.runs or 1
+        out = [f"Runs: {self.runs}   total cost: {total}   mean/run: {total / runs:.1f}", ""]
+
+        out.append(f"{'label':<28} {'total':>10} {'%':>6} {'mean':>8} {'min':>6} {'max':>6}")
+        histogram = self.label_histogram()
+        for label, stats in sorted(histogram.items(), key=lambda kv: -kv[1]["total"]):
+            out.append(
+                f"{label:<28} {stats['total']:>10} {100 * stats['total'] / total:>5.1f}% "
+                f"{stats['mean']:>8.1f} {stats['min']:>6} {stats['max']:>6}"
+            )
+
+        out.append("")
+        out.append(f"{'line':>5} {'total':>10} {'%':>6}  source")
+        for line, cost in self.by_line.most_common(top):
+            text = source_lines[line - 1].strip() if line <= len(source_lines) else ""
+            out.append(f"{line:>5} {cost:>10} {100 * cost / total:>5.1f}%  {text}")
+
+        out.append("")
+        out.append(f"{'opcode':<18} {'total':>10} {'%':>6}")
+        for op, cost in self.by_opcode.most_common(top):
+            out.append(f"{op:<18} {cost:>10} {100 * cost / total:>5.1f}%")
+        return "\n".join(out)
+
+
+# ── CLI ──
+
+def main(argv=None) -> Profiler:
+    parser = argparse.ArgumentParser(description="Profile approval program execution offline")
+    parser.add_argument("scenarios", nargs="*", help=f"scenario names (default: all): {', '.join(SCENARIOS)}")
+    parser.add_argument("--runs", type=int, default=100, help="runs per scenario")
+    parser.add_argument("--folded", help="write folded stacks to this path")
+    parser.add_argument("--trace", action="store_true", help="print the opcode trace of one run per scenario")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        print(f"❌ Unknown scenario(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    if args.trace:
+        for name in names:
+            trace = ExecutionTrace()
+            _, result = run_scenario(name, tracer=trace)
+            status = "approved" if result.approved else f"rejected ({result.error})"
+            print(f"== {name}: {len(trace.steps)} opcodes, cost {trace.total_cost}, {status}")
+            print(trace.format())
+            print()
+
+    profiler = Profiler()
+    for name in names:
+        for i in range(args.runs):
+            profiler.profile_scenario(name, user=make_address(f"user-{i}"))
+
+    print(profiler.report(top=args.top))
+    if args.folded:
+        profiler.write_folded(args.folded)
+        print(f"\nFolded stacks written to: {args.folded}")
+    return profiler
+
+
+if __name__ == "__main__":
+    main()
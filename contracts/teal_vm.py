@@ -0,0 +1,605 @@
+"""
+TrackBuddy -- Offline TEAL Evaluator
+
+A small AVM interpreter for the subset of TEAL v8 used by the
+discipline contract. It lets APPROVAL_PROGRAM run without a node so
+tooling can trace, profile and replay contract calls offline.
+
+Modelled behaviour:
+  - opcode costs and the pooled 700-per-app-call budget
+  - v8 account availability (Sender, Accounts array, app address)
+  - local state only for opted-in accounts
+  - atomic groups: payments apply in order, any failure reverts all
+  - inner payment transactions funded from the app balance
+
+Transactions are plain dicts keyed by TEAL field names, with addresses
+as 32-byte public keys (see app_call() / payment()).
+"""
+
+import re
+import base64
+import hashlib
+from dataclasses import dataclass, field
+
+
+# ── Constants ──
+
+ON_COMPLETION = {
+    "NoOp": 0,
+    "OptIn": 1,
+    "CloseOut": 2,
+    "ClearState": 3,
+    "UpdateApplication": 4,
+    "DeleteApplication": 5,
+}
+
+TYPE_ENUM = {
+    "unknown": 0,
+    "pay": 1,
+    "keyreg": 2,
+    "acfg": 3,
+    "axfer": 4,
+    "afrz": 5,
+    "appl": 6,
+}
+
+NAMED_INTS = {**ON_COMPLETION, **TYPE_ENUM}
+
+OPCODE_COSTS = {
+    "sha256": 35,
+    "keccak256": 130,
+    "sha512_256": 45,
+}
+
+APP_CALL_BUDGET = 700
+MIN_TXN_FEE = 1000
+ZERO_ADDRESS = bytes(32)
+MAX_UINT64 = 2 ** 64 - 1
+
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|\S+')
+
+
+class TealError(Exception):
+    """Raised when program evaluation fails (AVM panic)."""
+
+
+def application_address(app_id: int) -> bytes:
+    """Return the 32-byte escrow address of an application."""
+    return hashlib.new("sha512_256", b"appID" + app_id.to_bytes(8, "big")).digest()
+
+
+# ── Assembler ──
+
+@dataclass
+class Instruction:
+    """One assembled opcode with its source location."""
+    pc: int
+    op: str
+    args: tuple
+    line: int
+    label: str
+    cost: int = 1
+
+
+@dataclass
+class Program:
+    """Assembled program: instruction list plus label table."""
+    instructions: list
+    labels: dict
+    version: int = 8
+
+    def label_at(self, pc: int) -> str:
+        return self.instructions[pc].label
+
+
+def _parse_bytes(token: str) -> bytes:
+    if token.startswith('"'):
+        return token[1:-1].encode().decode("unicode_escape").encode("latin-1")
+    if token.startswith("0x"):
+        return bytes.fromhex(token[2:])
+    raise TealError(f"Unsupported byte constant: {token}")
+
+
+def _parse_int(token: str) -> int:
+    if token in NAMED_INTS:
+        return NAMED_INTS[token]
+    return int(token, 0)
+
+
+def _tokenize(line: str) -> list:
+    tokens = []
+    for token in _TOKEN_RE.findall(line):
+        if token.startswith("//"):
+            break
+        tokens.append(token)
+    return tokens
+
+
+def assemble(source: str) -> Program:
+    """Assemble TEAL source into a Program."""
+    instructions = []
+    labels = {}
+    version = 8
+    label = "main"
+
+    for lineno, raw in enumerate(source.splitlines(), start=1):
+        tokens = _tokenize(raw)
+        if not tokens:
+            continue
+        if tokens[0] == "#pragma":
+            version = int(tokens[2])
+            continue
+        if len(tokens) == 1 and tokens[0].endswith(":"):
+            label = tokens[0][:-1]
+            labels[label] = len(instructions)
+            continue
+
+        op, rest = tokens[0], tokens[1:]
+        if op in ("int", "pushint"):
+            args = (_parse_int(rest[0]),)
+        elif op in ("byte", "pushbytes"):
+            args = (_parse_bytes(rest[0]),)
+        elif op == "addr":
+            args = (base64.b32decode(rest[0] + "======")[:32],)
+        elif op in ("txna", "gtxn", "load", "store"):
+            args = tuple(int(t) if t.isdigit() else t for t in rest)
+        else:
+            args = tuple(rest)
+
+        instructions.append(Instruction(
+            pc=len(instructions),
+            op=op,
+            args=args,
+            line=lineno,
+            label=label,
+            cost=OPCODE_COSTS.get(op, 1),
+        ))
+
+    for instr in instructions:
+        if instr.op in ("b", "bz", "bnz", "callsub") and instr.args[0] not in labels:
+            raise TealError(f"Unknown label {instr.args[0]} at line {instr.line}")
+
+    return Program(instructions=instructions, labels=labels, version=version)
+
+
+# ── Transactions & State ──
+
+def app_call(sender: bytes, app_id: int, args=(), on_complete: str = "NoOp",
+             accounts=(), fee: int = MIN_TXN_FEE) -> dict:
+    """Build an application call transaction dict."""
+    return {
+        "TypeEnum": TYPE_ENUM["appl"],
+        "Sender": sender,
+        "ApplicationID": app_id,
+        "OnCompletion": ON_COMPLETION[on_complete],
+        "ApplicationArgs": list(args),
+        "Accounts": list(accounts),
+        "Fee": fee,
+    }
+
+
+def payment(sender: bytes, receiver: bytes, amount: int, fee: int = MIN_TXN_FEE) -> dict:
+    """Build a payment transaction dict."""
+    return {
+        "TypeEnum": TYPE_ENUM["pay"],
+        "Sender": sender,
+        "Receiver": receiver,
+        "Amount": amount,
+        "Fee": fee,
+    }
+
+
+@dataclass
+class AppState:
+    """Ledger view of a single application: global, local and balances."""
+    app_id: int = 1
+    creator: bytes = ZERO_ADDRESS
+    globals: dict = field(default_factory=dict)
+    locals: dict = field(default_factory=dict)
+    balances: dict = field(default_factory=dict)    # app escrow only
+    round: int = 1
+    timestamp: int = 0
+
+    @property
+    def address(self) -> bytes:
+        return application_address(self.app_id)
+
+
+@dataclass
+class EvalResult:
+    """Outcome of evaluating one transaction group."""
+    approved: bool
+    cost: int = 0
+    error: str = None
+    inner_txns: list = field(default_factory=list)
+    logs: list = field(default_factory=list)
+    steps: int = 0
+
+
+_MISSING = object()
+
+
+# ── Evaluator ──
+
+class Evaluator:
+    """
+    Executes an approval program against an AppState.
+
+    `tracer`, when given, is called as tracer(instr, stack_depth, frames)
+    before every executed opcode; frames lists the labels of the active
+    callsub sites, outermost first.
+    """
+
+    def __init__(self, program: Program, state: AppState, tracer=None):
+        self.program = program
+        self.state = state
+        self.tracer = tracer
+        self._undo = []
+
+    # -- journal --
+
+    def _set(self, container: dict, key, value):
+        self._undo.append((container, key, container.get(key, _MISSING)))
+        container[key] = value
+
+    def _delete(self, container: dict, key):
+        if key in container:
+            self._undo.append((container, key, container[key]))
+            del container[key]
+
+    def _rollback(self):
+        while self._undo:
+            container, key, old = self._undo.pop()
+            if old is _MISSING:
+                container.pop(key, None)
+            else:
+                container[key] = old
+
+    def _transfer(self, sender: bytes, receiver: bytes, amount: int, fee: int = 0):
+        # Only the app escrow is modelled; external accounts are unbounded.
+        app = self.state.address
+        balances = self.state.balances
+        if sender == app:
+            if balances.get(app, 0) < amount + fee:
+                raise TealError("overspend")
+            self._set(balances, app, balances.get(app, 0) - amount - fee)
+        if receiver == app:
+            self._set(balances, app, balances.get(app, 0) + amount)
+
+    # -- group execution --
+
+    def execute_group(self, group: list) -> EvalResult:
+        """
+        Apply a transaction group atomically.
+
+        Payments move balances in order; app calls to this app run the
+        approval program. Any rejection reverts every change in the group.
+        """
+        self._undo = []
+        budget = APP_CALL_BUDGET * sum(1 for t in group if t["TypeEnum"] == TYPE_ENUM["appl"])
+        total = EvalResult(approved=True)
+        try:
+            for index, txn in enumerate(group):
+                if txn["TypeEnum"] == TYPE_ENUM["pay"]:
+                    self._transfer(txn["Sender"], txn["Receiver"], txn["Amount"])
+                    continue
+                result = self._run_app_call(group, index, budget - total.cost)
+                total.cost += result.cost
+                total.steps += result.steps
+                total.inner_txns.extend(result.inner_txns)
+                total.logs.extend(result.logs)
+                if not result.approved:
+                    total.approved = False
+                    total.error = result.error
+                    break
+        except TealError as e:
+            total.approved = False
+            total.error = str(e)
+        if not total.approved:
+            self._rollback()
+        self._undo = []
+        return total
+
+    def _run_app_call(self, group: list, index: int, budget: int) -> EvalResult:
+        txn = group[index]
+        state = self.state
+        on_complete = txn["OnCompletion"]
+
+        if txn["ApplicationID"] not in (0, state.app_id):
+            raise TealError(f"Unknown application {txn['ApplicationID']}")
+        if txn["ApplicationID"] == 0:
+            self._set(state.__dict__, "creator", txn["Sender"])
+        if on_complete == ON_COMPLETION["OptIn"]:
+            if txn["Sender"] in state.locals:
+                raise TealError("account already opted in")
+            self._set(state.locals, txn["Sender"], {})
+
+        result = _Run(self, group, index, budget).execute()
+
+        if result.approved and on_complete in (ON_COMPLETION["CloseOut"], ON_COMPLETION["ClearState"]):
+            self._delete(state.locals, txn["Sender"])
+        return result
+
+
+class _Run:
+    """Single program execution for one app call."""
+
+    def __init__(self, evaluator: Evaluator, group: list, index: int, budget: int):
+        self.ev = evaluator
+        self.state = evaluator.state
+        self.group = group
+        self.txn = group[index]
+        self.budget = budget
+        self.stack = []
+        self.frames = []
+        self.returns = []
+        self.scratch = {}
+        self.inner = None
+        self.result = EvalResult(approved=False)
+
+    # -- helpers --
+
+    def pop(self):
+        if not self.stack:
+            raise TealError("stack underflow")
+        return self.stack.pop()
+
+    def pop_int(self) -> int:
+        value = self.pop()
+        if not isinstance(value, int):
+            raise TealError("expected uint64, got bytes")
+        return value
+
+    def pop_bytes(self) -> bytes:
+        value = self.pop()
+        if not isinstance(value, bytes):
+            raise TealError("expected bytes, got uint64")
+        return value
+
+    def push_bool(self, cond: bool):
+        self.stack.append(1 if cond else 0)
+
+    def txn_field(self, txn: dict, name: str, index=None):
+        if name == "NumAppArgs":
+            return len(txn.get("ApplicationArgs", []))
+        if name == "NumAccounts":
+            return len(txn.get("Accounts", []))
+        if name == "ApplicationArgs":
+            args = txn.get("ApplicationArgs", [])
+            if index >= len(args):
+                raise TealError(f"invalid ApplicationArgs index {index}")
+            return args[index]
+        if name == "Accounts":
+            accounts = [txn["Sender"]] + txn.get("Accounts", [])
+            if index >= len(accounts):
+                raise TealError(f"invalid Accounts index {index}")
+            return accounts[index]
+        if name not in txn:
+            defaults = {"Amount": 0, "Receiver": ZERO_ADDRESS, "Fee": 0, "OnCompletion": 0, "ApplicationID": 0}
+            if name in defaults:
+                return defaults[name]
+            raise TealError(f"unsupported txn field {name}")
+        return txn[name]
+
+    def global_field(self, name: str):
+        state = self.state
+        values = {
+            "GroupSize": lambda: len(self.group),
+            "CurrentApplicationAddress": lambda: state.address,
+            "CurrentApplicationID": lambda: state.app_id,
+            "CreatorAddress": lambda: state.creator,
+            "MinTxnFee": lambda: MIN_TXN_FEE,
+            "ZeroAddress": lambda: ZERO_ADDRESS,
+            "Round": lambda: state.round,
+            "LatestTimestamp": lambda: state.timestamp,
+        }
+        if name not in values:
+            raise TealError(f"unsupported global field {name}")
+        return values[name]()
+
+    def resolve_account(self, ref) -> bytes:
+        accounts = [self.txn["Sender"]] + self.txn.get("Accounts", [])
+        if isinstance(ref, int):
+            if ref >= len(accounts):
+                raise TealError(f"invalid Account reference {ref}")
+            return accounts[ref]
+        if len(ref) != 32:
+            raise TealError(f"invalid Account reference {ref!r}")
+        if ref not in accounts and ref != self.state.address:
+            raise TealError("unavailable Account")
+        return ref
+
+    def local_state(self, ref) -> dict:
+        addr = self.resolve_account(ref)
+        if addr not in self.state.locals:
+            raise TealError("account not opted in to app")
+        return self.state.locals[addr]
+
+    # -- main loop --
+
+    def execute(self) -> EvalResult:
+        try:
+            self._loop()
+        except TealError as e:
+            self.result.approved = False
+            self.result.error = str(e)
+        return self.result
+
+    def _loop(self):
+        program = self.ev.program
+        instructions = program.instructions
+        labels = program.labels
+        tracer = self.ev.tracer
+        stack = self.stack
+        result = self.result
+        pc = 0
+
+        while pc < len(instructions):
+            instr = instructions[pc]
+            result.cost += instr.cost
+            result.steps += 1
+            if result.cost > self.budget:
+                raise TealError("dynamic cost budget exceeded")
+            if tracer is not None:
+                tracer(instr, len(stack), self.frames)
+
+            op, args = instr.op, instr.args
+            pc += 1
+
+            if op in ("int", "pushint", "byte", "pushbytes", "addr"):
+                stack.append(args[0])
+            elif op == "txn":
+                stack.append(self.txn_field(self.txn, args[0]))
+            elif op == "txna":
+                stack.append(self.txn_field(self.txn, args[0], args[1]))
+            elif op == "gtxn":
+                if args[0] >= len(self.group):
+                    raise TealError(f"gtxn lookup {args[0]} out of range")
+                stack.append(self.txn_field(self.group[args[0]], args[1]))
+            elif op == "global":
+                stack.append(self.global_field(args[0]))
+            elif op in ("==", "!="):
+                b, a = self.pop(), self.pop()
+                if type(a) is not type(b):
+                    raise TealError(f"{op} arg types differ")
+                self.push_bool((a == b) if op == "==" else (a != b))
+            elif op in ("<", ">", "<=", ">=", "&&", "||"):
+                b, a = self.pop_int(), self.pop_int()
+                self.push_bool({
+                    "<": a < b, ">": a > b, "<=": a <= b, ">=": a >= b,
+                    "&&": a and b, "||": a or b,
+                }[op])
+            elif op == "!":
+                self.push_bool(self.pop_int() == 0)
+            elif op == "+":
+                b, a = self.pop_int(), self.pop_int()
+                if a + b > MAX_UINT64:
+                    raise TealError("+ overflowed")
+                stack.append(a + b)
+            elif op == "-":
+                b, a = self.pop_int(), self.pop_int()
+                if b > a:
+                    raise TealError("- would result negative")
+                stack.append(a - b)
+            elif op == "*":
+                b, a = self.pop_int(), self.pop_int()
+                if a * b > MAX_UINT64:
+                    raise TealError("* overflowed")
+                stack.append(a * b)
+            elif op in ("/", "%"):
+                b, a = self.pop_int(), self.pop_int()
+                if b == 0:
+                    raise TealError(f"{op} by zero")
+                stack.append(a // b if op == "/" else a % b)
+            elif op == "btoi":
+                value = self.pop_bytes()
+                if len(value) > 8:
+                    raise TealError("btoi arg too long")
+                stack.append(int.from_bytes(value, "big"))
+            elif op == "itob":
+                stack.append(self.pop_int().to_bytes(8, "big"))
+            elif op == "len":
+                stack.append(len(self.pop_bytes()))
+            elif op == "concat":
+                b, a = self.pop_bytes(), self.pop_bytes()
+                stack.append(a + b)
+            elif op == "sha256":
+                stack.append(hashlib.sha256(self.pop_bytes()).digest())
+            elif op == "sha512_256":
+                stack.append(hashlib.new("sha512_256", self.pop_bytes()).digest())
+            elif op == "pop":
+                self.pop()
+            elif op == "dup":
+                value = self.pop()
+                stack.extend((value, value))
+            elif op == "dup2":
+                b, a = self.pop(), self.pop()
+                stack.extend((a, b, a, b))
+            elif op == "swap":
+                b, a = self.pop(), self.pop()
+                stack.extend((b, a))
+            elif op == "select":
+                cond, b, a = self.pop_int(), self.pop(), self.pop()
+                stack.append(b if cond else a)
+            elif op == "load":
+                stack.append(self.scratch.get(args[0], 0))
+            elif op == "store":
+                self.scratch[args[0]] = self.pop()
+            elif op == "assert":
+                if not self.pop_int():
+                    raise TealError(f"assert failed pc={instr.pc} line={instr.line}")
+            elif op == "err":
+                raise TealError(f"err opcode executed pc={instr.pc}")
+            elif op == "b":
+                pc = labels[args[0]]
+            elif op == "bz":
+                if self.pop_int() == 0:
+                    pc = labels[args[0]]
+            elif op == "bnz":
+                if self.pop_int() != 0:
+                    pc = labels[args[0]]
+            elif op == "callsub":
+                self.returns.append(pc)
+                self.frames.append(instr.label)
+                pc = labels[args[0]]
+            elif op == "retsub":
+                if not self.returns:
+                    raise TealError("retsub with empty callstack")
+                pc = self.returns.pop()
+                self.frames.pop()
+            elif op == "return":
+                self._finish(self.pop_int())
+                return
+            elif op == "app_global_get":
+                key = self.pop_bytes()
+                stack.append(self.state.globals.get(key, 0))
+            elif op == "app_global_put":
+                value, key = self.pop(), self.pop_bytes()
+                self.ev._set(self.state.globals, key, value)
+            elif op == "app_global_del":
+                self.ev._delete(self.state.globals, self.pop_bytes())
+            elif op == "app_local_get":
+                key, ref = self.pop_bytes(), self.pop()
+                stack.append(self.local_state(ref).get(key, 0))
+            elif op == "app_local_put":
+                value, key, ref = self.pop(), self.pop_bytes(), self.pop()
+                self.ev._set(self.local_state(ref), key, value)
+            elif op == "app_local_del":
+                key, ref = self.pop_bytes(), self.pop()
+                self.ev._delete(self.local_state(ref), key)
+            elif op == "app_opted_in":
+                self.pop_int()
+                addr = self.resolve_account(self.pop())
+                self.push_bool(addr in self.state.locals)
+            elif op == "log":
+                result.logs.append(self.pop_bytes())
+            elif op == "itxn_begin":
+                self.inner = {"Sender": self.state.address, "Fee": MIN_TXN_FEE}
+            elif op == "itxn_field":
+                if self.inner is None:
+                    raise TealError("itxn_field without itxn_begin")
+                value = self.pop()
+                if args[0] == "Receiver":
+                    value = self.resolve_account(value)
+                self.inner[args[0]] = value
+            elif op == "itxn_submit":
+                self._submit_inner()
+            else:
+                raise TealError(f"unsupported opcode {op} at line {instr.line}")
+
+        # Fell off the end of the program: top of stack decides.
+        self._finish(self.pop_int())
+
+    def _finish(self, value: int):
+        self.result.approved = value != 0
+        if not self.result.approved:
+            self.result.error = "program rejected"
+
+    def _submit_inner(self):
+        inner, self.inner = self.inner, None
+        if inner is None:
+            raise TealError("itxn_submit without itxn_begin")
+        if inner.get("TypeEnum") != TYPE_ENUM["pay"]:
+            raise TealError("only inner payments are supported")
+        self.ev._transfer(inner["Sender"], inner["Receiver"], inner.get("Amount", 0), inner.get("Fee", 0))
+        self.result.inner_txns.append(inner)
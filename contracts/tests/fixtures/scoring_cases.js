@@ -0,0 +1,79 @@
+/**
+ * TrackBuddy -- scoring.ts fixture generator
+ *
+ * Evaluates calculateDisciplineScore from backend/src/services/scoring.ts
+ * (type annotations stripped, DB code left out) over deterministic inputs
+ * and prints [{input, result}] as JSON for tests/test_scoring_engine.py.
+ *
+ * Usage:
+ *     node tests/fixtures/scoring_cases.js > tests/fixtures/scoring_cases.json
+ */
+
+const fs = require('fs');
+const path = require('path');
+
+const source = fs.readFileSync(
+    path.join(__dirname, '..', '..', '..', 'backend', 'src', 'services', 'scoring.ts'), 'utf8');
+
+function section(start, end) {
+    const from = source.indexOf(start);
+    const to = end ? source.indexOf(end, from) : source.length;
+    if (from < 0 || to < 0) throw new Error(`scoring.ts changed: ${start}`);
+    return source.slice(from, to);
+}
+
+const js = [
+    section('const WEIGHTS', '// ── Scoring Engine ──'),
+    section('export function calculateDisciplineScore', '/**\n * Process'),
+    section('// ── Helpers ──'),
+].join('\n')
+    .replace(/export /g, '')
+    .replace(/function (\w+)\(([^)]*)\)\s*:[^{]+\{/g,           // parameter + return types
+        (_, name, params) => `function ${name}(${params.replace(/\s*:\s*[\w[\]]+/g, '')}) {`);
+
+const calculateDisciplineScore = new Function(`${js}\nreturn calculateDisciplineScore;`)();
+
+// Deterministic LCG so the fixture is reproducible without dependencies.
+let seed = 20240601;
+const rand = (n) => (seed = (seed * 1103515245 + 12345) % 2147483648) % n;
+
+const inputs = [
+    // edge cases: empty day, nothing planned, ties at .5, over-completion, streak threshold
+    { focusMinutes: 0, distractionMinutes: 0, sessionsCompleted: 0, sessionsPlanned: 0, violations: 0, previousStreak: 0, previousScores: [] },
+    { focusMinutes: 1, distractionMinutes: 7, sessionsCompleted: 1, sessionsPlanned: 8, violations: 0, previousStreak: 2, previousScores: [50, 60] },
+    { focusMinutes: 1, distractionMinutes: 1, sessionsCompleted: 3, sessionsPlanned: 2, violations: 0, previousStreak: 3, previousScores: [10, 20, 30] },
+    { focusMinutes: 200, distractionMinutes: 0, sessionsCompleted: 4, sessionsPlanned: 4, violations: 0, previousStreak: 40, previousScores: [100, 100, 100, 100, 100, 100, 100] },
+    { focusMinutes: 0, distractionMinutes: 90, sessionsCompleted: 0, sessionsPlanned: 3, violations: 30, previousStreak: 9, previousScores: [95, 90, 85, 40, 30, 20, 10] },
+];
+for (let i = 0; i < 200; i++) {
+    const planned = rand(6);
+    inputs.push({
+        focusMinutes: rand(300),
+        distractionMinutes: rand(4) === 0 ? 0 : rand(120),
+        sessionsCompleted: rand(planned + 2),
+        sessionsPlanned: planned,
+        violations: rand(3) === 0 ? rand(12) : 0,
+        previousStreak: rand(15),
+        previousScores: Array.from({ length: rand(8) }, () => rand(101)),
+    });
+}
+
+const cases = inputs.map((input) => {
+    const r = calculateDisciplineScore(input);
+    return {
+        input,
+        result: {
+            overallScore: r.overallScore,
+            focusScore: r.focusScore,
+            consistencyScore: r.consistencyScore,
+            currentStreak: r.currentStreak,
+            longestStreak: r.longestStreak,
+            trend: r.trend,
+            grade: r.grade,
+            rawScore: r.breakdown.rawScore,
+            violationPenalty: r.breakdown.violationPenalty,
+            streakBonus: r.breakdown.streakBonus,
+        },
+    };
+});
+process.stdout.write('[\n' + cases.map((c) => JSON.stringify(c)).join(',\n') + '\n]\n');
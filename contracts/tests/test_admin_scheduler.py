@@ -0,0 +1,143 @@
+"""
+TrackBuddy -- Admin Scheduler Tests
+
+Urgent settlements must not wait behind deferrable score logs, and the
+per-round budget and validity deadlines must hold.
+"""
+
+import pytest
+from algosdk import account, encoding
+from algosdk.error import AlgodHTTPError
+
+from loadgen import offline_params
+from admin_scheduler import AdminScheduler, MAX_GROUP_SIZE
+
+
+@pytest.fixture
+def users():
+    return [account.generate_account()[1] for _ in range(4)]
+
+
+def _methods(groups):
+    return [op.method for group in groups for op in group]
+
+
+class _Algod:
+    """Node stub: rejects any group touching `bad` accounts, or is down."""
+
+    def __init__(self, bad=(), down=False):
+        self.bad = set(bad)
+        self.down = down
+        self.sent = []
+
+    def suggested_params(self):
+        return offline_params()
+
+    def send_transactions(self, signed):
+        if self.down:
+            raise AlgodHTTPError("service unavailable", 503)
+        accounts = {encoding.encode_address(t.transaction.app_args[1]) for t in signed}
+        if accounts & self.bad:
+            raise AlgodHTTPError("transaction rejected: logic eval error: assert failed", 400)
+        self.sent.append([t.transaction for t in signed])
+        return signed[0].get_txid()
+
+
+class TestOrdering:
+    """Priority classes, then earliest deadline; near-deadline ops jump ahead."""
+
+    def test_priority_beats_arrival_order(self, users):
+        scheduler = AdminScheduler(txns_per_round=10)
+        for user in users:
+            scheduler.enqueue("logDiscipline", user, score=50)
+        scheduler.enqueue("applyPenalty", users[0])
+        scheduler.enqueue("verifySession", users[1], success=True)
+        assert _methods(scheduler.plan_round(1))[:3] == ["verifySession", "applyPenalty", "logDiscipline"]
+
+    def test_earliest_deadline_within_class(self, users):
+        scheduler = AdminScheduler(txns_per_round=10)
+        late = scheduler.enqueue("applyPenalty", users[0], deadline_round=500)
+        early = scheduler.enqueue("applyPenalty", users[1], deadline_round=50)
+        ops = scheduler.plan_round(1)[0]
+        assert ops == [early, late]
+
+    def test_urgent_deadline_promoted(self, users):
+        scheduler = AdminScheduler(txns_per_round=1, urgent_slack=3)
+        scheduler.enqueue("verifySession", users[0], success=True, deadline_round=900)
+        urgent = scheduler.enqueue("logDiscipline", users[1], score=70, deadline_round=12)
+        assert scheduler.plan_round(10) == [[urgent]]
+
+    def test_expired_ops_dropped(self, users):
+        scheduler = AdminScheduler()
+        scheduler.enqueue("applyPenalty", users[0], deadline_round=5)
+        assert scheduler.plan_round(6) == []
+        assert scheduler.stats()["applyPenalty"]["expired"] == 1
+
+
+class TestPacking:
+    """Per-round budget and group size limits."""
+
+    def test_budget_and_group_size(self, users):
+        scheduler = AdminScheduler(txns_per_round=40)
+        for i in range(100):
+            scheduler.enqueue("logDiscipline", users[i % 4], score=i % 101)
+        groups = scheduler.plan_round(1)
+        assert [len(g) for g in groups] == [MAX_GROUP_SIZE, MAX_GROUP_SIZE, 8]
+        assert len(scheduler) == 60
+        assert scheduler.depth() == {"logDiscipline": 60}
+
+    def test_wait_metrics(self, users):
+        ticks = iter([0.0, 0.0, 5.0, 5.0])
+        scheduler = AdminScheduler(txns_per_round=1, clock=lambda: next(ticks))
+        scheduler.enqueue("applyPenalty", users[0])
+        scheduler.enqueue("applyPenalty", users[1])
+        scheduler.plan_round(0)
+        scheduler.plan_round(2)
+        stats = scheduler.stats()["applyPenalty"]
+        assert stats["dispatched"] == 2 and stats["depth"] == 0
+        assert stats["wait_rounds_p99"] == 2
+        assert stats["wait_secs_p99"] == 5.0
+
+    def test_build_group_caps_validity(self, users):
+        admin = account.generate_account()[1]
+        scheduler = AdminScheduler()
+        scheduler.enqueue("verifySession", users[0], success=False, deadline_round=30)
+        scheduler.enqueue("applyPenalty", users[1])
+        (ops,) = scheduler.plan_round(1)
+        txns = scheduler.build_group(ops, admin, offline_params(), 1234)
+        assert txns[0].last_valid_round == 30
+        assert txns[1].last_valid_round == offline_params().last
+        assert txns[0].group == txns[1].group is not None
+
+    def test_rejects_unknown_method(self, users):
+        with pytest.raises(ValueError):
+            AdminScheduler().enqueue("createCommitment", users[0])
+
+
+class TestSending:
+    """A rejected op fails alone; unsent ops stay queued."""
+
+    def test_rejected_group_is_split(self, users):
+        key, admin = account.generate_account()
+        algod = _Algod(bad=[users[1]])
+        scheduler = AdminScheduler(group_size=4)
+        for user in users:
+            scheduler.enqueue("applyPenalty", user)
+        txids = scheduler.send_round(algod, admin, key, 1234)
+        assert len(txids) == 3 and [len(g) for g in algod.sent] == [1, 1, 1]
+        assert [op.account for op, _ in scheduler.failures] == [users[1]]
+        stats = scheduler.stats()["applyPenalty"]
+        assert stats["dispatched"] == 3 and stats["failed"] == 1 and stats["depth"] == 0
+
+    def test_unreachable_node_requeues(self, users):
+        key, admin = account.generate_account()
+        scheduler = AdminScheduler(group_size=2)
+        for user in users:
+            scheduler.enqueue("logDiscipline", user, score=70)
+        assert scheduler.send_round(_Algod(down=True), admin, key, 1234) == []
+        stats = scheduler.stats()["logDiscipline"]
+        assert stats["dispatched"] == 0 and stats["requeued"] == 4 and len(scheduler) == 4
+
+        algod = _Algod()
+        assert len(scheduler.send_round(algod, admin, key, 1234)) == 2
+        assert scheduler.stats()["logDiscipline"]["dispatched"] == 4 and len(scheduler) == 0
@@ -0,0 +1,133 @@
+"""
+TrackBuddy -- Backfill Loader Tests
+
+Folding an event stream must reproduce dbSync's row updates, and the
+COPY files must be valid PostgreSQL text format.
+"""
+
+from datetime import datetime
+
+import pytest
+from algosdk import account, encoding
+
+from backfill_loader import (
+    BackfillFold, CommitmentRow, COLUMNS, copy_value, load_snapshot,
+    render_load_sql, write_backfill,
+)
+from events import ContractEvent, event_to_json, read_event_lines
+
+
+T0 = 1_700_000_000          # 2023-11-14 22:13:20 UTC
+
+
+def _event(method, sender, *args, rnd=100, seconds=0, tx_id=None, payment=None):
+    return ContractEvent(
+        tx_id=tx_id or f"{method.upper()}{rnd}{seconds}",
+        method=method,
+        sender=sender,
+        args=[a if isinstance(a, bytes) else a.to_bytes(8, "big") for a in args],
+        confirmed_round=rnd,
+        round_time=T0 + seconds,
+        payment_amount=payment,
+    )
+
+
+@pytest.fixture
+def users():
+    return [account.generate_account()[1] for _ in range(2)]
+
+
+@pytest.fixture
+def fold(users):
+    created = datetime.utcfromtimestamp(T0 - 60)
+    commitments = [
+        CommitmentRow(id="c-old", user_id="u0", stake_amount=1.0, created_at=created,
+                      original=("TXOLD", "COMPLETED", None)),
+        CommitmentRow(id="c-new", user_id="u0", stake_amount=5.0, created_at=created.replace(second=30)),
+    ]
+    return BackfillFold({users[0]: "u0", users[1]: "u1"}, commitments)
+
+
+class TestFold:
+    """Handler rules match dbSync.ts."""
+
+    def test_commitment_lifecycle(self, fold, users):
+        key = encoding.decode_address(users[0])
+        fold.apply_all([
+            _event("createCommitment", users[0], b"method", tx_id="TXA"),
+            _event("createCommitment", users[0], b"method", tx_id="TXB", seconds=5),
+            _event("verifySession", users[1], key, 1, seconds=3600),
+        ])
+        rows = {r["id"]: r for r in fold.rows()["commitments"]}
+        # latest unlinked ACTIVE commitment first, then the older one
+        assert rows["c-new"]["on_chain_tx_id"] == "TXA"
+        assert rows["c-old"]["on_chain_tx_id"] == "TXB"
+        assert rows["c-new"]["status"] == "COMPLETED"
+        assert rows["c-new"]["end_time"] == datetime.utcfromtimestamp(T0 + 3600)
+
+    def test_event_before_commitment_is_unmatched(self, fold, users):
+        fold.apply(_event("createCommitment", users[0], b"m", seconds=-3600))
+        assert fold.stats.unmatched == {"createCommitment": 1}
+
+    def test_penalties_and_scores(self, fold, users):
+        key = encoding.decode_address(users[0])
+        fold.apply_all([
+            _event("applyPenalty", users[1], key, tx_id="P1"),
+            _event("applyPenaltyN", users[1], key, 3, tx_id="P2"),
+            _event("logDiscipline", users[1], key, 70, tx_id="S1"),
+            _event("logDiscipline", users[1], key, 85, tx_id="S2", seconds=60),
+        ])
+        rows = fold.rows()
+        assert [v["on_chain_tx_id"] for v in rows["violations"]] == ["P1", "P2", "P2", "P2"]
+        assert rows["violations"][0]["penalty_amount"] == pytest.approx(0.5)
+        assert len({v["id"] for v in rows["violations"]}) == 4
+        (score,) = rows["discipline_scores"]
+        assert score["overall_score"] == 85.0 and score["on_chain_tx_id"] == "S2"
+
+    def test_bridge_settles_latest_pending(self, fold, users):
+        fold.apply_all([
+            _event("bridgeIntent", users[1], b"m", tx_id="B1", payment=2_000_000),
+            _event("bridgeIntent", users[1], b"m", tx_id="B2", payment=1_000_000),
+            _event("settleBridge", users[0], encoding.decode_address(users[1]), tx_id="S", seconds=10),
+        ])
+        rows = {r["algo_tx_id"]: r for r in fold.rows()["bridge_transactions"]}
+        assert rows["B1"]["status"] == "PENDING" and rows["B1"]["algo_amount"] == 2.0
+        assert rows["B2"]["status"] == "SETTLED" and rows["B2"]["on_chain_settle_tx_id"] == "S"
+
+
+class TestOutput:
+    """COPY text format, load.sql and the snapshot / events readers."""
+
+    def test_copy_escaping(self):
+        assert copy_value(None) == "\\N"
+        assert copy_value(True) == "t"
+        assert copy_value("a\tb\\c\nd") == "a\\tb\\\\c\\nd"
+        assert copy_value(datetime(2024, 1, 2, 3, 4, 5)) == "2024-01-02 03:04:05.000"
+
+    def test_write_backfill(self, fold, users, tmp_path):
+        fold.apply(_event("applyPenalty", users[1], encoding.decode_address(users[0]), tx_id="P1"))
+        counts = write_backfill(fold, str(tmp_path))
+        assert counts["violations"] == 1 and counts["commitments"] == 1   # c-old reset to ACTIVE
+        (line,) = (tmp_path / "violations.copy").read_text().splitlines()
+        assert len(line.split("\t")) == len(COLUMNS["violations"])
+        sql = (tmp_path / "load.sql").read_text()
+        assert sql == render_load_sql()
+        for table in COLUMNS:
+            assert f"FROM '{table}.copy'" in sql
+        assert "ON CONFLICT (user_id, date)" in sql
+
+    def test_readers(self, users, tmp_path):
+        (tmp_path / "users.csv").write_text(f"id,wallet_address\nu0,{users[0]}\nu2,\n")
+        (tmp_path / "commitments.csv").write_text(
+            "id,user_id,status,stake_amount,on_chain_tx_id,end_time,created_at\n"
+            "c1,u0,ACTIVE,2.5,,,2024-01-01 10:00:00.123\n"
+            "c2,u0,CANCELLED,1,,,2024-01-01 09:00:00+05:30\n"
+        )
+        user_map, commitments = load_snapshot(str(tmp_path))
+        assert user_map == {users[0]: "u0"}
+        assert [c.id for c in commitments] == ["c1"]
+        assert commitments[0].original == (None, "ACTIVE", None)
+
+        event = _event("applyPenaltyN", users[1], b"k" * 32, 2)
+        (tmp_path / "events.jsonl").write_text(event_to_json(event) + "\n\n")
+        assert list(read_event_lines(str(tmp_path / "events.jsonl"))) == [event]
@@ -0,0 +1,258 @@
+"""
+TrackBuddy -- Block Ingestor Tests
+
+Decodes msgpack blocks assembled from real signed transactions and
+drives the follow loop against in-memory algod / indexer stubs.
+"""
+
+import base64
+import hashlib
+
+import msgpack
+import pytest
+from algosdk import account, encoding
+from algosdk.error import AlgodHTTPError
+from algosdk.transaction import PaymentTxn, SuggestedParams
+
+import txn_builders
+from events import PAYMENT_METHOD, decode_block, decode_indexer_txn, compute_txid
+from block_ingestor import BlockIngestor
+
+
+APP_ID = 4242
+GENESIS_HASH = "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI="
+GENESIS_ID = "testnet-v1.0"
+
+
+def _params():
+    return SuggestedParams(fee=1000, first=1, last=1000, gh=GENESIS_HASH, gen=GENESIS_ID, flat_fee=True)
+
+
+def _block_entry(txn, key, apply_data=None):
+    """Encode a signed txn the way algod stores it inside a block."""
+    stxn = msgpack.unpackb(base64.b64decode(encoding.msgpack_encode(txn.sign(key))), raw=False)
+    inner = stxn["txn"]
+    inner.pop("gh")
+    has_gen = inner.pop("gen", None) is not None
+    entry = {"sig": stxn["sig"], "txn": inner}
+    if has_gen:
+        entry["hgi"] = True
+    if apply_data:
+        entry["dt"] = apply_data
+    return entry
+
+
+def _block(rnd, entries, ts=1_700_000_000):
+    return msgpack.packb({"block": {
+        "rnd": rnd,
+        "ts": ts,
+        "gen": GENESIS_ID,
+        "gh": base64.b64decode(GENESIS_HASH),
+        "txns": entries,
+    }}, use_bin_type=True)
+
+
+@pytest.fixture
+def accounts():
+    admin_key, admin = account.generate_account()
+    user_key, user = account.generate_account()
+    return admin_key, admin, user_key, user
+
+
+class TestDecodeBlock:
+    """Raw blocks decode into ContractEvents with correct txids."""
+
+    def test_commitment_group_and_admin_call(self, accounts):
+        admin_key, admin, user_key, user = accounts
+        digest = hashlib.sha256(b"goal").digest()
+        pay, call = txn_builders.build_create_commitment_group(user, _params(), APP_ID, digest, 2_000_000)
+        penalty = txn_builders.build_apply_penalty_txn(admin, _params(), APP_ID, user)
+        other_app = txn_builders.build_apply_penalty_txn(admin, _params(), APP_ID + 1, user)
+        raw = _block(77, [
+            _block_entry(pay, user_key),
+            _block_entry(call, user_key),
+            _block_entry(penalty, admin_key),
+            _block_entry(other_app, admin_key),
+        ])
+
+        events = decode_block(raw, APP_ID)
+        assert [e.method for e in events] == ["createCommitment", "applyPenalty"]
+        commit, pen = events
+        assert commit.tx_id == call.get_txid()
+        assert commit.payment_amount == 2_000_000
+        assert commit.args == [digest]
+        assert pen.tx_id == penalty.get_txid()
+        assert pen.arg_account(0) == user
+        assert pen.confirmed_round == 77
+
+    def test_inner_payout_attached(self, accounts):
+        admin_key, admin, _, user = accounts
+        verify = txn_builders.build_verify_session_txn(admin, _params(), APP_ID, user, True)
+        apply_data = {"itx": [{"txn": {"type": "pay", "amt": 1_500_000, "rcv": encoding.decode_address(user)}}]}
+        events = decode_block(_block(5, [_block_entry(verify, admin_key, apply_data)]), APP_ID)
+        assert events[0].payout_amount == 1_500_000
+        assert events[0].arg_uint(1) == 1
+
+    def test_watched_payments(self, accounts):
+        _, admin, user_key, user = accounts
+        treasury, stranger = account.generate_account()[1], account.generate_account()[1]
+        app_address = txn_builders.get_app_address(APP_ID)
+        top_up = PaymentTxn(user, _params(), app_address, 300_000)
+        to_treasury = PaymentTxn(user, _params(), treasury, 40_000)
+        unwatched = PaymentTxn(user, _params(), stranger, 7)
+        pay, call = txn_builders.build_bridge_intent_group(user, _params(), APP_ID,
+                                                           hashlib.sha256(b"upi").digest(), 500_000)
+        raw = _block(8, [_block_entry(t, user_key) for t in (top_up, pay, call, to_treasury, unwatched)])
+        watch = frozenset(encoding.decode_address(a) for a in (app_address, treasury))
+
+        events = decode_block(raw, APP_ID, watch=watch)
+        assert [(e.method, e.payment_amount, e.receiver) for e in events] == [
+            (PAYMENT_METHOD, 300_000, app_address),
+            ("bridgeIntent", 500_000, None),
+            (PAYMENT_METHOD, 40_000, treasury),
+        ]
+        assert events[0].tx_id == top_up.get_txid() and events[0].sender == user
+        assert [e.method for e in decode_block(raw, APP_ID)] == [PAYMENT_METHOD, "bridgeIntent"]
+
+    def test_txid_roundtrip(self, accounts):
+        admin_key, admin, _, user = accounts
+        txn = txn_builders.build_log_discipline_txn(admin, _params(), APP_ID, user, 90)
+        decoded = msgpack.unpackb(base64.b64decode(encoding.msgpack_encode(txn)), raw=False)
+        assert compute_txid(decoded) == txn.get_txid()
+
+
+class TestIndexerDecode:
+    """Indexer records decode into the same event shape."""
+
+    def test_indexer_record(self, accounts):
+        _, admin, _, user = accounts
+        record = {
+            "id": "TXID",
+            "sender": admin,
+            "confirmed-round": 9,
+            "round-time": 100,
+            "application-transaction": {
+                "application-id": APP_ID,
+                "on-completion": "noop",
+                "application-args": [
+                    base64.b64encode(b"logDiscipline").decode(),
+                    base64.b64encode(encoding.decode_address(user)).decode(),
+                    base64.b64encode((88).to_bytes(8, "big")).decode(),
+                ],
+            },
+        }
+        event = decode_indexer_txn(record)
+        assert event.method == "logDiscipline"
+        assert event.arg_account(0) == user
+        assert event.arg_uint(1) == 88
+
+
+# ── Stubs ──
+
+class _Algod:
+    def __init__(self, blocks, last, pruned_below=0):
+        self.blocks = blocks
+        self.last = last
+        self.pruned_below = pruned_below
+
+    def status(self):
+        return {"last-round": self.last}
+
+    def status_after_block(self, rnd):
+        self.last = max(self.last, rnd + 1)
+        return {"last-round": self.last}
+
+    def block_info(self, rnd, response_format="json"):
+        if rnd < self.pruned_below or rnd not in self.blocks:
+            raise AlgodHTTPError("ledger does not have entry", 404)
+        return self.blocks[rnd]
+
+
+class _Indexer:
+    def __init__(self, txns, health_round):
+        self.txns = txns
+        self.health_round = health_round
+        self.calls = []
+
+    def health(self):
+        return {"round": self.health_round}
+
+    def search_transactions(self, **kwargs):
+        self.calls.append(kwargs)
+        lo, hi = kwargs["min_round"], kwargs["max_round"]
+        if kwargs.get("txn_type") == "pay":
+            matches = [t for t in self.txns
+                       if t.get("payment-transaction", {}).get("receiver") == kwargs["address"]]
+        else:
+            matches = [t for t in self.txns if "application-transaction" in t]
+        return {"transactions": [t for t in matches if lo <= t["confirmed-round"] <= hi]}
+
+
+class TestFollowLoop:
+    """Rounds are processed in order; pruned ranges come from the indexer."""
+
+    def test_follows_blocks_and_saves_cursor(self, accounts, tmp_path):
+        admin_key, admin, _, user = accounts
+        blocks = {
+            r: _block(r, [_block_entry(txn_builders.build_apply_penalty_txn(admin, _params(), APP_ID, user), admin_key)])
+            for r in (10, 11, 12)
+        }
+        seen = []
+        cursor = str(tmp_path / "cursor")
+        ingestor = BlockIngestor(_Algod(blocks, last=12), APP_ID, on_event=seen.append,
+                                 cursor_path=cursor, clock=lambda: 1_700_000_004)
+        assert ingestor.follow(start_round=10, max_rounds=3) == 12
+        assert [e.confirmed_round for e in seen] == [10, 11, 12]
+        assert ingestor.load_cursor() == 12
+        assert ingestor.stats.latency_percentiles()[50] == 4
+
+    def test_backfills_pruned_rounds(self, accounts, tmp_path):
+        admin_key, admin, _, user = accounts
+        blocks = {
+            6: _block(6, [_block_entry(txn_builders.build_apply_penalty_txn(admin, _params(), APP_ID, user), admin_key)]),
+        }
+        record = {
+            "id": "OLD",
+            "sender": admin,
+            "confirmed-round": 3,
+            "application-transaction": {
+                "application-id": APP_ID,
+                "application-args": [base64.b64encode(b"applyPenalty").decode(),
+                                     base64.b64encode(encoding.decode_address(user)).decode()],
+            },
+        }
+        indexer = _Indexer([record], health_round=5)
+        seen = []
+        ingestor = BlockIngestor(_Algod(blocks, last=6, pruned_below=6), APP_ID, indexer_client=indexer,
+                                 on_event=seen.append, cursor_path=str(tmp_path / "cursor"))
+        assert ingestor.follow(start_round=2, max_rounds=5) == 6
+        assert [(e.tx_id, e.confirmed_round) for e in seen][0] == ("OLD", 3)
+        assert seen[-1].confirmed_round == 6
+        assert ingestor.stats.backfills == 1
+        assert ingestor.stats.backfilled_events == 1
+
+    def test_backfill_reports_payments(self, accounts, tmp_path):
+        _, _, _, user = accounts
+        treasury = account.generate_account()[1]
+        app_address = txn_builders.get_app_address(APP_ID)
+        group = base64.b64encode(b"g" * 32).decode()
+
+        def pay(txid, receiver, amount, group=None, offset=0):
+            return {"id": txid, "sender": user, "confirmed-round": 4, "intra-round-offset": offset,
+                    "group": group, "payment-transaction": {"receiver": receiver, "amount": amount}}
+
+        stake_call = {
+            "id": "CALL", "sender": user, "confirmed-round": 4, "intra-round-offset": 2, "group": group,
+            "application-transaction": {"application-id": APP_ID,
+                                        "application-args": [base64.b64encode(b"createCommitment").decode(),
+                                                             base64.b64encode(b"h" * 32).decode()]},
+        }
+        txns = [pay("TOPUP", app_address, 10, offset=0), pay("STAKE", app_address, 900, group, offset=1),
+                stake_call, pay("TREASURY", treasury, 5, offset=3)]
+        seen = []
+        ingestor = BlockIngestor(_Algod({}, last=4, pruned_below=5), APP_ID, indexer_client=_Indexer(txns, 4),
+                                 on_event=seen.append, cursor_path=None, watch_addresses=[treasury, app_address])
+        assert ingestor.backfill(4, 4) == 4
+        assert [(e.tx_id, e.method, e.payment_amount) for e in seen] == [
+            ("TOPUP", PAYMENT_METHOD, 10), ("CALL", "createCommitment", 900), ("TREASURY", PAYMENT_METHOD, 5),
+        ]
@@ -0,0 +1,153 @@
+"""
+TrackBuddy -- Bridge Ledger Tests
+
+Intents and settlements are matched like dbSync.ts, indexed for backlog
+queries, and survive a reload from the journal.
+"""
+
+import hashlib
+import json
+
+import pytest
+from algosdk import account, encoding
+
+from events import ContractEvent
+from bridge_ledger import BridgeLedger
+
+
+def _intent(tx_id, user, amount, rnd, ts, upi=b"alice@upi"):
+    return ContractEvent(
+        tx_id=tx_id, method="bridgeIntent", sender=user,
+        args=[hashlib.sha256(upi).digest()],
+        confirmed_round=rnd, round_time=ts, payment_amount=amount,
+    )
+
+
+def _settle(tx_id, admin, user, rnd):
+    return ContractEvent(
+        tx_id=tx_id, method="settleBridge", sender=admin,
+        args=[encoding.decode_address(user), hashlib.sha256(tx_id.encode()).digest()],
+        confirmed_round=rnd, round_time=0,
+    )
+
+
+@pytest.fixture
+def people():
+    return [account.generate_account()[1] for _ in range(3)]
+
+
+class TestMatching:
+    """Settlement consumes the account's latest pending intent."""
+
+    def test_locked_totals_and_matching(self, people):
+        admin, alice, bob = people
+        ledger = BridgeLedger()
+        ledger.apply(_intent("I1", alice, 1_000_000, 10, 1000))
+        ledger.apply(_intent("I2", alice, 3_000_000, 11, 1005))
+        ledger.apply(_intent("I3", bob, 2_000_000, 12, 1010, upi=b"bob@upi"))
+        assert ledger.total_locked == 6_000_000 and ledger.pending_count == 3
+
+        ledger.apply(_settle("S1", admin, alice, 13))
+        assert ledger.intents["I2"].settled and not ledger.intents["I1"].settled
+        assert ledger.locked_for(alice) == 1_000_000
+        assert ledger.total_locked == 3_000_000
+        assert [i.tx_id for i in ledger.pending_for(alice)] == ["I1"]
+
+    def test_orphan_and_duplicate_events(self, people):
+        admin, alice, _ = people
+        ledger = BridgeLedger()
+        ledger.apply(_settle("S0", admin, alice, 5))
+        ledger.apply(_intent("I1", alice, 500, 6, 100))
+        ledger.apply(_intent("I1", alice, 500, 6, 100))
+        assert ledger.orphan_settlements == 1
+        assert ledger.total_locked == 500
+
+
+class TestQueries:
+    """Age and UPI indexes."""
+
+    def test_unsettled_older_than(self, people):
+        admin, alice, bob = people
+        ledger = BridgeLedger()
+        for n, ts in enumerate((100, 200, 300, 400)):
+            ledger.apply(_intent(f"I{n}", alice if n % 2 else bob, 10, n + 1, ts))
+        ledger.apply(_settle("S", admin, bob, 9))       # settles I2 (bob's latest)
+        old = ledger.unsettled_older_than(50, now=500)
+        assert [i.tx_id for i in old] == ["I0", "I1", "I3"]
+        assert [i.tx_id for i in ledger.unsettled_older_than(250, now=500)] == ["I0", "I1"]
+        assert ledger.oldest_pending().tx_id == "I0"
+
+    def test_by_upi(self, people):
+        _, alice, bob = people
+        ledger = BridgeLedger()
+        ledger.apply(_intent("I1", alice, 10, 1, 1, upi=b"shared@upi"))
+        ledger.apply(_intent("I2", bob, 20, 2, 2, upi=b"shared@upi"))
+        assert [i.tx_id for i in ledger.by_upi(hashlib.sha256(b"shared@upi").digest())] == ["I1", "I2"]
+
+
+class TestPersistence:
+    """Journal replay and compaction."""
+
+    def test_reload_and_compact(self, people, tmp_path):
+        admin, alice, bob = people
+        path = str(tmp_path / "bridge.journal")
+        ledger = BridgeLedger(path)
+        ledger.apply(_intent("I1", alice, 7, 1, 10))
+        ledger.apply(_intent("I2", bob, 9, 2, 20))
+        ledger.apply(_settle("S1", admin, alice, 3))
+        ledger.close()
+
+        reloaded = BridgeLedger(path)
+        assert reloaded.summary() == ledger.summary()
+        assert reloaded.intents["I1"].settle_tx_id == "S1"
+
+        reloaded.compact()
+        reloaded.close()
+        compacted = BridgeLedger(path)
+        assert list(compacted.intents) == ["I2"]
+        assert compacted.total_locked == 9
+
+        # overlapping history re-ingested after the reload stays settled
+        compacted.apply(_intent("I1", alice, 7, 1, 10))
+        compacted.apply(_settle("S1", admin, alice, 3))
+        assert list(compacted.intents) == ["I2"] and compacted.pending_count == 1
+        assert compacted.total_locked == 9 and compacted.orphan_settlements == 0
+        assert compacted.last_round == 3
+        compacted.close()
+
+    def test_round_watermark(self, people, tmp_path):
+        admin, alice, bob = people
+        path = str(tmp_path / "bridge.journal")
+        ledger = BridgeLedger(path)
+        ledger.apply(_intent("I1", alice, 7, 1, 10))
+        ledger.apply(_intent("I2", bob, 9, 4, 20))
+        ledger.apply(_intent("I3", alice, 5, 4, 21))
+        assert ledger._seen == {"I2", "I3"}
+
+        # below the watermark: already applied, even if never seen by tx_id
+        ledger.apply(_intent("I0", bob, 3, 2, 15))
+        ledger.apply(_settle("S1", admin, alice, 5))
+        assert "I0" not in ledger.intents and ledger._seen == {"S1"}
+
+        ledger.compact()
+        ledger.close()
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        assert [r["tx_id"] for r in records[:-1]] == ["I1", "I2"]
+        assert records[-1] == {"t": "seen", "round": 5, "tx_ids": ["S1"]}
+
+        compacted = BridgeLedger(path)
+        assert list(compacted.intents) == ["I1", "I2"] and compacted.total_locked == 16
+        assert compacted.last_round == 5 and compacted._seen == {"S1"}
+        compacted.apply(_intent("I2", bob, 9, 4, 20))
+        compacted.apply(_settle("S1", admin, alice, 5))
+        assert compacted.pending_count == 2 and compacted.orphan_settlements == 0
+        compacted.close()
+
+    def test_intent_without_grouped_payment(self, people):
+        _, alice, _ = people
+        ledger = BridgeLedger()
+        event = _intent("I9", alice, 0, 5, 50)
+        event.payment_amount = None          # ungrouped / payment not decoded
+        ledger.apply(event)
+        assert ledger.intents["I9"].amount == 0 and ledger.pending_count == 1
@@ -0,0 +1,69 @@
+"""
+TrackBuddy -- CLI Tests
+
+Offline commands must start without algosdk or python-dotenv, and
+config settings must still resolve on first access.
+"""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+import cli
+
+
+CONTRACTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _loaded_after(code: str) -> set:
+    """Heavy modules present in a fresh interpreter after running `code`."""
+    probe = code + "\nimport sys; sys.stderr.write(' '.join(m for m in ('algosdk', 'dotenv') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", probe], cwd=CONTRACTS_DIR,
+                            capture_output=True, text=True, check=True)
+    return set(result.stderr.split())
+
+
+class TestLazyImports:
+    """Heavy dependencies load only when a command needs them."""
+
+    def test_compile_skips_network_deps(self, tmp_path):
+        codec = tmp_path / "contract_codec.py"
+        code = f"import cli; cli.main(['compile', '--artifacts', {str(tmp_path)!r}, '--codec', {str(codec)!r}])"
+        assert _loaded_after(code) == set()
+        assert (tmp_path / "approval.teal").exists() and codec.exists()
+
+    def test_config_import_is_lazy(self):
+        assert _loaded_after("import config") == set()
+        assert _loaded_after("import config; config.get_network_info()") == {"dotenv"}
+
+    def test_config_settings_resolve(self, monkeypatch):
+        import config
+        monkeypatch.setenv("ALGO_NETWORK", "localnet")
+        monkeypatch.setenv("ALGO_INDEXER_CACHE_MB", "64")
+        monkeypatch.delitem(config.__dict__, "ALGO_NETWORK", raising=False)
+        monkeypatch.delitem(config.__dict__, "ALGO_INDEXER_CACHE_MB", raising=False)
+        assert config.get_network_info()["network"] == "localnet"
+        assert config.ALGO_INDEXER_CACHE_MB == 64
+        with pytest.raises(AttributeError):
+            config.NOT_A_SETTING
+
+
+class TestDispatch:
+    """Subcommand routing and argument handling."""
+
+    def test_unknown_command(self, capsys):
+        with pytest.raises(SystemExit) as exc:
+            cli.main(["frobnicate"])
+        assert exc.value.code == 2
+        assert "Unknown command" in capsys.readouterr().out
+
+    def test_rejects_args_for_fixed_commands(self):
+        with pytest.raises(SystemExit):
+            cli.main(["verify", "--app-id", "1"])
+
+    def test_help_lists_commands(self, capsys):
+        cli.main([])
+        out = capsys.readouterr().out
+        assert all(name in out for name in cli.COMMANDS)
@@ -0,0 +1,83 @@
+"""
+TrackBuddy -- Commitment Verifier Tests
+
+Recomputed hashes must be byte-identical to the backend's
+JSON.stringify + sha256, and the pipeline must classify every record.
+"""
+
+import pytest
+from algosdk import account
+from algosdk.error import AlgodHTTPError
+
+from commitment_verifier import (
+    CommitmentRecord, commitment_hash, find_timestamp, read_records, verify,
+)
+from contract_codec import LocalState
+
+
+# Digests produced by node v20 with commitment.ts's expression.
+NODE_VECTORS = [
+    (("Ship the v2 API", "CODING", 90, 1700000000123),
+     "ebaa6ff303ccd1dbc43b29ab1660d9c010df4b06cad3be2bedc0f41dfa393879"),
+    (('naïve "quote" \\ tab\there\u0001 🚀', "STUDY", "45", 1712345678901),
+     "7608e5d3b5cb5beac37ba4a64e29703dc4bbd5be9f13218b8119ffe711030999"),
+]
+
+
+def _record(n, offset=37, duration=30):
+    start = 1_700_000_000_000 + n * 1000
+    record = CommitmentRecord(id=f"c{n}", wallet_address=account.generate_account()[1],
+                              title=f"Deep work #{n}", category="CODING", duration=duration, start_ms=start)
+    return record, commitment_hash(record.title, record.category, duration, start - offset)
+
+
+class TestHash:
+    """Python payloads reproduce JSON.stringify exactly."""
+
+    def test_numeric_duration_matches_node(self):
+        (args, digest) = NODE_VECTORS[0]
+        assert commitment_hash(*args).hex() == digest
+
+    def test_escapes_and_string_duration(self):
+        (title, category, duration, ts), digest = NODE_VECTORS[1]
+        record = CommitmentRecord("c", "w", title, category, int(duration), ts + 5)
+        assert find_timestamp(record, bytes.fromhex(digest), window_ms=10) == 5
+
+    def test_outside_window(self):
+        record, expected = _record(1, offset=50)
+        assert find_timestamp(record, expected, window_ms=49) is None
+
+
+class TestPipeline:
+    """verify() classifies records across the fetch and hashing pools."""
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_outcomes(self, workers):
+        records, chain = [], {}
+        for n in range(40):
+            record, expected = _record(n, offset=n * 7)
+            records.append(record)
+            chain[record.wallet_address] = LocalState(commitment_hash=expected)
+        chain[records[0].wallet_address] = LocalState(commitment_hash=b"\x00" * 32)
+        chain[records[1].wallet_address] = LocalState(commitment_hash=b"\x01" * 32)
+        del chain[records[2].wallet_address]
+
+        def fetch(address):
+            if address == records[3].wallet_address:
+                raise AlgodHTTPError("down", 503)
+            return chain.get(address)
+
+        seen = []
+        report = verify(records, fetch, workers=workers, batch_size=8, window_ms=300,
+                        on_result=lambda record, outcome, offset: seen.append(record.id))
+        assert report.counts == {"match": 36, "mismatch": 1, "not_opted_in": 1, "no_hash": 1, "fetch_error": 1}
+        assert report.max_offset_ms == 39 * 7
+        assert sorted(seen) == sorted(r.id for r in records)
+
+    def test_read_records(self, tmp_path):
+        path = tmp_path / "commitments.csv"
+        path.write_text("id,wallet_address,title,category,duration,start_time\n"
+                        'c1,W,"Read, then write",STUDY,25,2023-11-14 22:13:20.123\n')
+        (record,) = read_records(str(path))
+        assert record.title == "Read, then write" and record.duration == 25
+        assert record.start_ms == 1_700_000_000_123
@@ -103,6 +103,8 @@ class TestContractCompilation:
             "method_log_discipline",
             "method_bridge_intent",
             "method_settle_bridge",
+            "method_anchor_scores",
+            "method_apply_penalty_n",
         ]
         for method in required_methods:
             assert method in approval, f"Missing method: {method}"
@@ -129,8 +131,8 @@ class TestContractMetadata:
 
     def test_global_schema(self, contract_metadata):
         global_schema = contract_metadata["state_schema"]["global"]
-        assert global_schema["num_uints"] == 3
-        assert global_schema["num_byte_slices"] == 1
+        assert global_schema["num_uints"] == 4
+        assert global_schema["num_byte_slices"] == 2
 
     def test_local_schema(self, contract_metadata):
         local_schema = contract_metadata["state_schema"]["local"]
@@ -146,13 +148,18 @@ class TestContractMetadata:
             "logDiscipline",
             "bridgeIntent",
             "settleBridge",
+            "anchorScores",
+            "applyPenaltyN",
         ]
         for method_name in expected:
             assert method_name in methods, f"Missing method spec: {method_name}"
 
     def test_admin_methods_marked(self, contract_metadata):
         methods = contract_metadata["methods"]
-        admin_methods = ["verifySession", "applyPenalty", "logDiscipline", "settleBridge"]
+        admin_methods = [
+            "verifySession", "applyPenalty", "applyPenaltyN",
+            "logDiscipline", "settleBridge", "anchorScores",
+        ]
         for name in admin_methods:
             assert methods[name]["admin_only"] is True, f"{name} should be admin_only"
 
@@ -276,15 +283,30 @@ class TestTransactionConstruction:
         assert txn.type == "appl"
 
 
+    def test_anchor_scores_txn(self, test_accounts):
+        """Simulate anchorScores app call."""
+        admin = test_accounts["admin"]
+        fake_app_id = 12345
+        root = hashlib.sha256(b"daily scores").digest()
+
+        txn = ApplicationNoOpTxn(
+            sender=admin["addr"],
+            sp=_fake_params(),
+            index=fake_app_id,
+            app_args=[b"anchorScores", root, (20260219).to_bytes(8, "big")],
+        )
+        assert txn.type == "appl"
+
+
 # ── Test: State Schema Validation ──
 
 class TestStateSchema:
     """Verify state schema matches TEAL expectations."""
 
     def test_global_schema_capacity(self):
-        schema = StateSchema(num_uints=3, num_byte_slices=1)
-        assert schema.num_uints == 3
-        assert schema.num_byte_slices == 1
+        schema = StateSchema(num_uints=4, num_byte_slices=2)
+        assert schema.num_uints == 4
+        assert schema.num_byte_slices == 2
 
     def test_local_schema_capacity(self):
         schema = StateSchema(num_uints=4, num_byte_slices=1)
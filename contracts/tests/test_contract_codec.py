@@ -0,0 +1,137 @@
+"""
+TrackBuddy -- Generated Codec Tests
+
+contract_codec.py must stay in sync with artifacts/contract.json and
+agree with the hand-written builders in txn_builders.py.
+"""
+
+import os
+import json
+import base64
+import hashlib
+
+import pytest
+from algosdk import account
+
+import contract_codec as codec
+import txn_builders
+from codec_gen import render_codec, snake_case
+from loadgen import offline_params
+
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(__file__), "..", "artifacts")
+CODEC_PATH = os.path.join(os.path.dirname(__file__), "..", "contract_codec.py")
+
+
+@pytest.fixture(scope="module")
+def metadata():
+    with open(os.path.join(ARTIFACTS_DIR, "contract.json")) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def addresses():
+    return account.generate_account()[1], account.generate_account()[1]
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode()
+
+
+class TestGeneration:
+    """Checked-in codec matches the metadata it was generated from."""
+
+    def test_codec_up_to_date(self, metadata):
+        with open(CODEC_PATH) as f:
+            assert f.read() == render_codec(metadata), "rerun `python discipline_contract.py`"
+
+    def test_every_method_has_codec(self, metadata):
+        assert list(codec.METHOD_SELECTORS) == list(metadata["methods"])
+        for method in metadata["methods"]:
+            assert callable(getattr(codec, f"encode_{snake_case(method)}"))
+
+    def test_state_layout(self, metadata):
+        assert codec.LocalState._fields == tuple(metadata["state_schema"]["local"]["keys"])
+        assert codec.GlobalState._fields == tuple(metadata["state_schema"]["global"]["keys"])
+        assert codec.LOCAL_RECORD.size == 4 * 8 + 1 + codec.BYTES_WIDTH
+
+
+class TestArgs:
+    """Encoders match txn_builders; decoders invert them."""
+
+    def test_encoders_match_builders(self, addresses):
+        admin, user = addresses
+        sp = offline_params()
+        assert txn_builders.build_log_discipline_txn(admin, sp, 1, user, 87).app_args == \
+            codec.encode_log_discipline(user, 87)
+        assert txn_builders.build_verify_session_txn(admin, sp, 1, user, False).app_args == \
+            codec.encode_verify_session(user, 0)
+        assert txn_builders.build_apply_penalty_n_txn(admin, sp, 1, user, 5).app_args == \
+            codec.encode_apply_penalty_n(user, 5)
+
+    def test_roundtrip_raw_and_b64(self, addresses):
+        _, user = addresses
+        ref = hashlib.sha256(b"ref").digest()
+        args = codec.encode_settle_bridge(user, ref)
+        assert codec.decode_app_args(args) == ("settleBridge", codec.SettleBridgeArgs(user, ref))
+        assert codec.decode_app_args_b64([_b64(a) for a in args]) == \
+            ("settleBridge", codec.SettleBridgeArgs(user, ref))
+
+    def test_decode_on_chain_payment_calls(self, addresses):
+        user, _ = addresses
+        sp = offline_params()
+        digest = hashlib.sha256(b"goal").digest()
+        _, commit_call = txn_builders.build_create_commitment_group(user, sp, 1, digest, 1_000_000)
+        _, bridge_call = txn_builders.build_bridge_intent_group(user, sp, 1, digest, 500_000)
+        assert codec.encode_create_commitment(digest) == commit_call.app_args
+        assert codec.decode_app_args(commit_call.app_args) == \
+            ("createCommitment", codec.CreateCommitmentArgs(digest))
+        records = [{"id": "X", "application-transaction": {
+            "application-args": [_b64(a) for a in bridge_call.app_args]}}]
+        assert codec.decode_indexer_txns(records) == [("X", "bridgeIntent", codec.BridgeIntentArgs(digest))]
+
+    def test_unknown_method(self):
+        assert codec.decode_app_args([b"nope"]) == (None, None)
+        assert codec.decode_app_args([]) == (None, None)
+
+    def test_decode_indexer_txns(self, addresses):
+        _, user = addresses
+        records = [
+            {"id": "A", "application-transaction": {
+                "application-args": [_b64(a) for a in codec.encode_log_discipline(user, 42)]}},
+            {"id": "B", "payment-transaction": {"amount": 1}},
+            {"id": "C", "application-transaction": {"application-args": []}},
+        ]
+        assert codec.decode_indexer_txns(records) == [("A", "logDiscipline", codec.LogDisciplineArgs(user, 42))]
+
+
+class TestState:
+    """Key-value lists decode into fixed-layout records."""
+
+    def test_decode_local_state(self):
+        digest = hashlib.sha256(b"goal").digest()
+        kvs = [
+            {"key": _b64(b"violations"), "value": {"type": 2, "uint": 3}},
+            {"key": _b64(b"commitment_hash"), "value": {"type": 1, "bytes": _b64(digest)}},
+            {"key": _b64(b"stake_amount"), "value": {"type": 2, "uint": 1_000_000}},
+            {"key": _b64(b"unrelated"), "value": {"type": 2, "uint": 9}},
+        ]
+        state = codec.decode_local_state(kvs)
+        assert state == codec.LocalState(1_000_000, 0, 3, 0, digest)
+        assert codec.decode_local_state_raw({b"violations": 3, b"stake_amount": 1_000_000,
+                                             b"commitment_hash": digest}) == state
+
+    def test_pack_roundtrip(self):
+        digest = hashlib.sha256(b"goal").digest()
+        states = [codec.LocalState(i, 1, i % 3, 50, digest) for i in range(4)]
+        buffer = b"".join(codec.pack_local(s) for s in states)
+        assert codec.unpack_local(buffer, codec.LOCAL_RECORD.size * 2) == states[2]
+        assert list(codec.iter_unpack_local(buffer)) == states
+
+        for value in (b"", b"\x07" * 20):
+            state = codec.LocalState(commitment_hash=value)
+            assert codec.unpack_local(codec.pack_local(state)) == state
+        with pytest.raises(ValueError, match="40-byte value"):
+            codec.pack_local(codec.LocalState(commitment_hash=b"\x09" * 40))
+        empty = codec.GlobalState(admin=b"", score_root=b"")
+        assert codec.unpack_global(codec.pack_global(empty)) == empty
@@ -0,0 +1,51 @@
+"""
+TrackBuddy -- Cost Gate Tests
+
+The checked-in golden traces must match the current approval program,
+and an edit that adds opcodes must be caught with a per-label diff.
+"""
+
+import copy
+
+from cost_gate import capture, check, compare
+from discipline_contract import APPROVAL_PROGRAM
+
+
+def _padded(label: str, ops: int) -> str:
+    """APPROVAL_PROGRAM with `ops` no-op pairs inserted after `label`."""
+    padding = "\n".join(["  int 1", "  pop"] * ops)
+    return APPROVAL_PROGRAM.replace(f"\n{label}:\n", f"\n{label}:\n{padding}\n", 1)
+
+
+class TestGoldens:
+    """The gate itself: current costs and behavior equal the goldens."""
+
+    def test_goldens_hold(self):
+        failures, _ = check()
+        assert failures == [], "\n".join(failures)
+
+
+class TestDetection:
+    """Regressions are reported per scenario and per label."""
+
+    def test_added_opcodes_fail(self):
+        source = _padded("method_apply_penalty", 3)
+        failures, _ = check(source=source)
+        (failure,) = [f for f in failures if f.startswith("applyPenalty:")]
+        assert "cost 91 -> 97" in failure
+        assert "method_apply_penalty" in failure and "(+6)" in failure
+
+    def test_tolerance_allows_small_growth(self):
+        source = _padded("method_apply_penalty", 3)
+        failures, _ = check(tolerance=0.1, source=source)
+        assert not [f for f in failures if f.startswith("applyPenalty:")]
+
+    def test_behavior_change_ignores_tolerance(self):
+        golden = capture("applyPenalty")
+        current = copy.deepcopy(golden)
+        current["state"]["local"]["violations"] += 1
+        failures = compare(golden, current, tolerance=10.0)
+        assert len(failures) == 1 and "state changed" in failures[0]
+
+    def test_missing_golden(self):
+        assert "no golden file" in compare(None, capture("optIn"))[0]
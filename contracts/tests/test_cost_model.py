@@ -0,0 +1,94 @@
+"""
+TrackBuddy -- Cost Model Tests
+
+Closed-form expectations must agree with the workload they describe,
+strategies must only ever reduce cost, and sweeps must stay vectorized.
+"""
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+from discipline_contract import METHOD_NAMES, build_metadata
+from cost_model import sweep, compare, grid, expected_ceil_poisson, STRATEGIES, RESULT_FIELDS
+from loadgen import _poisson
+
+
+class TestExpectations:
+    """Analytic terms against direct computation."""
+
+    @pytest.mark.parametrize("lam,batch", [(0.0, 32), (0.7, 1), (1.5, 32), (40.0, 32), (6.0, 4)])
+    def test_expected_ceil_poisson(self, lam, batch):
+        exact = sum(
+            math.exp(-lam) * lam ** k / math.factorial(k) * math.ceil(k / batch)
+            for k in range(150)
+        )
+        assert expected_ceil_poisson(lam, batch) == pytest.approx(exact, rel=1e-9, abs=1e-12)
+
+    def test_penalty_calls_match_monte_carlo(self):
+        rng = random.Random(7)
+        samples = [_poisson(rng, 2.5) for _ in range(20_000)]
+        per_call = sweep(users=1, violation_rate=2.5, strategy="per_call", bridge_rate=0, opt_in_rate=0)
+        batched = sweep(users=1, violation_rate=2.5, strategy="batched", bridge_rate=0, opt_in_rate=0)
+        base = 4 + 1                  # commitment group, logDiscipline, verifySession, anchor
+        assert per_call["total_txns"] - base == pytest.approx(np.mean(samples), rel=0.03)
+        assert batched["total_txns"] - base == pytest.approx(np.mean([s > 0 for s in samples]), rel=0.03)
+
+    def test_inner_payout_fees(self):
+        result = sweep(users=1000, violation_rate=0.0, success_rate=0.8)
+        assert result["inner_txns"] == pytest.approx(800)
+        assert result["inner_fees"] == pytest.approx(800_000)
+
+    def test_min_balance_from_schema(self):
+        result = sweep(users=10)
+        # base + opt-in + 4 uints + 1 byte slice (local schema)
+        assert result["user_min_balance"] == 10 * (100_000 + 100_000 + 4 * 28_500 + 50_000)
+        assert result["admin_min_balance"] == 100_000 + 100_000 + 4 * 28_500 + 2 * 50_000
+
+
+class TestSubsets:
+    """Contracts built with a subset of methods cost only what they define."""
+
+    def test_bridge_free_contract(self):
+        no_bridge = build_metadata([m for m in METHOD_NAMES if m not in ("bridgeIntent", "settleBridge")])
+        full = sweep(users=100, violation_rate=0.0, bridge_rate=0.5, opt_in_rate=0)
+        subset = sweep(users=100, violation_rate=0.0, bridge_rate=0.5, opt_in_rate=0, contract=no_bridge)
+        assert full["total_txns"] - subset["total_txns"] == pytest.approx(100 * 0.5 * 3)    # group + settle
+        assert subset["admin_min_balance"] < full["admin_min_balance"]
+
+    def test_without_penalty_n_or_payouts(self):
+        contract = build_metadata(["createCommitment", "applyPenalty", "logDiscipline"])
+        per_call = sweep(users=10, violation_rate=2.0, strategy="per_call", contract=contract)
+        grouped = sweep(users=10, violation_rate=2.0, strategy="grouped", contract=contract)
+        assert grouped["admin_txns"] == per_call["admin_txns"]
+        assert grouped["inner_txns"] == 0
+
+
+class TestStrategies:
+    """Batching cuts transactions, grouping cuts submissions."""
+
+    def test_ordering(self):
+        results = compare(users=50_000, violation_rate=3.0)
+        assert results["batched"]["total_fees"] < results["per_call"]["total_fees"]
+        assert results["grouped"]["total_fees"] == results["batched"]["total_fees"]
+        assert results["grouped"]["submissions"] == np.ceil(results["batched"]["admin_txns"] / 16)
+
+    def test_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            sweep(strategy="magic")
+
+
+class TestSweep:
+    """Grids evaluate as flat arrays."""
+
+    def test_grid_shapes(self):
+        axes = grid(users=np.linspace(1e3, 1e6, 50), violation_rate=np.linspace(0, 5, 40), bridge_rate=[0, 0.5])
+        assert len(axes["users"]) == 4000
+        results = compare(**axes)
+        assert set(results) == set(STRATEGIES)
+        for result in results.values():
+            assert set(result) == set(RESULT_FIELDS)
+            assert all(result[name].shape == (4000,) for name in RESULT_FIELDS)
+        assert np.all(results["batched"]["total_txns"] <= results["per_call"]["total_txns"] + 1e-6)
@@ -0,0 +1,114 @@
+"""
+TrackBuddy -- Contract IR Tests
+
+The full build must reproduce the checked-in artifacts, and a build
+with a subset of methods must drop their routes, bodies and state keys
+while its metadata and codec describe exactly what was emitted.
+"""
+
+import os
+import re
+import json
+import hashlib
+
+import pytest
+
+from contract_sim import DisciplineSim, make_address
+from cost_gate import capture
+from discipline_contract import (
+    APPROVAL_PROGRAM, METHOD_NAMES, build_approval, build_metadata, compile_contract, main,
+)
+
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(__file__), "..", "artifacts")
+CODEC_PATH = os.path.join(os.path.dirname(__file__), "..", "contract_codec.py")
+
+NO_BRIDGE = [m for m in METHOD_NAMES if m not in ("bridgeIntent", "settleBridge")]
+
+
+def _keys(metadata: dict) -> set:
+    schema = metadata["state_schema"]
+    return set(schema["global"]["keys"]) | set(schema["local"]["keys"])
+
+
+class TestFullBuild:
+    """Every method selected == the checked-in contract."""
+
+    def test_artifacts_up_to_date(self):
+        with open(os.path.join(ARTIFACTS_DIR, "approval.teal")) as f:
+            assert f.read() == APPROVAL_PROGRAM.strip(), "rerun `python discipline_contract.py`"
+        with open(os.path.join(ARTIFACTS_DIR, "contract.json")) as f:
+            assert json.load(f) == build_metadata()
+
+    def test_default_selects_everything(self):
+        assert build_approval(METHOD_NAMES) == build_approval() == APPROVAL_PROGRAM
+        assert build_approval(reversed(METHOD_NAMES)) == APPROVAL_PROGRAM     # routing order is fixed
+
+
+class TestSelection:
+    """Subsets emit only what they route to."""
+
+    def test_bridge_free_build(self):
+        source, metadata = build_approval(NO_BRIDGE), build_metadata(NO_BRIDGE)
+        assert len(source) < len(APPROVAL_PROGRAM)
+        for name in ("bridgeIntent", "settleBridge", "method_bridge_intent", "total_bridge_intents"):
+            assert name not in source
+        assert list(metadata["methods"]) == NO_BRIDGE
+        assert metadata["state_schema"]["global"]["num_uints"] == 3
+        assert "total_bridge_intents" not in metadata["state_schema"]["global"]["keys"]
+
+        # shorter NoOp chain: anchorScores no longer falls through two bridge routes
+        assert capture("anchorScores", source)["cost"] == capture("anchorScores")["cost"] - 8
+
+    @pytest.mark.parametrize("methods", [NO_BRIDGE, ["logDiscipline"], ["createCommitment", "verifySession"], []])
+    def test_metadata_matches_program(self, methods):
+        source, metadata = build_approval(methods), build_metadata(methods)
+        used = set(re.findall(r'byte "(\w+)"', source)) & _keys(build_metadata())
+        assert used == _keys(metadata)
+        routed = re.findall(r'// Route: (\w+)', source)
+        assert routed == list(metadata["methods"])
+
+    def test_subset_runs(self):
+        sim = DisciplineSim(source=build_approval(["logDiscipline", "anchorScores"]))
+        user = make_address("user")
+        assert sim.created.approved and sim.opt_in(user).approved
+        assert sim.log_discipline(user, 90).approved
+        assert sim.local(user) == {"commitment_status": 0, "discipline_score": 90}     # no stake keys
+        assert not sim.apply_penalty(user).approved
+        assert not sim.bridge_intent(user, hashlib.sha256(b"upi").digest(), 1000).approved
+        assert sim.close_out(user).approved
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError, match="bridgeIntnet"):
+            build_approval(["logDiscipline", "bridgeIntnet"])
+
+
+class TestCompile:
+    """compile_contract() writes TEAL, metadata and codec from one selection."""
+
+    def test_subset_artifacts(self, tmp_path):
+        codec_path = str(tmp_path / "contract_codec.py")
+        compile_contract(NO_BRIDGE, str(tmp_path), codec_path)
+        with open(tmp_path / "approval.teal") as f:
+            assert f.read() == build_approval(NO_BRIDGE).strip()
+        with open(tmp_path / "contract.json") as f:
+            assert json.load(f) == build_metadata(NO_BRIDGE)
+        with open(codec_path) as f:
+            codec = f.read()
+        assert "def encode_anchor_scores(" in codec and "encode_settle_bridge" not in codec
+
+    def test_codec_written_next_to_artifacts(self, tmp_path):
+        with open(CODEC_PATH) as f:
+            shared = f.read()
+        main(["--methods", ",".join(NO_BRIDGE), "--artifacts", str(tmp_path)])
+        with open(tmp_path / "contract.json") as f:
+            assert json.load(f) == build_metadata(NO_BRIDGE)
+        assert "encode_settle_bridge" not in (tmp_path / "contract_codec.py").read_text()
+        with open(CODEC_PATH) as f:
+            assert f.read() == shared
+
+    def test_subset_needs_own_directory(self):
+        with pytest.raises(ValueError, match="--artifacts"):
+            compile_contract(NO_BRIDGE)
+        with pytest.raises(SystemExit):
+            main(["--methods", "logDiscipline"])
@@ -0,0 +1,177 @@
+"""
+TrackBuddy -- Idempotent Submission Tests
+
+Retries of one logical admin action must never produce a second
+transaction while the first can still confirm.
+"""
+
+import base64
+
+import msgpack
+import pytest
+from algosdk import account
+from algosdk.error import AlgodHTTPError, IndexerHTTPError
+
+from loadgen import offline_params
+from idempotent_submit import IdempotentSubmitter, SubmissionCache, derive_lease
+
+
+class _Algod:
+    """Node stub enforcing (sender, lease) exclusivity until last valid."""
+
+    def __init__(self, round_=100):
+        self.round = round_
+        self.sent = []
+        self.txids = set()
+        self.leases = {}
+        self.confirmed = {}
+
+    def suggested_params(self):
+        sp = offline_params()
+        sp.first, sp.last = self.round, self.round + 1000
+        return sp
+
+    def status(self):
+        return {"last-round": self.round}
+
+    def send_raw_transaction(self, blob):
+        stxn = msgpack.unpackb(base64.b64decode(blob), raw=False)
+        txn = stxn["txn"]
+        key = (txn["snd"], txn.get("lx"))
+        self.sent.append(txn)
+        if key in self.leases and self.leases[key] >= self.round:
+            raise AlgodHTTPError("transaction rejected: using an overlapping lease", 400)
+        if txn.get("lx"):
+            self.leases[key] = txn["lv"]
+
+    def pending_transaction_info(self, txid):
+        if txid in self.confirmed:
+            return {"confirmed-round": self.confirmed[txid]}
+        raise AlgodHTTPError("txn does not exist", 404)
+
+
+class _Indexer:
+    """Indexer stub at a given round that knows only `confirmed` txids."""
+
+    def __init__(self, round_, confirmed=None):
+        self.round = round_
+        self.confirmed = confirmed or {}
+
+    def health(self):
+        return {"round": self.round}
+
+    def transaction(self, txid):
+        if txid in self.confirmed:
+            return {"transaction": {"id": txid, "confirmed-round": self.confirmed[txid]}}
+        raise IndexerHTTPError(f"no transaction found for transaction id: {txid}")
+
+
+@pytest.fixture
+def admin():
+    return account.generate_account()
+
+
+@pytest.fixture
+def user():
+    return account.generate_account()[1]
+
+
+@pytest.fixture
+def submitter(admin, tmp_path):
+    key, addr = admin
+    return IdempotentSubmitter(_Algod(), addr, key, 777, SubmissionCache(str(tmp_path / "subs.sqlite")))
+
+
+class TestLease:
+    def test_deterministic_and_distinct(self, user):
+        assert derive_lease("applyPenalty", user, "v1") == derive_lease("applyPenalty", user, "v1")
+        assert derive_lease("applyPenalty", user, "v1") != derive_lease("applyPenalty", user, "v2")
+        assert derive_lease("applyPenalty", user, "v1") != derive_lease("logDiscipline", user, "v1")
+        assert len(derive_lease("applyPenalty", user, 1)) == 32
+
+
+class TestSubmitter:
+    """Retries collapse to one on-chain transaction per event."""
+
+    def test_retry_in_window_rebroadcasts_same_txid(self, submitter, user):
+        first = submitter.submit("applyPenalty", user, event_id="viol-1")
+        submitter.algod.round += 3
+        retry = submitter.submit("applyPenalty", user, event_id="viol-1")
+        assert first.status == "submitted" and retry.status == "pending"
+        assert retry.txid == first.txid
+        assert len({bytes(t["lx"]) for t in submitter.algod.sent}) == 1
+        assert first.last_valid == 100 + submitter.window
+
+    def test_confirmed_event_is_skipped(self, submitter, user):
+        first = submitter.submit("logDiscipline", user, event_id="2026-10-18", score=80)
+        submitter.algod.confirmed[first.txid] = 102
+        sent = len(submitter.algod.sent)
+        again = submitter.submit("logDiscipline", user, event_id="2026-10-18", score=80)
+        assert again.status == "duplicate" and again.confirmed_round == 102
+        assert len(submitter.algod.sent) == sent
+        assert submitter.counts["duplicate"] == 1
+
+    def test_expired_proven_absent_resubmits_under_same_lease(self, submitter, user):
+        first = submitter.submit("applyPenalty", user, event_id="viol-2")
+        submitter.algod.round = first.last_valid + 1
+        submitter.indexer = _Indexer(first.last_valid + 1)
+        again = submitter.submit("applyPenalty", user, event_id="viol-2")
+        assert again.status == "resubmitted"
+        assert again.txid != first.txid and again.lease == first.lease
+
+    def test_expired_without_proof_is_not_resent(self, submitter, user):
+        first = submitter.submit("applyPenalty", user, event_id="viol-7")
+        submitter.algod.round = first.last_valid + 5      # algod no longer remembers it
+        sent = len(submitter.algod.sent)
+        again = submitter.submit("applyPenalty", user, event_id="viol-7")
+        assert again.status == "unresolved" and again.txid == first.txid
+        assert len(submitter.algod.sent) == sent
+        assert submitter.counts["unresolved"] == 1
+
+        submitter.indexer = _Indexer(first.last_valid)    # indexer behind the window
+        assert submitter.submit("applyPenalty", user, event_id="viol-7").status == "unresolved"
+        submitter.indexer = _Indexer(first.last_valid + 5, {first.txid: first.last_valid})
+        assert submitter.submit("applyPenalty", user, event_id="viol-7").status == "duplicate"
+        assert len(submitter.algod.sent) == sent
+
+    def test_distinct_events_submit_independently(self, submitter, user):
+        a = submitter.submit("applyPenalty", user, event_id="viol-3")
+        b = submitter.submit("applyPenalty", user, event_id="viol-4")
+        assert a.txid != b.txid and b.status == "submitted"
+
+    def test_cache_survives_restart(self, admin, user, tmp_path):
+        key, addr = admin
+        algod = _Algod()
+        path = str(tmp_path / "subs.sqlite")
+        first = IdempotentSubmitter(algod, addr, key, 777, SubmissionCache(path)).submit(
+            "verifySession", user, event_id="sess-9", success=True)
+        restarted = IdempotentSubmitter(algod, addr, key, 777, SubmissionCache(path))
+        assert restarted.submit("verifySession", user, event_id="sess-9", success=True).txid == first.txid
+
+    def test_wait_reports_confirmation(self, submitter, user):
+        result = submitter.submit("applyPenalty", user, event_id="viol-5")
+        submitter.algod.confirmed[result.txid] = 101
+        assert submitter.wait(result, poll_secs=0).status == "confirmed"
+
+    def test_prune_keeps_pending(self, submitter, user):
+        result = submitter.submit("applyPenalty", user, event_id="viol-6")
+        assert submitter.cache.prune(result.last_valid + 1) == 0
+        assert submitter.cache.get(result.lease).status == "pending"
+        submitter.cache.mark(result.lease, "expired")
+        assert submitter.cache.prune(result.last_valid + 1) == 1
+        assert submitter.cache.get(result.lease) is None
+
+    def test_prune_keeps_confirmed_tombstone(self, submitter, user):
+        result = submitter.submit("applyPenalty", user, event_id="viol-7")
+        submitter.algod.confirmed[result.txid] = 101
+        assert submitter.wait(result, poll_secs=0).status == "confirmed"
+        assert submitter.cache.prune(result.last_valid) == 0
+        assert submitter.cache.prune(result.last_valid + 1) == 1
+        assert submitter.cache.get(result.lease).signed == b""
+
+        submitter.algod.confirmed.clear()           # algod has forgotten it
+        submitter.algod.round = result.last_valid + 5
+        sent = len(submitter.algod.sent)
+        retry = submitter.submit("applyPenalty", user, event_id="viol-7")
+        assert (retry.status, retry.txid) == ("duplicate", result.txid)
+        assert len(submitter.algod.sent) == sent
@@ -0,0 +1,90 @@
+"""
+TrackBuddy -- Indexer Cache Tests
+
+Finalized-round responses are served from SQLite; open-ended or
+not-yet-final queries always reach the indexer.
+"""
+
+import pytest
+from algosdk.v2client import indexer
+
+from indexer_cache import CachedIndexerClient, ResponseCache
+
+
+class _Network:
+    """Stands in for IndexerClient.indexer_request (the HTTP layer)."""
+
+    def __init__(self, health_round=1000):
+        self.health_round = health_round
+        self.calls = []
+
+    def request(self, method, requrl, params=None, data=None, headers=None, timeout=30):
+        if requrl == "/health":
+            return {"round": self.health_round}
+        self.calls.append((requrl, dict(params or {})))
+        return {"transactions": [{"id": f"T{len(self.calls)}"}], "current-round": self.health_round}
+
+
+@pytest.fixture
+def network(monkeypatch):
+    net = _Network()
+    monkeypatch.setattr(indexer.IndexerClient, "indexer_request",
+                        lambda client, *args, **kwargs: net.request(*args, **kwargs))
+    return net
+
+
+@pytest.fixture
+def client(tmp_path, network):
+    clock = iter(range(0, 10_000, 10))
+    return CachedIndexerClient("", "http://indexer", ResponseCache(str(tmp_path / "cache.sqlite")),
+                               clock=lambda: next(clock))
+
+
+class TestCachedIndexerClient:
+    """Only queries bounded by a finalized round are cached."""
+
+    def test_finalized_range_served_from_cache(self, client, network):
+        first = client.search_transactions(application_id=7, min_round=10, max_round=900)
+        again = client.search_transactions(application_id=7, min_round=10, max_round=900)
+        assert first == again
+        assert len(network.calls) == 1
+        assert client.cache.hits == 1 and client.cache.misses == 1
+
+    def test_unfinalized_and_unbounded_bypass(self, client, network):
+        client.search_transactions(application_id=7, min_round=10, max_round=5000)
+        client.search_transactions(application_id=7, min_round=10, max_round=5000)
+        client.search_transactions(application_id=7)
+        assert len(network.calls) == 3
+        assert client.bypassed == 3
+        assert len(client.cache) == 0
+
+    def test_point_in_time_and_block_lookups(self, client, network):
+        client.account_info("ADDR", round_num=500)
+        client.account_info("ADDR", round_num=500)
+        client.block_info(block=42)
+        client.block_info(block=42)
+        assert len(network.calls) == 2
+
+    def test_persists_across_instances(self, tmp_path, network):
+        path = str(tmp_path / "cache.sqlite")
+        CachedIndexerClient("", "http://indexer", ResponseCache(path)).block_info(block=5)
+        reopened = CachedIndexerClient("", "http://indexer", ResponseCache(path))
+        reopened.block_info(block=5)
+        assert len(network.calls) == 1
+        assert reopened.cache.stats()["hit_rate"] == 1.0
+
+
+class TestResponseCache:
+    """Size-bounded LRU eviction."""
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / "lru.sqlite"))
+        cache.put("a", {"v": "x" * 10})
+        cache.max_bytes = cache.size * 2
+        cache.put("b", {"v": "x" * 10})
+        assert cache.get("a") is not None     # a is now most recent
+        cache.put("c", {"v": "x" * 10})
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.evictions == 1
+        assert cache.size <= cache.max_bytes
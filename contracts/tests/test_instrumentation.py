@@ -0,0 +1,104 @@
+"""
+TrackBuddy -- Instrumentation Tests
+
+Disabled instrumentation must leave clients untouched; enabled, it must
+count, time and size requests and export them in Prometheus format.
+"""
+
+import json
+import urllib.request
+
+import pytest
+from algosdk import account
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client.algod import AlgodClient
+
+import instrumentation
+
+
+@pytest.fixture
+def metrics():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield instrumentation
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def _client(responder):
+    client = AlgodClient("a" * 64, "http://algod.invalid")
+    client.algod_request = lambda method, requrl, params=None, data=None, headers=None, **kw: responder(requrl)
+    return client
+
+
+class TestDisabled:
+    """No wrapping and no spans when off."""
+
+    def test_instrument_is_identity(self):
+        client = _client(lambda url: {})
+        request = client.algod_request
+        assert instrumentation.instrument(client, "algod") is client
+        assert client.algod_request is request
+        assert instrumentation.span("x") is instrumentation.span("y")
+
+
+class TestRecording:
+    """Per-endpoint counts, latency, bytes and errors."""
+
+    def test_requests_by_normalized_endpoint(self, metrics):
+        client = metrics.instrument(_client(lambda url: {"amount": 5}), "algod")
+        for _ in range(3):
+            client.account_info(account.generate_account()[1])
+        client.block_info(1234, response_format="msgpack")
+        endpoint = "/accounts/{address}"
+        assert metrics.REQUESTS.value("algod", "GET", endpoint, "ok") == 3
+        assert metrics.LATENCY.count("algod", endpoint) == 3
+        assert metrics.BYTES.value("algod", endpoint, "received") == 3 * len('{"amount":5}')
+        assert metrics.REQUESTS.value("algod", "GET", "/blocks/{id}", "ok") == 1
+
+    def test_error_status(self, metrics):
+        def fail(url):
+            raise AlgodHTTPError("missing", 404)
+        client = metrics.instrument(_client(fail), "algod")
+        with pytest.raises(AlgodHTTPError):
+            client.application_info(99)
+        assert metrics.REQUESTS.value("algod", "GET", "/applications/{id}", "404") == 1
+
+    def test_retries_and_confirmation_rounds(self, metrics):
+        metrics.record_retry("submit.applyPenalty", "resubmitted")
+        metrics.record_confirmation("deploy", 3)
+        text = metrics.render()
+        assert 'trackbuddy_retries_total{operation="submit.applyPenalty",reason="resubmitted"} 1' in text
+        assert 'trackbuddy_confirmation_rounds_bucket{operation="deploy",le="2"} 0' in text
+        assert 'trackbuddy_confirmation_rounds_bucket{operation="deploy",le="3"} 1' in text
+        assert 'trackbuddy_confirmation_rounds_count{operation="deploy"} 1' in text
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        assert instrumentation.percentile(values, 50) == 50
+        assert instrumentation.percentile(values, 99) == 99
+        assert instrumentation.percentile([], 50) == 0.0
+
+
+class TestExport:
+    """HTTP endpoint and span log."""
+
+    def test_metrics_endpoint(self, metrics):
+        metrics.record_retry("ingest.block", "unavailable")
+        server = metrics.serve(0)
+        port = server.server_address[1]
+        body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode()
+        assert "# TYPE trackbuddy_request_seconds histogram" in body
+        assert 'operation="ingest.block"' in body
+
+    def test_nested_spans(self, metrics, tmp_path):
+        path = tmp_path / "spans.jsonl"
+        metrics.enable(trace_path=str(path))
+        client = metrics.instrument(_client(lambda url: {}), "algod")
+        with metrics.span("deploy.send", txid="T"):
+            client.status()
+        metrics.disable()
+        inner, outer = [json.loads(line) for line in path.read_text().splitlines()]
+        assert outer["name"] == "deploy.send" and outer["parent_id"] is None and outer["txid"] == "T"
+        assert inner["name"] == "algod GET /status"
+        assert inner["trace_id"] == outer["trace_id"] and inner["parent_id"] == outer["span_id"]
@@ -0,0 +1,98 @@
+"""
+TrackBuddy -- Compact Ledger Tests
+
+Checks the array-backed ledger against the approval program's
+transitions (via the offline simulator) and its memory-mapped
+persistence.
+"""
+
+import hashlib
+import numpy as np
+import pytest
+
+from contract_sim import DisciplineSim, make_address
+from ledger import CompactLedger, STATUS_ACTIVE, STATUS_COMPLETED, STATUS_FAILED
+
+
+@pytest.fixture
+def ledger():
+    ledger = CompactLedger(100)
+    ledger.opt_in(np.arange(100))
+    ledger.create_commitment(np.arange(100), np.full(100, 1_000_003), np.zeros((100, 32), dtype=np.uint8))
+    return ledger
+
+
+class TestTransitions:
+    """Bulk updates match on-chain semantics."""
+
+    def test_penalty_matches_contract_rounding(self, ledger):
+        sim = DisciplineSim()
+        user = make_address("user")
+        sim.opt_in(user)
+        sim.create_commitment(user, b"h" * 32, 1_000_003)
+        for _ in range(7):
+            assert sim.apply_penalty(user).approved
+
+        assert ledger.apply_penalty([5] * 7) == 7
+        assert ledger.get(5)["stake_amount"] == sim.local(user)["stake_amount"]
+        assert ledger.get(5)["violations"] == 7
+
+    def test_penalty_skips_inactive(self, ledger):
+        ledger.verify_session([1], True)
+        assert ledger.apply_penalty([1, 2]) == 1
+        assert ledger.get(1)["violations"] == 0
+
+    def test_verify_session_totals(self, ledger):
+        paid, forfeited = ledger.verify_session([0, 1, 2], [True, False, True])
+        assert paid == 2 * 1_000_003
+        assert forfeited == 1_000_003
+        assert ledger.commitment_status[0] == STATUS_COMPLETED
+        assert ledger.commitment_status[1] == STATUS_FAILED
+        assert ledger.count_status(STATUS_ACTIVE) == 97
+
+    def test_active_commitment_not_overwritten(self, ledger):
+        ok = ledger.create_commitment([3], [5], [b"x" * 32])
+        assert not ok.any()
+        assert ledger.get(3)["stake_amount"] == 1_000_003
+
+    def test_score_range(self, ledger):
+        with pytest.raises(ValueError):
+            ledger.log_discipline([0], [101])
+        ledger.log_discipline([0, 1], [100, 0])
+        assert ledger.get(0)["discipline_score"] == 100
+
+    def test_hash_roundtrip(self, ledger):
+        digest = hashlib.sha256(b"goal").digest()
+        ledger.set(9, commitment_hash=digest)
+        assert ledger.get(9)["commitment_hash"] == digest
+        ledger.set(9, commitment_hash=b"")
+        assert ledger.get(9)["commitment_hash"] == b""
+
+
+class TestPersistence:
+    """Saved ledgers reopen as memory-mapped columns."""
+
+    def test_save_and_open(self, ledger, tmp_path):
+        ledger.apply_penalty([4, 4])
+        path = str(tmp_path / "ledger.bin")
+        ledger.save(path)
+
+        mapped = CompactLedger.open(path)
+        assert isinstance(mapped.stake_amount, np.memmap)
+        assert mapped.capacity == 100
+        assert mapped.get(4) == ledger.get(4)
+        assert mapped.total_staked() == ledger.total_staked()
+
+    def test_file_backed_writes_through(self, tmp_path):
+        path = str(tmp_path / "ledger.bin")
+        live = CompactLedger.create(path, 10)
+        live.opt_in([2])
+        live.set(2, stake_amount=42, commitment_status=STATUS_ACTIVE)
+        live.flush()
+        assert CompactLedger.open(path).get(2)["stake_amount"] == 42
+
+    def test_rejects_foreign_file(self, tmp_path):
+        path = tmp_path / "junk.bin"
+        path.write_bytes(b"\0" * 128)
+        with pytest.raises(ValueError):
+            CompactLedger.open(str(path))
@@ -0,0 +1,96 @@
+"""
+TrackBuddy -- Load Generator Tests
+
+Validates the synthetic workload model, the Python transaction
+builders it drives, and the harness report in dry-run mode.
+"""
+
+from collections import Counter, defaultdict
+from algosdk import account, encoding
+
+import txn_builders
+from loadgen import (
+    WorkloadConfig,
+    LoadHarness,
+    generate_workload,
+    offline_params,
+)
+
+
+# ── Test: Transaction Builders ──
+
+class TestTransactionBuilders:
+    """Builders encode accounts as public keys and reference them."""
+
+    def test_admin_call_references_account(self):
+        _, admin = account.generate_account()
+        _, user = account.generate_account()
+        txn = txn_builders.build_apply_penalty_txn(admin, offline_params(), 12345, user)
+        assert txn.app_args[1] == encoding.decode_address(user)
+        assert txn.accounts == [user]
+
+    def test_verify_success_covers_inner_fee(self):
+        _, admin = account.generate_account()
+        _, user = account.generate_account()
+        sp = offline_params()
+        ok = txn_builders.build_verify_session_txn(admin, sp, 12345, user, True)
+        failed = txn_builders.build_verify_session_txn(admin, sp, 12345, user, False)
+        assert ok.fee == 2 * failed.fee
+        assert sp.fee == 1000  # caller's params untouched
+
+    def test_payment_groups_target_app_address(self):
+        _, user = account.generate_account()
+        group = txn_builders.build_create_commitment_group(user, offline_params(), 12345, b"h" * 32, 5000)
+        assert group[0].receiver == txn_builders.get_app_address(12345)
+        assert group[0].group == group[1].group
+
+
+# ── Test: Workload Model ──
+
+class TestWorkload:
+    """Generated lifecycles are time ordered and causally consistent."""
+
+    def test_ops_are_time_ordered(self):
+        ops = list(generate_workload(WorkloadConfig(users=200, seed=7)))
+        times = [op.at for op in ops]
+        assert times == sorted(times)
+
+    def test_lifecycle_order_per_user(self):
+        ops = list(generate_workload(WorkloadConfig(users=200, bridge_rate=0.5, seed=7)))
+        per_user = defaultdict(list)
+        for op in ops:
+            per_user[op.user].append(op.method)
+        assert len(per_user) == 200
+        for methods in per_user.values():
+            assert methods[:2] == ["optIn", "createCommitment"]
+            verify = methods.index("verifySession")
+            assert "applyPenalty" not in methods[verify:]
+            if "settleBridge" in methods:
+                assert methods.index("bridgeIntent") < methods.index("settleBridge")
+
+    def test_seed_is_deterministic(self):
+        cfg = WorkloadConfig(users=50, seed=3)
+        first = [(op.method, op.user, op.value) for op in generate_workload(cfg)]
+        second = [(op.method, op.user, op.value) for op in generate_workload(cfg)]
+        assert first == second
+
+
+# ── Test: Harness ──
+
+class TestHarness:
+    """Dry runs build and sign every transaction without a network."""
+
+    def test_dry_run_report(self):
+        admin_key, _ = account.generate_account()
+        cfg = WorkloadConfig(users=20, bridge_rate=1.0, seed=1)
+        ops = list(generate_workload(cfg))
+        report = LoadHarness(None, 12345, admin_key, rate=0).run(ops)
+
+        methods = Counter(op.method for op in ops)
+        assert report.errors == 0
+        assert report.ops == len(ops)
+        assert report.by_method == methods
+        # two-txn groups for commitments and bridge intents
+        assert report.txns == len(ops) + methods["createCommitment"] + methods["bridgeIntent"]
+        assert report.fees >= report.txns * 1000
+        assert "txns/sec" in report.summary()
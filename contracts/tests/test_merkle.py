@@ -0,0 +1,204 @@
+"""
+TrackBuddy -- Score Merkle Anchoring Tests
+
+Covers the streaming tree builder, inclusion proofs and the
+anchorScores contract method (via the offline simulator).
+"""
+
+import base64
+import hashlib
+import datetime
+import pytest
+from algosdk import encoding
+
+import merkle
+from merkle import MerkleTree, build_tree, leaf_hash, node_hash, verify_proof
+from contract_sim import DisciplineSim, make_address
+
+
+def _scores(n):
+    return [(make_address(f"user-{i}"), i % 101) for i in range(n)]
+
+
+def _naive_root(scores):
+    level = [leaf_hash(a, s) for a, s in scores]
+    while len(level) > 1:
+        nxt = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0]
+
+
+class TestTreeBuilder:
+    """Streaming builder matches an in-memory reference."""
+
+    @pytest.mark.parametrize("n", [1, 2, 3, 7, 8, 17])
+    def test_root_and_proofs(self, tmp_path, n):
+        scores = _scores(n)
+        path = str(tmp_path / "t.merkle")
+        root = build_tree(iter(scores), path, 20260219)
+        assert root == _naive_root(scores)
+
+        with MerkleTree(path) as tree:
+            assert tree.root == root
+            assert tree.leaf_count == n
+            assert tree.day == 20260219
+            for i, (address, score) in enumerate(scores):
+                assert tree.record(i) == (address, score)
+                assert verify_proof(root, address, score, tree.proof(i))
+
+    def test_chunked_reduction(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(merkle, "CHUNK_NODES", 4)
+        scores = _scores(29)
+        root = build_tree(scores, str(tmp_path / "t.merkle"), 1)
+        assert root == _naive_root(scores)
+
+    def test_rejects_bad_scores(self, tmp_path):
+        with pytest.raises(ValueError):
+            build_tree([(make_address("x"), 101)], str(tmp_path / "t.merkle"), 1)
+        with pytest.raises(ValueError):
+            build_tree([], str(tmp_path / "t.merkle"), 1)
+
+    def test_rejects_duplicate_addresses(self, tmp_path):
+        scores = _scores(5) + [(make_address("user-2"), 40)]
+        with pytest.raises(ValueError, match="duplicate address at leaf 5"):
+            build_tree(scores, str(tmp_path / "t.merkle"), 1)
+
+
+class TestProofs:
+    """Proofs are bound to the account, score and root."""
+
+    def test_tampered_score_fails(self, tmp_path):
+        scores = _scores(10)
+        path = str(tmp_path / "t.merkle")
+        root = build_tree(scores, path, 1)
+        with MerkleTree(path) as tree:
+            proof = tree.proof(3)
+        address, score = scores[3]
+        assert not verify_proof(root, address, score + 1, proof)
+        assert not verify_proof(root, scores[4][0], score, proof)
+
+    def test_proof_for_address_is_json_ready(self, tmp_path):
+        scores = _scores(10)
+        path = str(tmp_path / "t.merkle")
+        root = build_tree(scores, path, 20260219)
+        with MerkleTree(path) as tree:
+            proof = tree.proof_for(scores[6][0])
+        assert proof["index"] == 6
+        assert proof["root"] == root.hex()
+        assert verify_proof(root, proof["address"], proof["score"], proof["proof"])
+
+
+class _Algod:
+    def __init__(self, sim):
+        self.sim = sim
+
+    def application_info(self, app_id):
+        state = self.sim.global_state()
+        return {"params": {"global-state": [
+            {"key": base64.b64encode(b"admin").decode(),
+             "value": {"bytes": base64.b64encode(state["admin"]).decode()}},
+            {"key": base64.b64encode(b"score_root").decode(),
+             "value": {"bytes": base64.b64encode(state["score_root"]).decode()}},
+            {"key": base64.b64encode(b"score_day").decode(), "value": {"uint": state["score_day"]}},
+        ]}}
+
+
+class _Indexer:
+    """Applies the sender and start_time filters; one record per page."""
+
+    def __init__(self, records):
+        self.records = records
+        self.queries = []
+        self.pages = 0
+
+    def search_transactions(self, application_id, limit, next_page=None, start_time=None, address=None,
+                            address_role=None):
+        self.pages += 1
+        if next_page is None:
+            self.queries.append({"start_time": start_time, "address": address, "address_role": address_role})
+        since = datetime.datetime.strptime(start_time, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=datetime.timezone.utc)
+        matches = [r for r in self.records if r["round-time"] >= since.timestamp()
+                   and (address is None or r["sender"] == address)]
+        start = int(next_page or 0)
+        return {"transactions": matches[start:start + 1], "next-token": str(start + 1)}
+
+
+def _posted(day: int) -> int:
+    """Round time just after `day` ends (UTC), when its scores are anchored."""
+    end = datetime.datetime.strptime(str(day), "%Y%m%d").replace(tzinfo=datetime.timezone.utc)
+    return int((end + datetime.timedelta(days=1, minutes=30)).timestamp())
+
+
+def _app_record(method, sender, day, args, logs=()):
+    return {"id": f"{method}-{day}", "sender": sender, "round-time": _posted(day),
+            "logs": [base64.b64encode(entry).decode() for entry in logs],
+            "application-transaction": {"application-id": 1, "application-args": [
+                base64.b64encode(a).decode() for a in [method.encode(), *args]]}}
+
+
+class TestAnchorHistory:
+    """verify --app-id looks up the anchor for the proof's own day."""
+
+    @pytest.fixture
+    def chain(self):
+        sim, records = DisciplineSim(), []
+        admin = encoding.encode_address(sim.admin)
+        user = encoding.encode_address(make_address("user"))
+        decoy = (20260210).to_bytes(8, "big") + hashlib.sha256(b"decoy").digest()
+        records.append(_app_record("logDiscipline", admin, 20260210, [b"x" * 32], [decoy]))
+        roots = {day: hashlib.sha256(str(day).encode()).digest() for day in (20260217, 20260218, 20260219)}
+        for day, root in roots.items():
+            records.append(_app_record("createCommitment", user, day, [b"h" * 32]))
+            result = sim.anchor_scores(root, day)
+            records.append(_app_record("anchorScores", admin, day, [root, day.to_bytes(8, "big")], result.logs))
+        return _Algod(sim), records, roots, admin
+
+    def test_latest_day_from_global_state(self, chain):
+        algod, records, roots, _ = chain
+        indexer = _Indexer(records)
+        assert merkle.anchored_root(algod, indexer, 1, 20260219) == roots[20260219]
+        assert indexer.pages == 0
+
+    def test_earlier_day_from_narrowed_search(self, chain):
+        algod, records, roots, admin = chain
+        indexer = _Indexer(records)
+        assert merkle.anchored_root(algod, indexer, 1, 20260218) == roots[20260218]
+        assert indexer.queries == [{"start_time": "2026-02-17T00:00:00Z", "address": admin, "address_role": "sender"}]
+        assert indexer.pages == 2            # anchors of 02-17 and 02-18 only; user calls filtered out
+        assert merkle.anchored_root(algod, _Indexer(records), 1, 20260217) == roots[20260217]
+
+    def test_unanchored_days(self, chain):
+        algod, records, _, _ = chain
+        indexer = _Indexer(records)
+        assert merkle.anchored_root(algod, indexer, 1, 20260210) is None    # only a non-anchor log
+        assert indexer.pages == 2            # stops at the 02-17 anchor
+        assert merkle.anchored_root(algod, _Indexer(records), 1, 20260301) is None
+
+
+class TestAnchorScoresMethod:
+    """On-chain anchoring stores one root per day regardless of user count."""
+
+    def test_anchor_updates_global_state(self):
+        sim = DisciplineSim()
+        root = hashlib.sha256(b"day1").digest()
+        result = sim.anchor_scores(root, 20260219)
+        assert result.approved, result.error
+        state = sim.global_state()
+        assert state["score_root"] == root
+        assert state["score_day"] == 20260219
+        assert result.logs == [(20260219).to_bytes(8, "big") + root]
+
+    def test_day_must_advance(self):
+        sim = DisciplineSim()
+        root = hashlib.sha256(b"day1").digest()
+        assert sim.anchor_scores(root, 20260219).approved
+        assert not sim.anchor_scores(root, 20260219).approved
+        assert sim.anchor_scores(root, 20260220).approved
+
+    def test_admin_only_and_root_length(self):
+        sim = DisciplineSim()
+        root = hashlib.sha256(b"day1").digest()
+        assert not sim.anchor_scores(root, 1, sender=make_address("mallory")).approved
+        assert not sim.anchor_scores(root[:31], 1).approved
@@ -0,0 +1,111 @@
+"""
+TrackBuddy -- Coalesced Penalty Tests
+
+applyPenaltyN must match repeated applyPenalty exactly, and the
+coalescer must batch bursts per account within its window.
+"""
+
+import pytest
+from algosdk import account
+
+from contract_sim import DisciplineSim, make_address
+from penalty_coalescer import PenaltyCoalescer, compound_penalty, MAX_PENALTIES_PER_CALL
+from loadgen import offline_params
+
+
+def _committed(stake):
+    sim = DisciplineSim()
+    user = make_address("user")
+    sim.opt_in(user)
+    assert sim.create_commitment(user, b"h" * 32, stake).approved
+    return sim, user
+
+
+class TestApplyPenaltyN:
+    """On-chain method equals `count` successive applyPenalty calls."""
+
+    @pytest.mark.parametrize("stake,count", [(1_000_003, 1), (1_000_003, 5), (999_999_999, 32), (7, 3), (19, 32)])
+    def test_matches_repeated_penalties(self, stake, count):
+        batched, user = _committed(stake)
+        assert batched.apply_penalty_n(user, count).approved
+
+        single, _ = _committed(stake)
+        for _ in range(count):
+            assert single.apply_penalty(user).approved
+
+        assert batched.local(user) == single.local(user)
+        assert batched.global_state() == single.global_state()
+        assert batched.local(user)["stake_amount"] == compound_penalty(stake, count)
+
+    def test_count_bounds(self):
+        sim, user = _committed(1_000_000)
+        assert not sim.apply_penalty_n(user, 0).approved
+        assert not sim.apply_penalty_n(user, MAX_PENALTIES_PER_CALL + 1).approved
+        result = sim.apply_penalty_n(user, MAX_PENALTIES_PER_CALL)
+        assert result.approved
+        assert result.cost <= 700
+
+    def test_admin_only(self):
+        sim, user = _committed(1_000_000)
+        assert not sim.apply_penalty_n(user, 2, sender=make_address("mallory")).approved
+
+
+class TestCoalescer:
+    """Violation bursts collapse into one call per account per window."""
+
+    def test_window_batches_bursts(self):
+        coalescer = PenaltyCoalescer(window_secs=10)
+        for t in (0, 1, 2, 3, 4):
+            coalescer.add("A", at=t)
+        coalescer.add("B", at=5)
+        assert coalescer.due(now=9) == []
+
+        ready = coalescer.due(now=10)
+        assert [(b.account, b.count) for b in ready] == [("A", 5)]
+        assert len(coalescer) == 1
+
+        ready = coalescer.due(now=15)
+        assert [(b.account, b.count) for b in ready] == [("B", 1)]
+        assert coalescer.reduction == 3.0
+
+    def test_large_bursts_split(self):
+        coalescer = PenaltyCoalescer(window_secs=1, max_per_call=32)
+        for i in range(70):
+            coalescer.add("A", event_id=i, at=0)
+        ready = coalescer.drain()
+        assert [b.count for b in ready] == [32, 32, 6]
+        assert ready[2].event_ids == list(range(64, 70))
+
+    def test_out_of_order_timestamps(self):
+        coalescer = PenaltyCoalescer(window_secs=10)
+        coalescer.add("A", at=8)
+        coalescer.add("B", at=1)
+        coalescer.add("A", event_id="a-early", at=2)
+        assert [(b.account, b.first_seen) for b in coalescer.due(now=11)] == [("B", 1)]
+        ready = coalescer.due(now=12)
+        assert [(b.account, b.count, b.first_seen) for b in ready] == [("A", 2, 2)]
+        assert ready[0].event_ids == ["a-early", None]
+        assert coalescer.due(now=20) == [] and len(coalescer) == 0
+
+    def test_ids_stay_aligned_with_events(self):
+        coalescer = PenaltyCoalescer(window_secs=1, max_per_call=2)
+        for i, event_id in enumerate([None, "x", None, "y", "z"]):
+            coalescer.add("A", event_id=event_id, at=i)
+        ready = coalescer.drain()
+        assert [(b.count, b.event_ids) for b in ready] == [(2, [None, "x"]), (2, [None, "y"]), (1, ["z"])]
+        assert [b.first_seen for b in ready] == [0, 2, 4]
+
+    def test_build_txns(self):
+        _, admin = account.generate_account()
+        _, user = account.generate_account()
+        coalescer = PenaltyCoalescer(window_secs=0)
+        coalescer.add(user, at=0)
+        coalescer.add(user, at=0)
+        txns = coalescer.build_txns(coalescer.due(now=0), admin, offline_params(), 12345)
+        assert len(txns) == 1
+        assert txns[0].app_args[0] == b"applyPenaltyN"
+        assert int.from_bytes(txns[0].app_args[2], "big") == 2
+
+    def test_rejects_invalid_bound(self):
+        with pytest.raises(ValueError):
+            PenaltyCoalescer(max_per_call=MAX_PENALTIES_PER_CALL + 1)
@@ -0,0 +1,160 @@
+"""
+TrackBuddy -- Singleflight Tests
+
+Overlapping identical reads must reach algod once and fan out to every
+caller; different keys, sends and failures must not be merged wrongly.
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from algosdk import account
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client.algod import AlgodClient
+
+import instrumentation
+from singleflight import Singleflight, coalesce
+
+
+class _Node:
+    """algod_request stub that holds each call open until released."""
+
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.release = threading.Event()
+        self.fail = fail
+
+    def request(self, method, requrl, params=None, data=None, headers=None, **kwargs):
+        self.calls.append((method, requrl))
+        self.release.wait(5)
+        if self.fail:
+            raise AlgodHTTPError("node down", 503)
+        return {"round": 100, "app-local-state": {"key-value": []}, "path": requrl}
+
+
+@pytest.fixture
+def node():
+    return _Node()
+
+
+def _client(node):
+    client = AlgodClient("a" * 64, "http://algod.invalid")
+    client.algod_request = node.request
+    return coalesce(client, "algod")
+
+
+def _concurrently(fn, count: int, node: _Node) -> list:
+    with ThreadPoolExecutor(count) as pool:
+        futures = [pool.submit(fn) for _ in range(count)]
+        while len(node.calls) < 1:
+            time.sleep(0.001)
+        time.sleep(0.05)                 # let the rest join while the leader is held
+        node.release.set()
+        return [f.result() for f in futures]
+
+
+class TestCoalescing:
+    """One HTTP call per key while in flight."""
+
+    def test_identical_reads_share_one_call(self, node):
+        client = _client(node)
+        user = account.generate_account()[1]
+        results = _concurrently(lambda: client.account_application_info(user, 1234), 16, node)
+        assert len(node.calls) == 1
+        assert all(r == results[0] for r in results)
+        results[0]["round"] = 0          # joiners hold copies
+        assert results[1]["round"] == 100
+        assert client.singleflight.stats() == {"calls": 16, "executions": 1, "coalesced": 15,
+                                               "hit_rate": 15 / 16}
+        assert client.singleflight.in_flight() == 0
+
+    def test_distinct_keys_are_not_merged(self, node):
+        client = _client(node)
+        users = [account.generate_account()[1] for _ in range(4)]
+        counter = iter(range(16))
+        lock = threading.Lock()
+
+        def read():
+            with lock:
+                i = next(counter)
+            return client.account_application_info(users[i % 4], 1234 + i % 2)
+
+        results = _concurrently(read, 16, node)
+        assert len(node.calls) == 4 and len({r["path"] for r in results}) == 4
+        # a finished call is not cached
+        client.account_application_info(users[0], 1234)
+        assert len(node.calls) == 5
+
+    def test_errors_fan_out(self):
+        node = _Node(fail=True)
+        client = _client(node)
+        user = account.generate_account()[1]
+
+        def read():
+            with pytest.raises(AlgodHTTPError):
+                client.account_application_info(user, 1)
+            return True
+
+        assert all(_concurrently(read, 8, node))
+        assert len(node.calls) == 1
+
+    def test_leader_mutation_not_shared(self):
+        group, release, gate = Singleflight(), threading.Event(), threading.Event()
+
+        class _Gated:
+            """Copies after the first block until `gate` is set."""
+            copies = 0
+
+            def __deepcopy__(self, memo):
+                _Gated.copies += 1
+                if _Gated.copies > 1:
+                    gate.wait(5)
+                return _Gated()
+
+        def fetch():
+            release.wait(5)
+            return {"gated": _Gated(), "amount": 1}
+
+        with ThreadPoolExecutor(4) as pool:
+            leader = pool.submit(group.do, "k", fetch)
+            while not group.in_flight():
+                time.sleep(0.001)
+            joiners = [pool.submit(group.do, "k", fetch) for _ in range(3)]
+            while group.coalesced < 3:
+                time.sleep(0.001)
+            release.set()
+            result, joined = leader.result(5)
+            result["amount"] = 99           # joiners are still copying
+            gate.set()
+            assert not joined
+            assert [(r["amount"], j) for r, j in (f.result(5) for f in joiners)] == [(1, True)] * 3
+
+    def test_non_get_passes_through(self):
+        calls = []
+        group = Singleflight()
+        client = AlgodClient("a" * 64, "http://algod.invalid")
+        client.algod_request = lambda method, requrl, params=None, data=None, headers=None, **kw: calls.append(method)
+        coalesce(client, "algod", group)
+        client.algod_request("POST", "/transactions", data=b"x")
+        assert calls == ["POST"] and group.stats()["calls"] == 0
+
+
+class TestMetrics:
+    """Leader / joined counts per normalized endpoint."""
+
+    def test_roles_recorded(self, node):
+        instrumentation.reset()
+        instrumentation.enable()
+        try:
+            client = _client(node)
+            user = account.generate_account()[1]
+            _concurrently(lambda: client.account_application_info(user, 7), 5, node)
+            endpoint = "/accounts/{address}/applications/{id}"
+            assert instrumentation.COALESCED.value("algod", endpoint, "leader") == 1
+            assert instrumentation.COALESCED.value("algod", endpoint, "joined") == 4
+            assert "trackbuddy_coalesced_requests_total" in instrumentation.render()
+        finally:
+            instrumentation.disable()
+            instrumentation.reset()
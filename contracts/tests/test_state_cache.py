@@ -0,0 +1,139 @@
+"""
+TrackBuddy -- Shared State Cache Tests
+
+Parallel workers must share one fetch per account per round, and a
+newer round must invalidate every entry read before it.
+"""
+
+import time
+import uuid
+import multiprocessing
+
+import pytest
+from algosdk import account
+from algosdk.error import AlgodHTTPError
+
+from contract_codec import LocalState
+from state_cache import SharedStateCache, algod_fetcher
+
+
+def _state(n):
+    return LocalState(stake_amount=n, commitment_status=1, violations=0, discipline_score=n % 101,
+                      commitment_hash=bytes([n % 256]) * 32)
+
+
+@pytest.fixture
+def cache():
+    cache = SharedStateCache.create(f"tb-test-{uuid.uuid4().hex[:12]}", capacity=256)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def users():
+    return [account.generate_account()[1] for _ in range(12)]
+
+
+def _worker(name, users, rnd, log_path):
+    cache = SharedStateCache.attach(name)
+
+    def fetch(address):
+        with open(log_path, "a") as f:
+            f.write(address + "\n")
+        time.sleep(0.02)
+        return _state(users.index(address))
+
+    for address in users:
+        assert cache.get(address, rnd, fetch) == _state(users.index(address))
+    cache.close()
+
+
+class TestSharing:
+    """One fetch per account per round across processes."""
+
+    def test_parallel_workers_share_fetches(self, cache, users, tmp_path):
+        log_path = str(tmp_path / "fetches.log")
+        ctx = multiprocessing.get_context("fork")
+        workers = [ctx.Process(target=_worker, args=(cache.name, users, 100, log_path)) for _ in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join(30)
+            assert w.exitcode == 0
+        with open(log_path) as f:
+            fetched = f.read().split()
+        assert sorted(fetched) == sorted(users)
+        stats = cache.stats()
+        assert stats["misses"] == len(users)
+        assert stats["hits"] == 3 * len(users)
+
+    def test_not_opted_in_is_cached(self, cache, users):
+        calls = []
+        fetch = lambda address: calls.append(address)       # returns None
+        assert cache.get(users[0], 5, fetch) is None
+        assert cache.get(users[0], 5, fetch) is None
+        assert calls == [users[0]]
+
+    def test_hit_matches_fetch(self, cache, users):
+        states = [LocalState(), _state(1)._replace(commitment_hash=b"\x07" * 20),
+                  _state(2)._replace(commitment_hash=b"\x09" * 40)]
+        calls = []
+
+        def fetch(address):
+            calls.append(address)
+            return states[users.index(address)]
+
+        for _ in range(2):
+            assert [cache.get(u, 5, fetch) for u in users[:3]] == states
+        assert calls == users[:3] + users[2:3]       # wider than the record: never cached
+
+
+class TestInvalidation:
+    """Entries are valid only for the newest observed round."""
+
+    def test_newer_round_refetches(self, cache, users):
+        calls = []
+
+        def fetch(address):
+            calls.append(address)
+            return _state(len(calls))
+
+        assert cache.get(users[0], 10, fetch) == _state(1)
+        assert cache.get(users[0], 10, fetch) == _state(1)
+        assert cache.observe_round(11)
+        assert cache.get(users[0], 10, fetch) == _state(2)   # older caller still sees the refetch
+        assert len(calls) == 2
+        assert cache.stats()["stale"] == 1
+
+    def test_failed_fetch_releases_slot(self, cache, users):
+        def boom(address):
+            raise AlgodHTTPError("down", 503)
+        with pytest.raises(AlgodHTTPError):
+            cache.get(users[0], 3, boom)
+        assert cache.get(users[0], 3, lambda address: _state(9)) == _state(9)
+
+    def test_overflow_still_returns(self, users):
+        small = SharedStateCache.create(f"tb-test-{uuid.uuid4().hex[:12]}", capacity=4)
+        try:
+            results = [small.get(u, 1, lambda address: _state(1)) for u in users]
+            assert results == [_state(1)] * len(users)
+            assert small.stats()["overflow"] == len(users) - 4
+        finally:
+            small.close()
+
+
+class TestFetcher:
+    """algod_fetcher decodes account_application_info."""
+
+    def test_decodes_and_maps_404(self, users):
+        class Algod:
+            def account_application_info(self, address, app_id):
+                if address == users[1]:
+                    raise AlgodHTTPError("not opted in", 404)
+                return {"app-local-state": {"key-value": [
+                    {"key": "c3Rha2VfYW1vdW50", "value": {"type": 2, "uint": 500}},
+                ]}}
+
+        fetch = algod_fetcher(Algod(), 1234)
+        assert fetch(users[0]).stake_amount == 500
+        assert fetch(users[1]) is None
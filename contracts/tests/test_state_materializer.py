@@ -0,0 +1,128 @@
+"""
+TrackBuddy -- State Materializer Tests
+
+Replayed events reproduce the contract's state transitions, checkpoints
+land on interval boundaries, and as-of queries match a full replay.
+"""
+
+import hashlib
+
+import pytest
+from algosdk import account, encoding
+
+from events import PAYMENT_METHOD, ContractEvent
+from state_materializer import StateMaterializer
+
+
+def _event(tx_id, method, sender, rnd, args=(), payment=None):
+    return ContractEvent(
+        tx_id=tx_id, method=method, sender=sender, args=list(args),
+        confirmed_round=rnd, round_time=1_700_000_000 + rnd * 3, payment_amount=payment,
+    )
+
+
+def _pk(address):
+    return encoding.decode_address(address)
+
+
+@pytest.fixture
+def people():
+    return [account.generate_account()[1] for _ in range(3)]
+
+
+@pytest.fixture
+def history(people):
+    admin, alice, bob = people
+    return [
+        _event("T1", "optIn", alice, 5),
+        _event("T2", "createCommitment", alice, 6, [hashlib.sha256(b"code").digest()], payment=2_000_000),
+        _event("T3", "optIn", bob, 12),
+        _event("T4", "createCommitment", bob, 14, [hashlib.sha256(b"read").digest()], payment=1_000_000),
+        _event("T5", "applyPenalty", admin, 18, [_pk(bob)]),
+        _event("T6", "logDiscipline", admin, 23, [_pk(alice), (88).to_bytes(8, "big")]),
+        _event("T7", "verifySession", admin, 27, [_pk(alice), (1).to_bytes(8, "big")]),
+    ]
+
+
+class TestReplay:
+    """Events drive the approval program's transitions."""
+
+    def test_live_state(self, people, history, tmp_path):
+        admin, alice, bob = people
+        mat = StateMaterializer(str(tmp_path), app_id=77, admin=admin, interval=10)
+        for event in history:
+            mat.apply(event)
+        assert mat.rejected == []
+        assert mat.local_as_of(alice, 30)["commitment_status"] == 2
+        assert mat.local_as_of(alice, 30)["discipline_score"] == 88
+        assert mat.local_as_of(bob, 30)["violations"] == 1
+        assert mat.checkpoints == [0, 10, 20]
+
+    def test_rejected_event_recorded(self, people, tmp_path):
+        admin, alice, _ = people
+        mat = StateMaterializer(str(tmp_path), app_id=77, admin=admin, interval=10)
+        mat.apply(_event("X", "applyPenalty", alice, 3, [_pk(alice)]))
+        assert [tx for tx, _ in mat.rejected] == ["X"]
+
+    def test_watched_payment_credits_app(self, people, history, tmp_path):
+        admin, alice, _ = people
+        mat = StateMaterializer(str(tmp_path), app_id=77, admin=admin, interval=10)
+        for event in history[:2]:
+            mat.apply(event)
+        app_address = encoding.encode_address(mat.state_as_of(6).address)
+        top_up = _event("P", PAYMENT_METHOD, alice, 8, payment=250_000)
+        top_up.receiver = app_address
+        mat.apply(top_up)
+        assert mat.rejected == []
+        assert mat.state_as_of(8).balances[_pk(app_address)] == mat.state_as_of(6).balances[_pk(app_address)] + 250_000
+
+
+class TestTimeTravel:
+    """As-of queries load the nearest checkpoint and replay the delta."""
+
+    def test_as_of_matches_prefix_replay(self, people, history, tmp_path):
+        admin, _, _ = people
+        mat = StateMaterializer(str(tmp_path / "full"), app_id=77, admin=admin, interval=10)
+        for event in history:
+            mat.apply(event)
+        for rnd in (4, 6, 13, 20, 25, 27):
+            prefix = StateMaterializer(str(tmp_path / f"p{rnd}"), app_id=77, admin=admin, interval=10)
+            for event in history:
+                if event.confirmed_round <= rnd:
+                    prefix.apply(event)
+            assert mat.state_as_of(rnd).locals == prefix.state.locals
+            assert mat.state_as_of(rnd).globals == prefix.state.globals
+
+    def test_before_opt_in_is_none(self, people, history, tmp_path):
+        admin, _, bob = people
+        mat = StateMaterializer(str(tmp_path), app_id=77, admin=admin, interval=10)
+        for event in history:
+            mat.apply(event)
+        assert mat.local_as_of(bob, 11) is None
+        with pytest.raises(ValueError):
+            StateMaterializer(str(tmp_path / "late"), app_id=77, admin=admin, start_round=100).state_as_of(50)
+
+    def test_reopen_restores_tip(self, people, history, tmp_path):
+        admin, alice, _ = people
+        mat = StateMaterializer(str(tmp_path), app_id=77, admin=admin, interval=10)
+        for event in history[:6]:
+            mat.apply(event)
+        reopened = StateMaterializer(str(tmp_path))
+        assert reopened.state.locals == mat.state.locals
+        reopened.apply(history[6])
+        assert reopened.local_as_of(alice, 27)["commitment_status"] == 2
+
+    def test_redelivered_round_is_skipped(self, people, history, tmp_path):
+        admin, _, bob = people
+        mat = StateMaterializer(str(tmp_path), app_id=77, admin=admin, interval=10)
+        for event in history[:5]:
+            mat.apply(event)
+        before = mat.local_as_of(bob, 18)
+        assert mat.apply(history[4]) is False                  # same round fed again
+        reopened = StateMaterializer(str(tmp_path))             # crash before the cursor was saved
+        assert reopened.apply(history[4]) is False
+        reopened.checkpoint()
+        assert StateMaterializer(str(tmp_path)).apply(history[4]) is False
+        assert reopened.duplicates == 1
+        assert reopened.local_as_of(bob, 18) == before and before["violations"] == 1
+        assert reopened.apply(history[5]) is True
@@ -0,0 +1,66 @@
+"""
+TrackBuddy -- Tracer & Profiler Tests
+
+Validates opcode traces, cost aggregation across runs and the
+folded-stack export format.
+"""
+
+from contract_sim import run_scenario, make_address
+from teal_profile import ExecutionTrace, Profiler
+
+
+class TestExecutionTrace:
+    """Every executed opcode is recorded with its location."""
+
+    def test_trace_matches_cost(self):
+        trace = ExecutionTrace()
+        _, result = run_scenario("applyPenalty", tracer=trace)
+        assert result.approved
+        assert trace.total_cost == result.cost
+        assert len(trace.steps) == result.steps
+
+    def test_callsub_frames_recorded(self):
+        trace = ExecutionTrace()
+        run_scenario("applyPenalty", tracer=trace)
+        in_admin = [s for s in trace.steps if s.label == "is_admin"]
+        assert in_admin
+        assert all(s.frames == ("method_apply_penalty",) for s in in_admin)
+
+    def test_stack_depth_tracked(self):
+        trace = ExecutionTrace()
+        run_scenario("logDiscipline", tracer=trace)
+        assert trace.steps[0].stack_depth == 0
+        assert max(s.stack_depth for s in trace.steps) >= 2
+
+
+class TestProfiler:
+    """Aggregates are consistent across runs and export formats."""
+
+    def test_aggregates_across_runs(self):
+        profiler = Profiler()
+        for i in range(5):
+            profiler.profile_scenario("applyPenalty", user=make_address(f"u{i}"))
+        assert profiler.runs == 5
+        assert len(set(profiler.run_costs)) == 1
+        total = sum(profiler.run_costs)
+        assert sum(profiler.by_label.values()) == total
+        assert sum(profiler.by_line.values()) == total
+        assert sum(profiler.folded.values()) == total
+        assert profiler.label_histogram()["method_apply_penalty"]["runs"] == 5
+
+    def test_folded_format(self, tmp_path):
+        profiler = Profiler()
+        profiler.profile_scenario("verifySession:success")
+        path = tmp_path / "out.folded"
+        profiler.write_folded(str(path))
+        lines = path.read_text().strip().splitlines()
+        assert "approval;method_verify_session;is_admin 5" in lines
+        for line in lines:
+            stack, cost = line.rsplit(" ", 1)
+            assert stack.startswith("approval")
+            assert int(cost) > 0
+
+    def test_report_mentions_hot_label(self):
+        profiler = Profiler()
+        profiler.profile_scenario("applyPenalty")
+        assert "method_apply_penalty" in profiler.report()
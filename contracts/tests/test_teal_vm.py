@@ -0,0 +1,108 @@
+"""
+TrackBuddy -- Offline Evaluator Tests
+
+Executes the approval program through teal_vm via the contract
+simulator and checks state transitions, access control and
+AVM failure semantics.
+"""
+
+import hashlib
+import pytest
+
+import teal_vm
+from contract_sim import DisciplineSim, make_address, SCENARIOS, run_scenario
+
+
+# ── Fixtures ──
+
+@pytest.fixture
+def sim():
+    return DisciplineSim()
+
+
+@pytest.fixture
+def user():
+    return make_address("user")
+
+
+def _commit(sim, user, stake=1_000_000):
+    assert sim.opt_in(user).approved
+    result = sim.create_commitment(user, hashlib.sha256(b"goal").digest(), stake)
+    assert result.approved, result.error
+    return result
+
+
+# ── Test: Assembler ──
+
+class TestAssembler:
+    """TEAL source assembles with labels and source lines."""
+
+    def test_labels_resolved(self):
+        program = teal_vm.assemble("#pragma version 8\nint 1\nbnz done\nerr\ndone:\nint 1\nreturn\n")
+        assert program.labels["done"] == 3
+        assert program.instructions[0].line == 2
+
+    def test_unknown_label_rejected(self):
+        with pytest.raises(teal_vm.TealError):
+            teal_vm.assemble("#pragma version 8\nb nowhere\n")
+
+    def test_comments_and_strings(self):
+        program = teal_vm.assemble('#pragma version 8\nbyte "a // b"  // trailing\npop\n')
+        assert program.instructions[0].args == (b"a // b",)
+
+
+# ── Test: Contract Lifecycle ──
+
+class TestLifecycle:
+    """Approval program state transitions through the evaluator."""
+
+    def test_create_initializes_globals(self, sim):
+        state = sim.global_state()
+        assert state["admin"] == sim.admin
+        assert state["total_commitments"] == 0
+
+    def test_commitment_and_penalty(self, sim, user):
+        _commit(sim, user)
+        assert sim.apply_penalty(user).approved
+        local = sim.local(user)
+        assert local["stake_amount"] == 900_000
+        assert local["violations"] == 1
+        assert sim.global_state()["total_penalties"] == 1
+
+    def test_verify_success_pays_stake_back(self, sim, user):
+        _commit(sim, user, stake=2_000_000)
+        result = sim.verify_session(user, True)
+        assert result.approved
+        assert result.inner_txns[0]["Amount"] == 2_000_000
+        assert result.inner_txns[0]["Receiver"] == user
+        assert sim.local(user)["commitment_status"] == 2
+
+    def test_non_admin_rejected_and_reverted(self, sim, user):
+        _commit(sim, user)
+        result = sim.apply_penalty(user, sender=make_address("mallory"))
+        assert not result.approved
+        assert sim.local(user)["stake_amount"] == 1_000_000
+
+    def test_score_range_enforced(self, sim, user):
+        sim.opt_in(user)
+        assert not sim.log_discipline(user, 101).approved
+        assert sim.log_discipline(user, 100).approved
+
+    def test_second_active_commitment_rejected(self, sim, user):
+        _commit(sim, user)
+        result = sim.create_commitment(user, b"x" * 32, 5)
+        assert not result.approved
+        # payment in the failed group is reverted too
+        assert sim.state.balances[sim.app_address] == 1_000_000
+
+    def test_unavailable_account_rejected(self, sim, user):
+        _commit(sim, user)
+        txn = teal_vm.app_call(sim.admin, sim.app_id, [b"applyPenalty", user])  # no Accounts entry
+        result = sim.execute([txn])
+        assert not result.approved
+        assert "unavailable Account" in result.error
+
+    def test_all_scenarios_approve(self):
+        for name in SCENARIOS:
+            _, result = run_scenario(name)
+            assert result.approved, f"{name}: {result.error}"
@@ -0,0 +1,148 @@
+"""
+TrackBuddy -- Transaction Archive Tests
+
+Archived signed bytes must come back byte-identical by txid and by
+round range, survive a torn write, and resubmit with groups intact.
+"""
+
+import os
+import base64
+
+import msgpack
+import pytest
+from algosdk import account, encoding
+from algosdk.error import AlgodHTTPError
+
+from admin_scheduler import AdminScheduler
+from idempotent_submit import IdempotentSubmitter, SubmissionCache
+from loadgen import offline_params
+from txn_archive import TxnArchive, main
+from txn_builders import build_log_discipline_txn
+
+
+@pytest.fixture
+def admin():
+    return account.generate_account()
+
+
+@pytest.fixture
+def users():
+    return [account.generate_account()[1] for _ in range(4)]
+
+
+def _signed(admin, user, first, score=50, window=10):
+    key, addr = admin
+    sp = offline_params()
+    sp.first, sp.last = first, first + window
+    stxn = build_log_discipline_txn(addr, sp, 777, user, score).sign(key)
+    return stxn.get_txid(), base64.b64decode(encoding.msgpack_encode(stxn))
+
+
+class _Algod:
+    def __init__(self, round_=100):
+        self.round = round_
+        self.sent = []
+
+    def suggested_params(self):
+        sp = offline_params()
+        sp.first, sp.last = self.round, self.round + 1000
+        return sp
+
+    def status(self):
+        return {"last-round": self.round - 1}
+
+    def send_raw_transaction(self, blob):
+        raw = base64.b64decode(blob)
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(raw)
+        txns = [s["txn"] for s in unpacker]
+        if any(t["apaa"][-1] == (13).to_bytes(8, "big") for t in txns):     # score 13 "landed" already
+            raise AlgodHTTPError("TransactionPool.Remember: transaction already in ledger", 400)
+        self.sent.append(txns)
+
+    def send_transactions(self, signed):
+        self.sent.append(signed)
+        return signed[0].get_txid()
+
+
+class TestArchive:
+    """Lookups and range scans return the archived bytes without copying."""
+
+    def test_lookup_and_ranges(self, admin, users, tmp_path):
+        archived = {}
+        with TxnArchive(str(tmp_path)) as archive:
+            for i in range(30):
+                txid, signed = _signed(admin, users[i % 4], first=1000 + 10 * i, score=i)
+                archive.append(signed)
+                archived[txid] = signed
+            view = archive.get(txid)
+            assert isinstance(view, memoryview) and view == signed      # found via the recent dict
+
+        with TxnArchive(str(tmp_path), readonly=True) as archive:           # found via the sorted index
+            assert len(archive) == 30
+            for txid, signed in archived.items():
+                assert bytes(archive.get(txid)) == signed
+            assert archive.get("A" * 52) is None
+            firsts = [entry.first_valid for entry, _ in archive.iter_rounds(1100, 1190)]
+            assert firsts == list(range(1100, 1200, 10))
+            assert all(archived[entry.txid] == bytes(view) for entry, view in archive.iter_rounds(1100, 1190))
+            with pytest.raises(PermissionError):
+                archive.append(signed)
+
+    def test_torn_tail_is_dropped(self, admin, users, tmp_path):
+        with TxnArchive(str(tmp_path)) as archive:
+            for i in range(3):
+                archive.append(_signed(admin, users[0], first=10 + i)[1])
+        with open(tmp_path / "data.bin", "ab") as f:
+            f.write(b"\x82\xa3sig")                                          # crash mid-append
+        with open(tmp_path / "index.bin", "ab") as f:
+            f.write(b"\x01" * 40)
+        with TxnArchive(str(tmp_path)) as archive:
+            assert len(archive) == 3
+            txid, signed = _signed(admin, users[1], first=20)
+            archive.append(signed)
+            assert bytes(archive.get(txid)) == signed
+
+    def test_single_writer(self, admin, users, tmp_path, monkeypatch):
+        import config
+        with TxnArchive(str(tmp_path)) as writer:
+            for i in range(3):
+                writer.append(_signed(admin, users[0], first=100 + i)[1])
+            with open(tmp_path / "data.bin", "ab") as f:
+                f.write(b"\x82\xa3sig")                                      # writer mid-append
+            size = os.path.getsize(tmp_path / "data.bin")
+            with pytest.raises(RuntimeError, match="already open for writing"):
+                TxnArchive(str(tmp_path))
+            monkeypatch.setattr(config, "get_algod_client", lambda: _Algod(round_=101))
+            main([str(tmp_path), "resubmit"])                                   # reads only
+            assert os.path.getsize(tmp_path / "data.bin") == size
+        with TxnArchive(str(tmp_path)) as reopened:                             # lock released on close
+            assert len(reopened) == 3
+
+
+class TestResubmit:
+    """Still-valid entries go back out, atomic groups in one send."""
+
+    def test_bulk_resubmit(self, admin, users, tmp_path):
+        key, addr = admin
+        algod = _Algod(round_=100)
+        scheduler = AdminScheduler(group_size=3)
+        for i, user in enumerate(users[:3]):
+            scheduler.enqueue("logDiscipline", user, score=60 + i)
+        with TxnArchive(str(tmp_path)) as archive:
+            scheduler.send_round(algod, addr, key, 777, archive=archive)        # one group of 3
+            archive.append(_signed(admin, users[3], first=95, score=13)[1])     # already confirmed
+            archive.append(_signed(admin, users[3], first=40, score=14)[1])     # expired at 50
+
+            counts = archive.resubmit(algod)
+            assert counts == {"sent": 1, "duplicate": 1, "rejected": 0}
+            (group,) = algod.sent[1:]
+            assert [t["apaa"][2] for t in group] == [s.to_bytes(8, "big") for s in (60, 61, 62)]
+
+    def test_submitter_archives_before_send(self, admin, users, tmp_path):
+        key, addr = admin
+        with TxnArchive(str(tmp_path / "archive")) as archive:
+            submitter = IdempotentSubmitter(_Algod(), addr, key, 777,
+                                            SubmissionCache(str(tmp_path / "subs.sqlite")), archive=archive)
+            result = submitter.submit("applyPenalty", users[0], event_id="v1")
+            assert archive.entry(result.txid).last_valid == result.last_valid
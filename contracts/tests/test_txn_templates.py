@@ -0,0 +1,121 @@
+"""
+TrackBuddy -- Transaction Template Tests
+
+Patched templates must encode and sign byte-for-byte like algosdk.
+"""
+
+import base64
+import hashlib
+
+import msgpack
+import pytest
+from algosdk import account, encoding
+
+import txn_builders
+from loadgen import offline_params
+from txn_templates import TxnTemplate, pack_uint, txid
+
+
+APP_ID = 98765
+
+
+@pytest.fixture
+def admin():
+    return account.generate_account()
+
+
+@pytest.fixture
+def users():
+    return [account.generate_account()[1] for _ in range(3)]
+
+
+def _sdk_bytes(obj) -> bytes:
+    return base64.b64decode(encoding.msgpack_encode(obj))
+
+
+def _params(first, last):
+    sp = offline_params()
+    sp.first, sp.last = first, last
+    return sp
+
+
+class TestEncoding:
+    """Every method template matches the algosdk builder."""
+
+    # Rounds chosen to exercise every msgpack uint width.
+    ROUNDS = [(1, 127), (128, 255), (300, 1300), (70_000, 71_000), (40_000_000, 40_001_000), (2**32, 2**32 + 5)]
+
+    @pytest.mark.parametrize("first,last", ROUNDS)
+    def test_log_discipline(self, admin, users, first, last):
+        _, addr = admin
+        template = TxnTemplate("logDiscipline", addr, offline_params(), APP_ID)
+        for score, user in zip((0, 55, 100), users):
+            expected = txn_builders.build_log_discipline_txn(addr, _params(first, last), APP_ID, user, score)
+            encoded = template.encode(first, last, account=user, score=score)
+            assert encoded == _sdk_bytes(expected)
+            assert txid(encoded) == expected.get_txid()
+
+    @pytest.mark.parametrize("success", [True, False])
+    def test_verify_session_fee_variants(self, admin, users, success):
+        _, addr = admin
+        template = TxnTemplate("verifySession", addr, offline_params(), APP_ID, success=success)
+        expected = txn_builders.build_verify_session_txn(addr, _params(500, 1500), APP_ID, users[0], success)
+        assert template.encode(500, 1500, account=users[0]) == _sdk_bytes(expected)
+
+    def test_other_methods(self, admin, users):
+        _, addr = admin
+        ref = hashlib.sha256(b"ref").digest()
+        sp = _params(9, 1009)
+        cases = [
+            ("applyPenalty", {"account": users[0]},
+             txn_builders.build_apply_penalty_txn(addr, sp, APP_ID, users[0])),
+            ("applyPenaltyN", {"account": users[1], "count": 7},
+             txn_builders.build_apply_penalty_n_txn(addr, sp, APP_ID, users[1], 7)),
+            ("settleBridge", {"account": users[2], "ref_hash": ref},
+             txn_builders.build_settle_bridge_txn(addr, sp, APP_ID, users[2], ref)),
+        ]
+        for method, values, expected in cases:
+            template = TxnTemplate(method, addr, offline_params(), APP_ID)
+            assert template.encode(9, 1009, **values) == _sdk_bytes(expected)
+
+    def test_lease_and_raw_account_keys(self, admin, users):
+        _, addr = admin
+        lease = hashlib.sha256(b"lease").digest()
+        template = TxnTemplate("applyPenalty", addr, offline_params(), APP_ID, lease=True)
+        expected = txn_builders.build_apply_penalty_txn(addr, _params(42, 1042), APP_ID, users[0])
+        expected.lease = lease
+        encoded = template.encode(42, 1042, account=encoding.decode_address(users[0]), lease=lease)
+        assert encoded == _sdk_bytes(expected)
+
+    def test_default_window_follows_params(self, admin, users):
+        _, addr = admin
+        template = TxnTemplate("applyPenalty", addr, offline_params(), APP_ID)
+        sp = offline_params()
+        expected = txn_builders.build_apply_penalty_txn(addr, _params(10, 10 + sp.last - sp.first), APP_ID, users[0])
+        assert template.encode(10, account=users[0]) == _sdk_bytes(expected)
+
+    def test_pack_uint_is_canonical(self):
+        for value in (0, 1, 127, 128, 255, 256, 65535, 65536, 2**32 - 1, 2**32, 2**64 - 1):
+            assert pack_uint(value) == msgpack.packb(value)
+
+
+class TestSigning:
+    """sign() matches SignedTransaction encoding."""
+
+    def test_signed_bytes_match(self, admin, users):
+        key, addr = admin
+        template = TxnTemplate("logDiscipline", addr, offline_params(), APP_ID)
+        expected = txn_builders.build_log_discipline_txn(addr, _params(77, 1077), APP_ID, users[0], 64)
+        signed = template.sign(template.encode(77, 1077, account=users[0], score=64), key)
+        assert signed == _sdk_bytes(expected.sign(key))
+
+    def test_rejects_foreign_key(self, admin):
+        _, addr = admin
+        other_key, _ = account.generate_account()
+        template = TxnTemplate("applyPenalty", addr, offline_params(), APP_ID)
+        with pytest.raises(ValueError):
+            template.sign(template.encode(1, account=addr), other_key)
+
+    def test_unknown_method(self, admin):
+        with pytest.raises(ValueError):
+            TxnTemplate("createCommitment", admin[1], offline_params(), APP_ID)
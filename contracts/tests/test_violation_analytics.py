@@ -0,0 +1,135 @@
+"""
+TrackBuddy -- Violation Analytics Tests
+
+Sketch estimates must bound the true counts from above, heavy hitters
+must surface the most penalized accounts, and memory must stay fixed
+as the stream grows.
+"""
+
+import random
+import hashlib
+from collections import Counter
+
+import pytest
+from algosdk import encoding
+
+from events import ContractEvent
+from violation_analytics import ViolationAnalytics
+
+
+T0 = 1_700_000_000
+
+
+def _event(method, address, *uints, rnd=1, at=T0):
+    args = [encoding.decode_address(address)] + [u.to_bytes(8, "big") for u in uints]
+    return ContractEvent(tx_id=f"T{rnd}", method=method, sender="ADMIN", args=args,
+                         confirmed_round=rnd, round_time=at)
+
+
+@pytest.fixture(scope="module")
+def users():
+    """Fixed addresses: sketch error bounds are probabilistic, so keep the hashing reproducible."""
+    return [encoding.encode_address(hashlib.sha256(b"user%d" % i).digest()) for i in range(300)]
+
+
+@pytest.fixture(scope="module")
+def stream(users):
+    """Zipf-ish penalties: a few accounts dominate; every account has sessions."""
+    rng = random.Random(11)
+    events, truth = [], Counter()
+    for i in range(6000):
+        user = users[min(int(rng.paretovariate(1.2)) - 1, len(users) - 1)]
+        at = T0 + i * 60
+        if rng.random() < 0.1:
+            events.append(_event("applyPenaltyN", user, 3, rnd=i, at=at))
+            truth[user] += 3
+        else:
+            events.append(_event("applyPenalty", user, rnd=i, at=at))
+            truth[user] += 1
+        events.append(_event("verifySession", users[i % len(users)], i % 2, rnd=i, at=at))
+    return events, truth
+
+
+class TestEstimates:
+    """Count-min bounds and heavy hitters."""
+
+    def test_sketch_never_underestimates(self, users, stream):
+        events, truth = stream
+        analytics = ViolationAnalytics(width=256, depth=4)
+        analytics.consume_all(events)
+        total = sum(truth.values())
+        for user in users:
+            estimate = analytics.user(user)["violations"]
+            assert truth[user] <= estimate <= truth[user] + 4 * total / 256
+
+    def test_heavy_hitters(self, stream):
+        events, truth = stream
+        analytics = ViolationAnalytics(top_k=16)
+        analytics.consume_all(events)
+        top = analytics.heavy_hitters(5)
+        assert [address for address, _, _ in top] == [address for address, _ in truth.most_common(5)]
+        for address, count, error in top:
+            assert count - error <= truth[address] <= count
+
+    def test_memory_is_fixed(self, stream):
+        events, _ = stream
+        analytics = ViolationAnalytics()
+        before = analytics.memory_bytes()
+        analytics.consume_all(events)
+        assert analytics.memory_bytes() == before
+        assert len(analytics.heavy.counts) <= analytics.heavy.k
+
+
+class TestWindow:
+    """Sliding-window totals follow round time."""
+
+    def test_expiry(self, users):
+        analytics = ViolationAnalytics(bucket_secs=60, buckets=10)
+        analytics.consume(_event("applyPenalty", users[0], at=T0))
+        analytics.consume(_event("verifySession", users[0], 0, at=T0 + 30))
+        analytics.consume(_event("applyPenalty", users[1], at=T0 + 300))
+        summary = analytics.summary()
+        assert summary["window_penalties"] == 2 and summary["window_failure_rate"] == 1.0
+
+        analytics.consume(_event("applyPenalty", users[1], at=T0 + 630))    # T0's bucket drops out
+        assert analytics.summary()["window_penalties"] == 2
+        assert analytics.user(users[0])["window_violations"] == 0
+        assert analytics.user(users[0])["violations"] == 1                  # all-time still counts it
+        assert analytics.user(users[1])["window_violations"] == 2
+
+        analytics.consume(_event("applyPenalty", users[2], at=T0))          # late, outside the window
+        assert analytics.summary()["window_penalties"] == 2
+        assert analytics.user(users[2])["violations"] == 1
+
+
+class TestSnapshot:
+    """snapshot() / restore() resume the stream exactly."""
+
+    def test_round_trip(self, users, stream, tmp_path):
+        events, _ = stream
+        whole = ViolationAnalytics()
+        whole.consume_all(events)
+
+        first = ViolationAnalytics()
+        first.consume_all(events[:5000])
+        first.save(str(tmp_path / "state.msgpack"))
+        resumed = ViolationAnalytics.load(str(tmp_path / "state.msgpack"))
+        resumed.consume_all(events[5000:])
+
+        assert resumed.summary() == whole.summary()
+        assert resumed.heavy_hitters() == whole.heavy_hitters()
+        for user in users[:20]:
+            assert resumed.user(user) == whole.user(user)
+
+    def test_overlap_after_restore_is_skipped(self, users, stream):
+        events, _ = stream
+        whole = ViolationAnalytics()
+        whole.consume_all(events)
+
+        first = ViolationAnalytics()
+        first.consume_all(events[:5000])
+        resumed = ViolationAnalytics.restore(first.snapshot())
+        resumed.consume_all(events[4000:])                  # re-fed overlap
+        assert resumed.skipped == 1000
+        assert resumed.summary() == whole.summary()
+        assert resumed.heavy_hitters() == whole.heavy_hitters()
@@ -0,0 +1,337 @@
+"""
+TrackBuddy -- Signed Transaction Archive
+
+The submission cache drops signed bytes once a lease window closes, and
+admin_scheduler keeps nothing, so after a node outage the only way to
+resend admin calls was to rebuild and re-sign them. TxnArchive keeps
+every signed admin transaction in an append-only directory:
+
+    data.bin     signed transactions (msgpack), back to back
+    index.bin    16-byte header + one INDEX_ENTRY per transaction:
+                 txid, group id, first / last valid round, offset, length
+
+Both files are read through mmap. get() and iter_rounds() return
+memoryview slices of the data map, so audits and bulk resubmission never
+copy transaction bytes. Lookups by txid binary-search a sorted copy of
+the index's 8-byte txid prefixes built at open; entries appended since
+are kept in a small dict until the next rebuild.
+
+One process appends (submitters pass the archive in); any number may
+open it read-only. The writer holds an exclusive fcntl lock on index.bin
+for as long as it is open, so a second writer fails fast instead of
+truncating a live writer's in-progress append. A crash can leave a torn
+tail in either file; the writer drops it on open, under that lock.
+
+Usage:
+    archive = TxnArchive("txn-archive/")
+    submitter = IdempotentSubmitter(algod, admin, key, app_id, archive=archive)
+    scheduler.send_round(algod, admin, key, app_id, archive=archive)
+    ...
+    python txn_archive.py txn-archive/ show TXID
+    python txn_archive.py txn-archive/ rounds --from-round 1000 --to-round 2000
+    python txn_archive.py txn-archive/ resubmit           # still-valid entries, groups intact
+"""
+
+import os
+import sys
+import mmap
+import fcntl
+import base64
+import argparse
+from dataclasses import dataclass
+
+import msgpack
+import numpy as np
+from algosdk import encoding
+from algosdk.error import AlgodHTTPError
+
+from events import compute_txid
+from idempotent_submit import DUPLICATE_ERRORS
+
+
+MAGIC = b"TBTXARC1"
+HEADER_SIZE = 16
+INDEX_ENTRY = np.dtype([
+    ("txid", "u1", (32,)),
+    ("group", "u1", (32,)),
+    ("first_valid", "<u8"),
+    ("last_valid", "<u8"),
+    ("offset", "<u8"),
+    ("length", "<u4"),
+    ("pad", "u1", (4,)),
+])
+NO_GROUP = bytes(32)
+RESORT_THRESHOLD = 1 << 16       # appended entries kept in a dict before re-sorting
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    txid: str
+    group: bytes
+    first_valid: int
+    last_valid: int
+    offset: int
+    length: int
+
+
+def _raw_txid(txid: str) -> bytes:
+    return base64.b32decode(txid + "=" * (-len(txid) % 8))
+
+
+def _txid(raw: bytes) -> str:
+    return base64.b32encode(raw).decode().rstrip("=")
+
+
+def _map(path: str):
+    """Read-only mmap of `path`, or None while it is empty."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class TxnArchive:
+    """Append-only store of signed transactions with a txid index."""
+
+    def __init__(self, directory: str, readonly: bool = False):
+        self.directory = directory
+        self.readonly = readonly
+        self.data_path = os.path.join(directory, "data.bin")
+        self.index_path = os.path.join(directory, "index.bin")
+        self._lock_fd = None
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+            if not os.path.exists(self.index_path):
+                with open(self.index_path, "wb") as f:
+                    f.write(MAGIC.ljust(HEADER_SIZE, b"\0"))
+            self._lock_fd = os.open(self.index_path, os.O_RDONLY)
+            try:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(self._lock_fd)
+                raise RuntimeError(f"{directory} is already open for writing by another process") from None
+            open(self.data_path, "ab").close()
+            self._recover()
+        with open(self.index_path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.index_path} is not a transaction archive index")
+        self._data_map = self._index_map = None
+        self._data_fd = None if readonly else os.open(self.data_path, os.O_WRONLY | os.O_APPEND)
+        self._index_fd = None if readonly else os.open(self.index_path, os.O_WRONLY | os.O_APPEND)
+        self._data_end = os.path.getsize(self.data_path)
+        self._count = (os.path.getsize(self.index_path) - HEADER_SIZE) // INDEX_ENTRY.itemsize
+        self._recent = {}
+        self._sort()
+
+    def _recover(self):
+        """Drop a torn tail: partial index entries, and data past the last indexed entry."""
+        count = (os.path.getsize(self.index_path) - HEADER_SIZE) // INDEX_ENTRY.itemsize
+        data_size = os.path.getsize(self.data_path)
+        index = np.fromfile(self.index_path, dtype=INDEX_ENTRY, count=count, offset=HEADER_SIZE)
+        ends = index["offset"] + index["length"]
+        valid = int(np.searchsorted(np.maximum.accumulate(ends) > data_size, True)) if count else 0
+        os.truncate(self.index_path, HEADER_SIZE + valid * INDEX_ENTRY.itemsize)
+        os.truncate(self.data_path, int(ends[valid - 1]) if valid else 0)
+
+    # -- mapping --
+
+    def _index(self) -> np.ndarray:
+        """Zero-copy structured view of all index entries."""
+        if self._count == 0:
+            return np.empty(0, dtype=INDEX_ENTRY)
+        needed = HEADER_SIZE + self._count * INDEX_ENTRY.itemsize
+        if self._index_map is None or len(self._index_map) < needed:
+            self._index_map = _map(self.index_path)
+        return np.frombuffer(self._index_map, dtype=INDEX_ENTRY, count=self._count, offset=HEADER_SIZE)
+
+    def _data(self, end: int) -> mmap.mmap:
+        if self._data_map is None or len(self._data_map) < end:
+            self._data_map = _map(self.data_path)
+        return self._data_map
+
+    def _sort(self):
+        index = self._index()
+        keys = np.ascontiguousarray(index["txid"][:, :8]).view("<u8").ravel()
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+        self._recent = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    # -- appends --
+
+    def append(self, signed: bytes) -> ArchiveEntry:
+        """Archive one signed transaction (msgpack bytes as sent to algod)."""
+        if self.readonly:
+            raise PermissionError("archive opened read-only")
+        stxn = msgpack.unpackb(signed, raw=False)
+        txn = stxn["txn"]
+        raw_txid = _raw_txid(compute_txid(txn))
+        record = np.zeros(1, dtype=INDEX_ENTRY)
+        record["txid"] = np.frombuffer(raw_txid, dtype=np.uint8)
+        record["group"] = np.frombuffer(txn.get("grp", NO_GROUP), dtype=np.uint8)
+        record["first_valid"] = txn.get("fv", 0)
+        record["last_valid"] = txn.get("lv", 0)
+        record["offset"] = self._data_end
+        record["length"] = len(signed)
+        # Data first: an index entry must never point past the data file.
+        os.write(self._data_fd, signed)
+        os.write(self._index_fd, record.tobytes())
+        self._recent[raw_txid] = self._count
+        self._count += 1
+        self._data_end += len(signed)
+        if len(self._recent) >= RESORT_THRESHOLD:
+            self._sort()
+        return self._entry(record[0])
+
+    def append_group(self, signed_txns) -> list:
+        """Archive an atomic group (bytes, or SignedTransaction objects) in group order."""
+        return [
+            self.append(s if isinstance(s, (bytes, bytearray)) else base64.b64decode(encoding.msgpack_encode(s)))
+            for s in signed_txns
+        ]
+
+    def flush(self):
+        """fsync both files (appends are already visible to readers)."""
+        if not self.readonly:
+            os.fsync(self._data_fd)
+            os.fsync(self._index_fd)
+
+    # -- reads --
+
+    @staticmethod
+    def _entry(record) -> ArchiveEntry:
+        return ArchiveEntry(_txid(record["txid"].tobytes()), record["group"].tobytes(),
+                            int(record["first_valid"]), int(record["last_valid"]),
+                            int(record["offset"]), int(record["length"]))
+
+    def _position(self, txid: str):
+        raw = _raw_txid(txid)
+        if raw in self._recent:
+            return self._recent[raw]
+        index = self._index()
+        key = np.frombuffer(raw[:8], dtype="<u8")[0]
+        lo = int(np.searchsorted(self._keys, key, "left"))
+        hi = int(np.searchsorted(self._keys, key, "right"))
+        for pos in self._order[lo:hi]:
+            if index[pos]["txid"].tobytes() == raw:
+                return int(pos)
+        return None
+
+    def entry(self, txid: str):
+        pos = self._position(txid)
+        return None if pos is None else self._entry(self._index()[pos])
+
+    def get(self, txid: str):
+        """Signed bytes of `txid` as a memoryview into the archive, or None."""
+        entry = self.entry(txid)
+        if entry is None:
+            return None
+        end = entry.offset + entry.length
+        return memoryview(self._data(end))[entry.offset:end]
+
+    def positions(self, from_round: int = 0, to_round: int = None, valid_at: int = None) -> np.ndarray:
+        """Index positions, in append order, with first_valid in the range (and still valid at a round)."""
+        index = self._index()
+        mask = index["first_valid"] >= from_round
+        if to_round is not None:
+            mask &= index["first_valid"] <= to_round
+        if valid_at is not None:
+            mask &= (index["first_valid"] <= valid_at) & (index["last_valid"] >= valid_at)
+        return np.flatnonzero(mask)
+
+    def iter_rounds(self, from_round: int = 0, to_round: int = None, valid_at: int = None):
+        """(ArchiveEntry, memoryview) for each matching transaction, in append order."""
+        index = self._index()
+        view = memoryview(self._data(self._data_end)) if self._count else None
+        for pos in self.positions(from_round, to_round, valid_at):
+            entry = self._entry(index[pos])
+            yield entry, view[entry.offset:entry.offset + entry.length]
+
+    # -- resubmission --
+
+    def pending_groups(self, current_round: int) -> list:
+        """Still-valid transactions as send units: lists of memoryviews, atomic groups together."""
+        units, groups = [], {}
+        for entry, signed in self.iter_rounds(valid_at=current_round):
+            if entry.group == NO_GROUP:
+                units.append([signed])
+            elif entry.group in groups:
+                groups[entry.group].append(signed)
+            else:
+                groups[entry.group] = [signed]
+                units.append(groups[entry.group])
+        return units
+
+    def resubmit(self, algod_client, current_round: int = None) -> dict:
+        """Rebroadcast every still-valid transaction; counts of sent / duplicate / rejected units."""
+        if current_round is None:
+            current_round = algod_client.status()["last-round"] + 1
+        counts = {"sent": 0, "duplicate": 0, "rejected": 0}
+        for unit in self.pending_groups(current_round):
+            try:
+                algod_client.send_raw_transaction(base64.b64encode(b"".join(unit)).decode())
+                counts["sent"] += 1
+            except AlgodHTTPError as e:
+                counts["duplicate" if any(m in str(e) for m in DUPLICATE_ERRORS) else "rejected"] += 1
+        return counts
+
+    # -- lifecycle --
+
+    def close(self):
+        for fd in (self._data_fd, self._index_fd, self._lock_fd):      # closing the lock fd unlocks
+            if fd is not None:
+                os.close(fd)
+        self._data_fd = self._index_fd = self._lock_fd = None
+        self._data_map = self._index_map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ── CLI ──
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Signed admin transaction archive")
+    parser.add_argument("directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="print one archived transaction")
+    show.add_argument("txid")
+    rounds = sub.add_parser("rounds", help="list transactions by first-valid round")
+    rounds.add_argument("--from-round", type=int, default=0)
+    rounds.add_argument("--to-round", type=int)
+    sub.add_parser("resubmit", help="rebroadcast still-valid transactions")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(os.path.join(args.directory, "index.bin")):
+        print(f"❌ No archive in {args.directory}")
+        sys.exit(1)
+
+    if args.command == "resubmit":
+        from config import get_algod_client
+        with TxnArchive(args.directory, readonly=True) as archive:
+            counts = archive.resubmit(get_algod_client())
+        print(f"Resubmitted from {len(archive)} archived txns: "
+              + ", ".join(f"{k} {v}" for k, v in counts.items()))
+        return
+
+    with TxnArchive(args.directory, readonly=True) as archive:
+        if args.command == "show":
+            signed = archive.get(args.txid)
+            if signed is None:
+                print(f"❌ {args.txid} not in archive")
+                sys.exit(1)
+            print(archive.entry(args.txid))
+            print(msgpack.unpackb(signed, raw=False))
+        else:
+            for entry, _ in archive.iter_rounds(args.from_round, args.to_round):
+                group = entry.group.hex()[:12] if entry.group != NO_GROUP else "-"
+                print(f"{entry.first_valid:>10} {entry.last_valid:>10}  {entry.txid}  group {group}")
+
+
+if __name__ == "__main__":
+    main()
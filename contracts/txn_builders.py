@@ -0,0 +1,175 @@
+"""
+TrackBuddy -- Python Transaction Builders
+
+Offline builders for every discipline contract call, mirroring the
+backend's web3 helpers (buildAppCallTxn, buildPaymentTxn, buildOptInTxn).
+
+Account arguments are passed as 32-byte public keys and also listed in
+the foreign accounts array, so app_local_get / app_local_put in the
+approval program can reach the target user's local state.
+"""
+
+import copy
+from algosdk import encoding, logic
+from algosdk.transaction import (
+    ApplicationNoOpTxn,
+    ApplicationOptInTxn,
+    PaymentTxn,
+    SuggestedParams,
+    assign_group_id,
+)
+
+
+# ── Argument Encoding ──
+
+def encode_account_arg(address: str) -> bytes:
+    """Encode an Algorand address as a 32-byte app argument."""
+    return encoding.decode_address(address)
+
+
+def encode_uint_arg(value: int) -> bytes:
+    """Encode an integer as a big-endian uint64 app argument."""
+    return int(value).to_bytes(8, "big")
+
+
+def get_app_address(app_id: int) -> str:
+    """Return the escrow address of the application."""
+    return logic.get_application_address(app_id)
+
+
+def with_fee(sp: SuggestedParams, fee: int) -> SuggestedParams:
+    """Return a copy of suggested params with a flat fee."""
+    params = copy.copy(sp)
+    params.flat_fee = True
+    params.fee = fee
+    return params
+
+
+def min_txn_fee(sp: SuggestedParams) -> int:
+    """Return the per-transaction fee implied by suggested params."""
+    if sp.flat_fee:
+        return max(sp.fee, sp.min_fee or 1000)
+    return sp.min_fee or 1000
+
+
+# ── User Transactions ──
+
+def build_optin_txn(sender: str, sp: SuggestedParams, app_id: int) -> ApplicationOptInTxn:
+    """Build an opt-in transaction for a user."""
+    return ApplicationOptInTxn(sender=sender, sp=sp, index=app_id)
+
+
+def build_create_commitment_group(sender: str, sp: SuggestedParams, app_id: int,
+                                  commitment_hash: bytes, stake: int) -> list:
+    """Build the [payment, createCommitment] atomic group."""
+    pay_txn = PaymentTxn(
+        sender=sender,
+        sp=sp,
+        receiver=get_app_address(app_id),
+        amt=stake,
+    )
+    app_txn = ApplicationNoOpTxn(
+        sender=sender,
+        sp=sp,
+        index=app_id,
+        app_args=[b"createCommitment", commitment_hash],
+    )
+    return assign_group_id([pay_txn, app_txn])
+
+
+def build_bridge_intent_group(sender: str, sp: SuggestedParams, app_id: int,
+                              upi_hash: bytes, amount: int) -> list:
+    """Build the [payment, bridgeIntent] atomic group."""
+    pay_txn = PaymentTxn(
+        sender=sender,
+        sp=sp,
+        receiver=get_app_address(app_id),
+        amt=amount,
+    )
+    app_txn = ApplicationNoOpTxn(
+        sender=sender,
+        sp=sp,
+        index=app_id,
+        app_args=[b"bridgeIntent", upi_hash],
+    )
+    return assign_group_id([pay_txn, app_txn])
+
+
+# ── Admin Transactions ──
+
+def build_verify_session_txn(admin: str, sp: SuggestedParams, app_id: int,
+                             account: str, success: bool) -> ApplicationNoOpTxn:
+    """
+    Build a verifySession call.
+
+    A successful session pays the stake back with an inner payment
+    whose fee is 0, so the outer call covers both fees.
+    """
+    if success:
+        sp = with_fee(sp, 2 * min_txn_fee(sp))
+    return ApplicationNoOpTxn(
+        sender=admin,
+        sp=sp,
+        index=app_id,
+        app_args=[b"verifySession", encode_account_arg(account), encode_uint_arg(1 if success else 0)],
+        accounts=[account],
+    )
+
+
+def build_apply_penalty_txn(admin: str, sp: SuggestedParams, app_id: int,
+                            account: str) -> ApplicationNoOpTxn:
+    """Build an applyPenalty call."""
+    return ApplicationNoOpTxn(
+        sender=admin,
+        sp=sp,
+        index=app_id,
+        app_args=[b"applyPenalty", encode_account_arg(account)],
+        accounts=[account],
+    )
+
+
+def build_apply_penalty_n_txn(admin: str, sp: SuggestedParams, app_id: int,
+                              account: str, count: int) -> ApplicationNoOpTxn:
+    """Build an applyPenaltyN call covering `count` violations."""
+    return ApplicationNoOpTxn(
+        sender=admin,
+        sp=sp,
+        index=app_id,
+        app_args=[b"applyPenaltyN", encode_account_arg(account), encode_uint_arg(count)],
+        accounts=[account],
+    )
+
+
+def build_log_discipline_txn(admin: str, sp: SuggestedParams, app_id: int,
+                             account: str, score: int) -> ApplicationNoOpTxn:
+    """Build a logDiscipline call."""
+    return ApplicationNoOpTxn(
+        sender=admin,
+        sp=sp,
+        index=app_id,
+        app_args=[b"logDiscipline", encode_account_arg(account), encode_uint_arg(score)],
+        accounts=[account],
+    )
+
+
+def build_settle_bridge_txn(admin: str, sp: SuggestedParams, app_id: int,
+                            account: str, ref_hash: bytes) -> ApplicationNoOpTxn:
+    """Build a settleBridge call."""
+    return ApplicationNoOpTxn(
+        sender=admin,
+        sp=sp,
+        index=app_id,
+        app_args=[b"settleBridge", encode_account_arg(account), ref_hash],
+        accounts=[account],
+    )
+
+
+def build_anchor_scores_txn(admin: str, sp: SuggestedParams, app_id: int,
+                            root: bytes, day: int) -> ApplicationNoOpTxn:
+    """Build an anchorScores call for a day's score Merkle root."""
+    return ApplicationNoOpTxn(
+        sender=admin,
+        sp=sp,
+        index=app_id,
+        app_args=[b"anchorScores", root, encode_uint_arg(day)],
+    )
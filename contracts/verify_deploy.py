@@ -8,19 +8,25 @@ Verifies the deployed contract on Algorand testnet by:
 4. Printing deployment summary
 
 Usage:
-    python verify_deploy.py
+    python verify_deploy.py                 # artifacts/
+    python verify_deploy.py builds/core     # the directory a subset build was deployed from
 """
 
 import os
 import sys
 import json
+
+import instrumentation
 from config import get_algod_client, get_network_info
 
 
-def verify():
-    """Verify deployed contract on testnet."""
+ARTIFACTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts")
+
+
+def verify(artifacts_dir: str = ARTIFACTS_DIR):
+    """Verify the contract deployed from artifacts_dir on testnet."""
     # Load deploy info
-    info_path = os.path.join(os.path.dirname(__file__), "artifacts", "deploy_info.json")
+    info_path = os.path.join(artifacts_dir, "deploy_info.json")
 
     if not os.path.exists(info_path):
         print("[DEPLOY] No deploy_info.json found.")
@@ -32,6 +38,10 @@ def verify():
     with open(info_path, "r") as f:
         deploy_info = json.load(f)
 
+    # Expected schema comes from the compiled build (it may hold a subset of methods)
+    with open(os.path.join(artifacts_dir, "contract.json"), "r") as f:
+        expected = json.load(f)["state_schema"]
+
     app_id = deploy_info["app_id"]
     network = deploy_info.get("network", "testnet")
 
@@ -41,7 +51,8 @@ def verify():
     try:
         # Query application info
         algod = get_algod_client()
-        app_info = algod.application_info(app_id)
+        with instrumentation.span("verify.application_info", app_id=app_id):
+            app_info = algod.application_info(app_id)
 
         params = app_info["params"]
 
@@ -51,10 +62,10 @@ def verify():
 
         print(f"  App ID:          {app_id}")
         print(f"  Creator:         {params['creator']}")
-        print(f"  Global ints:     {global_schema.get('num-uint', 0)} (expected: 3)")
-        print(f"  Global bytes:    {global_schema.get('num-byte-slice', 0)} (expected: 1)")
-        print(f"  Local ints:      {local_schema.get('num-uint', 0)} (expected: 4)")
-        print(f"  Local bytes:     {local_schema.get('num-byte-slice', 0)} (expected: 1)")
+        print(f"  Global ints:     {global_schema.get('num-uint', 0)} (expected: {expected['global']['num_uints']})")
+        print(f"  Global bytes:    {global_schema.get('num-byte-slice', 0)} (expected: {expected['global']['num_byte_slices']})")
+        print(f"  Local ints:      {local_schema.get('num-uint', 0)} (expected: {expected['local']['num_uints']})")
+        print(f"  Local bytes:     {local_schema.get('num-byte-slice', 0)} (expected: {expected['local']['num_byte_slices']})")
 
         # Check global state
         global_state = params.get("global-state", [])
@@ -75,4 +86,4 @@ def verify():
 
 
 if __name__ == "__main__":
-    verify()
+    verify(*sys.argv[1:2])
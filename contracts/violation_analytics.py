@@ -0,0 +1,350 @@
+"""
+TrackBuddy -- Streaming Violation Analytics
+
+Per-user violation counts, violation rates and heavy hitters over the
+applyPenalty / verifySession event stream, in memory that does not grow
+with the number of users or the length of history:
+
+    CountMinSketch    per-user violations and sessions since the start
+                      (overestimates by at most total/width with
+                      probability 1 - e^-depth, never underestimates)
+    SpaceSaving       the top-k most penalized accounts, with per-entry
+                      error bounds
+    SlidingWindow     ring of time buckets (default 7 days of hours):
+                      global penalty / session / failure totals plus a
+                      count-min slab per bucket for per-user windowed counts
+
+Buckets are keyed by round time, so replaying years of history gives the
+same window as following the chain live. Events older than the window
+still count toward the all-time sketches and heavy hitters.
+
+snapshot() / restore() round-trip the whole state through msgpack, so a
+dashboard process can resume from its last position instead of
+replaying from genesis. A snapshot covers every event through its
+last_round (save at round boundaries), so after a restore events from
+that round or earlier are skipped: overlapping input, such as a cursor
+resume or re-fed file, is not counted twice.
+
+Usage:
+    python block_ingestor.py --app-id 1234 > events.jsonl
+    python violation_analytics.py events.jsonl --state analytics.msgpack --top 20
+    python violation_analytics.py - --state analytics.msgpack --user ADDR < new_events.jsonl
+"""
+
+import os
+import sys
+import heapq
+import hashlib
+import argparse
+
+import msgpack
+import numpy as np
+
+from events import ContractEvent, event_from_json, read_event_lines
+
+
+SNAPSHOT_VERSION = 1
+DEFAULT_WIDTH = 2048
+DEFAULT_DEPTH = 4
+DEFAULT_TOP_K = 64
+DEFAULT_BUCKET_SECS = 3600
+DEFAULT_BUCKETS = 24 * 7
+
+WINDOW_COUNTERS = ("penalties", "sessions", "failures")
+
+
+# ── Count-Min Sketch ──
+
+def sketch_indexes(key: str, width: int, depth: int) -> np.ndarray:
+    """Column per row from one blake2b digest (Kirsch-Mitzenmacher double hashing)."""
+    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return np.array([(h1 + i * h2) % width for i in range(depth)], dtype=np.intp)
+
+
+class CountMinSketch:
+    """depth x width counters; estimate() is the minimum over rows."""
+
+    def __init__(self, width: int = DEFAULT_WIDTH, depth: int = DEFAULT_DEPTH, counts: np.ndarray = None):
+        self.width = width
+        self.depth = depth
+        self.counts = counts if counts is not None else np.zeros((depth, width), dtype=np.uint64)
+        self._rows = np.arange(depth)
+
+    def add(self, indexes: np.ndarray, count: int = 1):
+        self.counts[self._rows, indexes] += np.uint64(count)
+
+    def estimate(self, indexes: np.ndarray) -> int:
+        return int(self.counts[self._rows, indexes].min())
+
+    @property
+    def total(self) -> int:
+        return int(self.counts[0].sum())
+
+
+# ── Heavy Hitters ──
+
+class SpaceSaving:
+    """
+    Top-k by weighted count (Metwally et al.). A new key evicts the
+    current minimum and inherits its count as error, so count - error
+    is a guaranteed lower bound. The min-heap is lazy: stale entries are
+    skipped on eviction and the heap is rebuilt when it outgrows 4k.
+    """
+
+    def __init__(self, k: int = DEFAULT_TOP_K):
+        self.k = k
+        self.counts = {}
+        self.errors = {}
+        self._heap = []
+
+    def add(self, key: str, count: int = 1):
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.k:
+            self.counts[key] = count
+            self.errors[key] = 0
+        else:
+            floor, victim = self._pop_min()
+            del self.counts[victim], self.errors[victim]
+            self.counts[key] = floor + count
+            self.errors[key] = floor
+        heapq.heappush(self._heap, (self.counts[key], key))
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(c, k) for k, c in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> tuple:
+        while True:
+            count, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:
+                return count, key
+
+    def top(self, n: int = None) -> list:
+        """[(key, count, error)] by count, highest first."""
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+        return [(key, count, self.errors[key]) for key, count in ranked[:n]]
+
+
+# ── Sliding Window ──
+
+class SlidingWindow:
+    """Ring of `buckets` time buckets ending at the newest event seen."""
+
+    def __init__(self, bucket_secs: int = DEFAULT_BUCKET_SECS, buckets: int = DEFAULT_BUCKETS,
+                 width: int = DEFAULT_WIDTH, depth: int = DEFAULT_DEPTH):
+        self.bucket_secs = bucket_secs
+        self.buckets = buckets
+        self.head = -1                      # absolute index of the newest bucket
+        self.totals = np.zeros((buckets, len(WINDOW_COUNTERS)), dtype=np.uint64)
+        self.sketches = np.zeros((buckets, depth, width), dtype=np.uint32)
+        self._rows = np.arange(depth)
+
+    def slot(self, timestamp: int):
+        """Ring position for `timestamp`, advancing the window; None if it already expired."""
+        bucket = timestamp // self.bucket_secs
+        if bucket > self.head:
+            if self.head < 0 or bucket - self.head >= self.buckets:
+                self.totals[:] = 0
+                self.sketches[:] = 0
+            else:
+                for b in range(self.head + 1, bucket + 1):
+                    self.totals[b % self.buckets] = 0
+                    self.sketches[b % self.buckets] = 0
+            self.head = bucket
+        elif bucket <= self.head - self.buckets:
+            return None
+        return bucket % self.buckets
+
+    def add(self, slot: int, counter: str, count: int = 1, indexes: np.ndarray = None):
+        self.totals[slot, WINDOW_COUNTERS.index(counter)] += np.uint64(count)
+        if indexes is not None:
+            self.sketches[slot, self._rows, indexes] += np.uint32(count)
+
+    def total(self, counter: str) -> int:
+        return int(self.totals[:, WINDOW_COUNTERS.index(counter)].sum())
+
+    def estimate(self, indexes: np.ndarray) -> int:
+        return int(self.sketches[:, self._rows, indexes].sum(axis=0, dtype=np.uint64).min())
+
+
+# ── Analytics ──
+
+class ViolationAnalytics:
+    """Fixed-memory aggregates over decoded penalty and session events."""
+
+    def __init__(self, width: int = DEFAULT_WIDTH, depth: int = DEFAULT_DEPTH, top_k: int = DEFAULT_TOP_K,
+                 bucket_secs: int = DEFAULT_BUCKET_SECS, buckets: int = DEFAULT_BUCKETS):
+        self.width = width
+        self.depth = depth
+        self.violations = CountMinSketch(width, depth)
+        self.sessions = CountMinSketch(width, depth)
+        self.heavy = SpaceSaving(top_k)
+        self.window = SlidingWindow(bucket_secs, buckets, width, depth)
+        self.events = 0
+        self.last_round = 0
+        self.resume_round = None    # restored snapshot covers rounds <= this
+        self.skipped = 0
+
+    # -- ingestion --
+
+    def consume(self, event: ContractEvent) -> bool:
+        """Fold one event in; False for methods that carry no violation data or already-covered rounds."""
+        if self.resume_round is not None and event.confirmed_round <= self.resume_round:
+            self.skipped += 1
+            return False
+        if event.method in ("applyPenalty", "applyPenaltyN"):
+            account = event.arg_account(0)
+            count = event.arg_uint(1) if event.method == "applyPenaltyN" else 1
+            indexes = sketch_indexes(account, self.width, self.depth)
+            self.violations.add(indexes, count)
+            self.heavy.add(account, count)
+            slot = self.window.slot(event.round_time)
+            if slot is not None:
+                self.window.add(slot, "penalties", count, indexes)
+        elif event.method == "verifySession":
+            account = event.arg_account(0)
+            self.sessions.add(sketch_indexes(account, self.width, self.depth))
+            slot = self.window.slot(event.round_time)
+            if slot is not None:
+                self.window.add(slot, "sessions")
+                if event.arg_uint(1) != 1:
+                    self.window.add(slot, "failures")
+        else:
+            return False
+        self.events += 1
+        self.last_round = max(self.last_round, event.confirmed_round)
+        return True
+
+    def consume_all(self, events) -> int:
+        return sum(self.consume(event) for event in events)
+
+    # -- queries --
+
+    def user(self, address: str) -> dict:
+        """Estimated all-time and windowed counts for one account."""
+        indexes = sketch_indexes(address, self.width, self.depth)
+        violations = self.violations.estimate(indexes)
+        sessions = self.sessions.estimate(indexes)
+        return {
+            "violations": violations,
+            "sessions": sessions,
+            "violations_per_session": violations / sessions if sessions else None,
+            "window_violations": self.window.estimate(indexes),
+        }
+
+    def heavy_hitters(self, n: int = None) -> list:
+        return self.heavy.top(n)
+
+    def summary(self) -> dict:
+        penalties, sessions, failures = (self.window.total(c) for c in WINDOW_COUNTERS)
+        return {
+            "events": self.events,
+            "last_round": self.last_round,
+            "total_violations": self.violations.total,
+            "total_sessions": self.sessions.total,
+            "window_secs": self.window.bucket_secs * self.window.buckets,
+            "window_penalties": penalties,
+            "window_sessions": sessions,
+            "window_failure_rate": failures / sessions if sessions else None,
+            "window_penalties_per_session": penalties / sessions if sessions else None,
+        }
+
+    def memory_bytes(self) -> int:
+        """Array storage; constant for a given configuration."""
+        return (self.violations.counts.nbytes + self.sessions.counts.nbytes
+                + self.window.totals.nbytes + self.window.sketches.nbytes)
+
+    # -- persistence --
+
+    def snapshot(self) -> bytes:
+        return msgpack.packb({
+            "version": SNAPSHOT_VERSION,
+            "width": self.width,
+            "depth": self.depth,
+            "top_k": self.heavy.k,
+            "bucket_secs": self.window.bucket_secs,
+            "buckets": self.window.buckets,
+            "events": self.events,
+            "last_round": self.last_round,
+            "violations": self.violations.counts.tobytes(),
+            "sessions": self.sessions.counts.tobytes(),
+            "heavy": [[key, count, self.heavy.errors[key]] for key, count in self.heavy.counts.items()],
+            "head": self.window.head,
+            "totals": self.window.totals.tobytes(),
+            "sketches": self.window.sketches.tobytes(),
+        }, use_bin_type=True)
+
+    @classmethod
+    def restore(cls, blob: bytes) -> "ViolationAnalytics":
+        data = msgpack.unpackb(blob, raw=False)
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported analytics snapshot version: {data.get('version')}")
+        analytics = cls(data["width"], data["depth"], data["top_k"], data["bucket_secs"], data["buckets"])
+        analytics.events = data["events"]
+        analytics.last_round = analytics.resume_round = data["last_round"]
+        for name in ("violations", "sessions"):
+            sketch = getattr(analytics, name)
+            sketch.counts[:] = np.frombuffer(data[name], dtype=np.uint64).reshape(sketch.counts.shape)
+        for key, count, error in data["heavy"]:
+            analytics.heavy.counts[key] = count
+            analytics.heavy.errors[key] = error
+        analytics.heavy._heap = [(count, key) for key, count in analytics.heavy.counts.items()]
+        heapq.heapify(analytics.heavy._heap)
+        window = analytics.window
+        window.head = data["head"]
+        window.totals[:] = np.frombuffer(data["totals"], dtype=np.uint64).reshape(window.totals.shape)
+        window.sketches[:] = np.frombuffer(data["sketches"], dtype=np.uint32).reshape(window.sketches.shape)
+        return analytics
+
+    def save(self, path: str):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.snapshot())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ViolationAnalytics":
+        with open(path, "rb") as f:
+            return cls.restore(f.read())
+
+
+# ── CLI ──
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming violation analytics over contract events")
+    parser.add_argument("events", help="block_ingestor JSON lines ('-' for stdin)")
+    parser.add_argument("--state", help="snapshot file to resume from and save to")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--user", action="append", default=[], help="print estimates for an account")
+    args = parser.parse_args(argv)
+
+    if args.state and os.path.exists(args.state):
+        analytics = ViolationAnalytics.load(args.state)
+    else:
+        analytics = ViolationAnalytics()
+    if args.events == "-":
+        consumed = analytics.consume_all(event_from_json(line) for line in sys.stdin if line.strip())
+    else:
+        consumed = analytics.consume_all(read_event_lines(args.events))
+    if args.state:
+        analytics.save(args.state)
+
+    summary = analytics.summary()
+    print(f"Consumed {consumed} events ({summary['events']} total, through round {summary['last_round']}, "
+          f"{analytics.memory_bytes() / 1e6:.1f} MB)")
+    if analytics.skipped:
+        print(f"  skipped {analytics.skipped} events at or before snapshot round {analytics.resume_round}")
+    for key, value in summary.items():
+        if key not in ("events", "last_round"):
+            print(f"  {key:<30} {value if value is not None else '-'}")
+    print(f"Top {args.top} penalized accounts:")
+    for address, count, error in analytics.heavy_hitters(args.top):
+        print(f"  {address}  {count:>8}  (±{error})")
+    for address in args.user:
+        print(f"{address}: {analytics.user(address)}")
+
+
+if __name__ == "__main__":
+    main()